@@ -3,13 +3,18 @@
  * 
  * Mapa de calor interativo para visualização de dados eleitorais
  * usando Google Maps Visualization Library (HeatmapLayer)
+ *
+ * As células pré-calculadas (tabela mapa_calor) são pedidas só para a janela
+ * visível, no nível de zoom atual; sem células, usa os bairros de demonstração
  */
 
 /// <reference types="@types/google.maps" />
 
 import { useEffect, useRef, useState, useCallback } from "react";
 import { usePersistFn } from "@/hooks/usePersistFn";
+import { trpc } from "@/lib/trpc";
 import { cn } from "@/lib/utils";
+import { celulasDaJanela, MAX_CELULAS_JANELA, totalCelulas, type IntervaloCelulas } from "@shared/mapaCalor";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { Button } from "@/components/ui/button";
@@ -59,6 +64,8 @@ type HeatmapDataType = "eleitores" | "nulos" | "partidos";
 interface ElectoralHeatmapProps {
   className?: string;
   initialDataType?: HeatmapDataType;
+  anoEleicao?: number;
+  cargo?: string;
   onBairroSelect?: (bairro: typeof bairrosPortoVelho[0] | null) => void;
 }
 
@@ -88,6 +95,8 @@ function loadMapScript() {
 export function ElectoralHeatmap({
   className,
   initialDataType = "eleitores",
+  anoEleicao = 2024,
+  cargo = "prefeito",
   onBairroSelect,
 }: ElectoralHeatmapProps) {
   const mapContainer = useRef<HTMLDivElement>(null);
@@ -101,8 +110,59 @@ export function ElectoralHeatmap({
   const [selectedBairro, setSelectedBairro] = useState<typeof bairrosPortoVelho[0] | null>(null);
   const [showMarkers, setShowMarkers] = useState(true);
   const [showHeatmap, setShowHeatmap] = useState(true);
+  const [intervalo, setIntervalo] = useState<IntervaloCelulas | null>(null);
+
+  // Células da janela visível; ao mover o mapa, as anteriores ficam na tela até as novas chegarem
+  const { data: celulas } = trpc.mapaCalor.celulas.useQuery(
+    { anoEleicao, cargo, ...(intervalo ?? { zoom: 0, xMin: 0, xMax: 0, yMin: 0, yMax: 0 }) },
+    {
+      enabled: !!intervalo && totalCelulas(intervalo) <= MAX_CELULAS_JANELA,
+      placeholderData: (anteriores) => anteriores,
+      staleTime: 5 * 60 * 1000,
+    }
+  );
+
+  const atualizarJanela = usePersistFn(() => {
+    const bounds = mapRef.current?.getBounds();
+    if (!bounds) return;
+    const norteLeste = bounds.getNorthEast();
+    const sulOeste = bounds.getSouthWest();
+    const novo = celulasDaJanela(
+      { norte: norteLeste.lat(), sul: sulOeste.lat(), leste: norteLeste.lng(), oeste: sulOeste.lng() },
+      mapRef.current?.getZoom() ?? 12
+    );
+    setIntervalo((atual) =>
+      atual &&
+      atual.zoom === novo.zoom &&
+      atual.xMin === novo.xMin &&
+      atual.xMax === novo.xMax &&
+      atual.yMin === novo.yMin &&
+      atual.yMax === novo.yMax
+        ? atual
+        : novo
+    );
+  });
 
   const getHeatmapData = useCallback((type: HeatmapDataType) => {
+    if (celulas && celulas.length > 0) {
+      return celulas.map((celula) => {
+        let weight: number;
+        switch (type) {
+          case "nulos":
+            weight = (celula.nulos + celula.brancos) / 100;
+            break;
+          case "partidos":
+            weight = Math.max(0, ...Object.values(celula.partidos ?? {})) / 500;
+            break;
+          default:
+            weight = celula.eleitores / 1000;
+        }
+        return {
+          location: new google.maps.LatLng(celula.latitude, celula.longitude),
+          weight,
+        };
+      });
+    }
     return bairrosPortoVelho.map((bairro) => {
       let weight: number;
       switch (type) {
@@ -123,7 +183,7 @@ export function ElectoralHeatmap({
         weight,
       };
     });
-  }, []);
+  }, [celulas]);
 
   const getHeatmapGradient = useCallback((type: HeatmapDataType) => {
     switch (type) {
@@ -274,6 +334,9 @@ export function ElectoralHeatmap({
       // Create markers
       createMarkers();
 
+      // Pede as células da janela sempre que o mapa para de mover
+      mapRef.current.addListener("idle", atualizarJanela);
+
       setIsLoading(false);
     } catch (error) {
       console.error("Error initializing map:", error);
@@ -67,6 +67,16 @@ function getStatusBadgeClass(status: string) {
   }
 }
 
+function formatEta(segundos: number) {
+  if (segundos < 60) return `${segundos}s`;
+  const minutos = Math.round(segundos / 60);
+  if (minutos < 60) return `${minutos} min`;
+  return `${Math.floor(minutos / 60)}h${String(minutos % 60).padStart(2, "0")}`;
+}
+
+// Intervalo de atualização do histórico enquanto há importação em andamento
+const INTERVALO_PROGRESSO_MS = 5000;
+
 export default function Importar() {
   const { user, loading: authLoading } = useAuth();
   const [, navigate] = useLocation();
@@ -80,6 +90,8 @@ export default function Importar() {
 
   const { data: importacoes, refetch: refetchImportacoes } = trpc.importacoes.list.useQuery(undefined, {
     enabled: !!user && ["admin", "gestor"].includes(user.role),
+    refetchInterval: (query) =>
+      query.state.data?.some((imp) => imp.status === "processando") ? INTERVALO_PROGRESSO_MS : false,
   });
 
   const createImportacao = trpc.importacoes.create.useMutation();
@@ -390,6 +402,17 @@ export default function Importar() {
                               {getStatusLabel(imp.status || "pendente")}
                             </span>
                           </div>
+                          {imp.status === "processando" && imp.etapaAtual && (
+                            <div className="mt-2 min-w-[180px] space-y-1">
+                              <Progress value={imp.progresso ?? 0} className="h-1.5" />
+                              <p className="text-xs text-muted-foreground">
+                                {imp.etapaAtual}
+                                {imp.progresso != null && ` · ${imp.progresso}%`}
+                                {imp.linhasPorSegundo != null && ` · ${imp.linhasPorSegundo.toLocaleString("pt-BR")} linhas/s`}
+                                {imp.etaSegundos != null && ` · ${formatEta(imp.etaSegundos)} restantes`}
+                              </p>
+                            </div>
+                          )}
                         </td>
                         <td className="py-3 px-4 text-sm text-muted-foreground">
                           {new Date(imp.createdAt).toLocaleDateString("pt-BR", {
@@ -123,6 +123,7 @@ export default function Mapas() {
           <CardContent className="p-0">
             <ElectoralHeatmap
               className="h-[600px]"
+              anoEleicao={Number(anoSelecionado)}
               onBairroSelect={setSelectedBairro}
             />
           </CardContent>
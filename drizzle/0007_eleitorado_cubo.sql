@@ -0,0 +1,10 @@
+CREATE TABLE `eleitorado_cubo` (
+	`anoEleicao` int NOT NULL,
+	`municipioId` int NOT NULL,
+	`zonaId` int NOT NULL,
+	`genero` varchar(30) NOT NULL,
+	`faixaEtaria` varchar(30) NOT NULL,
+	`escolaridade` varchar(30) NOT NULL,
+	`totalEleitores` int NOT NULL DEFAULT 0,
+	CONSTRAINT `eleitorado_cubo_pk` PRIMARY KEY(`anoEleicao`,`municipioId`,`zonaId`,`genero`,`faixaEtaria`,`escolaridade`)
+);
@@ -0,0 +1,5 @@
+ALTER TABLE `importacoes` ADD `etapaAtual` varchar(100);--> statement-breakpoint
+ALTER TABLE `importacoes` ADD `progresso` int DEFAULT 0;--> statement-breakpoint
+ALTER TABLE `importacoes` ADD `linhasProcessadas` int DEFAULT 0;--> statement-breakpoint
+ALTER TABLE `importacoes` ADD `linhasPorSegundo` int;--> statement-breakpoint
+ALTER TABLE `importacoes` ADD `etaSegundos` int;
\ No newline at end of file
@@ -0,0 +1,15 @@
+CREATE TABLE `mapa_calor` (
+	`anoEleicao` int NOT NULL,
+	`cargo` varchar(50) NOT NULL,
+	`zoom` int NOT NULL,
+	`celulaX` int NOT NULL,
+	`celulaY` int NOT NULL,
+	`latitude` double NOT NULL,
+	`longitude` double NOT NULL,
+	`eleitores` int NOT NULL DEFAULT 0,
+	`nulos` int NOT NULL DEFAULT 0,
+	`brancos` int NOT NULL DEFAULT 0,
+	`votosValidos` int NOT NULL DEFAULT 0,
+	`partidos` json,
+	CONSTRAINT `mapa_calor_pk` PRIMARY KEY(`anoEleicao`,`cargo`,`zoom`,`celulaX`,`celulaY`)
+);
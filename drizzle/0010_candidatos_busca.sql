@@ -0,0 +1,26 @@
+CREATE TABLE `candidatos_busca` (
+	`anoEleicao` int NOT NULL,
+	`uf` varchar(2) NOT NULL,
+	`seq` int NOT NULL,
+	`nomeUrna` varchar(100),
+	`nome` varchar(200),
+	`sigla` varchar(20),
+	`coligacao` text,
+	`cargo` varchar(50),
+	`municipio` varchar(100),
+	`numero` int,
+	`situacao` varchar(50),
+	`texto` text NOT NULL,
+	CONSTRAINT `candidatos_busca_pk` PRIMARY KEY(`anoEleicao`,`uf`,`seq`)
+);
+--> statement-breakpoint
+CREATE TABLE `candidatos_busca_termos` (
+	`termo` varchar(16) NOT NULL,
+	`peso` int NOT NULL,
+	`anoEleicao` int NOT NULL,
+	`uf` varchar(2) NOT NULL,
+	`seq` int NOT NULL,
+	CONSTRAINT `candidatos_busca_termos_pk` PRIMARY KEY(`termo`,`peso`,`anoEleicao`,`uf`,`seq`)
+);
+--> statement-breakpoint
+CREATE INDEX `candidatos_busca_termos_particao_idx` ON `candidatos_busca_termos` (`anoEleicao`,`uf`);
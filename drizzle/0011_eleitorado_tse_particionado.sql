@@ -0,0 +1,36 @@
+-- Recria eleitorado_tse particionada por (ano, UF); a tabela ainda não era populada.
+-- Tabelas particionadas não aceitam chave estrangeira, e a chave primária inclui as colunas da partição.
+-- As partições novas são criadas por scripts/import_eleitorado_tse.py (drizzle-kit não modela partições).
+DROP TABLE `eleitorado_tse`;
+--> statement-breakpoint
+CREATE TABLE `eleitorado_tse` (
+	`id` int AUTO_INCREMENT NOT NULL,
+	`dtGeracao` varchar(20),
+	`anoEleicao` int NOT NULL,
+	`sgUf` varchar(2) NOT NULL DEFAULT 'RO',
+	`cdMunicipio` varchar(10),
+	`nmMunicipio` varchar(100),
+	`cdMrc` varchar(10),
+	`nmMrc` varchar(100),
+	`nrZona` int,
+	`cdGenero` varchar(5),
+	`dsGenero` varchar(20),
+	`cdEstadoCivil` varchar(5),
+	`dsEstadoCivil` varchar(30),
+	`cdFaixaEtaria` varchar(10),
+	`dsFaixaEtaria` varchar(30),
+	`cdGrauEscolaridade` varchar(5),
+	`dsGrauEscolaridade` varchar(50),
+	`qtEleitoresPerfilBiometrico` int DEFAULT 0,
+	`qtEleitoresPerfilDeficiencia` int DEFAULT 0,
+	`qtEleitoresPerfilNomeSocial` int DEFAULT 0,
+	`qtEleitoresPerfil` int DEFAULT 0,
+	`importacaoId` int,
+	`createdAt` timestamp NOT NULL DEFAULT (now()),
+	CONSTRAINT `eleitorado_tse_pk` PRIMARY KEY(`id`,`anoEleicao`,`sgUf`)
+)
+PARTITION BY LIST COLUMNS(`anoEleicao`, `sgUf`) (
+	PARTITION `p2024_ro` VALUES IN ((2024, 'RO'))
+);
+--> statement-breakpoint
+CREATE INDEX `eleitorado_tse_local_idx` ON `eleitorado_tse` (`anoEleicao`,`cdMunicipio`,`nrZona`);
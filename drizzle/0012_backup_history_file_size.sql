@@ -0,0 +1,2 @@
+-- Backups de tabelas com milhões de linhas passam de 2 GB: fileSize (bytes) vira bigint.
+ALTER TABLE `backup_history` MODIFY COLUMN `fileSize` bigint;
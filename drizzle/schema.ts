@@ -1,4 +1,4 @@
-import { int, mysqlEnum, mysqlTable, text, timestamp, varchar, decimal, bigint, boolean, json } from "drizzle-orm/mysql-core";
+import { int, mysqlEnum, mysqlTable, primaryKey, text, timestamp, varchar, decimal, bigint, boolean, json, double, index } from "drizzle-orm/mysql-core";
 
 // ==================== USUÁRIOS E AUTENTICAÇÃO ====================
 
@@ -134,11 +134,13 @@ export const eleitorado = mysqlTable("eleitorado", {
 });
 
 // Tabela detalhada de eleitores do TSE (perfil_eleitorado)
+// Particionada por LIST COLUMNS (anoEleicao, sgUf) na migração 0011 (drizzle-kit não modela partições):
+// cada partição é carregada à parte e trocada por scripts/import_eleitorado_tse.py
 export const eleitoradoTse = mysqlTable("eleitorado_tse", {
-  id: int("id").autoincrement().primaryKey(),
+  id: int("id").autoincrement().notNull(),
   dtGeracao: varchar("dtGeracao", { length: 20 }),
   anoEleicao: int("anoEleicao").notNull(),
-  sgUf: varchar("sgUf", { length: 2 }).default("RO"),
+  sgUf: varchar("sgUf", { length: 2 }).notNull().default("RO"),
   cdMunicipio: varchar("cdMunicipio", { length: 10 }),
   nmMunicipio: varchar("nmMunicipio", { length: 100 }),
   cdMrc: varchar("cdMrc", { length: 10 }),
@@ -156,9 +158,34 @@ export const eleitoradoTse = mysqlTable("eleitorado_tse", {
   qtEleitoresPerfilDeficiencia: int("qtEleitoresPerfilDeficiencia").default(0),
   qtEleitoresPerfilNomeSocial: int("qtEleitoresPerfilNomeSocial").default(0),
   qtEleitoresPerfil: int("qtEleitoresPerfil").default(0),
-  importacaoId: int("importacaoId").references(() => importacoes.id),
+  // Sem chave estrangeira: tabelas particionadas não aceitam
+  importacaoId: int("importacaoId"),
   createdAt: timestamp("createdAt").defaultNow().notNull(),
-});
+}, (table) => [
+  primaryKey({ name: "eleitorado_tse_pk", columns: [table.id, table.anoEleicao, table.sgUf] }),
+  index("eleitorado_tse_local_idx").on(table.anoEleicao, table.cdMunicipio, table.nrZona),
+]);
+
+// Cubo de agregados do eleitorado, gerado pela importação (scripts/tse_cubo.py)
+// Todas as combinações das dimensões com "todos" (0 ou ""), uma linha por chave
+export const eleitoradoCubo = mysqlTable(
+  "eleitorado_cubo",
+  {
+    anoEleicao: int("anoEleicao").notNull(),
+    municipioId: int("municipioId").notNull(),
+    zonaId: int("zonaId").notNull(),
+    genero: varchar("genero", { length: 30 }).notNull(),
+    faixaEtaria: varchar("faixaEtaria", { length: 30 }).notNull(),
+    escolaridade: varchar("escolaridade", { length: 30 }).notNull(),
+    totalEleitores: int("totalEleitores").notNull().default(0),
+  },
+  (table) => [
+    primaryKey({
+      name: "eleitorado_cubo_pk",
+      columns: [table.anoEleicao, table.municipioId, table.zonaId, table.genero, table.faixaEtaria, table.escolaridade],
+    }),
+  ]
+);
 
 // ==================== PARTIDOS TSE ====================
 
@@ -331,6 +358,74 @@ export const votosNulosBrancos = mysqlTable("votos_nulos_brancos", {
   createdAt: timestamp("createdAt").defaultNow().notNull(),
 });
 
+// Células do mapa de calor por nível de zoom, geradas por scripts/gerar_mapa_calor.py
+// Grade Web Mercator de shared/mapaCalor.ts: a janela visível é um intervalo da chave primária
+export const mapaCalor = mysqlTable(
+  "mapa_calor",
+  {
+    anoEleicao: int("anoEleicao").notNull(),
+    cargo: varchar("cargo", { length: 50 }).notNull(),
+    zoom: int("zoom").notNull(),
+    celulaX: int("celulaX").notNull(),
+    celulaY: int("celulaY").notNull(),
+    latitude: double("latitude").notNull(),
+    longitude: double("longitude").notNull(),
+    eleitores: int("eleitores").notNull().default(0),
+    nulos: int("nulos").notNull().default(0),
+    brancos: int("brancos").notNull().default(0),
+    votosValidos: int("votosValidos").notNull().default(0),
+    partidos: json("partidos").$type<Record<string, number>>(),
+  },
+  (table) => [
+    primaryKey({
+      name: "mapa_calor_pk",
+      columns: [table.anoEleicao, table.cargo, table.zoom, table.celulaX, table.celulaY],
+    }),
+  ]
+);
+
+// Índice de busca de candidatos, gerado por scripts/indexar_busca.py (normalização em shared/buscaCandidatos.ts)
+export const candidatosBusca = mysqlTable(
+  "candidatos_busca",
+  {
+    anoEleicao: int("anoEleicao").notNull(),
+    uf: varchar("uf", { length: 2 }).notNull(),
+    seq: int("seq").notNull(),
+    nomeUrna: varchar("nomeUrna", { length: 100 }),
+    nome: varchar("nome", { length: 200 }),
+    sigla: varchar("sigla", { length: 20 }),
+    coligacao: text("coligacao"),
+    cargo: varchar("cargo", { length: 50 }),
+    municipio: varchar("municipio", { length: 100 }),
+    numero: int("numero"),
+    situacao: varchar("situacao", { length: 50 }),
+    texto: text("texto").notNull(),
+  },
+  (table) => [
+    primaryKey({ name: "candidatos_busca_pk", columns: [table.anoEleicao, table.uf, table.seq] }),
+  ]
+);
+
+// Prefixos e trigramas (#abc) com os melhores candidatos de cada termo por partição (ano, UF)
+// peso = qualidade do casamento * 10000 + ano: a chave primária já dá a ordem da busca
+export const candidatosBuscaTermos = mysqlTable(
+  "candidatos_busca_termos",
+  {
+    termo: varchar("termo", { length: 16 }).notNull(),
+    peso: int("peso").notNull(),
+    anoEleicao: int("anoEleicao").notNull(),
+    uf: varchar("uf", { length: 2 }).notNull(),
+    seq: int("seq").notNull(),
+  },
+  (table) => [
+    primaryKey({
+      name: "candidatos_busca_termos_pk",
+      columns: [table.termo, table.peso, table.anoEleicao, table.uf, table.seq],
+    }),
+    index("candidatos_busca_termos_particao_idx").on(table.anoEleicao, table.uf),
+  ]
+);
+
 // ==================== IMPORTAÇÕES ====================
 
 export const importacoes = mysqlTable("importacoes", {
@@ -352,6 +447,12 @@ export const importacoes = mysqlTable("importacoes", {
   status: mysqlEnum("status", ["pendente", "processando", "concluido", "erro"]).default("pendente"),
   mensagemErro: text("mensagemErro"),
   anoReferencia: int("anoReferencia"),
+  // Progresso publicado pelos scripts de importação (scripts/tse_metricas.py)
+  etapaAtual: varchar("etapaAtual", { length: 100 }),
+  progresso: int("progresso").default(0),
+  linhasProcessadas: int("linhasProcessadas").default(0),
+  linhasPorSegundo: int("linhasPorSegundo"),
+  etaSegundos: int("etaSegundos"),
   createdAt: timestamp("createdAt").defaultNow().notNull(),
   updatedAt: timestamp("updatedAt").defaultNow().onUpdateNow().notNull(),
 });
@@ -407,7 +508,7 @@ export const backupHistory = mysqlTable("backup_history", {
   status: mysqlEnum("status", ["success", "failed", "running"]).default("running"),
   dataTypes: json("dataTypes"),
   recordCounts: json("recordCounts"), // { users: 100, eleitorado: 5000, ... }
-  fileSize: int("fileSize"), // in bytes
+  fileSize: bigint("fileSize", { mode: "number" }), // in bytes
   fileUrl: text("fileUrl"),
   errorMessage: text("errorMessage"),
   emailSent: boolean("emailSent").default(false),
@@ -440,6 +541,7 @@ export type ZonaEleitoral = typeof zonasEleitorais.$inferSelect;
 export type SecaoEleitoral = typeof secoesEleitorais.$inferSelect;
 export type Eleitorado = typeof eleitorado.$inferSelect;
 export type EleitoradoTse = typeof eleitoradoTse.$inferSelect;
+export type EleitoradoCubo = typeof eleitoradoCubo.$inferSelect;
 export type Partido = typeof partidos.$inferSelect;
 export type PartidoTse = typeof partidosTse.$inferSelect;
 export type ColigacaoTse = typeof coligacoesTse.$inferSelect;
@@ -447,5 +549,7 @@ export type Candidato = typeof candidatos.$inferSelect;
 export type CandidatoTse = typeof candidatosTse.$inferSelect;
 export type ResultadoEleitoral = typeof resultadosEleitorais.$inferSelect;
 export type VotoNuloBranco = typeof votosNulosBrancos.$inferSelect;
+export type MapaCalor = typeof mapaCalor.$inferSelect;
+export type CandidatoBusca = typeof candidatosBusca.$inferSelect;
 export type Importacao = typeof importacoes.$inferSelect;
 export type AuditLog = typeof auditLogs.$inferSelect;
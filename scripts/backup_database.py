@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Script de backup do banco de dados DTE
+Exporta as tabelas em NDJSON ou CSV comprimido, completo ou incremental, e registra em backup_history
+"""
+
+import argparse
+import json
+import os
+
+from seed_database import DATA_DIR, get_connection
+from tse_backup import CONJUNTOS, FORMATOS, executar_backup
+from tse_metricas import Metricas
+from tse_ndjson import LINHAS_POR_BLOCO
+
+SAIDA_PADRAO = os.path.join(DATA_DIR, "backups")
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "backup_database.json")
+
+
+def carregar_agendado(conn, agendado_id):
+    """(dataTypes, formato) do backup agendado; o formato 'json' da interface vira NDJSON"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT dataTypes, format FROM scheduled_backups WHERE id = %s", [agendado_id])
+    linha = cursor.fetchone()
+    cursor.close()
+    if not linha:
+        raise ValueError(f"Backup agendado não encontrado: {agendado_id}")
+    tipos, formato = linha
+    if isinstance(tipos, (bytes, bytearray)):
+        tipos = tipos.decode('utf-8')
+    return (json.loads(tipos) if isinstance(tipos, str) else tipos), ('ndjson' if formato == 'json' else 'csv')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backup das tabelas do banco de dados DTE")
+    parser.add_argument('--conjuntos', nargs='+', choices=sorted(CONJUNTOS), default=None,
+                        help="Conjuntos exportados (padrão: os do agendamento, ou todos)")
+    parser.add_argument('--agendado', type=int, default=None,
+                        help="Id em scheduled_backups: usa os conjuntos e o formato do agendamento")
+    parser.add_argument('--formato', choices=FORMATOS, default=None, help="ndjson (padrão) ou csv")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Só linhas criadas/alteradas desde o último backup bem-sucedido de cada conjunto")
+    parser.add_argument('--saida', default=SAIDA_PADRAO, help="Diretório dos backups (um subdiretório por backup)")
+    parser.add_argument('--workers', type=int, default=2, help="Tabelas exportadas em paralelo")
+    parser.add_argument('--bloco', type=int, default=LINHAS_POR_BLOCO, help="Linhas por bloco comprimido")
+    parser.add_argument('--sem-compressao', action='store_true', help="Grava os arquivos sem gzip")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo, linhas/s e pico de memória do backup")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("BACKUP DO BANCO DE DADOS")
+    print("=" * 60)
+
+    print("\nConectando ao banco de dados...")
+    conn = get_connection()
+    if not conn:
+        print("Falha na conexão. Verifique as credenciais.")
+        return
+
+    try:
+        conjuntos, formato = list(CONJUNTOS), 'ndjson'
+        if args.agendado is not None:
+            conjuntos, formato = carregar_agendado(conn, args.agendado)
+        conjuntos = args.conjuntos or conjuntos
+        formato = args.formato or formato
+        print(f"Conjuntos: {', '.join(conjuntos)}")
+        print(f"Formato: {formato}{'' if args.sem_compressao else ' (gzip)'} | "
+              f"{'incremental' if args.incremental else 'completo'} | workers: {args.workers}")
+
+        with Metricas(args.metricas) as metricas:
+            with metricas.etapa('backup'):
+                manifesto = executar_backup(
+                    conn, get_connection, conjuntos, args.saida, formato, args.incremental, args.agendado,
+                    args.workers, not args.sem_compressao, args.bloco
+                )
+    except Exception as e:
+        print(f"Erro durante o backup: {e}")
+        return
+    finally:
+        conn.close()
+
+    print("\n" + "=" * 60)
+    print("RESUMO")
+    print("=" * 60)
+    for entrada in manifesto['conjuntos']:
+        desde = manifesto['desde'].get(entrada['conjunto'])
+        print(f"{entrada['conjunto']}: {entrada['linhas']:,} linhas, {entrada['bytes'] / 1e6:,.1f} MB"
+              f"{f' (desde {desde})' if desde else ''}")
+    diretorio = os.path.join(args.saida, f"backup_{manifesto['historico_id']}")
+    print(f"Backup: {diretorio}")
+    print(f"Métricas: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline de importação do TSE com dados sintéticos
+Mede cada etapa de import_tse_data.py e seed_database.py (linhas/s e pico de RSS)
+e grava o resultado em JSON para comparar execuções
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import import_tse_data
+import seed_database
+from tse_agregacao import COLUNAS_PERFIL, agregar_eleitorado, agregar_perfil
+from tse_cache import construir_cache
+from tse_carga import CarregadorBulk
+from tse_csv import iter_csv_latin1
+from tse_dimensoes import Dimensoes
+from tse_dump import EscritorDump
+from tse_escritores import EscritorParalelo, PoolConexoes
+from tse_esquemas import PERFIL_ELEITORADO, VOTACAO_SECAO
+from tse_metricas import pico_rss_mb
+from tse_ndjson import EscritorParticionado
+from tse_sintetico import gerar_conjunto
+from tse_votacao import TAMANHO_LOTE, AgregadorVotacao, importar_votacao
+
+ESCALAS_PADRAO = (100_000, 1_000_000)
+
+# Escritores concorrentes medidos na etapa carga_paralela e latência de ida e volta simulada por comando
+ESCRITORES_PADRAO = (1, 2, 4, 8, 16)
+LATENCIA_PADRAO_MS = 2.0
+
+# Etapas medidas uma vez para cada quantidade de escritores
+ETAPAS_PARALELAS = ('carga_paralela',)
+
+# Banco local que substitui o TiDB nas etapas de carga
+ESQUEMA_SQLITE = """
+CREATE TABLE regioes (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, uf TEXT);
+CREATE TABLE municipios (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, codigoTse TEXT, regiaoId INTEGER, uf TEXT);
+CREATE TABLE zonas_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, municipioId INTEGER);
+CREATE TABLE eleitorado (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    bairroId INTEGER, secaoId INTEGER, totalEleitores INTEGER,
+    eleitoresMasculino INTEGER, eleitoresFeminino INTEGER, eleitoresOutros INTEGER,
+    faixa16a17 INTEGER, faixa18a24 INTEGER, faixa25a34 INTEGER, faixa35a44 INTEGER,
+    faixa45a59 INTEGER, faixa60a69 INTEGER, faixa70mais INTEGER,
+    escolaridadeAnalfabeto INTEGER, escolaridadeFundamental INTEGER,
+    escolaridadeMedio INTEGER, escolaridadeSuperior INTEGER
+);
+CREATE TABLE secoes_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, zonaId INTEGER, bairroId INTEGER);
+CREATE TABLE partidos (id INTEGER PRIMARY KEY, sigla TEXT, nome TEXT, numero INTEGER, cor TEXT);
+CREATE TABLE candidatos (
+    id INTEGER PRIMARY KEY, nome TEXT, nomeUrna TEXT, numero INTEGER, partidoId INTEGER,
+    cargo TEXT, anoEleicao INTEGER, municipioId INTEGER
+);
+CREATE TABLE resultados_eleitorais (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, candidatoId INTEGER, partidoId INTEGER,
+    votosValidos INTEGER, votosNominais INTEGER, votosLegenda INTEGER
+);
+CREATE TABLE votos_nulos_brancos (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, votosNulos INTEGER, votosBrancos INTEGER
+);
+CREATE TABLE eleitorado_cubo (
+    anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    genero TEXT, faixaEtaria TEXT, escolaridade TEXT, totalEleitores INTEGER,
+    PRIMARY KEY (anoEleicao, municipioId, zonaId, genero, faixaEtaria, escolaridade)
+);
+"""
+
+
+def _conexao_local(contexto, nome, remota=False):
+    """Banco sqlite novo da etapa; com `remota`, cada comando e commit esperam a latência configurada"""
+    caminho = os.path.join(contexto['trabalho'], f"{nome}.sqlite")
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    if not remota:
+        return sqlite3.connect(caminho)
+    conn = sqlite3.connect(caminho, factory=ConexaoRemota)
+    conn.latencia = contexto['latencia_ms'] / 1000
+    return conn
+
+
+class CursorRemoto(sqlite3.Cursor):
+    """Cursor que espera a latência da conexão antes de cada comando, como em um banco remoto"""
+
+    def execute(self, sql, parametros=()):
+        time.sleep(self.connection.latencia)
+        return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        time.sleep(self.connection.latencia)
+        return super().executemany(sql, parametros)
+
+
+class ConexaoRemota(sqlite3.Connection):
+    """
+    Substituto local do TiDB/MySQL para a escrita concorrente: sqlite com latência de rede por
+    comando e por commit. Cada conexão do pool grava no próprio arquivo, já que o sqlite
+    serializa os escritores de um mesmo banco e o servidor não.
+    """
+    latencia = 0.0
+
+    def cursor(self, factory=CursorRemoto):
+        return super().cursor(factory)
+
+    def commit(self):
+        super().commit()
+        time.sleep(self.latencia)
+
+
+def _candidatos(contexto):
+    import_tse_data.DATA_DIR = contexto['diretorio']
+    return import_tse_data.process_candidatos_ro(contexto['ano'])
+
+
+# ==================== ETAPAS ====================
+# Cada etapa recebe o contexto e retorna (linhas, segundos) medindo só o trecho da etapa
+
+def etapa_leitura(contexto):
+    inicio = time.perf_counter()
+    linhas = sum(1 for _ in iter_csv_latin1(contexto['perfil'], colunas=COLUNAS_PERFIL))
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_leitura_zip(contexto):
+    """Leitura do perfil direto do .zip, descomprimindo em streaming (mesmas linhas da etapa leitura)"""
+    arquivo = os.path.join(contexto['trabalho'], 'perfil_eleitorado.zip')
+    if not os.path.exists(arquivo):
+        with zipfile.ZipFile(arquivo, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.write(contexto['perfil'], os.path.basename(contexto['perfil']))
+    membro = f"{arquivo}/{os.path.basename(contexto['perfil'])}"
+    inicio = time.perf_counter()
+    linhas = sum(1 for _ in iter_csv_latin1(membro, colunas=COLUNAS_PERFIL))
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_leitura_tipada(contexto):
+    """Leitura do perfil pelo esquema declarado: mesmas colunas da etapa leitura, com as inteiras já convertidas"""
+    inicio = time.perf_counter()
+    linhas = sum(len(lote) for lote in PERFIL_ELEITORADO.ler_lotes(contexto['perfil'], 'agregacao'))
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_agregacao(contexto):
+    inicio = time.perf_counter()
+    _, linhas = agregar_eleitorado(contexto['perfil'])
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_cache(contexto):
+    inicio = time.perf_counter()
+    meta = construir_cache(contexto['perfil'], contexto['cache'])
+    return meta['linhas'], time.perf_counter() - inicio
+
+
+def etapa_agregacao_cache(contexto):
+    inicio = time.perf_counter()
+    _, linhas = agregar_eleitorado(contexto['perfil'], cache_dir=contexto['cache'])
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_candidatos(contexto):
+    inicio = time.perf_counter()
+    linhas = len(_candidatos(contexto))
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_coligacoes(contexto):
+    import_tse_data.DATA_DIR = contexto['diretorio']
+    inicio = time.perf_counter()
+    linhas = len(import_tse_data.process_coligacoes_ro(contexto['ano']))
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_sql(contexto):
+    candidatos = _candidatos(contexto)
+    tabela = 'candidatos_tse'
+    inicio = time.perf_counter()
+    with EscritorDump(os.path.join(contexto['trabalho'], 'dump.sql.gz')) as dump:
+        linhas, _ = dump.escrever_tabela(tabela, import_tse_data.registros_dump(tabela, candidatos),
+                                         import_tse_data.ESQUEMAS_DUMP[tabela])
+    return linhas, time.perf_counter() - inicio
+
+
+def etapa_ndjson(contexto):
+    candidatos = _candidatos(contexto)
+    inicio = time.perf_counter()
+    saida = EscritorParticionado(os.path.join(contexto['trabalho'], 'ndjson'), comprimir=True)
+    particao = saida.escrever('candidatos', contexto['ano'], candidatos)
+    saida.gravar_indice()
+    return particao['linhas'], time.perf_counter() - inicio
+
+
+def etapa_carga_seed(contexto):
+    """Etapas do seed_database.py (municípios, zonas, eleitorado e cubo) contra sqlite"""
+    conn = _conexao_local(contexto, 'seed')
+    conn.executescript(ESQUEMA_SQLITE)
+    carga = CarregadorBulk(conn)
+    dimensoes = Dimensoes(conn, carga, seed_database.UF)
+    inicio = time.perf_counter()
+    seed_database.insert_municipios(conn, contexto['perfil'], carga, dimensoes=dimensoes)
+    seed_database.insert_zonas(conn, contexto['perfil'], carga, dimensoes=dimensoes)
+    agregador = agregar_perfil(contexto['perfil'])
+    _, linhas = seed_database.insert_eleitorado(conn, contexto['perfil'], carga, agregador=agregador,
+                                                dimensoes=dimensoes)
+    seed_database.atualizar_cubo_eleitorado(conn, contexto['perfil'], carga, agregador, dimensoes=dimensoes)
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return linhas, segundos
+
+
+def etapa_carga_seed_pipeline(contexto):
+    """Como carga_seed, com o perfil lido uma vez em pipeline (seed_database.py --pipeline)"""
+    conn = _conexao_local(contexto, 'seed_pipeline')
+    conn.executescript(ESQUEMA_SQLITE)
+    carga = CarregadorBulk(conn)
+    dimensoes = Dimensoes(conn, carga, seed_database.UF)
+    inicio = time.perf_counter()
+    agregador = seed_database.ler_perfil_em_pipeline(conn, contexto['perfil'], carga, dimensoes=dimensoes)
+    _, linhas = seed_database.insert_eleitorado(conn, contexto['perfil'], carga, agregador=agregador,
+                                                dimensoes=dimensoes)
+    seed_database.atualizar_cubo_eleitorado(conn, contexto['perfil'], carga, agregador, dimensoes=dimensoes)
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return linhas, segundos
+
+
+def etapa_carga_paralela(contexto):
+    """Eleitorado e cubo do seed_database.py por município com N escritores contra o substituto remoto"""
+    conn = _conexao_local(contexto, 'paralela')
+    conn.executescript(ESQUEMA_SQLITE)
+    carga = CarregadorBulk(conn)
+    dimensoes = Dimensoes(conn, carga, seed_database.UF)
+    seed_database.insert_municipios(conn, contexto['perfil'], carga, dimensoes=dimensoes)
+    seed_database.insert_zonas(conn, contexto['perfil'], carga, dimensoes=dimensoes)
+    agregador = agregar_perfil(contexto['perfil'])
+
+    escritores = contexto['escritores']
+    numeros = itertools.count()
+    shards = []
+
+    def conectar():
+        caminho = os.path.join(contexto['trabalho'], f"paralela_{escritores}_{next(numeros)}.sqlite")
+        shards.append(caminho)
+        shard = sqlite3.connect(caminho, factory=ConexaoRemota, check_same_thread=False)
+        shard.executescript(ESQUEMA_SQLITE)
+        shard.latencia = contexto['latencia_ms'] / 1000
+        return shard
+
+    pool = PoolConexoes(conectar, escritores)
+    escritor = EscritorParalelo(pool, escritores)
+    inicio = time.perf_counter()
+    eleitorado, _ = seed_database.insert_eleitorado(conn, contexto['perfil'], carga, agregador=agregador,
+                                                    escritor=escritor, dimensoes=dimensoes)
+    cubo = seed_database.atualizar_cubo_eleitorado(conn, contexto['perfil'], carga, agregador,
+                                                   escritor=escritor, dimensoes=dimensoes)
+    segundos = time.perf_counter() - inicio
+    pool.fechar()
+    conn.close()
+
+    # O total gravado não depende da quantidade de escritores
+    gravadas = 0
+    for caminho in shards:
+        with contextlib.closing(sqlite3.connect(caminho)) as shard:
+            gravadas += sum(shard.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                            for tabela in ('eleitorado', 'eleitorado_cubo'))
+    if gravadas != eleitorado + cubo:
+        raise RuntimeError(f"Contagem final divergente: {gravadas} gravadas, {eleitorado + cubo} esperadas")
+    return gravadas, segundos
+
+
+def etapa_carga_candidatos(contexto):
+    """Carga em lote dos candidatos processados (CarregadorBulk) contra sqlite"""
+    candidatos = _candidatos(contexto)
+    colunas = [coluna for coluna, _ in import_tse_data.ESQUEMAS_DUMP['candidatos_tse']]
+    conn = _conexao_local(contexto, 'candidatos')
+    conn.execute(f"CREATE TABLE candidatos_tse ({', '.join(colunas)})")
+    inicio = time.perf_counter()
+    registros = import_tse_data.registros_dump('candidatos_tse', candidatos)
+    linhas = CarregadorBulk(conn).inserir(
+        'candidatos_tse', colunas, (tuple(r[coluna] for coluna in colunas) for r in registros)
+    )
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return linhas, segundos
+
+
+def etapa_votacao(contexto):
+    """Leitura e agregação por zona da votação por seção"""
+    inicio = time.perf_counter()
+    agregador = AgregadorVotacao('zona')
+    for lote in VOTACAO_SECAO.ler_lotes(contexto['votacao'], 'votacao', TAMANHO_LOTE):
+        agregador.adicionar(lote)
+    return agregador.total_linhas, time.perf_counter() - inicio
+
+
+def etapa_carga_votacao(contexto):
+    """Importação completa da votação no nível de seção (import_votacao_secao.py) contra sqlite"""
+    conn = _conexao_local(contexto, 'votacao')
+    conn.executescript(ESQUEMA_SQLITE)
+    carga = CarregadorBulk(conn)
+    seed_database.insert_municipios(conn, contexto['perfil'], carga)
+    inicio = time.perf_counter()
+    stats = importar_votacao(conn, carga, contexto['votacao'], 'secao')
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return stats['linhas'], segundos
+
+
+def _carga_votacao_remota(contexto, pipeline):
+    """Votação no nível de seção contra o substituto remoto, com ou sem pipeline"""
+    conn = _conexao_local(contexto, 'votacao_pipeline' if pipeline else 'votacao_remota', remota=True)
+    latencia, conn.latencia = conn.latencia, 0.0
+    conn.executescript(ESQUEMA_SQLITE)
+    seed_database.insert_municipios(conn, contexto['perfil'], CarregadorBulk(conn))
+    conn.latencia = latencia
+    carga = CarregadorBulk(conn)
+    inicio = time.perf_counter()
+    stats = importar_votacao(conn, carga, contexto['votacao'], 'secao', pipeline=pipeline)
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return stats['linhas'], segundos
+
+
+def etapa_carga_votacao_remota(contexto):
+    return _carga_votacao_remota(contexto, pipeline=False)
+
+
+def etapa_carga_votacao_pipeline(contexto):
+    return _carga_votacao_remota(contexto, pipeline=True)
+
+
+ETAPAS = {
+    'leitura': etapa_leitura,
+    'leitura_zip': etapa_leitura_zip,
+    'leitura_tipada': etapa_leitura_tipada,
+    'agregacao': etapa_agregacao,
+    'cache': etapa_cache,
+    'agregacao_cache': etapa_agregacao_cache,
+    'candidatos': etapa_candidatos,
+    'coligacoes': etapa_coligacoes,
+    'sql': etapa_sql,
+    'ndjson': etapa_ndjson,
+    'carga_seed': etapa_carga_seed,
+    'carga_seed_pipeline': etapa_carga_seed_pipeline,
+    'carga_paralela': etapa_carga_paralela,
+    'carga_candidatos': etapa_carga_candidatos,
+    'votacao': etapa_votacao,
+    'carga_votacao': etapa_carga_votacao,
+    'carga_votacao_remota': etapa_carga_votacao_remota,
+    'carga_votacao_pipeline': etapa_carga_votacao_pipeline,
+}
+
+
+def executar_etapa(nome, contexto):
+    """Executa a etapa no processo atual e retorna (linhas, segundos, pico de RSS em MiB)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        linhas, segundos = ETAPAS[nome](contexto)
+    return linhas, segundos, pico_rss_mb()
+
+
+def medir_etapa(nome, contexto):
+    """Executa a etapa em um processo novo (spawn), para que o pico de RSS seja só dela"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        linhas, segundos, pico = pool.submit(executar_etapa, nome, contexto).result()
+    return {
+        'linhas': linhas,
+        'segundos': round(segundos, 4),
+        'linhas_por_segundo': round(linhas / segundos, 1) if segundos > 0 else None,
+        'pico_rss_mb': round(pico, 1),
+    }
+
+
+def medir_escala(diretorio_base, n_linhas, etapas, ano=2024, reusar=False,
+                 escritores=ESCRITORES_PADRAO, latencia_ms=LATENCIA_PADRAO_MS):
+    """Gera (ou reaproveita) os arquivos da escala e mede cada etapa (as paralelas, por quantidade de escritores)"""
+    diretorio = os.path.join(diretorio_base, f"linhas_{n_linhas}")
+    esperados = {
+        'perfil': os.path.join(diretorio, f"perfil_eleitorado_{ano}_RO.csv"),
+        'candidatos': os.path.join(diretorio, f"consulta_cand_{ano}_RO.csv"),
+        'coligacoes': os.path.join(diretorio, f"consulta_coligacao_{ano}_RO.csv"),
+        'votacao': os.path.join(diretorio, f"votacao_secao_{ano}_RO.csv"),
+    }
+    inicio = time.perf_counter()
+    if reusar and all(os.path.exists(caminho) for caminho in esperados.values()):
+        arquivos = esperados
+    else:
+        print(f"\nGerando dados sintéticos ({n_linhas:,} linhas de perfil)...")
+        arquivos = gerar_conjunto(diretorio, n_linhas, ano)
+    geracao = time.perf_counter() - inicio
+
+    trabalho = tempfile.mkdtemp(prefix='benchmark_tse_')
+    contexto = {
+        'diretorio': diretorio,
+        'ano': ano,
+        'perfil': arquivos['perfil'],
+        'votacao': arquivos['votacao'],
+        'cache': os.path.join(trabalho, 'cache'),
+        'trabalho': trabalho,
+        'latencia_ms': latencia_ms,
+    }
+    resultado = {
+        'linhas_perfil': n_linhas,
+        'geracao_segundos': round(geracao, 2),
+        'arquivos_bytes': {nome: os.path.getsize(caminho) for nome, caminho in arquivos.items()},
+        'etapas': {},
+    }
+    try:
+        for nome in etapas:
+            variantes = ([(f"{nome}_{n}", {**contexto, 'escritores': n}) for n in escritores]
+                         if nome in ETAPAS_PARALELAS else [(nome, contexto)])
+            for rotulo, contexto_etapa in variantes:
+                print(f"  {rotulo}...", end=' ', flush=True)
+                medida = medir_etapa(nome, contexto_etapa)
+                resultado['etapas'][rotulo] = medida
+                print(f"{medida['linhas']:,} linhas em {medida['segundos']:.2f}s "
+                      f"({medida['linhas_por_segundo'] or 0:,.0f} linhas/s, pico {medida['pico_rss_mb']:.0f} MiB)")
+    finally:
+        shutil.rmtree(trabalho, ignore_errors=True)
+    return resultado
+
+
+def comparar(anterior, atual):
+    """Imprime a variação de linhas/s por escala e etapa em relação a uma execução anterior"""
+    escalas_anteriores = {e['linhas_perfil']: e for e in anterior['escalas']}
+    print("\nComparação com a execução anterior (linhas/s):")
+    for escala in atual['escalas']:
+        base = escalas_anteriores.get(escala['linhas_perfil'])
+        if not base:
+            continue
+        for nome, medida in escala['etapas'].items():
+            antes = base['etapas'].get(nome, {}).get('linhas_por_segundo')
+            agora = medida['linhas_por_segundo']
+            if antes and agora:
+                variacao = (agora / antes - 1) * 100
+                print(f"  {escala['linhas_perfil']:>11,} {nome:<18} {antes:>14,.0f} -> {agora:>14,.0f} ({variacao:+.1f}%)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark da importação do TSE com dados sintéticos")
+    parser.add_argument('--linhas', type=int, nargs='+', default=list(ESCALAS_PADRAO),
+                        help="Escalas em linhas do perfil do eleitorado (ex.: 100000 1000000 50000000)")
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), default=list(ETAPAS),
+                        help="Etapas a medir (padrão: todas)")
+    parser.add_argument('--dados', default=os.path.join(tempfile.gettempdir(), 'benchmark_tse'),
+                        help="Diretório dos arquivos sintéticos")
+    parser.add_argument('--reusar', action='store_true', help="Reaproveita arquivos sintéticos já gerados")
+    parser.add_argument('--escritores', type=int, nargs='+', default=list(ESCRITORES_PADRAO),
+                        help="Quantidades de escritores concorrentes da etapa carga_paralela")
+    parser.add_argument('--latencia-ms', type=float, default=LATENCIA_PADRAO_MS,
+                        help="Latência simulada por comando e por commit no substituto do banco remoto")
+    parser.add_argument('--saida', default=None, help="Arquivo JSON de resultado")
+    parser.add_argument('--comparar', metavar='JSON', default=None,
+                        help="Resultado anterior para comparar linhas/s")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DA IMPORTAÇÃO TSE")
+    print("=" * 60)
+
+    resultado = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'escalas': [],
+    }
+    for n_linhas in args.linhas:
+        resultado['escalas'].append(medir_escala(args.dados, n_linhas, args.etapas, reusar=args.reusar,
+                                                  escritores=args.escritores, latencia_ms=args.latencia_ms))
+
+    saida = args.saida or f"benchmark_tse_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado salvo em: {saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(json.load(f), resultado)
+
+    return resultado
+
+if __name__ == "__main__":
+    main()
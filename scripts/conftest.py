@@ -0,0 +1,23 @@
+"""
+Fixtures comuns aos testes que usam sqlite3 como banco local
+"""
+
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def banco():
+    """Fábrica de conexões sqlite3 já com o esquema (DDL) de cada teste; fecha todas no fim"""
+    conexoes = []
+
+    def criar(esquema, caminho=':memory:'):
+        conexao = sqlite3.connect(caminho)
+        conexao.executescript(esquema)
+        conexoes.append(conexao)
+        return conexao
+
+    yield criar
+    for conexao in conexoes:
+        conexao.close()
@@ -0,0 +1,163 @@
+"""
+Geração dos favicons a partir da logo DTE, com cache por hash de conteúdo
+A logo é decodificada uma vez e cada tamanho sai de uma pirâmide de reduções pela metade, com uma
+máscara circular por tamanho. Só os arquivos desatualizados são renderizados, e só os que mudaram
+de conteúdo são regravados (o manifesto com os hashes versiona as URLs no build do Vite).
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+# Versão do desenho: mudar invalida o cache de todos os arquivos
+VERSAO = 1
+
+# Arquivo gerado -> (formato, tamanhos); o 180 px é renderizado uma vez para os dois arquivos
+SAIDAS = {
+    'favicon.ico': ('ICO', (16, 32, 48, 64)),
+    'favicon-32x32.png': ('PNG', (32,)),
+    'favicon-180x180.png': ('PNG', (180,)),
+    'favicon-192x192.png': ('PNG', (192,)),
+    'favicon-512x512.png': ('PNG', (512,)),
+    'apple-touch-icon.png': ('PNG', (180,)),
+}
+
+# Manifesto gravado junto dos favicons (lido por vite.config.ts)
+MANIFESTO = 'favicons.json'
+
+
+def sha256(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+def sha256_arquivo(caminho):
+    """Hash do arquivo, ou None se ele não existe"""
+    try:
+        with open(caminho, 'rb') as f:
+            return sha256(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def chave_cache(hash_logo, nome):
+    """Muda quando a logo, o desenho ou os tamanhos do arquivo mudam"""
+    formato, tamanhos = SAIDAS[nome]
+    return sha256(f"{VERSAO}:{hash_logo}:{nome}:{formato}:{','.join(map(str, tamanhos))}".encode())
+
+
+def piramide(imagem, menor):
+    """A imagem e suas reduções pela metade (filtro de caixa) enquanto o lado não fica abaixo de `menor`"""
+    niveis = [imagem]
+    while min(niveis[-1].size) // 2 >= menor:
+        niveis.append(niveis[-1].reduce(2))
+    return niveis
+
+
+def nivel_para(niveis, tamanho):
+    """Menor nível com lado de pelo menos o dobro do tamanho: o LANCZOS final ainda tem pixels para filtrar"""
+    for nivel in reversed(niveis):
+        if min(nivel.size) >= 2 * tamanho:
+            return nivel
+    return niveis[0]
+
+
+def mascara_circular(tamanho):
+    mascara = Image.new('L', (tamanho, tamanho), 0)
+    ImageDraw.Draw(mascara).ellipse((0, 0, tamanho, tamanho), fill=255)
+    return mascara
+
+
+def renderizar(imagem, tamanhos, workers=4):
+    """{tamanho: imagem RGBA circular}, cada tamanho uma vez só, em paralelo"""
+    tamanhos = sorted(set(tamanhos))
+    niveis = piramide(imagem, 2 * tamanhos[0])
+    mascaras = {tamanho: mascara_circular(tamanho) for tamanho in tamanhos}
+
+    def circular(tamanho):
+        saida = nivel_para(niveis, tamanho).resize((tamanho, tamanho), Image.Resampling.LANCZOS)
+        saida.putalpha(mascaras[tamanho])
+        return saida
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(tamanhos, pool.map(circular, tamanhos)))
+
+
+def codificar(nome, imagens):
+    """Bytes do arquivo `nome` a partir das imagens renderizadas"""
+    formato, tamanhos = SAIDAS[nome]
+    buffer = io.BytesIO()
+    if formato == 'ICO':
+        # O ICO só guarda tamanhos até o da imagem principal: ela é a maior, e as demais entram prontas
+        maior = max(tamanhos)
+        imagens[maior].save(buffer, format='ICO', sizes=[(t, t) for t in tamanhos],
+                            append_images=[imagens[t] for t in tamanhos if t != maior])
+    else:
+        imagens[tamanhos[0]].save(buffer, format=formato)
+    return buffer.getvalue()
+
+
+def gravar_se_mudou(caminho, dados):
+    """Grava só se o conteúdo mudou (a data do arquivo não muda à toa); retorna o hash"""
+    digital = sha256(dados)
+    if sha256_arquivo(caminho) != digital:
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, caminho)
+    return digital
+
+
+def carregar_manifesto(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifesto if manifesto.get('versao') == VERSAO else {}
+
+
+def gerar_favicons(logo, saida, forcar=False, workers=4):
+    """
+    Gera os arquivos de SAIDAS em `saida` e o manifesto de hashes.
+    Um arquivo é reaproveitado quando a chave de cache (logo, desenho, tamanhos) e o hash do arquivo
+    em disco conferem com o manifesto; sem nada desatualizado, a logo nem é decodificada.
+    Retorna {'gerados': [...], 'inalterados': [...], 'manifesto': caminho}.
+    """
+    with open(logo, 'rb') as f:
+        dados_logo = f.read()
+    hash_logo = sha256(dados_logo)
+    caminho_manifesto = os.path.join(saida, MANIFESTO)
+    anteriores = carregar_manifesto(caminho_manifesto).get('arquivos', {})
+
+    arquivos, pendentes = {}, []
+    for nome in SAIDAS:
+        chave = chave_cache(hash_logo, nome)
+        anterior = anteriores.get(nome, {})
+        if (not forcar and anterior.get('chave') == chave
+                and sha256_arquivo(os.path.join(saida, nome)) == anterior.get('sha256')):
+            arquivos[nome] = anterior
+        else:
+            pendentes.append(nome)
+
+    if pendentes:
+        imagem = Image.open(io.BytesIO(dados_logo)).convert('RGBA')
+        imagens = renderizar(imagem, [t for nome in pendentes for t in SAIDAS[nome][1]], workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            codificados = dict(zip(pendentes, pool.map(lambda nome: codificar(nome, imagens), pendentes)))
+        for nome in pendentes:
+            dados = codificados[nome]
+            arquivos[nome] = {'sha256': gravar_se_mudou(os.path.join(saida, nome), dados), 'bytes': len(dados),
+                              'chave': chave_cache(hash_logo, nome)}
+
+    manifesto = {
+        'versao': VERSAO,
+        'logo': {'arquivo': os.path.basename(logo), 'sha256': hash_logo},
+        'arquivos': {nome: arquivos[nome] for nome in SAIDAS},
+    }
+    gravar_se_mudou(caminho_manifesto, (json.dumps(manifesto, indent=2, ensure_ascii=False) + '\n').encode('utf-8'))
+    return {'gerados': pendentes, 'inalterados': [nome for nome in SAIDAS if nome not in pendentes],
+            'manifesto': caminho_manifesto}
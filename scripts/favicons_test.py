@@ -0,0 +1,104 @@
+"""
+Testes da geração dos favicons com cache por hash
+"""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image
+
+from favicons import (
+    MANIFESTO, SAIDAS, chave_cache, gerar_favicons, nivel_para, piramide, renderizar, sha256_arquivo
+)
+
+
+@pytest.fixture
+def logo(tmp_path):
+    caminho = tmp_path / 'logo-dte.png'
+    imagem = Image.new('RGB', (1000, 1000), (20, 60, 140))
+    imagem.paste((240, 200, 30), (250, 250, 750, 750))
+    imagem.save(caminho)
+    return str(caminho)
+
+
+def _datas(diretorio):
+    return {nome: os.stat(os.path.join(diretorio, nome)).st_mtime_ns for nome in SAIDAS}
+
+
+def test_piramide_e_nivel_de_cada_tamanho(logo):
+    niveis = piramide(Image.open(logo), 32)
+    assert [n.size[0] for n in niveis] == [1000, 500, 250, 125, 63]
+    assert min(niveis[-1].size) // 2 < 32
+    assert nivel_para(niveis, 16).size[0] == 63 and nivel_para(niveis, 512).size[0] == 1000
+
+
+def test_renderiza_cada_tamanho_uma_vez_com_mascara(logo):
+    imagens = renderizar(Image.open(logo).convert('RGBA'), [180, 16, 180, 64])
+    assert sorted(imagens) == [16, 64, 180]
+    circulo = imagens[180]
+    assert circulo.size == (180, 180) and circulo.mode == 'RGBA'
+    # Cantos transparentes, centro opaco com a cor da logo
+    assert circulo.getpixel((0, 0))[3] == 0 and circulo.getpixel((90, 90)) == (240, 200, 30, 255)
+
+
+def test_gera_arquivos_e_manifesto(logo, tmp_path):
+    saida = tmp_path / 'public'
+    saida.mkdir()
+    resultado = gerar_favicons(logo, str(saida))
+    assert sorted(resultado['gerados']) == sorted(SAIDAS)
+
+    with open(saida / MANIFESTO, encoding='utf-8') as f:
+        manifesto = json.load(f)
+    assert set(manifesto['arquivos']) == set(SAIDAS)
+    assert (saida / 'favicon-180x180.png').read_bytes() == (saida / 'apple-touch-icon.png').read_bytes()
+    assert Image.open(saida / 'favicon-512x512.png').size == (512, 512)
+    assert sorted(Image.open(saida / 'favicon.ico').info['sizes']) == [(16, 16), (32, 32), (48, 48), (64, 64)]
+
+
+def test_cache_pula_arquivos_inalterados(logo, tmp_path):
+    saida = str(tmp_path)
+    gerar_favicons(logo, saida)
+    datas = _datas(saida)
+
+    segunda = gerar_favicons(logo, saida)
+    assert segunda['gerados'] == [] and _datas(saida) == datas
+
+    # Arquivo apagado ou alterado fora do script: só ele é refeito
+    os.remove(os.path.join(saida, 'favicon-192x192.png'))
+    with open(os.path.join(saida, 'favicon.ico'), 'ab') as f:
+        f.write(b'x')
+    assert sorted(gerar_favicons(logo, saida)['gerados']) == ['favicon-192x192.png', 'favicon.ico']
+
+    # Forçado: tudo é renderizado, mas o conteúdo igual não é regravado
+    datas = _datas(saida)
+    assert len(gerar_favicons(logo, saida, forcar=True)['gerados']) == len(SAIDAS)
+    assert _datas(saida) == datas
+
+
+def test_logo_nova_refaz_todos(logo, tmp_path):
+    saida = str(tmp_path)
+    anterior = gerar_favicons(logo, saida)
+    with open(anterior['manifesto'], encoding='utf-8') as f:
+        hashes = {nome: item['sha256'] for nome, item in json.load(f)['arquivos'].items()}
+
+    Image.new('RGB', (800, 600), (200, 0, 0)).save(logo)
+    assert sorted(gerar_favicons(logo, saida)['gerados']) == sorted(SAIDAS)
+    with open(anterior['manifesto'], encoding='utf-8') as f:
+        assert all(item['sha256'] != hashes[nome] for nome, item in json.load(f)['arquivos'].items())
+
+
+def test_manifesto_versionado_confere_com_os_arquivos():
+    # O build do Vite versiona as URLs pelo manifesto do repositório: ele precisa estar em dia com os arquivos
+    publico = os.path.join(os.path.dirname(__file__), '..', 'client', 'public')
+    with open(os.path.join(publico, MANIFESTO), encoding='utf-8') as f:
+        manifesto = json.load(f)
+    hash_logo = sha256_arquivo(os.path.join(publico, manifesto['logo']['arquivo']))
+    assert hash_logo == manifesto['logo']['sha256'], "Logo mudou: rode scripts/generate-favicon.py"
+    assert set(manifesto['arquivos']) == set(SAIDAS)
+    for nome, item in manifesto['arquivos'].items():
+        assert item['chave'] == chave_cache(hash_logo, nome)
+        assert sha256_arquivo(os.path.join(publico, nome)) == item['sha256'], f"{nome} difere de {MANIFESTO}"
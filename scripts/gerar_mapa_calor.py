@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script para gerar as células do mapa de calor (tabela mapa_calor) a partir das tabelas de fatos
+Roda depois das importações de eleitorado e votação; o mapa carrega só as células da janela visível
+"""
+
+import argparse
+import os
+
+from seed_database import DATA_DIR, get_connection
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_mapa import NIVEIS_ZOOM, carregar_pontos, construir_celulas, gravar_mapa
+from tse_metricas import Metricas
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "gerar_mapa_calor.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera as células do mapa de calor por nível de zoom")
+    parser.add_argument('--ano', type=int, default=2024, help="Ano da eleição")
+    parser.add_argument('--cargo', default='prefeito', help="Cargo dos votos (nulos, brancos e partidos)")
+    parser.add_argument('--turno', type=int, default=1, help="Turno dos votos")
+    parser.add_argument('--niveis', type=int, nargs='+', default=list(NIVEIS_ZOOM),
+                        help="Níveis de zoom pré-calculados (os mesmos de shared/mapaCalor.ts)")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--transacao', type=int, default=50_000, help="Linhas por transação (commit)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo e linhas/s por etapa")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("MAPA DE CALOR")
+    print("=" * 60)
+    print(f"Ano: {args.ano} | cargo: {args.cargo} | turno: {args.turno}")
+    print(f"Níveis de zoom: {', '.join(map(str, args.niveis))}")
+
+    print("\nConectando ao banco de dados...")
+    conn = get_connection(allow_local_infile=(args.modo_carga == 'load_data'))
+    if not conn:
+        print("Falha na conexão. Verifique as credenciais.")
+        return
+
+    carga = CarregadorBulk(
+        conn, modo=args.modo_carga, tamanho_lote=args.lote,
+        linhas_por_transacao=args.transacao, max_bytes=args.max_bytes
+    )
+    try:
+        with Metricas(args.metricas) as metricas:
+            with metricas.etapa('pontos'):
+                pontos = carregar_pontos(conn, carga.placeholder, args.ano, args.cargo, args.turno)
+                metricas.avancar(len(pontos))
+            with metricas.etapa('celulas'):
+                linhas = construir_celulas(pontos, args.ano, args.cargo, args.niveis)
+                metricas.avancar(len(pontos), len(linhas))
+            with metricas.etapa('mapa_calor'):
+                gravadas = gravar_mapa(conn, carga, args.ano, args.cargo, linhas)
+    except Exception as e:
+        print(f"Erro durante a geração: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+
+    print("\n" + "=" * 60)
+    print("RESUMO")
+    print("=" * 60)
+    print(f"Pontos com coordenada: {len(pontos):,}")
+    if pontos.ignorados:
+        print(f"Linhas sem coordenada (fora do mapa): {pontos.ignorados:,}")
+    for zoom in args.niveis:
+        print(f"  zoom {zoom:>2}: {sum(1 for linha in linhas if linha[2] == zoom):,} células")
+    print(f"mapa_calor: {gravadas:,} linhas")
+    print(f"Métricas: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Script para importar as linhas completas do perfil do eleitorado (perfil_eleitorado) em eleitorado_tse
+Cada arquivo é uma partição (ano, UF), carregada à parte e trocada pela partição em uso no fim
+"""
+
+import argparse
+import os
+import re
+
+from seed_database import DATA_DIR, get_connection
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_eleitorado_tse import carregar_eleitorado_tse
+from tse_esquemas import TAMANHO_LOTE
+from tse_metricas import Metricas, publicar_importacao
+from tse_zip import existe, membros, tamanho
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "import_eleitorado_tse.json")
+
+
+def registrar_importacao(conn, arquivos):
+    """Cria o registro em `importacoes` da carga (tipo 'eleitorado') e retorna o id"""
+    ano = re.search(r'_(\d{4})_', os.path.basename(arquivos[0]))
+    nome = os.path.basename(arquivos[0]) + (f" (+{len(arquivos) - 1})" if len(arquivos) > 1 else '')
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO importacoes (nomeArquivo, tipoArquivo, tipoDataset, anoReferencia, status) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        (nome, 'csv', 'eleitorado', int(ano.group(1)) if ano else None, 'processando')
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Importa perfil_eleitorado do TSE para a tabela eleitorado_tse")
+    parser.add_argument('arquivos', nargs='*', default=[os.path.join(DATA_DIR, "perfil_eleitorado_2024_RO.csv")],
+                        help="Arquivos perfil_eleitorado_<ano>_<UF>.csv ou .zip do TSE (cada membro é uma partição)")
+    parser.add_argument('--uf', default=None, help="Só os membros desta UF nos .zip")
+    parser.add_argument('--ano', type=int, default=None, help="Só os membros deste ano nos .zip")
+    parser.add_argument('--leitura', type=int, default=TAMANHO_LOTE, help="Linhas do arquivo lidas por lote")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--transacao', type=int, default=50_000, help="Linhas por transação (commit)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Diretório do cache colunar binário (ex.: /home/ubuntu/tse-data/cache)")
+    parser.add_argument('--importacao', type=int, default=None,
+                        help="Id do registro em importacoes que recebe o progresso (padrão: cria um novo)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo, linhas/s, bytes lidos e pico de memória por etapa")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("IMPORTAÇÃO DO PERFIL DO ELEITORADO (eleitorado_tse)")
+    print("=" * 60)
+
+    arquivos = []
+    for arquivo in args.arquivos:
+        if not existe(arquivo):
+            print(f"Arquivo não encontrado: {arquivo}")
+            return
+        arquivos += membros(arquivo, args.uf, args.ano) if arquivo.lower().endswith('.zip') else [arquivo]
+    if not arquivos:
+        print("Nenhum arquivo perfil_eleitorado encontrado (confira --uf/--ano)")
+        return
+    for arquivo in arquivos:
+        print(f"  {arquivo} ({tamanho(arquivo) / 1e6:,.1f} MB)")
+
+    print("\nConectando ao banco de dados...")
+    conn = get_connection(allow_local_infile=(args.modo_carga == 'load_data'))
+    if not conn:
+        print("Falha na conexão. Verifique as credenciais.")
+        return
+
+    carga = CarregadorBulk(
+        conn, modo=args.modo_carga, tamanho_lote=args.lote,
+        linhas_por_transacao=args.transacao, max_bytes=args.max_bytes
+    )
+    # Progresso em conexão própria: os commits dele não interferem nas transações da carga
+    conn_progresso = get_connection()
+    publicar, importacao_id = None, args.importacao
+    if conn_progresso:
+        importacao_id = importacao_id or registrar_importacao(conn_progresso, arquivos)
+        publicar = publicar_importacao(conn_progresso, importacao_id)
+    resultados = []
+    try:
+        with Metricas(args.metricas, publicar) as metricas:
+            for arquivo in arquivos:
+                stats = carregar_eleitorado_tse(conn, carga, arquivo, importacao_id, args.cache, args.leitura,
+                                                metricas)
+                if stats:
+                    resultados.append(stats)
+    except Exception as e:
+        print(f"Erro durante a importação: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+        if conn_progresso:
+            conn_progresso.close()
+
+    print("\n" + "=" * 60)
+    print("RESUMO")
+    print("=" * 60)
+    for stats in resultados:
+        print(f"{stats['ano']}/{stats['uf']} ({stats['particao']}{', nova' if stats['particao_criada'] else ''}): "
+              f"{stats['linhas']:,} linhas em {stats['segundos_carga']:.1f}s "
+              f"({stats['linhas_por_segundo']:,.0f} linhas/s)")
+        print(f"  índices: {stats['segundos_indices']:.2f}s | troca: {stats['segundos_troca']:.2f}s")
+        print("  consultas (mediana): " + ', '.join(f"{nome} {ms:.1f} ms" for nome, ms in stats['latencias_ms'].items()))
+    print(f"Métricas: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
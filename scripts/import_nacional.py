@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Importação nacional do perfil do eleitorado: um shard por UF em um pool de processos
+Cada processo lê o perfil da própria UF em lotes, grava a partição NDJSON da UF e, com --banco,
+carrega municípios, zonas, eleitorado e cubo da UF em conexão própria. Ao final, o processo
+principal junta os totais nacionais no índice e recalcula o município "todos" do cubo.
+"""
+
+import argparse
+import functools
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import seed_database
+from import_tse_data import registros_eleitorado
+from seed_database import ANO_ELEICAO, DATA_DIR, get_connection
+from tse_agregacao import CONTADORES, agregar_perfil
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_cubo import recalcular_total_nacional
+from tse_dimensoes import Dimensoes
+from tse_manifesto import Manifesto
+from tse_metricas import Metricas, pico_rss_mb
+from tse_ndjson import EscritorParticionado
+from tse_ufs import TODAS, UFS, selecionar_ufs
+from tse_zip import existe, localizar, tamanho
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "import_nacional.json")
+MANIFESTOS_PADRAO = os.path.join(DATA_DIR, "manifestos")
+
+# Etapas de banco de cada UF, com checkpoint no manifesto da UF ('dimensoes' = municípios e zonas)
+ETAPAS_UF = ('dimensoes', 'eleitorado', 'cubo')
+
+
+def arquivo_uf(uf, zips=()):
+    """Perfil do eleitorado da UF: o CSV extraído em DATA_DIR ou o membro de mesmo nome nos `zips`"""
+    nome = f"perfil_eleitorado_{ANO_ELEICAO}_{uf}.csv"
+    filepath = os.path.join(DATA_DIR, nome)
+    if zips and not os.path.exists(filepath):
+        return localizar(nome, zips) or filepath
+    return filepath
+
+
+def carregar_uf(conn, filepath, uf, opcoes):
+    """
+    Carrega a UF no banco e retorna (agregador, linhas de eleitorado, linhas do cubo).
+    Etapas já concluídas para o mesmo arquivo (manifesto da UF) são puladas; o arquivo é sempre
+    lido, porque a partição NDJSON e os totais nacionais dependem da agregação.
+    """
+    carga = CarregadorBulk(conn, **opcoes['carga'])
+    dimensoes = Dimensoes(conn, carga, uf)
+    manifesto = None
+    if opcoes['manifestos']:
+        os.makedirs(opcoes['manifestos'], exist_ok=True)
+        manifesto = Manifesto(os.path.join(opcoes['manifestos'], f"manifesto_importacao_{uf}.json"))
+        _, digital = manifesto.situacao(filepath)
+        manifesto.iniciar(filepath, digital)
+        if opcoes['forcar']:
+            manifesto.reiniciar(filepath)
+
+    def pendente(nome):
+        return manifesto is None or manifesto.etapa(filepath, nome)['status'] != 'concluido'
+
+    def concluir(nome):
+        if manifesto:
+            manifesto.atualizar_etapa(filepath, nome, status='concluido',
+                                      concluidoEm=datetime.now().isoformat(timespec='seconds'))
+
+    if pendente('dimensoes'):
+        agregador = seed_database.ler_perfil_em_pipeline(conn, filepath, carga, opcoes['cache'], dimensoes)
+        concluir('dimensoes')
+    else:
+        agregador = agregar_perfil(filepath, cache_dir=opcoes['cache'])
+    eleitorado = cubo = 0
+    if pendente('eleitorado'):
+        eleitorado, _ = seed_database.insert_eleitorado(conn, filepath, carga, manifesto, opcoes['cache'],
+                                                        agregador, dimensoes=dimensoes)
+        concluir('eleitorado')
+    if pendente('cubo'):
+        # O município "todos" soma todas as UFs: recalculado uma vez, depois de todos os shards
+        cubo = seed_database.atualizar_cubo_eleitorado(conn, filepath, carga, agregador, manifesto,
+                                                       dimensoes=dimensoes, total_nacional=False)
+        concluir('cubo')
+    return agregador, eleitorado, cubo
+
+
+def importar_uf(uf, filepath, opcoes):
+    """Shard de uma UF (executado em um processo do pool); retorna o resumo da UF"""
+    inicio = time.perf_counter()
+    eleitorado = cubo = 0
+    if opcoes['conectar']:
+        conn = opcoes['conectar']()
+        try:
+            agregador, eleitorado, cubo = carregar_uf(conn, filepath, uf, opcoes)
+        finally:
+            conn.close()
+    else:
+        agregador = agregar_perfil(filepath, cache_dir=opcoes['cache'])
+
+    registros = agregador.resultado()
+    particao = None
+    if opcoes['saida']:
+        saida = EscritorParticionado(opcoes['saida'], comprimir=opcoes['comprimir'])
+        particao = saida.escrever('eleitorado', ANO_ELEICAO, registros_eleitorado(registros), uf=uf)
+    return {
+        'uf': uf,
+        'arquivo': filepath,
+        'registros': agregador.total_registros,
+        'municipios': len(agregador.municipios),
+        'zonas': len(registros),
+        'totais': dict(zip(CONTADORES, agregador.totais().sum(axis=0).tolist())),
+        'particao': particao,
+        'eleitorado': eleitorado,
+        'cubo': cubo,
+        'segundos': time.perf_counter() - inicio,
+        'pico_mb': pico_rss_mb(),
+    }
+
+
+def executar_shards(ufs, opcoes, workers=1, metricas=None):
+    """
+    Executa um shard por UF, em sequência (workers <= 1) ou em um pool de processos.
+    Cada processo atende uma única UF (max_tasks_per_child=1), então a memória de uma UF
+    é devolvida ao sistema antes da próxima. As maiores UFs começam primeiro, para equilibrar o fim.
+    Uma UF que falha não interrompe as outras: o resumo dela traz `erro`.
+    Retorna os resumos na ordem de `ufs`.
+    """
+    arquivos = {uf: arquivo_uf(uf, opcoes['zips']) for uf in ufs}
+    resumos = {uf: {'uf': uf, 'arquivo': f, 'erro': 'arquivo não encontrado'}
+               for uf, f in arquivos.items() if not existe(f)}
+    fila = sorted((uf for uf in ufs if uf not in resumos), key=lambda uf: tamanho(arquivos[uf]), reverse=True)
+
+    def concluir(uf, resumo):
+        resumos[uf] = resumo
+        if 'erro' in resumo:
+            print(f"  [{len(resumos)}/{len(ufs)}] {uf}: erro: {resumo['erro']}")
+            return
+        print(f"  [{len(resumos)}/{len(ufs)}] {uf}: {resumo['registros']:,} registros, "
+              f"{resumo['zonas']} zonas em {resumo['segundos']:.1f}s (pico {resumo['pico_mb']:.0f} MiB)")
+        if metricas:
+            metricas.registrar(f"uf_{uf}", resumo['segundos'], gravadas=resumo['eleitorado'] + resumo['cubo'],
+                               arquivo=resumo['arquivo'], pico_mb=round(resumo['pico_mb'], 1))
+
+    if workers <= 1:
+        for uf in fila:
+            try:
+                concluir(uf, importar_uf(uf, arquivos[uf], opcoes))
+            except Exception as e:
+                concluir(uf, {'uf': uf, 'arquivo': arquivos[uf], 'erro': str(e)})
+    else:
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+            futuros = {pool.submit(importar_uf, uf, arquivos[uf], opcoes): uf for uf in fila}
+            for futuro in as_completed(futuros):
+                uf = futuros[futuro]
+                try:
+                    concluir(uf, futuro.result())
+                except Exception as e:
+                    concluir(uf, {'uf': uf, 'arquivo': arquivos[uf], 'erro': str(e)})
+    return [resumos[uf] for uf in ufs]
+
+
+def juntar_totais(resumos):
+    """Totais nacionais (soma das UFs importadas) e os totais de cada UF"""
+    importadas = [r for r in resumos if 'erro' not in r]
+    nacional = {'ufs': len(importadas)}
+    for campo in ('registros', 'municipios', 'zonas'):
+        nacional[campo] = sum(r[campo] for r in importadas)
+    for contador in CONTADORES:
+        nacional[contador] = sum(r['totais'][contador] for r in importadas)
+    return {'nacional': nacional, 'por_uf': {r['uf']: r['totais'] for r in importadas}}
+
+
+def gravar_indice_nacional(diretorio, resumos, totais, comprimir=False):
+    """Índice único das partições gravadas pelos shards, com os totais nacionais e as falhas"""
+    saida = EscritorParticionado(diretorio, comprimir=comprimir)
+    saida.particoes.extend(r['particao'] for r in resumos if r.get('particao'))
+    return saida.gravar_indice(
+        ano=ANO_ELEICAO, totais=totais,
+        falhas={r['uf']: r['erro'] for r in resumos if 'erro' in r},
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Importa o perfil do eleitorado de várias UFs, uma por processo")
+    parser.add_argument('--ufs', nargs='+', default=[TODAS],
+                        help=f"Siglas das UFs ou '{TODAS}' (padrão: as 27)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos em paralelo, uma UF por vez em cada (1 = sequencial)")
+    parser.add_argument('--zip', metavar='ARQUIVO', nargs='+', default=None,
+                        help="Arquivos .zip do TSE lidos sem extração quando o CSV não está em DATA_DIR "
+                             "(padrão: os .zip de DATA_DIR)")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Diretório do cache colunar binário (ex.: /home/ubuntu/tse-data/cache)")
+    parser.add_argument('--saida', metavar='DIR', default=os.path.join(DATA_DIR, 'processados'),
+                        help="Diretório da saída NDJSON (eleitorado/uf=XX/ano=AAAA.ndjson)")
+    parser.add_argument('--comprimir', action='store_true', help="Comprime as partições NDJSON com gzip")
+    parser.add_argument('--banco', action='store_true',
+                        help="Carrega municípios, zonas, eleitorado e cubo de cada UF no banco")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--transacao', type=int, default=50_000, help="Linhas por transação (commit)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--manifestos', metavar='DIR', default=MANIFESTOS_PADRAO,
+                        help="Diretório dos manifestos por UF (checkpoints e delta da carga no banco)")
+    parser.add_argument('--forcar', action='store_true', help="Recarrega tudo, ignorando os manifestos")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo, linhas/s, bytes lidos e pico de memória por UF")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    ufs = selecionar_ufs(args.ufs)
+
+    print("=" * 60)
+    print(f"IMPORTAÇÃO NACIONAL - {len(ufs)} UF(s), {args.workers} processo(s)")
+    print("=" * 60)
+
+    conn = carga = None
+    conectar = None
+    if args.banco:
+        conectar = functools.partial(get_connection, allow_local_infile=(args.modo_carga == 'load_data'))
+        conn = conectar()
+        if not conn:
+            print("Falha na conexão. Verifique as credenciais.")
+            return
+        carga = CarregadorBulk(conn)
+        # Partidos são nacionais: cadastrados uma vez, antes dos shards
+        seed_database.insert_partidos(conn, carga, Dimensoes(conn, carga))
+
+    opcoes = {
+        'zips': args.zip if args.zip is not None else sorted(glob.glob(os.path.join(DATA_DIR, '*.zip'))),
+        'cache': args.cache,
+        'saida': args.saida,
+        'comprimir': args.comprimir,
+        'conectar': conectar,
+        'carga': {'modo': args.modo_carga, 'tamanho_lote': args.lote,
+                  'linhas_por_transacao': args.transacao, 'max_bytes': args.max_bytes},
+        'manifestos': args.manifestos,
+        'forcar': args.forcar,
+    }
+    try:
+        with Metricas(args.metricas) as metricas:
+            print("\nShards por UF:")
+            resumos = executar_shards(ufs, opcoes, args.workers, metricas)
+            with metricas.etapa('totais_nacionais'):
+                totais = juntar_totais(resumos)
+                indice = gravar_indice_nacional(args.saida, resumos, totais, args.comprimir)
+                if conn:
+                    recalcular_total_nacional(conn, carga, ANO_ELEICAO)
+    finally:
+        if conn:
+            conn.close()
+
+    nacional = totais['nacional']
+    print("\n" + "=" * 60)
+    print("RESUMO NACIONAL")
+    print("=" * 60)
+    print(f"UFs importadas: {nacional['ufs']} de {len(ufs)}")
+    print(f"Eleitores: {nacional['totalEleitores']:,} em {nacional['municipios']:,} municípios "
+          f"e {nacional['zonas']:,} zonas ({nacional['registros']:,} registros lidos)")
+    falhas = [r for r in resumos if 'erro' in r]
+    for r in falhas:
+        print(f"  {r['uf']} ({UFS[r['uf']]}): {r['erro']}")
+    print(f"Índice: {indice}")
+    print(f"Métricas por UF: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
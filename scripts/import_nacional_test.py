@@ -0,0 +1,126 @@
+"""
+Testes da importação nacional em shards por UF usando sqlite3 como banco local
+"""
+
+import functools
+import json
+import os
+import sqlite3
+
+import pytest
+
+import import_nacional
+from tse_agregacao import agregar_perfil
+from tse_carga import CarregadorBulk
+from tse_ndjson import ler_bloco
+from tse_sintetico import gerar_perfil
+from tse_ufs import UFS, selecionar_ufs
+
+ESQUEMA = """
+CREATE TABLE regioes (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, uf TEXT);
+CREATE TABLE municipios (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, codigoTse TEXT, regiaoId INTEGER, uf TEXT);
+CREATE TABLE zonas_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, municipioId INTEGER);
+CREATE TABLE eleitorado (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    bairroId INTEGER, secaoId INTEGER, totalEleitores INTEGER,
+    eleitoresMasculino INTEGER, eleitoresFeminino INTEGER, eleitoresOutros INTEGER,
+    faixa16a17 INTEGER, faixa18a24 INTEGER, faixa25a34 INTEGER, faixa35a44 INTEGER,
+    faixa45a59 INTEGER, faixa60a69 INTEGER, faixa70mais INTEGER,
+    escolaridadeAnalfabeto INTEGER, escolaridadeFundamental INTEGER,
+    escolaridadeMedio INTEGER, escolaridadeSuperior INTEGER
+);
+CREATE TABLE eleitorado_cubo (
+    anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    genero TEXT, faixaEtaria TEXT, escolaridade TEXT, totalEleitores INTEGER,
+    PRIMARY KEY (anoEleicao, municipioId, zonaId, genero, faixaEtaria, escolaridade)
+);
+"""
+
+# Linhas de perfil por UF (tamanhos diferentes para conferir a ordem das maiores primeiro)
+LINHAS = {'RO': 3_000, 'AC': 1_000, 'SP': 5_000}
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    diretorio = tmp_path / 'dados'
+    diretorio.mkdir()
+    for i, (uf, linhas) in enumerate(LINHAS.items()):
+        gerar_perfil(str(diretorio / f"perfil_eleitorado_2024_{uf}.csv"), linhas, uf=uf, semente=i + 1)
+    monkeypatch.setattr(import_nacional, 'DATA_DIR', str(diretorio))
+    return diretorio
+
+
+def _opcoes(tmp_path, conectar=None):
+    return {
+        'zips': (), 'cache': None, 'saida': str(tmp_path / 'saida'), 'comprimir': False,
+        'conectar': conectar, 'carga': {'tamanho_lote': 500}, 'manifestos': str(tmp_path / 'manifestos'),
+        'forcar': False,
+    }
+
+
+def test_selecionar_ufs():
+    assert len(UFS) == 27 and len(selecionar_ufs(['todas'])) == 27
+    assert selecionar_ufs(['ro', 'AC', 'RO']) == ['RO', 'AC']
+    assert selecionar_ufs(['SP', 'todas'])[0] == 'SP'
+    with pytest.raises(ValueError, match='XX'):
+        selecionar_ufs(['XX'])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_shards_e_totais_nacionais(dados, tmp_path, workers):
+    opcoes = _opcoes(tmp_path)
+    resumos = import_nacional.executar_shards(['RO', 'AC', 'SP', 'AM'], opcoes, workers)
+
+    assert [r['uf'] for r in resumos] == ['RO', 'AC', 'SP', 'AM']
+    assert resumos[3]['erro'] == 'arquivo não encontrado'
+    for resumo in resumos[:3]:
+        agregador = agregar_perfil(resumo['arquivo'])
+        assert resumo['registros'] == LINHAS[resumo['uf']]
+        assert resumo['totais']['totalEleitores'] == int(agregador.totais()[:, 0].sum())
+
+    totais = import_nacional.juntar_totais(resumos)
+    assert totais['nacional']['ufs'] == 3
+    assert totais['nacional']['registros'] == sum(LINHAS.values())
+    assert totais['nacional']['totalEleitores'] == sum(t['totalEleitores'] for t in totais['por_uf'].values())
+
+    # Uma partição por UF, listadas no índice único com os totais
+    caminho = import_nacional.gravar_indice_nacional(opcoes['saida'], resumos, totais)
+    with open(caminho, encoding='utf-8') as f:
+        indice = json.load(f)
+    assert sorted(p['arquivo'] for p in indice['particoes']) == [
+        os.path.join('eleitorado', f'uf={uf}', 'ano=2024.ndjson') for uf in ('AC', 'RO', 'SP')
+    ]
+    assert indice['falhas'] == {'AM': 'arquivo não encontrado'}
+    assert indice['totais']['nacional'] == totais['nacional']
+    ro = next(p for p in indice['particoes'] if p['uf'] == 'RO')
+    registros = [r for bloco in ro['blocos'] for r in ler_bloco(opcoes['saida'], ro, bloco)]
+    assert sum(r['total_eleitores'] for r in registros) == totais['por_uf']['RO']['totalEleitores']
+
+
+def test_carga_por_uf_e_total_nacional_no_cubo(dados, tmp_path):
+    banco = str(tmp_path / 'nacional.sqlite')
+    with sqlite3.connect(banco) as conn:
+        conn.executescript(ESQUEMA)
+    opcoes = _opcoes(tmp_path, functools.partial(sqlite3.connect, banco))
+    resumos = import_nacional.executar_shards(list(LINHAS), opcoes)
+    conn = sqlite3.connect(banco)
+    import_nacional.recalcular_total_nacional(conn, CarregadorBulk(conn), 2024)
+
+    nacional = import_nacional.juntar_totais(resumos)['nacional']
+    assert conn.execute("SELECT uf, nome FROM regioes ORDER BY uf").fetchall() == [
+        ('AC', 'Acre'), ('RO', 'Rondônia'), ('SP', 'São Paulo')
+    ]
+    # Os códigos sintéticos se repetem entre UFs: cada UF tem os próprios municípios
+    assert conn.execute("SELECT COUNT(DISTINCT uf) FROM municipios").fetchone()[0] == 3
+    assert conn.execute("SELECT SUM(totalEleitores) FROM eleitorado").fetchone()[0] == nacional['totalEleitores']
+    todos = "SELECT totalEleitores FROM eleitorado_cubo WHERE anoEleicao = ? AND municipioId = 0 AND zonaId = 0 " \
+            "AND genero = '' AND faixaEtaria = '' AND escolaridade = ''"
+    assert conn.execute(todos, [2024]).fetchone()[0] == nacional['totalEleitores']
+    assert conn.execute(todos, [0]).fetchone()[0] == nacional['totalEleitores']
+
+    # Reexecução com os mesmos arquivos: etapas de banco puladas pelos manifestos, mesmos totais
+    linhas = conn.execute("SELECT COUNT(*) FROM eleitorado").fetchone()[0]
+    resumos = import_nacional.executar_shards(list(LINHAS), opcoes)
+    assert [(r['eleitorado'], r['cubo']) for r in resumos] == [(0, 0)] * 3
+    assert conn.execute("SELECT COUNT(*) FROM eleitorado").fetchone()[0] == linhas
+    conn.close()
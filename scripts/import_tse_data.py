@@ -4,173 +4,310 @@ Script para importar dados do TSE para o banco de dados DTE
 Suporta: eleitorado, candidatos, coligações, partidos
 """
 
-import csv
+import argparse
+import glob
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+
+from tse_agregacao import agregar_eleitorado
+from tse_carga import MAX_BYTES_PADRAO
+from tse_dump import EscritorDump, gerar_inserts
+from tse_esquemas import CONSULTA_CAND, CONSULTA_COLIGACAO
+from tse_metricas import Metricas, avancar, pico_rss_mb
+from tse_ndjson import EscritorParticionado
+from tse_zip import existe, localizar
 
 # Diretório dos dados
 DATA_DIR = "/home/ubuntu/tse-data"
 
-def read_csv_latin1(filepath, delimiter=';'):
-    """Lê arquivo CSV com encoding Latin-1"""
-    data = []
-    with open(filepath, 'r', encoding='latin-1') as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
-        for row in reader:
-            # Limpar aspas dos valores
-            clean_row = {k.strip('"'): v.strip('"') if isinstance(v, str) else v for k, v in row.items()}
-            data.append(clean_row)
-    return data
-
-def process_eleitorado_ro():
+# Anos processados para candidatos e coligações
+ANOS = (2024, 2022, 2020)
+
+# UF dos arquivos processados
+UF = 'RO'
+
+# Resumo lido por populate_demo_data.mjs (eleitorado completo, amostra dos demais conjuntos e totais)
+RESUMO = os.path.join(DATA_DIR, "dados_processados_ro.json")
+
+# Registros de candidatos e coligações por ano na amostra do resumo
+AMOSTRA_RESUMO = 100
+
+# Arquivo de origem de cada conjunto (extraído em DATA_DIR ou membro de um .zip do TSE)
+ARQUIVOS = {
+    'eleitorado': "perfil_eleitorado_{ano}_{uf}.csv",
+    'candidatos': "consulta_cand_{ano}_{uf}.csv",
+    'coligacoes': "consulta_coligacao_{ano}_{uf}.csv",
+}
+
+# Tabelas do dump SQL (as de drizzle/schema.ts) e suas colunas: (coluna, campo do registro processado, tipo).
+# O eleitorado fica fora: a tabela `eleitorado` usa ids de município e zona, resolvidos por seed_database.py.
+COLUNAS_DUMP = {
+    'candidatos_tse': (
+        ('anoEleicao', 'ano_eleicao', 'inteiro'), ('nmTipoEleicao', 'tipo_eleicao', 'texto'),
+        ('nrTurno', 'turno', 'inteiro'), ('sgUf', 'uf', 'texto'), ('nmUe', 'municipio', 'texto'),
+        ('dsCargo', 'cargo', 'texto'), ('nrCandidato', 'numero', 'inteiro'), ('nmCandidato', 'nome', 'texto'),
+        ('nmUrna', 'nome_urna', 'texto'), ('sgPartido', 'partido_sigla', 'texto'),
+        ('nmPartido', 'partido_nome', 'texto'), ('nmColigacao', 'coligacao', 'texto'),
+        ('dsSituacaoCandidatura', 'situacao', 'texto'), ('dsSitTotTurno', 'resultado', 'texto'),
+        ('dsGenero', 'genero', 'texto'), ('dsGrauInstrucao', 'escolaridade', 'texto'),
+        ('dsCorRaca', 'cor_raca', 'texto'), ('dsOcupacao', 'ocupacao', 'texto'),
+    ),
+    'coligacoes_tse': (
+        ('anoEleicao', 'ano_eleicao', 'inteiro'), ('nmTipoEleicao', 'tipo_eleicao', 'texto'),
+        ('nrTurno', 'turno', 'inteiro'), ('sgUf', 'uf', 'texto'), ('nmUe', 'municipio', 'texto'),
+        ('dsCargo', 'cargo', 'texto'), ('tpAgremiacao', 'tipo_agremiacao', 'texto'),
+        ('sqColigacao', 'sequencial', 'texto'), ('nmColigacao', 'nome', 'texto'),
+        ('dsComposicaoColigacao', 'composicao', 'texto_longo'), ('stColigacao', 'situacao', 'texto'),
+    ),
+}
+
+# Esquema (coluna, tipo) de cada tabela do dump, usado na geração de SQL
+ESQUEMAS_DUMP = {
+    tabela: tuple((coluna, tipo) for coluna, _, tipo in colunas) for tabela, colunas in COLUNAS_DUMP.items()
+}
+
+# Conjunto processado gravado em cada tabela do dump
+DATASETS_DUMP = {
+    'candidatos_tse': 'candidatos',
+    'coligacoes_tse': 'coligacoes',
+}
+
+def arquivo_tarefa(tarefa, zips=()):
+    """
+    Caminho do arquivo de origem de uma tarefa (dataset, ano): o CSV extraído em DATA_DIR
+    ou, se ele não existir, o membro de mesmo nome em um dos arquivos `zips`
+    """
+    dataset, ano = tarefa
+    nome = ARQUIVOS[dataset].format(ano=ano, uf=UF)
+    filepath = os.path.join(DATA_DIR, nome)
+    if zips and not os.path.exists(filepath):
+        return localizar(nome, zips) or filepath
+    return filepath
+
+def process_eleitorado_ro(cache_dir=None, filepath=None):
     """Processa dados do eleitorado de Rondônia"""
-    filepath = os.path.join(DATA_DIR, "perfil_eleitorado_2024_RO.csv")
-    if not os.path.exists(filepath):
+    filepath = filepath or arquivo_tarefa(('eleitorado', 2024))
+    if not existe(filepath):
         print(f"Arquivo não encontrado: {filepath}")
         return []
     
     print(f"Lendo {filepath}...")
-    data = read_csv_latin1(filepath)
-    print(f"Total de registros: {len(data)}")
-    
-    # Agrupar por município e zona
-    municipios = {}
-    for row in data:
-        mun = row.get('NM_MUNICIPIO', '')
-        zona = row.get('NR_ZONA', '')
-        key = f"{mun}_{zona}"
-        
-        if key not in municipios:
-            municipios[key] = {
-                'municipio': mun,
-                'codigo_municipio': row.get('CD_MUNICIPIO', ''),
-                'zona': zona,
-                'total_eleitores': 0,
-                'masculino': 0,
-                'feminino': 0,
-                'biometria': 0,
-                'deficiencia': 0
-            }
-        
-        qt = int(row.get('QT_ELEITORES_PERFIL', 0) or 0)
-        municipios[key]['total_eleitores'] += qt
-        
-        genero = row.get('DS_GENERO', '')
-        if 'MASCULINO' in genero.upper():
-            municipios[key]['masculino'] += qt
-        elif 'FEMININO' in genero.upper():
-            municipios[key]['feminino'] += qt
-        
-        municipios[key]['biometria'] += int(row.get('QT_ELEITORES_BIOMETRIA', 0) or 0)
-        municipios[key]['deficiencia'] += int(row.get('QT_ELEITORES_DEFICIENCIA', 0) or 0)
-    
-    return list(municipios.values())
-
-def process_candidatos_ro(ano=2024):
+    registros, total_registros = agregar_eleitorado(filepath, cache_dir=cache_dir)
+    print(f"Total de registros: {total_registros}")
+    return registros_eleitorado(registros)
+
+def registros_eleitorado(registros):
+    """Registros de AgregadorEleitorado.resultado() no formato da saída: um por município e zona"""
+    return [{
+        'municipio': r['municipio'],
+        'codigo_municipio': r['codigo_municipio'],
+        'zona': r['zona'],
+        'total_eleitores': r['totalEleitores'],
+        'masculino': r['eleitoresMasculino'],
+        'feminino': r['eleitoresFeminino'],
+        'biometria': r['biometria'],
+        'deficiencia': r['deficiencia']
+    } for r in registros]
+
+def process_candidatos_ro(ano=2024, cache_dir=None, filepath=None):
     """Processa dados de candidatos de Rondônia"""
-    filepath = os.path.join(DATA_DIR, f"consulta_cand_{ano}_RO.csv")
-    if not os.path.exists(filepath):
+    filepath = filepath or arquivo_tarefa(('candidatos', ano))
+    if not existe(filepath):
         print(f"Arquivo não encontrado: {filepath}")
         return []
     
     print(f"Lendo {filepath}...")
-    data = read_csv_latin1(filepath)
-    print(f"Total de registros: {len(data)}")
+    linhas = CONSULTA_CAND.ler(filepath, 'candidatos', cache_dir)
     
     candidatos = []
-    for row in data:
+    for (tipo_eleicao, turno, municipio, cargo, numero, nome, nome_urna, partido_sigla,
+         partido_nome, coligacao, situacao, resultado, genero, escolaridade, cor_raca, ocupacao) in linhas:
         candidatos.append({
             'ano_eleicao': ano,
-            'tipo_eleicao': row.get('NM_TIPO_ELEICAO', ''),
-            'turno': row.get('NR_TURNO', 1),
+            'tipo_eleicao': tipo_eleicao,
+            'turno': turno,
             'uf': 'RO',
-            'municipio': row.get('NM_UE', ''),
-            'cargo': row.get('DS_CARGO', ''),
-            'numero': row.get('NR_CANDIDATO', ''),
-            'nome': row.get('NM_CANDIDATO', ''),
-            'nome_urna': row.get('NM_URNA_CANDIDATO', ''),
-            'partido_sigla': row.get('SG_PARTIDO', ''),
-            'partido_nome': row.get('NM_PARTIDO', ''),
-            'coligacao': row.get('NM_COLIGACAO', ''),
-            'situacao': row.get('DS_SITUACAO_CANDIDATURA', ''),
-            'resultado': row.get('DS_SIT_TOT_TURNO', ''),
-            'genero': row.get('DS_GENERO', ''),
-            'escolaridade': row.get('DS_GRAU_INSTRUCAO', ''),
-            'cor_raca': row.get('DS_COR_RACA', ''),
-            'ocupacao': row.get('DS_OCUPACAO', '')
+            'municipio': municipio,
+            'cargo': cargo,
+            'numero': numero,
+            'nome': nome,
+            'nome_urna': nome_urna,
+            'partido_sigla': partido_sigla,
+            'partido_nome': partido_nome,
+            'coligacao': coligacao,
+            'situacao': situacao,
+            'resultado': resultado,
+            'genero': genero,
+            'escolaridade': escolaridade,
+            'cor_raca': cor_raca,
+            'ocupacao': ocupacao
         })
     
+    print(f"Total de registros: {len(candidatos)}")
     return candidatos
 
-def process_coligacoes_ro(ano=2024):
+def process_coligacoes_ro(ano=2024, cache_dir=None, filepath=None):
     """Processa dados de coligações de Rondônia"""
-    filepath = os.path.join(DATA_DIR, f"consulta_coligacao_{ano}_RO.csv")
-    if not os.path.exists(filepath):
+    filepath = filepath or arquivo_tarefa(('coligacoes', ano))
+    if not existe(filepath):
         print(f"Arquivo não encontrado: {filepath}")
         return []
     
     print(f"Lendo {filepath}...")
-    data = read_csv_latin1(filepath)
-    print(f"Total de registros: {len(data)}")
+    linhas = CONSULTA_COLIGACAO.ler(filepath, 'coligacoes', cache_dir)
     
     coligacoes = []
-    for row in data:
+    for (tipo_eleicao, turno, municipio, cargo, tipo_agremiacao, sequencial,
+         nome, composicao, situacao) in linhas:
         coligacoes.append({
             'ano_eleicao': ano,
-            'tipo_eleicao': row.get('NM_TIPO_ELEICAO', ''),
-            'turno': row.get('NR_TURNO', 1),
+            'tipo_eleicao': tipo_eleicao,
+            'turno': turno,
             'uf': 'RO',
-            'municipio': row.get('NM_UE', ''),
-            'cargo': row.get('DS_CARGO', ''),
-            'tipo_agremiacao': row.get('TP_AGREMIACAO', ''),
-            'sequencial': row.get('SQ_COLIGACAO', ''),
-            'nome': row.get('NM_COLIGACAO', ''),
-            'composicao': row.get('DS_COMPOSICAO_COLIGACAO', ''),
-            'situacao': row.get('ST_COLIGACAO', '')
+            'municipio': municipio,
+            'cargo': cargo,
+            'tipo_agremiacao': tipo_agremiacao,
+            'sequencial': sequencial,
+            'nome': nome,
+            'composicao': composicao,
+            'situacao': situacao
         })
     
+    print(f"Total de registros: {len(coligacoes)}")
     return coligacoes
 
-def generate_sql_insert(table, data, batch_size=100):
-    """Gera comandos SQL INSERT para os dados"""
-    if not data:
-        return []
+def registros_dump(tabela, registros):
+    """Registros processados com os nomes das colunas da tabela do dump"""
+    campos = [(coluna, campo) for coluna, campo, _ in COLUNAS_DUMP[tabela]]
+    return ({coluna: registro.get(campo) for coluna, campo in campos} for registro in registros)
+
+def generate_sql_insert(table, data, max_bytes=MAX_BYTES_PADRAO):
+    """Gera comandos SQL INSERT para os registros processados, limitados a `max_bytes` cada (gerador)"""
+    if table not in COLUNAS_DUMP:
+        raise ValueError(f"Tabela sem esquema de dump: {table} (use {', '.join(COLUNAS_DUMP)})")
+    return gerar_inserts(table, registros_dump(table, data), ESQUEMAS_DUMP[table], max_bytes)
+
+def gravar_dump(caminho, resultados, max_bytes=MAX_BYTES_PADRAO):
+    """
+    Grava os conjuntos completos de candidatos e coligações em um script SQL (.sql ou .sql.gz) em streaming,
+    nas tabelas candidatos_tse e coligacoes_tse já criadas pelas migrações. Cada tabela começa apagando
+    as linhas da UF nos anos processados, e o script pode ser carregado de novo sem duplicar linhas.
+    """
+    anos = ', '.join(str(ano) for ano in ANOS)
+    with EscritorDump(caminho, max_bytes) as dump:
+        for tabela, dataset in DATASETS_DUMP.items():
+            dump.escrever_comando(f"DELETE FROM {tabela} WHERE sgUf = '{UF}' AND anoEleicao IN ({anos})")
+            registros = (r for ano in ANOS for r in resultados[(dataset, ano)])
+            linhas, comandos = dump.escrever_tabela(tabela, registros_dump(tabela, registros), ESQUEMAS_DUMP[tabela],
+                                                    criar=False)
+            avancar(0, linhas)
+            print(f"  {tabela}: {linhas} linhas em {comandos} comandos INSERT")
+    print(f"Dump SQL salvo em: {caminho}")
+
+def gravar_resumo(caminho, resultados, totais):
+    """
+    Grava o resumo no formato antigo de dados_processados_ro.json: o eleitorado por município e zona,
+    os primeiros AMOSTRA_RESUMO candidatos e coligações de cada ano e os totais. Os conjuntos
+    completos ficam nas partições NDJSON.
+    """
+    resumo = {'eleitorado': resultados[('eleitorado', 2024)]}
+    for dataset in ('candidatos', 'coligacoes'):
+        for ano in ANOS:
+            resumo[f"{dataset}_{ano}"] = resultados[(dataset, ano)][:AMOSTRA_RESUMO]
+    resumo['totais'] = totais
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + '.tmp', caminho)
+    print(f"Resumo salvo em: {caminho}")
+
+def listar_tarefas():
+    """Tarefas independentes da importação: (dataset, ano)"""
+    return (
+        [('eleitorado', 2024)]
+        + [('candidatos', ano) for ano in ANOS]
+        + [('coligacoes', ano) for ano in ANOS]
+    )
+
+def executar_tarefa(tarefa, filepath=None, cache_dir=None):
+    """Executa uma tarefa e retorna (tarefa, dados, segundos, pico de memória do processo em MiB)"""
+    dataset, ano = tarefa
+    inicio = time.perf_counter()
+    if dataset == 'eleitorado':
+        dados = process_eleitorado_ro(cache_dir, filepath)
+    elif dataset == 'candidatos':
+        dados = process_candidatos_ro(ano, cache_dir, filepath)
+    else:
+        dados = process_coligacoes_ro(ano, cache_dir, filepath)
+    return tarefa, dados, time.perf_counter() - inicio, pico_rss_mb()
+
+def executar_tarefas(tarefas, workers=1, cache_dir=None, metricas=None, zips=()):
+    """
+    Executa as tarefas em sequência (workers <= 1) ou em um pool de processos.
+    O resultado segue sempre a ordem de `tarefas`, independente da ordem de término.
+    Arquivos ausentes em DATA_DIR são lidos dos `zips`: cada processo descomprime o próprio membro.
+    Com `metricas`, cada tarefa é registrada como uma etapa.
+    """
+    inicio = time.perf_counter()
+    arquivos = [arquivo_tarefa(tarefa, zips) for tarefa in tarefas]
+    executar = partial(executar_tarefa, cache_dir=cache_dir)
+    if workers <= 1:
+        resultados = list(map(executar, tarefas, arquivos))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(executar, tarefas, arquivos))
+    total = time.perf_counter() - inicio
     
-    columns = list(data[0].keys())
-    sql_statements = []
-    
-    for i in range(0, len(data), batch_size):
-        batch = data[i:i+batch_size]
-        values_list = []
-        
-        for row in batch:
-            values = []
-            for col in columns:
-                val = row.get(col, '')
-                if val is None or val == '':
-                    values.append('NULL')
-                elif isinstance(val, (int, float)):
-                    values.append(str(val))
-                else:
-                    # Escapar aspas simples
-                    val_escaped = str(val).replace("'", "''")
-                    values.append(f"'{val_escaped}'")
-            values_list.append(f"({', '.join(values)})")
-        
-        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n" + ",\n".join(values_list) + ";"
-        sql_statements.append(sql)
-    
-    return sql_statements
+    print("\nTempo por tarefa:")
+    for (tarefa, dados, segundos, pico), arquivo in zip(resultados, arquivos):
+        dataset, ano = tarefa
+        print(f"  {dataset} {ano}: {segundos:.2f}s ({len(dados)} registros)")
+        if metricas and existe(arquivo):
+            metricas.registrar(f"{dataset}_{ano}", segundos, gravadas=len(dados), arquivo=arquivo,
+                               pico_mb=round(pico, 1))
+    soma = sum(segundos for _, _, segundos, _ in resultados)
+    print(f"  Total: {total:.2f}s de relógio, {soma:.2f}s somando as tarefas ({max(workers, 1)} worker(s))")
+    
+    return {tarefa: dados for tarefa, dados, _, _ in resultados}
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Processa os dados do TSE de Rondônia")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos em paralelo (1 = sequencial)")
+    parser.add_argument('--zip', metavar='ARQUIVO', nargs='+', default=None,
+                        help="Arquivos .zip do TSE lidos sem extração quando o CSV não está em DATA_DIR "
+                             "(padrão: os .zip de DATA_DIR)")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Diretório do cache colunar binário (ex.: /home/ubuntu/tse-data/cache)")
+    parser.add_argument('--saida', metavar='DIR', default=os.path.join(DATA_DIR, 'processados'),
+                        help="Diretório da saída NDJSON particionada (dataset/ano=AAAA.ndjson)")
+    parser.add_argument('--comprimir', action='store_true', help="Comprime as partições NDJSON com gzip")
+    parser.add_argument('--resumo', metavar='ARQUIVO', default=RESUMO,
+                        help="Resumo com amostras e totais lido por populate_demo_data.mjs")
+    parser.add_argument('--dump', metavar='ARQUIVO', default=None,
+                        help="Grava os dados completos em um script SQL (.sql, ou .sql.gz comprimido)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada INSERT do dump (respeitar max_allowed_packet)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=os.path.join(DATA_DIR, 'metricas', 'import_tse_data.json'),
+                        help="Arquivo JSON com tempo, linhas/s, bytes lidos e pico de memória por etapa")
+    return parser.parse_args()
+
+def importar(args, metricas):
+    """Processa as tarefas e grava as saídas; cada tarefa e cada saída é uma etapa das métricas"""
     print("=" * 60)
     print("IMPORTAÇÃO DE DADOS TSE - RONDÔNIA")
     print("=" * 60)
     
+    zips = args.zip if args.zip is not None else sorted(glob.glob(os.path.join(DATA_DIR, '*.zip')))
+    resultados = executar_tarefas(listar_tarefas(), args.workers, args.cache, metricas, zips)
+    
     # Processar eleitorado
     print("\n[1/3] Processando ELEITORADO...")
-    eleitorado = process_eleitorado_ro()
+    eleitorado = resultados[('eleitorado', 2024)]
     print(f"Municípios/Zonas processados: {len(eleitorado)}")
     
     # Calcular totais
@@ -183,18 +320,18 @@ def main():
     
     # Processar candidatos
     print("\n[2/3] Processando CANDIDATOS...")
-    candidatos_2024 = process_candidatos_ro(2024)
-    candidatos_2022 = process_candidatos_ro(2022)
-    candidatos_2020 = process_candidatos_ro(2020)
+    candidatos_2024 = resultados[('candidatos', 2024)]
+    candidatos_2022 = resultados[('candidatos', 2022)]
+    candidatos_2020 = resultados[('candidatos', 2020)]
     print(f"Candidatos 2024: {len(candidatos_2024)}")
     print(f"Candidatos 2022: {len(candidatos_2022)}")
     print(f"Candidatos 2020: {len(candidatos_2020)}")
     
     # Processar coligações
     print("\n[3/3] Processando COLIGAÇÕES...")
-    coligacoes_2024 = process_coligacoes_ro(2024)
-    coligacoes_2022 = process_coligacoes_ro(2022)
-    coligacoes_2020 = process_coligacoes_ro(2020)
+    coligacoes_2024 = resultados[('coligacoes', 2024)]
+    coligacoes_2022 = resultados[('coligacoes', 2022)]
+    coligacoes_2020 = resultados[('coligacoes', 2020)]
     print(f"Coligações 2024: {len(coligacoes_2024)}")
     print(f"Coligações 2022: {len(coligacoes_2022)}")
     print(f"Coligações 2020: {len(coligacoes_2020)}")
@@ -207,36 +344,42 @@ def main():
     print(f"Candidatos: {len(candidatos_2024) + len(candidatos_2022) + len(candidatos_2020)} registros")
     print(f"Coligações: {len(coligacoes_2024) + len(coligacoes_2022) + len(coligacoes_2020)} registros")
     
-    # Salvar dados processados em JSON para uso posterior
-    import json
-    
-    output = {
-        'eleitorado': eleitorado,
-        'candidatos_2024': candidatos_2024[:100],  # Amostra
-        'candidatos_2022': candidatos_2022[:100],
-        'candidatos_2020': candidatos_2020[:100],
-        'coligacoes_2024': coligacoes_2024[:100],
-        'coligacoes_2022': coligacoes_2022[:100],
-        'coligacoes_2020': coligacoes_2020[:100],
-        'totais': {
-            'eleitores': total_eleitores,
-            'masculino': total_masculino,
-            'feminino': total_feminino,
-            'candidatos_2024': len(candidatos_2024),
-            'candidatos_2022': len(candidatos_2022),
-            'candidatos_2020': len(candidatos_2020),
-            'coligacoes_2024': len(coligacoes_2024),
-            'coligacoes_2022': len(coligacoes_2022),
-            'coligacoes_2020': len(coligacoes_2020)
-        }
+    # Salvar conjuntos completos em NDJSON particionado por conjunto e ano
+    saida = EscritorParticionado(args.saida, comprimir=args.comprimir)
+    with metricas.etapa('ndjson'):
+        for (dataset, ano), dados in resultados.items():
+            particao = saida.escrever(dataset, ano, dados)
+            avancar(0, particao['linhas'])
+            print(f"  {particao['arquivo']}: {particao['linhas']} linhas, {particao['bytes']:,} bytes")
+    totais = {
+        'eleitores': total_eleitores,
+        'masculino': total_masculino,
+        'feminino': total_feminino,
+        'candidatos_2024': len(candidatos_2024),
+        'candidatos_2022': len(candidatos_2022),
+        'candidatos_2020': len(candidatos_2020),
+        'coligacoes_2024': len(coligacoes_2024),
+        'coligacoes_2022': len(coligacoes_2022),
+        'coligacoes_2020': len(coligacoes_2020)
     }
+    indice = saida.gravar_indice(totais=totais)
     
-    with open('/home/ubuntu/tse-data/dados_processados_ro.json', 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"\nDados salvos em: {args.saida} (índice: {indice})")
+    gravar_resumo(args.resumo, resultados, totais)
     
-    print(f"\nDados salvos em: /home/ubuntu/tse-data/dados_processados_ro.json")
+    if args.dump:
+        print("\nGerando dump SQL...")
+        with metricas.etapa('dump'):
+            gravar_dump(args.dump, resultados, args.max_bytes)
     
-    return output
+    return saida.particoes
+
+def main():
+    args = parse_args()
+    with Metricas(args.metricas) as metricas:
+        particoes = importar(args, metricas)
+    print(f"Métricas por etapa: {args.metricas}")
+    return particoes
 
 if __name__ == "__main__":
     main()
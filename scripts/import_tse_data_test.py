@@ -0,0 +1,83 @@
+"""
+Testes das saídas de import_tse_data
+"""
+
+import json
+import os
+import re
+import sqlite3
+
+import pytest
+
+from import_tse_data import ANOS, COLUNAS_DUMP, generate_sql_insert, gravar_dump, gravar_resumo
+
+SCHEMA_TS = os.path.join(os.path.dirname(__file__), '..', 'drizzle', 'schema.ts')
+
+
+def _colunas_schema(tabela):
+    """Colunas de uma tabela em drizzle/schema.ts"""
+    with open(SCHEMA_TS, encoding='utf-8') as f:
+        texto = f.read()
+    corpo = re.search(rf'mysqlTable\("{tabela}", \{{(.*?)\n\}}', texto, re.S).group(1)
+    return re.findall(r'^\s+\w+: \w+\("(\w+)"', corpo, re.M)
+
+
+def _resultados():
+    resultados = {('eleitorado', 2024): []}
+    for ano in ANOS:
+        resultados[('candidatos', ano)] = [{
+            'ano_eleicao': ano, 'turno': 1, 'uf': 'RO', 'municipio': 'PORTO VELHO', 'cargo': 'VEREADOR',
+            'numero': 10_000 + i, 'nome': f"CANDIDATA D'ÁVILA {i}", 'partido_sigla': 'PT',
+        } for i in range(3)]
+        resultados[('coligacoes', ano)] = [{
+            'ano_eleicao': ano, 'uf': 'RO', 'municipio': 'CACOAL', 'cargo': 'PREFEITO', 'sequencial': '2200',
+            'nome': 'FEDERAÇÃO', 'composicao': 'PT / PV',
+        }]
+    return resultados
+
+
+def test_resumo_no_formato_antigo(tmp_path):
+    resultados = {('eleitorado', 2024): [{'municipio': 'PORTO VELHO', 'zona': 2, 'total_eleitores': 10}]}
+    for ano in ANOS:
+        resultados[('candidatos', ano)] = [{'nome': f"C{i}"} for i in range(150)]
+        resultados[('coligacoes', ano)] = [{'nome': 'FEDERAÇÃO'}]
+    caminho = str(tmp_path / 'dados_processados_ro.json')
+    gravar_resumo(caminho, resultados, {'eleitores': 10, 'candidatos_2024': 150})
+
+    with open(caminho, encoding='utf-8') as f:
+        resumo = json.load(f)
+    # Chaves lidas por populate_demo_data.mjs
+    assert resumo['eleitorado'] == resultados[('eleitorado', 2024)]
+    assert resumo['totais'] == {'eleitores': 10, 'candidatos_2024': 150}
+    assert len(resumo['candidatos_2024']) == 100 and resumo['candidatos_2024'][0] == {'nome': 'C0'}
+    assert resumo['coligacoes_2020'] == [{'nome': 'FEDERAÇÃO'}]
+
+
+def test_dump_nas_tabelas_do_schema(tmp_path):
+    for tabela, colunas in COLUNAS_DUMP.items():
+        assert {coluna for coluna, _, _ in colunas} <= set(_colunas_schema(tabela))
+
+    caminho = str(tmp_path / 'dados_ro.sql')
+    gravar_dump(caminho, _resultados())
+    with open(caminho, encoding='utf-8') as f:
+        script = f.read()
+    assert 'CREATE TABLE' not in script
+    conn = sqlite3.connect(':memory:')
+    for tabela in COLUNAS_DUMP:
+        conn.execute(f"CREATE TABLE {tabela} ({', '.join(_colunas_schema(tabela))})")
+    conn.execute("INSERT INTO candidatos_tse (anoEleicao, sgUf, nmCandidato) VALUES (2024, 'RO', 'ANTIGA')")
+    # Carregado duas vezes: o DELETE do início de cada tabela evita linhas duplicadas
+    for _ in range(2):
+        conn.executescript(script.replace('SET NAMES utf8mb4;', ''))
+    assert conn.execute("SELECT COUNT(*), MIN(nmCandidato) FROM candidatos_tse WHERE anoEleicao = 2024").fetchone() == (
+        3, "CANDIDATA D'ÁVILA 0"
+    )
+    assert conn.execute("SELECT COUNT(*) FROM coligacoes_tse").fetchone()[0] == len(ANOS)
+    assert conn.execute("SELECT dsComposicaoColigacao FROM coligacoes_tse LIMIT 1").fetchone()[0] == 'PT / PV'
+
+
+def test_generate_sql_insert_tabela_sem_esquema():
+    comandos = list(generate_sql_insert('candidatos_tse', _resultados()[('candidatos', 2024)]))
+    assert len(comandos) == 1 and comandos[0].startswith('INSERT INTO candidatos_tse (anoEleicao, nmTipoEleicao,')
+    with pytest.raises(ValueError, match='tse_candidatos_ro'):
+        generate_sql_insert('tse_candidatos_ro', [])
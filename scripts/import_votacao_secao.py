@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Script para importar a votação por seção do TSE (votacao_secao) no banco de dados DTE
+Preenche resultados_eleitorais e votos_nulos_brancos em uma única passada pelo arquivo
+"""
+
+import argparse
+import os
+import re
+
+from seed_database import DATA_DIR, get_connection
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_metricas import Metricas, publicar_importacao
+from tse_votacao import NIVEIS, TAMANHO_LOTE, importar_votacao
+from tse_zip import existe, membros, tamanho
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "import_votacao_secao.json")
+
+
+def registrar_importacao(conn, filepath):
+    """Cria o registro em `importacoes` da carga (tipo 'resultados') e retorna o id"""
+    ano = re.search(r'_(\d{4})_', os.path.basename(filepath))
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO importacoes (nomeArquivo, tipoArquivo, tipoDataset, anoReferencia, status) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        (os.path.basename(filepath), 'csv', 'resultados', int(ano.group(1)) if ano else None, 'processando')
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Importa votacao_secao do TSE para o banco de dados DTE")
+    parser.add_argument('arquivo', nargs='?', default=os.path.join(DATA_DIR, "votacao_secao_2024_RO.csv"),
+                        help="Arquivo votacao_secao_<ano>_<UF>.csv ou .zip do TSE (lido sem extração)")
+    parser.add_argument('--uf', default='RO', help="UF do membro lido quando o arquivo é um .zip")
+    parser.add_argument('--ano', type=int, default=None, help="Ano do membro lido quando o arquivo é um .zip")
+    parser.add_argument('--nivel', choices=NIVEIS, default='zona',
+                        help="Nível dos votos gravados: secao (com bairro da seção), zona ou municipio")
+    parser.add_argument('--leitura', type=int, default=TAMANHO_LOTE, help="Linhas do arquivo lidas por lote")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--transacao', type=int, default=50_000, help="Linhas por transação (commit)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Diretório do cache colunar binário (ex.: /home/ubuntu/tse-data/cache)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Grava os votos de um lote enquanto os seguintes são lidos e agregados")
+    parser.add_argument('--importacao', type=int, default=None,
+                        help="Id do registro em importacoes que recebe o progresso (padrão: cria um novo)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo, linhas/s, bytes lidos e pico de memória por etapa")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("IMPORTAÇÃO DA VOTAÇÃO POR SEÇÃO (TSE)")
+    print("=" * 60)
+
+    if not existe(args.arquivo):
+        print(f"Arquivo não encontrado: {args.arquivo}")
+        return
+    if args.arquivo.lower().endswith('.zip'):
+        encontrados = membros(args.arquivo, args.uf, args.ano)
+        if len(encontrados) != 1:
+            print(f"O .zip deve ter exatamente um membro de {args.uf}"
+                  f"{f' em {args.ano}' if args.ano else ''} (encontrados: {len(encontrados)}); use --uf/--ano")
+            for membro in encontrados:
+                print(f"  {membro}")
+            return
+        args.arquivo = encontrados[0]
+    print(f"\nArquivo de origem: {args.arquivo} ({tamanho(args.arquivo) / 1e6:,.1f} MB)")
+    print(f"Nível: {args.nivel}")
+
+    print("\nConectando ao banco de dados...")
+    conn = get_connection(allow_local_infile=(args.modo_carga == 'load_data'))
+    if not conn:
+        print("Falha na conexão. Verifique as credenciais.")
+        return
+
+    carga = CarregadorBulk(
+        conn, modo=args.modo_carga, tamanho_lote=args.lote,
+        linhas_por_transacao=args.transacao, max_bytes=args.max_bytes
+    )
+    # Progresso em conexão própria: os commits dele não interferem nas transações da carga
+    conn_progresso = get_connection()
+    publicar = None
+    if conn_progresso:
+        importacao_id = args.importacao or registrar_importacao(conn_progresso, args.arquivo)
+        publicar = publicar_importacao(conn_progresso, importacao_id)
+    try:
+        with Metricas(args.metricas, publicar) as metricas:
+            with metricas.etapa(f"votacao_{args.nivel}", arquivo=args.arquivo):
+                stats = importar_votacao(conn, carga, args.arquivo, args.nivel, args.leitura, args.cache,
+                                         pipeline=args.pipeline)
+    except Exception as e:
+        print(f"Erro durante a importação: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+        if conn_progresso:
+            conn_progresso.close()
+
+    print("\n" + "=" * 60)
+    print("RESUMO")
+    print("=" * 60)
+    print(f"Linhas lidas: {stats['linhas']:,} em {stats['segundos']:.1f}s "
+          f"({stats['linhas_por_segundo']:,.0f} linhas/s)")
+    print(f"Votos: {stats['votos']:,}")
+    print(f"resultados_eleitorais: {stats['resultados']:,} linhas")
+    print(f"votos_nulos_brancos: {stats['nulos_brancos']:,} linhas")
+    print(f"Cadastrados: {stats['candidatos_cadastrados']} candidatos, "
+          f"{stats['zonas_cadastradas']} zonas, {stats['secoes_cadastradas']} seções")
+    if stats['municipios_ignorados']:
+        print(f"Municípios não cadastrados (ignorados): {', '.join(stats['municipios_ignorados'])} "
+              f"({stats['votos_ignorados']:,} votos)")
+    print(f"Métricas: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
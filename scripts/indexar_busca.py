@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para gerar o índice de busca de candidatos (tabelas candidatos_busca e candidatos_busca_termos)
+a partir dos arquivos consulta_cand do TSE; só as partições (ano, UF) alteradas são regravadas
+"""
+
+import argparse
+import glob
+import os
+
+from import_tse_data import ANOS, arquivo_tarefa, process_candidatos_ro
+from seed_database import DATA_DIR, get_connection
+from tse_busca import atualizar_busca
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_manifesto import Manifesto
+from tse_metricas import Metricas
+
+MANIFESTO_PADRAO = os.path.join(DATA_DIR, "manifesto_busca.json")
+
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "indexar_busca.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera o índice de busca de candidatos")
+    parser.add_argument('--anos', type=int, nargs='+', default=list(ANOS), help="Anos dos arquivos consulta_cand")
+    parser.add_argument('--zip', metavar='ARQUIVO', nargs='+', default=None,
+                        help="Arquivos .zip do TSE lidos sem extração (padrão: os .zip de DATA_DIR)")
+    parser.add_argument('--cache', metavar='DIR', default=None, help="Diretório do cache colunar binário")
+    parser.add_argument('--manifesto', default=MANIFESTO_PADRAO,
+                        help="Arquivo do manifesto (partições já indexadas não são regravadas)")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo e linhas/s por etapa")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("ÍNDICE DE BUSCA DE CANDIDATOS")
+    print("=" * 60)
+
+    print("\nConectando ao banco de dados...")
+    conn = get_connection(allow_local_infile=(args.modo_carga == 'load_data'))
+    if not conn:
+        print("Falha na conexão. Verifique as credenciais.")
+        return
+
+    zips = args.zip if args.zip is not None else sorted(glob.glob(os.path.join(DATA_DIR, '*.zip')))
+    manifesto = Manifesto(args.manifesto)
+    carga = CarregadorBulk(conn, modo=args.modo_carga, tamanho_lote=args.lote, max_bytes=args.max_bytes)
+    try:
+        with Metricas(args.metricas) as metricas:
+            for ano in args.anos:
+                filepath = arquivo_tarefa(('candidatos', ano), zips)
+                with metricas.etapa(f"busca_{ano}"):
+                    registros = process_candidatos_ro(ano, args.cache, filepath)
+                    metricas.avancar(len(registros))
+                    resultado = atualizar_busca(conn, carga, filepath, registros, manifesto)
+                if not resultado:
+                    continue
+                situacao = "atualizada" if resultado['atualizada'] else "sem alterações"
+                print(f"  {resultado['particao']}: {resultado['documentos']:,} candidatos, "
+                      f"{resultado['termos']:,} termos ({situacao})")
+    except Exception as e:
+        print(f"Erro durante a indexação: {e}")
+        conn.rollback()
+        return
+    finally:
+        conn.close()
+
+    print(f"\nManifesto: {args.manifesto}")
+    print(f"Métricas: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
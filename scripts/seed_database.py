@@ -3,12 +3,26 @@
 Script para popular o banco de dados DTE com dados do TSE de Rondônia
 """
 
-import csv
+import argparse
+import functools
+import glob
 import json
 import os
-import mysql.connector
 from datetime import datetime
 
+from tse_agregacao import AgregadorEleitorado, agregar_perfil
+from tse_categorias import relatar_desconhecidos
+from tse_carga import MAX_BYTES_PADRAO, MODOS_CARGA, CarregadorBulk
+from tse_cubo import atualizar_cubo, celulas_cubo, cubo_cobre_ano, expandir, invalidar_ano
+from tse_dimensoes import Dimensoes
+from tse_escritores import EscritorParalelo, PoolConexoes
+from tse_esquemas import PERFIL_ELEITORADO
+from tse_manifesto import Manifesto, resumo_registros
+from tse_metricas import Metricas, avancar, publicar_importacao
+from tse_pipeline import Pipeline
+from tse_ufs import UFS
+from tse_zip import existe, localizar
+
 # Configuração do banco de dados
 DB_CONFIG = {
     'host': 'gateway01.us-west-2.prod.aws.tidbcloud.com',
@@ -21,202 +35,275 @@ DB_CONFIG = {
 }
 
 DATA_DIR = "/home/ubuntu/tse-data"
+MANIFESTO_PADRAO = os.path.join(DATA_DIR, "manifesto_importacao.json")
+METRICAS_PADRAO = os.path.join(DATA_DIR, "metricas", "seed_database.json")
+
+# Ano e UF de referência dos arquivos importados
+ANO_ELEICAO = 2024
+UF = 'RO'
+
+# Etapas da carga, na ordem de execução (checkpoint por etapa no manifesto)
+ETAPAS = ('municipios', 'zonas', 'partidos', 'eleitorado', 'cubo')
 
-def read_csv_latin1(filepath, delimiter=';'):
-    """Lê arquivo CSV com encoding Latin-1"""
-    data = []
-    with open(filepath, 'r', encoding='latin-1') as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
-        for row in reader:
-            clean_row = {k.strip('"'): v.strip('"') if isinstance(v, str) else v for k, v in row.items()}
-            data.append(clean_row)
-    return data
+# Etapas que leem o arquivo do perfil (bytes lidos e ETA pela estimativa de linhas)
+ETAPAS_LEITURA = ('municipios', 'zonas', 'eleitorado', 'cubo')
 
-def get_connection():
+# Linhas lidas por lote nas etapas que só extraem municípios e zonas
+LOTE_LEITURA = 100_000
+
+# Colunas da tabela `eleitorado` preenchidas pela carga agregada
+COLUNAS_ELEITORADO = (
+    'anoEleicao', 'municipioId', 'zonaId', 'totalEleitores',
+    'eleitoresMasculino', 'eleitoresFeminino', 'eleitoresOutros',
+    'faixa16a17', 'faixa18a24', 'faixa25a34', 'faixa35a44', 'faixa45a59', 'faixa60a69', 'faixa70mais',
+    'escolaridadeAnalfabeto', 'escolaridadeFundamental', 'escolaridadeMedio', 'escolaridadeSuperior'
+)
+
+def get_connection(**opcoes):
     """Conecta ao banco de dados"""
+    # Importado aqui para que as funções de carga funcionem com outras conexões (ex.: sqlite3)
+    import mysql.connector
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = mysql.connector.connect(**DB_CONFIG, **opcoes)
         return conn
     except Exception as e:
         print(f"Erro ao conectar: {e}")
         return None
 
-def insert_municipios(conn, data):
-    """Insere municípios de Rondônia"""
-    cursor = conn.cursor()
+def insert_municipios(conn, filepath, carga, cache_dir=None, dimensoes=None):
+    """Insere os municípios do arquivo, na UF das dimensões (padrão: Rondônia)"""
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
     
     # Primeiro, criar a região RO se não existir
-    cursor.execute("""
-        INSERT IGNORE INTO regioes (nome, codigo, uf) 
-        VALUES ('Rondônia', 'RO', 'RO')
-    """)
-    cursor.execute("SELECT id FROM regioes WHERE uf = 'RO' LIMIT 1")
-    regiao_id = cursor.fetchone()[0]
+    uf = dimensoes.uf
+    dimensoes.regioes.inserir_faltantes(('nome', 'codigo', 'uf'), {uf: (UFS[uf], uf, uf)})
+    regiao_id = dimensoes.regioes[uf]
     
     # Extrair municípios únicos
     municipios = {}
-    for row in data:
-        cod = row.get('CD_MUNICIPIO', '')
-        nome = row.get('NM_MUNICIPIO', '')
-        if cod and nome and cod not in municipios:
-            municipios[cod] = nome
+    for lote in PERFIL_ELEITORADO.ler_lotes(filepath, 'municipios', LOTE_LEITURA, cache_dir):
+        for cod, nome in lote:
+            if cod and nome and cod not in municipios:
+                municipios[cod] = nome
+        avancar(len(lote))
     
-    # Inserir municípios
-    for cod, nome in municipios.items():
-        cursor.execute("""
-            INSERT IGNORE INTO municipios (nome, codigo, codigoTse, regiaoId, uf)
-            VALUES (%s, %s, %s, %s, 'RO')
-        """, (nome, cod, cod, regiao_id))
+    # Inserir apenas municípios novos (a tabela não tem chave única por código)
+    inseridos = dimensoes.municipios.inserir_faltantes(
+        ('nome', 'codigo', 'codigoTse', 'regiaoId', 'uf'),
+        {cod: (nome, cod, cod, regiao_id, uf) for cod, nome in municipios.items()}
+    )
     
-    conn.commit()
-    print(f"Inseridos {len(municipios)} municípios")
+    print(f"Inseridos {inseridos} municípios ({len(municipios) - inseridos} já existentes)")
     return municipios
 
-def insert_zonas(conn, data):
+def insert_zonas(conn, filepath, carga, cache_dir=None, dimensoes=None):
     """Insere zonas eleitorais"""
-    cursor = conn.cursor()
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
     
     # Extrair zonas únicas por município
     zonas = {}
-    for row in data:
-        zona = row.get('NR_ZONA', '')
-        mun_cod = row.get('CD_MUNICIPIO', '')
-        if zona and mun_cod:
-            key = f"{mun_cod}_{zona}"
-            if key not in zonas:
-                zonas[key] = {'numero': int(zona), 'municipio_cod': mun_cod}
-    
-    # Buscar IDs dos municípios
-    cursor.execute("SELECT id, codigo FROM municipios WHERE uf = 'RO'")
-    mun_map = {row[1]: row[0] for row in cursor.fetchall()}
+    for lote in PERFIL_ELEITORADO.ler_lotes(filepath, 'zonas', LOTE_LEITURA, cache_dir):
+        for zona, mun_cod in lote:
+            if zona and mun_cod:
+                zonas.setdefault((zona, mun_cod))
+        avancar(len(lote))
     
-    # Inserir zonas
-    inserted = 0
-    for key, z in zonas.items():
-        mun_id = mun_map.get(z['municipio_cod'])
+    # Inserir apenas zonas novas
+    novas = {}
+    for zona, mun_cod in zonas:
+        mun_id = dimensoes.municipios.get(mun_cod)
         if mun_id:
-            cursor.execute("""
-                INSERT IGNORE INTO zonas_eleitorais (numero, municipioId)
-                VALUES (%s, %s)
-            """, (z['numero'], mun_id))
-            inserted += 1
+            novas[(zona, mun_id)] = (zona, mun_id)
+    inserted = dimensoes.zonas.inserir_faltantes(('numero', 'municipioId'), novas)
     
-    conn.commit()
     print(f"Inseridas {inserted} zonas eleitorais")
 
-def insert_eleitorado(conn, data):
-    """Insere dados do eleitorado agregados por zona"""
-    cursor = conn.cursor()
+def ler_perfil_em_pipeline(conn, filepath, carga, cache_dir=None, dimensoes=None, capacidade=2):
+    """
+    Lê o perfil uma única vez em pipeline: leitura, agregação e gravação de municípios e zonas
+    ligadas por filas limitadas (tse_pipeline). Os municípios e zonas novos de um lote são gravados
+    enquanto os lotes seguintes são lidos e agregados. Retorna o AgregadorEleitorado completo.
+    """
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
+    uf = dimensoes.uf
+    dimensoes.regioes.inserir_faltantes(('nome', 'codigo', 'uf'), {uf: (UFS[uf], uf, uf)})
+    regiao_id = dimensoes.regioes[uf]
+    agregador = AgregadorEleitorado()
+    inseridos = {'municipios': 0, 'zonas': 0}
     
-    # Buscar mapeamentos
-    cursor.execute("SELECT id, codigo FROM municipios WHERE uf = 'RO'")
-    mun_map = {row[1]: row[0] for row in cursor.fetchall()}
+    def agregar(lote):
+        # Grupos (município, zona) novos no lote, sem percorrer as linhas de novo
+        antes = len(agregador.grupos)
+        agregador.adicionar(lote)
+        avancar(len(lote))
+        municipios, zonas = {}, []
+        for chave in agregador.grupos.valores[antes:]:
+            cod = agregador.municipios.valores[chave >> 20]
+            zona = agregador.zonas.valores[chave & 0xFFFFF]
+            nome = agregador.nome_municipio[chave >> 20]
+            if cod and nome:
+                municipios[cod] = nome
+            if cod and zona:
+                zonas.append((zona, cod))
+        return (municipios, zonas) if municipios or zonas else None
     
-    cursor.execute("SELECT id, numero, municipioId FROM zonas_eleitorais")
-    zona_map = {(row[1], row[2]): row[0] for row in cursor.fetchall()}
+    def gravar(novos):
+        municipios, zonas = novos
+        inseridos['municipios'] += dimensoes.municipios.inserir_faltantes(
+            ('nome', 'codigo', 'codigoTse', 'regiaoId', 'uf'),
+            {cod: (nome, cod, cod, regiao_id, uf) for cod, nome in municipios.items()}
+        )
+        novas = {}
+        for zona, cod in zonas:
+            mun_id = dimensoes.municipios.get(cod)
+            if mun_id:
+                novas[(zona, mun_id)] = (zona, mun_id)
+        inseridos['zonas'] += dimensoes.zonas.inserir_faltantes(('numero', 'municipioId'), novas)
+    
+    pipeline = Pipeline(capacidade)
+    pipeline.executar(PERFIL_ELEITORADO.ler_lotes(filepath, 'agregacao', LOTE_LEITURA, cache_dir),
+                      ('agregacao', agregar), ('gravacao', gravar))
+    print(f"Inseridos {inseridos['municipios']} municípios e {inseridos['zonas']} zonas eleitorais "
+          f"({agregador.total_registros} registros lidos)")
+    print(f"Pipeline: {pipeline.resumo()}")
+    return agregador
+
+def remover_eleitorado(cursor, placeholder, ano, municipio_ids):
+    """Remove os agregados por zona (sem bairro/seção) dos municípios informados"""
+    if not municipio_ids:
+        return 0
+    cursor.execute(
+        f"DELETE FROM eleitorado WHERE anoEleicao = {placeholder} AND bairroId IS NULL AND secaoId IS NULL "
+        f"AND municipioId IN ({', '.join([placeholder] * len(municipio_ids))})",
+        [ano, *municipio_ids]
+    )
+    return cursor.rowcount
+
+def insert_eleitorado(conn, filepath, carga, manifesto=None, cache_dir=None, agregador=None, escritor=None,
+                      dimensoes=None):
+    """
+    Insere dados do eleitorado agregados por zona.
+    Só recarrega os municípios cujos totais mudaram desde a última carga registrada
+    no manifesto (DELETE + INSERT por município) e retoma do último lote confirmado.
+    Com `escritor` (EscritorParalelo), cada município é uma transação gravada em paralelo.
+    """
+    cursor = conn.cursor()
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
+    mun_map, zona_map = dimensoes.municipios, dimensoes.zonas
     
     # Agregar dados por zona
-    zonas_data = {}
-    for row in data:
-        mun_cod = row.get('CD_MUNICIPIO', '')
-        zona_num = int(row.get('NR_ZONA', 0) or 0)
-        mun_id = mun_map.get(mun_cod)
-        
+    agregador = agregador or agregar_perfil(filepath, cache_dir=cache_dir)
+    registros, total_registros = agregador.resultado(), agregador.total_registros
+    relatar_desconhecidos()
+    print(f"Total de registros: {total_registros}")
+    
+    # Delta por município em relação ao estado já carregado
+    por_municipio = {}
+    for z in registros:
+        por_municipio.setdefault(z['codigo_municipio'], []).append(z)
+    resumos = {cod: resumo_registros(regs) for cod, regs in por_municipio.items()}
+    anterior = manifesto.estado(filepath, 'eleitorado') if manifesto else {}
+    alterados = sorted(cod for cod, resumo in resumos.items() if anterior.get(cod) != resumo)
+    removidos = sorted(set(anterior) - set(resumos))
+    
+    linhas_por_municipio = {}
+    for cod in alterados:
+        mun_id = mun_map.get(cod)
         if not mun_id:
             continue
-            
-        zona_id = zona_map.get((zona_num, mun_id))
-        key = f"{mun_id}_{zona_num}"
-        
-        if key not in zonas_data:
-            zonas_data[key] = {
-                'municipioId': mun_id,
-                'zonaId': zona_id,
-                'totalEleitores': 0,
-                'masculino': 0,
-                'feminino': 0,
-                'outros': 0,
-                'faixa16a17': 0,
-                'faixa18a24': 0,
-                'faixa25a34': 0,
-                'faixa35a44': 0,
-                'faixa45a59': 0,
-                'faixa60a69': 0,
-                'faixa70mais': 0,
-                'analfabeto': 0,
-                'fundamental': 0,
-                'medio': 0,
-                'superior': 0
-            }
-        
-        qt = int(row.get('QT_ELEITORES_PERFIL', 0) or 0)
-        zonas_data[key]['totalEleitores'] += qt
-        
-        # Gênero
-        genero = row.get('DS_GENERO', '').upper()
-        if 'MASCULINO' in genero:
-            zonas_data[key]['masculino'] += qt
-        elif 'FEMININO' in genero:
-            zonas_data[key]['feminino'] += qt
+        linhas_por_municipio[mun_id] = [
+            (ANO_ELEICAO, mun_id, zona_map.get((z['zona'], mun_id)))
+            + tuple(z[c] for c in COLUNAS_ELEITORADO[3:])
+            for z in por_municipio[cod]
+        ]
+    
+    if escritor:
+        # Partições idempotentes: repetir ou retomar a etapa não duplica linhas, dispensando o checkpoint
+        particoes = {mun_map[cod]: [] for cod in removidos if cod in mun_map}
+        particoes.update(linhas_por_municipio)
+        inserted = escritor.gravar(
+            'eleitorado', COLUNAS_ELEITORADO, particoes,
+            limpar=lambda c, p, mun_id: remover_eleitorado(c, p, ANO_ELEICAO, [mun_id])
+        )
+        confirmadas = 0
+    else:
+        etapa = manifesto.etapa(filepath, 'eleitorado') if manifesto else {}
+        confirmadas = etapa.get('linhas_confirmadas', 0) if etapa.get('removidos') else 0
+        if etapa.get('removidos'):
+            print(f"Retomando após {confirmadas} linhas já confirmadas")
         else:
-            zonas_data[key]['outros'] += qt
+            ids = [mun_map[cod] for cod in alterados + removidos if cod in mun_map]
+            apagados = remover_eleitorado(cursor, carga.placeholder, ANO_ELEICAO, ids)
+            conn.commit()
+            print(f"Removidos {apagados} registros de {len(ids)} municípios alterados")
+            if manifesto:
+                manifesto.atualizar_etapa(filepath, 'eleitorado', status='processando',
+                                          removidos=True, linhas_confirmadas=0)
         
-        # Faixa etária
-        faixa = row.get('DS_FAIXA_ETARIA', '')
-        if '16' in faixa or '17' in faixa:
-            zonas_data[key]['faixa16a17'] += qt
-        elif '18' in faixa or '19' in faixa or '20' in faixa or '21' in faixa or '22' in faixa or '23' in faixa or '24' in faixa:
-            zonas_data[key]['faixa18a24'] += qt
-        elif '25' in faixa or '26' in faixa or '27' in faixa or '28' in faixa or '29' in faixa or '30' in faixa or '31' in faixa or '32' in faixa or '33' in faixa or '34' in faixa:
-            zonas_data[key]['faixa25a34'] += qt
-        elif '35' in faixa or '36' in faixa or '37' in faixa or '38' in faixa or '39' in faixa or '40' in faixa or '41' in faixa or '42' in faixa or '43' in faixa or '44' in faixa:
-            zonas_data[key]['faixa35a44'] += qt
-        elif '45' in faixa or '46' in faixa or '47' in faixa or '48' in faixa or '49' in faixa or '50' in faixa or '51' in faixa or '52' in faixa or '53' in faixa or '54' in faixa or '55' in faixa or '56' in faixa or '57' in faixa or '58' in faixa or '59' in faixa:
-            zonas_data[key]['faixa45a59'] += qt
-        elif '60' in faixa or '61' in faixa or '62' in faixa or '63' in faixa or '64' in faixa or '65' in faixa or '66' in faixa or '67' in faixa or '68' in faixa or '69' in faixa:
-            zonas_data[key]['faixa60a69'] += qt
-        elif '70' in faixa or '71' in faixa or '72' in faixa or '73' in faixa or '74' in faixa or '75' in faixa or '76' in faixa or '77' in faixa or '78' in faixa or '79' in faixa or '80' in faixa or '81' in faixa or '82' in faixa or '83' in faixa or '84' in faixa or '85' in faixa or '86' in faixa or '87' in faixa or '88' in faixa or '89' in faixa or '90' in faixa or '100' in faixa:
-            zonas_data[key]['faixa70mais'] += qt
+        def checkpoint(total):
+            manifesto.atualizar_etapa(filepath, 'eleitorado', linhas_confirmadas=confirmadas + total)
         
-        # Escolaridade
-        escol = row.get('DS_GRAU_ESCOLARIDADE', '').upper()
-        if 'ANALFABETO' in escol or 'LÊ E ESCREVE' in escol:
-            zonas_data[key]['analfabeto'] += qt
-        elif 'FUNDAMENTAL' in escol:
-            zonas_data[key]['fundamental'] += qt
-        elif 'MÉDIO' in escol or 'MEDIO' in escol:
-            zonas_data[key]['medio'] += qt
-        elif 'SUPERIOR' in escol:
-            zonas_data[key]['superior'] += qt
+        linhas = [linha for linhas in linhas_por_municipio.values() for linha in linhas]
+        inserted = carga.inserir('eleitorado', COLUNAS_ELEITORADO, linhas[confirmadas:],
+                                 ao_confirmar=checkpoint if manifesto else None)
+    if manifesto:
+        manifesto.definir_estado(filepath, 'eleitorado', resumos)
+    print(f"Inseridos {inserted} registros de eleitorado "
+          f"({len(alterados)} municípios alterados, {len(removidos)} removidos)")
+    return confirmadas + inserted, total_registros
+
+def linhas_sem_municipio(conn, placeholder, ano):
+    """Se `eleitorado` tem linhas do ano sem município (as do upload por importacoes.processData)"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT 1 FROM eleitorado WHERE anoEleicao = {placeholder} AND municipioId IS NULL LIMIT 1",
+                   [ano])
+    encontrada = cursor.fetchone() is not None
+    cursor.close()
+    return encontrada
+
+def atualizar_cubo_eleitorado(conn, filepath, carga, agregador, manifesto=None, escritor=None, dimensoes=None,
+                              total_nacional=True):
+    """
+    Atualiza o cubo `eleitorado_cubo` do ano a partir das mesmas células da agregação.
+    Só os municípios cujas células mudaram desde a última carga são substituídos; se o cubo do ano
+    foi invalidado (upload pela API), todos são refeitos. Enquanto `eleitorado` tiver linhas do ano
+    sem município (vindas do upload), o cubo não as cobre: o ano fica sem cubo e a API usa o SUM.
+    """
+    if linhas_sem_municipio(conn, carga.placeholder, ANO_ELEICAO):
+        invalidar_ano(conn, carga.placeholder, ANO_ELEICAO)
+        print(f"Cubo de {ANO_ELEICAO} não gerado: há linhas de eleitorado sem município (upload pela API)")
+        return 0
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
+    mun_map, zona_map = dimensoes.municipios, dimensoes.zonas
+    celulas = celulas_cubo(agregador)
     
-    # Inserir dados
-    inserted = 0
-    for key, z in zonas_data.items():
-        cursor.execute("""
-            INSERT INTO eleitorado (
-                anoEleicao, municipioId, zonaId, totalEleitores,
-                eleitoresMasculino, eleitoresFeminino, eleitoresOutros,
-                faixa16a17, faixa18a24, faixa25a34, faixa35a44, faixa45a59, faixa60a69, faixa70mais,
-                escolaridadeAnalfabeto, escolaridadeFundamental, escolaridadeMedio, escolaridadeSuperior
-            ) VALUES (
-                2024, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """, (
-            z['municipioId'], z['zonaId'], z['totalEleitores'],
-            z['masculino'], z['feminino'], z['outros'],
-            z['faixa16a17'], z['faixa18a24'], z['faixa25a34'], z['faixa35a44'],
-            z['faixa45a59'], z['faixa60a69'], z['faixa70mais'],
-            z['analfabeto'], z['fundamental'], z['medio'], z['superior']
-        ))
-        inserted += 1
+    resumos = {cod: resumo_registros(c) for cod, c in celulas.items()}
+    anterior = {}
+    if manifesto and cubo_cobre_ano(conn, carga.placeholder, ANO_ELEICAO):
+        anterior = manifesto.estado(filepath, 'cubo')
+    alterados = sorted(cod for cod, resumo in resumos.items() if anterior.get(cod) != resumo)
+    removidos = sorted(set(anterior) - set(resumos))
     
-    conn.commit()
-    print(f"Inseridos {inserted} registros de eleitorado")
+    linhas = {}
+    for cod in alterados:
+        mun_id = mun_map.get(cod)
+        if not mun_id:
+            continue
+        linhas[mun_id] = expandir(ANO_ELEICAO, mun_id, [
+            (zona_map.get((zona, mun_id)), genero, faixa, escolaridade, qt)
+            for zona, genero, faixa, escolaridade, qt in celulas[cod]
+        ])
+    
+    inseridas = atualizar_cubo(conn, carga, ANO_ELEICAO, linhas,
+                               [mun_map[cod] for cod in removidos if cod in mun_map], escritor, total_nacional)
+    if manifesto:
+        manifesto.definir_estado(filepath, 'cubo', resumos)
+    print(f"Inseridas {inseridas} linhas no cubo "
+          f"({len(alterados)} municípios alterados, {len(removidos)} removidos)")
+    return inseridas
 
-def insert_partidos(conn):
+def insert_partidos(conn, carga, dimensoes=None):
     """Insere partidos políticos"""
-    cursor = conn.cursor()
-    
     partidos = [
         ('PT', 'Partido dos Trabalhadores', 13, '#FF0000'),
         ('PL', 'Partido Liberal', 22, '#0000FF'),
@@ -240,60 +327,176 @@ def insert_partidos(conn):
         ('AGIR', 'Agir', 36, '#9933FF'),
     ]
     
-    for sigla, nome, numero, cor in partidos:
-        cursor.execute("""
-            INSERT IGNORE INTO partidos (sigla, nome, numero, cor)
-            VALUES (%s, %s, %s, %s)
-        """, (sigla, nome, numero, cor))
+    dimensoes = dimensoes or Dimensoes(conn, carga, UF)
+    inseridos = dimensoes.partidos.inserir_faltantes(
+        ('numero', 'sigla', 'nome', 'cor'),
+        {str(numero): (numero, sigla, nome, cor) for sigla, nome, numero, cor in partidos}
+    )
     
+    print(f"Inseridos {inseridos} partidos")
+
+def registrar_importacao(conn, manifesto, filepath, status, **campos):
+    """Cria ou atualiza o registro em `importacoes` ligado ao arquivo do manifesto"""
+    cursor = conn.cursor()
+    registro = manifesto.arquivo(filepath)
+    campos['status'] = status
+    if registro.get('importacaoId') is None:
+        campos.update(nomeArquivo=os.path.basename(filepath), tipoArquivo='csv',
+                      tipoDataset='eleitorado', anoReferencia=ANO_ELEICAO)
+        cursor.execute(
+            f"INSERT INTO importacoes ({', '.join(campos)}) VALUES ({', '.join(['%s'] * len(campos))})",
+            list(campos.values())
+        )
+        registro['importacaoId'] = cursor.lastrowid
+        manifesto.salvar()
+    else:
+        cursor.execute(
+            f"UPDATE importacoes SET {', '.join(f'{c} = %s' for c in campos)} WHERE id = %s",
+            [*campos.values(), registro['importacaoId']]
+        )
     conn.commit()
-    print(f"Inseridos {len(partidos)} partidos")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Popula o banco de dados DTE com dados do TSE")
+    parser.add_argument('--modo-carga', choices=MODOS_CARGA, default='multi',
+                        help="multi (INSERT multi-linhas), executemany ou load_data (LOAD DATA LOCAL INFILE)")
+    parser.add_argument('--lote', type=int, default=1000, help="Linhas por comando INSERT")
+    parser.add_argument('--transacao', type=int, default=50_000, help="Linhas por transação (commit)")
+    parser.add_argument('--escritores', type=int, default=1,
+                        help="Conexões gravando eleitorado e cubo em paralelo, uma transação por município")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Lê o perfil uma vez, gravando municípios e zonas enquanto os lotes seguintes "
+                             "são lidos e agregados (filas limitadas entre as etapas)")
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_PADRAO,
+                        help="Tamanho máximo de cada comando em bytes (respeitar max_allowed_packet)")
+    parser.add_argument('--manifesto', default=MANIFESTO_PADRAO,
+                        help="Arquivo JSON com impressões digitais e checkpoints das importações")
+    parser.add_argument('--forcar', action='store_true',
+                        help="Reprocessa o arquivo mesmo que não tenha mudado desde a última carga")
+    parser.add_argument('--zip', metavar='ARQUIVO', nargs='+', default=None,
+                        help="Arquivos .zip do TSE lidos sem extração quando o CSV não está em DATA_DIR "
+                             "(padrão: os .zip de DATA_DIR)")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Diretório do cache colunar binário (ex.: /home/ubuntu/tse-data/cache)")
+    parser.add_argument('--metricas', metavar='ARQUIVO', default=METRICAS_PADRAO,
+                        help="Arquivo JSON com tempo, linhas/s, bytes lidos e pico de memória por etapa")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    
     print("=" * 60)
     print("POPULANDO BANCO DE DADOS DTE COM DADOS DO TSE")
     print("=" * 60)
     
-    # Ler dados do eleitorado
-    filepath = os.path.join(DATA_DIR, "perfil_eleitorado_2024_RO.csv")
+    # Ler dados do eleitorado (CSV extraído ou membro de um .zip do TSE)
+    nome = f"perfil_eleitorado_{ANO_ELEICAO}_{UF}.csv"
+    filepath = os.path.join(DATA_DIR, nome)
     if not os.path.exists(filepath):
+        zips = args.zip if args.zip is not None else sorted(glob.glob(os.path.join(DATA_DIR, '*.zip')))
+        filepath = localizar(nome, zips) or filepath
+    if not existe(filepath):
         print(f"Arquivo não encontrado: {filepath}")
         return
     
-    print(f"\nLendo {filepath}...")
-    data = read_csv_latin1(filepath)
-    print(f"Total de registros: {len(data)}")
+    print(f"\nArquivo de origem: {filepath}")
+    
+    manifesto = Manifesto(args.manifesto)
+    situacao, digital = manifesto.situacao(filepath)
+    if situacao == 'inalterado' and manifesto.concluido(filepath, ETAPAS) and not args.forcar:
+        print("Arquivo inalterado desde a última importação concluída. Nada a fazer (use --forcar).")
+        return
+    print(f"Situação do arquivo: {situacao}")
+    manifesto.iniciar(filepath, digital)
+    if args.forcar:
+        manifesto.reiniciar(filepath)
     
     # Conectar ao banco
     print("\nConectando ao banco de dados...")
-    conn = get_connection()
+    conn = get_connection(allow_local_infile=(args.modo_carga == 'load_data'))
     if not conn:
         print("Falha na conexão. Verifique as credenciais.")
         return
     
+    carga = CarregadorBulk(
+        conn, modo=args.modo_carga, tamanho_lote=args.lote,
+        linhas_por_transacao=args.transacao, max_bytes=args.max_bytes
+    )
+    
+    # Eleitorado e cubo particionados por município entre N conexões do pool
+    escritor = None
+    if args.escritores > 1:
+        pool = PoolConexoes(functools.partial(get_connection, allow_local_infile=(args.modo_carga == 'load_data')),
+                            args.escritores)
+        escritor = EscritorParalelo(pool, args.escritores, modo=args.modo_carga, tamanho_lote=args.lote,
+                                    max_bytes=args.max_bytes)
+    
+    # Ids de regiões, municípios, zonas e partidos lidos uma vez e compartilhados pelas etapas
+    dimensoes = Dimensoes(conn, carga, UF)
+    
+    # Agregação do perfil compartilhada pelas etapas de eleitorado e cubo (feita uma vez, se necessária)
+    agregador = functools.cache(lambda: agregar_perfil(filepath, cache_dir=args.cache))
+    if args.pipeline:
+        # Municípios e zonas gravados durante a única leitura, que também produz a agregação
+        agregador = functools.cache(lambda: ler_perfil_em_pipeline(conn, filepath, carga, args.cache, dimensoes))
+    
+    etapas = {
+        'municipios': ("Inserindo municípios", lambda: insert_municipios(conn, filepath, carga, args.cache, dimensoes)),
+        'zonas': ("Inserindo zonas eleitorais", lambda: insert_zonas(conn, filepath, carga, args.cache, dimensoes)),
+        'partidos': ("Inserindo partidos", lambda: insert_partidos(conn, carga, dimensoes)),
+        'eleitorado': ("Inserindo dados do eleitorado", lambda: insert_eleitorado(conn, filepath, carga, manifesto, args.cache, agregador(), escritor, dimensoes)),
+        'cubo': ("Atualizando cubo de agregados", lambda: atualizar_cubo_eleitorado(conn, filepath, carga, agregador(), manifesto, escritor, dimensoes)),
+    }
+    if args.pipeline:
+        etapas['municipios'] = ("Lendo o perfil em pipeline (municípios, zonas e agregação)", agregador)
+        etapas['zonas'] = ("Zonas eleitorais (gravadas na leitura em pipeline)", agregador)
+    
+    conn_progresso = None
     try:
-        # Inserir dados
-        print("\n[1/4] Inserindo municípios...")
-        insert_municipios(conn, data)
+        registrar_importacao(conn, manifesto, filepath, 'processando')
         
-        print("\n[2/4] Inserindo zonas eleitorais...")
-        insert_zonas(conn, data)
+        # Progresso em conexão própria: os commits dele não interferem nas transações da carga
+        conn_progresso = get_connection()
+        publicar = None
+        if conn_progresso:
+            publicar = publicar_importacao(conn_progresso, manifesto.arquivo(filepath)['importacaoId'])
         
-        print("\n[3/4] Inserindo partidos...")
-        insert_partidos(conn)
-        
-        print("\n[4/4] Inserindo dados do eleitorado...")
-        insert_eleitorado(conn, data)
+        with Metricas(args.metricas, publicar) as metricas:
+            for i, nome in enumerate(ETAPAS, 1):
+                descricao, executar = etapas[nome]
+                if manifesto.etapa(filepath, nome)['status'] == 'concluido':
+                    print(f"\n[{i}/{len(ETAPAS)}] {descricao}: já concluído, pulando")
+                    continue
+                print(f"\n[{i}/{len(ETAPAS)}] {descricao}...")
+                with metricas.etapa(nome, arquivo=filepath if nome in ETAPAS_LEITURA else None):
+                    resultado = executar()
+                manifesto.atualizar_etapa(filepath, nome, status='concluido',
+                                          concluidoEm=datetime.now().isoformat(timespec='seconds'))
+                if nome == 'eleitorado':
+                    importados, total = resultado
+                    registrar_importacao(conn, manifesto, filepath, 'processando',
+                                         totalRegistros=total, registrosImportados=importados)
+            
+            registrar_importacao(conn, manifesto, filepath, 'concluido')
         
         print("\n" + "=" * 60)
         print("IMPORTAÇÃO CONCLUÍDA COM SUCESSO!")
         print("=" * 60)
+        print(f"Métricas por etapa: {args.metricas}")
         
     except Exception as e:
         print(f"Erro durante a importação: {e}")
         conn.rollback()
+        try:
+            registrar_importacao(conn, manifesto, filepath, 'erro', mensagemErro=str(e))
+        except Exception as erro_registro:
+            print(f"Não foi possível registrar o erro em importacoes: {erro_registro}")
     finally:
         conn.close()
+        if escritor:
+            escritor.pool.fechar()
+        if conn_progresso:
+            conn_progresso.close()
 
 if __name__ == "__main__":
     main()
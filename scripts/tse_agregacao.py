@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Agregação colunar do perfil do eleitorado (perfil_eleitorado_*.csv)
+Codifica as colunas categóricas como inteiros e calcula todos os contadores
+da tabela `eleitorado` com uma única redução agrupada (NumPy)
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+from tse_categorias import (
+    classificar_escolaridade, classificar_faixa, classificar_genero, relatar_desconhecidos
+)
+from tse_cache import Dicionario, abrir_cache
+from tse_csv import ler_cabecalho
+from tse_esquemas import PERFIL_ELEITORADO
+from tse_metricas import avancar
+
+# Colunas lidas do arquivo, na ordem em que chegam a AgregadorEleitorado.adicionar
+COLUNAS_PERFIL = PERFIL_ELEITORADO.projecao('agregacao')
+
+# Contadores por município/zona (nomes das colunas da tabela `eleitorado`)
+CONTADORES = (
+    'totalEleitores', 'eleitoresMasculino', 'eleitoresFeminino', 'eleitoresOutros',
+    'faixa16a17', 'faixa18a24', 'faixa25a34', 'faixa35a44', 'faixa45a59', 'faixa60a69', 'faixa70mais',
+    'escolaridadeAnalfabeto', 'escolaridadeFundamental', 'escolaridadeMedio', 'escolaridadeSuperior',
+    'biometria', 'deficiencia'
+)
+INDICE_CONTADOR = {nome: i for i, nome in enumerate(CONTADORES)}
+
+
+def _coluna(lote, indice):
+    """Iterador sobre uma coluna de um lote de tuplas (sem transpor o lote inteiro)"""
+    return map(itemgetter(indice), lote)
+
+
+def _inteiros(lote, indice):
+    """Coluna inteira (já convertida na leitura) como int64"""
+    return np.fromiter(_coluna(lote, indice), np.int64, len(lote))
+
+
+class AgregadorEleitorado:
+    """
+    Acumula lotes do perfil do eleitorado em uma matriz grupo x combinação de categorias.
+
+    Cada grupo é um par (CD_MUNICIPIO, NR_ZONA); cada combinação é um trio
+    (gênero, faixa etária, escolaridade). A quantidade de eleitores é somada com
+    um único bincount por lote e, ao final, multiplicada pela matriz indicadora
+    combinação -> contador, produzindo todos os contadores de uma vez.
+    """
+
+    def __init__(self):
+        self.municipios = Dicionario()
+        self.zonas = Dicionario()
+        self.generos = Dicionario()
+        self.faixas = Dicionario()
+        self.escolaridades = Dicionario()
+        self.grupos = Dicionario()       # (cod municipio, cod zona)
+        self.combinacoes = Dicionario()  # (cod genero, cod faixa, cod escolaridade)
+        self.nome_municipio = {}
+        self.uf_municipio = {}
+        self.qt = np.zeros((0, 0), dtype=np.int64)
+        self.extras = np.zeros((0, 2), dtype=np.int64)  # biometria, deficiencia
+        self.total_registros = 0
+
+    def adicionar(self, lote):
+        """Soma um lote de tuplas tipadas (PERFIL_ELEITORADO.ler_lotes) na ordem de COLUNAS_PERFIL"""
+        if not lote:
+            return
+        n = len(lote)
+        mun = self.municipios.codificar(_coluna(lote, 1), n)
+        self._somar(
+            mun,
+            self.zonas.codificar(_coluna(lote, 3), n),
+            self.generos.codificar(_coluna(lote, 4), n),
+            self.faixas.codificar(_coluna(lote, 5), n),
+            self.escolaridades.codificar(_coluna(lote, 6), n),
+            _inteiros(lote, 7), _inteiros(lote, 8), _inteiros(lote, 9),
+            lambda i: (lote[i][0], lote[i][2]),
+        )
+
+    def adicionar_tabela(self, tabela, inicio=0, fim=None):
+        """
+        Soma as linhas [inicio, fim) de uma TabelaColunar (cache binário).
+        Os códigos do cache são traduzidos pelos dicionários, sem reler texto linha a linha.
+        """
+        fim = len(tabela) if fim is None else min(fim, len(tabela))
+        if fim <= inicio:
+            return
+        uf, cd_municipio, nm_municipio, nr_zona, genero, faixa, escolaridade, qt, biometria, deficiencia = COLUNAS_PERFIL
+
+        def codificar(dicionario, nome):
+            codigos, valores = tabela.codigos(nome, inicio, fim)
+            converter = PERFIL_ELEITORADO.conversor(nome)
+            if converter:
+                valores = list(map(converter, valores))
+            return dicionario.codificar(valores, len(valores))[codigos]
+
+        self._somar(
+            codificar(self.municipios, cd_municipio),
+            codificar(self.zonas, nr_zona),
+            codificar(self.generos, genero),
+            codificar(self.faixas, faixa),
+            codificar(self.escolaridades, escolaridade),
+            tabela.inteiros(qt, inicio, fim),
+            tabela.inteiros(biometria, inicio, fim),
+            tabela.inteiros(deficiencia, inicio, fim),
+            lambda i: (tabela.valor(uf, inicio + i), tabela.valor(nm_municipio, inicio + i)),
+        )
+
+    def _somar(self, mun, zona, genero, faixa, escolaridade, qt, biometria, deficiencia, uf_e_nome):
+        """Redução agrupada de um lote já codificado; `uf_e_nome(i)` dá UF e nome do município da linha i"""
+        self.total_registros += len(mun)
+        grupo = self._agrupar(self.grupos, mun, zona)
+        combinacao = self._agrupar(self.combinacoes, genero, faixa, escolaridade)
+
+        # Nome e UF do município: primeira ocorrência de cada código no lote
+        codigos, primeiros = np.unique(mun, return_index=True)
+        for cod, i in zip(codigos.tolist(), primeiros.tolist()):
+            if cod not in self.nome_municipio:
+                self.uf_municipio[cod], self.nome_municipio[cod] = uf_e_nome(i)
+
+        n_grupos, n_comb = len(self.grupos), len(self.combinacoes)
+        self._redimensionar(n_grupos, n_comb)
+
+        # Redução agrupada: uma célula por (grupo, combinação)
+        celula = grupo * n_comb + combinacao
+        self.qt += np.bincount(
+            celula, weights=qt, minlength=n_grupos * n_comb
+        ).astype(np.int64).reshape(n_grupos, n_comb)
+        self.extras[:, 0] += np.bincount(grupo, weights=biometria, minlength=n_grupos).astype(np.int64)
+        self.extras[:, 1] += np.bincount(grupo, weights=deficiencia, minlength=n_grupos).astype(np.int64)
+
+    def _agrupar(self, dicionario, *codigos):
+        """Codifica tuplas de códigos em um único código denso"""
+        chave = codigos[0]
+        for cod in codigos[1:]:
+            chave = (chave << 20) | cod
+        distintos = np.unique(chave)
+        tabela = dicionario.codificar(distintos.tolist(), len(distintos))
+        return tabela[np.searchsorted(distintos, chave)]
+
+    def _redimensionar(self, n_grupos, n_comb):
+        g, c = self.qt.shape
+        if (g, c) != (n_grupos, n_comb):
+            qt = np.zeros((n_grupos, n_comb), dtype=np.int64)
+            qt[:g, :c] = self.qt
+            self.qt = qt
+        if len(self.extras) != n_grupos:
+            extras = np.zeros((n_grupos, 2), dtype=np.int64)
+            extras[:len(self.extras)] = self.extras
+            self.extras = extras
+
+    def categorias(self):
+        """Categorias classificadas (gênero, faixa, escolaridade) de cada combinação; faixa e escolaridade podem ser None"""
+        categorias = []
+        for chave in self.combinacoes.valores:
+            escol = chave & 0xFFFFF
+            faixa = (chave >> 20) & 0xFFFFF
+            genero = chave >> 40
+            categorias.append((
+                classificar_genero(self.generos.valores[genero]),
+                classificar_faixa(self.faixas.valores[faixa]),
+                classificar_escolaridade(self.escolaridades.valores[escol]),
+            ))
+        return categorias
+
+    def matriz_indicadora(self):
+        """Matriz combinação x contador com 1 onde a combinação soma no contador"""
+        m = np.zeros((len(self.combinacoes), len(CONTADORES)), dtype=np.int64)
+        for i, (genero, faixa, escolaridade) in enumerate(self.categorias()):
+            m[i, INDICE_CONTADOR['totalEleitores']] = 1
+            m[i, INDICE_CONTADOR[genero]] = 1
+            if faixa:
+                m[i, INDICE_CONTADOR[faixa]] = 1
+            if escolaridade:
+                m[i, INDICE_CONTADOR[escolaridade]] = 1
+        return m
+
+    def totais(self):
+        """Matriz grupo x contador (na ordem de CONTADORES)"""
+        totais = self.qt @ self.matriz_indicadora()
+        totais[:, INDICE_CONTADOR['biometria']] = self.extras[:, 0]
+        totais[:, INDICE_CONTADOR['deficiencia']] = self.extras[:, 1]
+        return totais
+
+    def resultado(self):
+        """Lista de dicts por município/zona, ordenada por código do município e zona"""
+        totais = self.totais().tolist()
+        registros = []
+        for i, chave in enumerate(self.grupos.valores):
+            mun = chave >> 20
+            zona = self.zonas.valores[chave & 0xFFFFF]
+            registro = {
+                'uf': self.uf_municipio[mun],
+                'codigo_municipio': self.municipios.valores[mun],
+                'municipio': self.nome_municipio[mun],
+                'zona': zona,
+            }
+            registro.update(zip(CONTADORES, totais[i]))
+            registros.append(registro)
+        registros.sort(key=lambda r: (r['codigo_municipio'], r['zona']))
+        return registros
+
+
+def agregar_perfil(filepath, tamanho_lote=250_000, cache_dir=None):
+    """
+    Lê o perfil do eleitorado em lotes e retorna o AgregadorEleitorado preenchido.
+    Com `cache_dir`, lê do cache colunar binário (construído na primeira execução).
+    """
+    agregador = AgregadorEleitorado()
+    if cache_dir:
+        PERFIL_ELEITORADO.verificar(ler_cabecalho(filepath), 'agregacao', filepath)
+        tabela = abrir_cache(filepath, cache_dir)
+        for inicio in range(0, len(tabela), tamanho_lote):
+            agregador.adicionar_tabela(tabela, inicio, inicio + tamanho_lote)
+            avancar(min(tamanho_lote, len(tabela) - inicio))
+    else:
+        for lote in PERFIL_ELEITORADO.ler_lotes(filepath, 'agregacao', tamanho_lote):
+            agregador.adicionar(lote)
+            avancar(len(lote))
+    return agregador
+
+
+def agregar_eleitorado(filepath, tamanho_lote=250_000, cache_dir=None):
+    """Lê o perfil do eleitorado e retorna (registros por município/zona, total de linhas)"""
+    agregador = agregar_perfil(filepath, tamanho_lote, cache_dir)
+    registros = agregador.resultado()
+    relatar_desconhecidos()
+    return registros, agregador.total_registros
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Backup das tabelas do banco DTE em streaming
+Cada tabela é lida com cursor no servidor e gravada em NDJSON ou CSV comprimido em blocos, com memória
+constante; as tabelas são exportadas em paralelo e o resultado é registrado em `backup_history`
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+from tse_metricas import avancar
+from tse_ndjson import LINHAS_POR_BLOCO
+
+# Conjunto (nome usado em scheduled_backups.dataTypes) -> tabela
+CONJUNTOS = {
+    'users': 'users',
+    'activities': 'user_activities',
+    'eleitorado': 'eleitorado',
+    'resultados': 'resultados_eleitorais',
+    'votos_nulos_brancos': 'votos_nulos_brancos',
+    'eleitorado_tse': 'eleitorado_tse',
+    'candidatos_tse': 'candidatos_tse',
+    'partidos_tse': 'partidos_tse',
+    'coligacoes_tse': 'coligacoes_tse',
+    'importacoes': 'importacoes',
+    'audit_logs': 'audit_logs',
+}
+
+# Colunas exportadas dos conjuntos com dados pessoais, as mesmas de exportUsers/exportActivities (server/db.ts):
+# hash de senha e openId não vão para os arquivos do backup. Os demais conjuntos saem com todas as colunas.
+COLUNAS_EXPORTADAS = {
+    'users': ('id', 'name', 'email', 'username', 'role', 'loginMethod', 'createdAt', 'lastSignedIn'),
+    'activities': ('id', 'userId', 'activityType', 'description', 'ipAddress', 'createdAt'),
+}
+
+FORMATOS = ('ndjson', 'csv')
+
+# Colunas que marcam linhas novas ou alteradas no backup incremental
+COLUNAS_TEMPO = ('createdAt', 'updatedAt')
+
+ARQUIVO_MANIFESTO = 'backup.json'
+
+
+def _valor_json(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=' ')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return bytes(valor).decode('utf-8', errors='replace')
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _valor_csv(valor):
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+    if isinstance(valor, (bytes, bytearray)):
+        return bytes(valor).decode('utf-8', errors='replace')
+    return valor
+
+
+def colunas_tabela(conn, tabela):
+    """Nomes das colunas da tabela, na ordem do banco"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM {tabela} LIMIT 0")
+    cursor.fetchall()
+    colunas = [d[0] for d in cursor.description]
+    cursor.close()
+    return colunas
+
+
+def colunas_exportadas(conjunto, colunas):
+    """Colunas da tabela que entram no backup do conjunto, na ordem do banco"""
+    permitidas = COLUNAS_EXPORTADAS.get(conjunto)
+    return colunas if permitidas is None else [c for c in colunas if c in permitidas]
+
+
+def filtro_incremental(colunas, placeholder):
+    """(condição, quantidade de parâmetros) das linhas criadas ou alteradas desde uma data; None sem colunas de tempo"""
+    tempo = [c for c in COLUNAS_TEMPO if c in colunas]
+    if not tempo:
+        return None, 0
+    return ' OR '.join(f"{c} >= {placeholder}" for c in tempo), len(tempo)
+
+
+def ler_lotes(conn, tabela, colunas, placeholder, desde=None, lote=LINHAS_POR_BLOCO, colunas_tabela=None):
+    """
+    Gera lotes de até `lote` linhas da tabela. O cursor do mysql.connector não é bufferizado: as linhas
+    vêm do servidor conforme são lidas, sem carregar a tabela inteira na memória. Com `desde`, só as
+    linhas criadas ou alteradas a partir dessa data (tabelas sem colunas de tempo vêm inteiras); as
+    colunas de tempo são procuradas em `colunas_tabela` (padrão: `colunas`), mesmo fora do backup.
+    """
+    sql = f"SELECT {', '.join(colunas)} FROM {tabela}"
+    parametros = []
+    if desde is not None:
+        condicao, n = filtro_incremental(colunas_tabela or colunas, placeholder)
+        if condicao:
+            sql += f" WHERE {condicao}"
+            parametros = [desde] * n
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, parametros)
+        while True:
+            linhas = cursor.fetchmany(lote)
+            if not linhas:
+                return
+            avancar(len(linhas))
+            yield linhas
+    finally:
+        cursor.close()
+
+
+class EscritorBackup:
+    """
+    Grava cada conjunto em `diretorio/<conjunto>.<formato>[.gz]`, em blocos de `linhas_por_bloco` linhas.
+
+    Como em EscritorParticionado (tse_ndjson.py), cada bloco comprimido é um membro gzip independente
+    com offset registrado no manifesto: o arquivo inteiro é um .gz válido e cada bloco pode ser lido sozinho.
+    No CSV o cabeçalho fica no início do primeiro bloco.
+    """
+
+    def __init__(self, diretorio, formato='ndjson', comprimir=True, linhas_por_bloco=LINHAS_POR_BLOCO):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
+        self.diretorio = diretorio
+        self.formato = formato
+        self.comprimir = comprimir
+        self.linhas_por_bloco = linhas_por_bloco
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, conjunto, tabela, colunas, lotes):
+        """Grava os lotes (listas de tuplas na ordem de `colunas`) e retorna a entrada do manifesto"""
+        relativo = f"{conjunto}.{self.formato}" + ('.gz' if self.comprimir else '')
+        caminho = os.path.join(self.diretorio, relativo)
+        blocos = []
+        linhas = 0
+        pendentes = []
+        with open(caminho + '.tmp', 'wb') as f:
+            for lote in lotes:
+                pendentes.extend(lote)
+                while len(pendentes) >= self.linhas_por_bloco:
+                    bloco, pendentes = pendentes[:self.linhas_por_bloco], pendentes[self.linhas_por_bloco:]
+                    blocos.append(self._gravar_bloco(f, colunas, bloco, linhas))
+                    linhas += len(bloco)
+            if pendentes or not blocos:
+                blocos.append(self._gravar_bloco(f, colunas, pendentes, linhas))
+                linhas += len(pendentes)
+            tamanho = f.tell()
+        os.replace(caminho + '.tmp', caminho)
+        return {
+            'conjunto': conjunto,
+            'tabela': tabela,
+            'arquivo': relativo,
+            'formato': self.formato,
+            'comprimido': self.comprimir,
+            'colunas': list(colunas),
+            'linhas': linhas,
+            'bytes': tamanho,
+            'blocos': blocos,
+        }
+
+    def _gravar_bloco(self, f, colunas, bloco, linha_inicial):
+        if self.formato == 'ndjson':
+            texto = ''.join(
+                json.dumps(dict(zip(colunas, linha)), ensure_ascii=False, separators=(',', ':'),
+                           default=_valor_json) + '\n'
+                for linha in bloco
+            )
+        else:
+            saida = io.StringIO()
+            escritor = csv.writer(saida, lineterminator='\n')
+            if linha_inicial == 0:
+                escritor.writerow(colunas)
+            escritor.writerows([_valor_csv(v) for v in linha] for linha in bloco)
+            texto = saida.getvalue()
+        dados = texto.encode('utf-8')
+        if self.comprimir:
+            dados = gzip.compress(dados, compresslevel=6)
+        offset = f.tell()
+        f.write(dados)
+        return {'linha_inicial': linha_inicial, 'linhas': len(bloco), 'offset': offset, 'bytes': len(dados)}
+
+
+def ler_backup(diretorio, entrada):
+    """Gera os registros (dicts) de um conjunto do backup; no CSV os valores vêm como texto"""
+    caminho = os.path.join(diretorio, entrada['arquivo'])
+    abrir = gzip.open if entrada['comprimido'] else open
+    with abrir(caminho, 'rt', encoding='utf-8', newline='') as f:
+        if entrada['formato'] == 'ndjson':
+            for linha in f:
+                yield json.loads(linha)
+        else:
+            yield from csv.DictReader(f)
+
+
+def ultimos_backups(conn, placeholder, conjuntos, agendado=None):
+    """
+    Início do último backup bem-sucedido que incluiu cada conjunto (do mesmo agendamento, ou manual
+    sem `agendado`). Conjuntos que nunca tiveram backup ficam fora e são exportados inteiros.
+    """
+    cursor = conn.cursor()
+    if agendado is None:
+        filtro, parametros = "scheduledBackupId IS NULL", []
+    else:
+        filtro, parametros = f"scheduledBackupId = {placeholder}", [agendado]
+    cursor.execute(
+        f"SELECT startedAt, dataTypes FROM backup_history WHERE status = 'success' AND {filtro} "
+        f"ORDER BY startedAt DESC", parametros
+    )
+    desde = {}
+    for inicio, tipos in cursor.fetchall():
+        if isinstance(tipos, (bytes, bytearray)):
+            tipos = tipos.decode('utf-8')
+        for conjunto in json.loads(tipos) if isinstance(tipos, str) else (tipos or []):
+            if conjunto in conjuntos:
+                desde.setdefault(conjunto, inicio)
+        if len(desde) == len(conjuntos):
+            break
+    cursor.close()
+    return desde
+
+
+def registrar_inicio(conn, placeholder, conjuntos, agendado=None):
+    """Cria a entrada 'running' em backup_history e retorna (id, startedAt)"""
+    p = placeholder
+    cursor = conn.cursor()
+    cursor.execute(
+        f"INSERT INTO backup_history (scheduledBackupId, status, dataTypes) VALUES ({p}, 'running', {p})",
+        [agendado, json.dumps(list(conjuntos))]
+    )
+    historico_id = cursor.lastrowid
+    cursor.execute(f"SELECT startedAt FROM backup_history WHERE id = {p}", [historico_id])
+    inicio = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return historico_id, inicio
+
+
+def registrar_fim(conn, placeholder, historico_id, status, contagens=None, tamanho=None, arquivo=None,
+                  erro=None, agendado=None):
+    """Conclui a entrada em backup_history; no sucesso de um agendamento, atualiza lastRunAt"""
+    p = placeholder
+    cursor = conn.cursor()
+    cursor.execute(
+        f"UPDATE backup_history SET status = {p}, recordCounts = {p}, fileSize = {p}, fileUrl = {p}, "
+        f"errorMessage = {p}, completedAt = CURRENT_TIMESTAMP WHERE id = {p}",
+        [status, json.dumps(contagens) if contagens is not None else None, tamanho, arquivo, erro, historico_id]
+    )
+    if agendado is not None and status == 'success':
+        cursor.execute(f"UPDATE scheduled_backups SET lastRunAt = CURRENT_TIMESTAMP WHERE id = {p}", [agendado])
+    conn.commit()
+    cursor.close()
+
+
+def _exportar(conectar, escritor, conjunto, placeholder, desde):
+    """Exporta um conjunto em conexão própria (o cursor não bufferizado ocupa a conexão até o fim)"""
+    tabela = CONJUNTOS[conjunto]
+    conn = conectar()
+    if conn is None:
+        raise ConnectionError(f"Falha ao abrir conexão para {tabela}")
+    try:
+        todas = colunas_tabela(conn, tabela)
+        colunas = colunas_exportadas(conjunto, todas)
+        lotes = ler_lotes(conn, tabela, colunas, placeholder, desde, escritor.linhas_por_bloco, todas)
+        return escritor.escrever(conjunto, tabela, colunas, lotes)
+    finally:
+        conn.close()
+
+
+def executar_backup(conn, conectar, conjuntos, saida, formato='ndjson', incremental=False, agendado=None,
+                    workers=2, comprimir=True, linhas_por_bloco=LINHAS_POR_BLOCO, placeholder='%s'):
+    """
+    Exporta os conjuntos para `saida/backup_<id>` com `workers` tabelas em paralelo, cada uma em uma
+    conexão de `conectar()`, e registra o backup em backup_history pela conexão `conn`.
+    Com `incremental`, cada conjunto traz só as linhas com createdAt/updatedAt a partir do início do
+    último backup bem-sucedido que o incluiu. Retorna o manifesto gravado em `backup.json`.
+    """
+    desconhecidos = [c for c in conjuntos if c not in CONJUNTOS]
+    if desconhecidos:
+        raise ValueError(f"Conjunto desconhecido: {', '.join(desconhecidos)}")
+    desde = ultimos_backups(conn, placeholder, conjuntos, agendado) if incremental else {}
+    historico_id, inicio = registrar_inicio(conn, placeholder, conjuntos, agendado)
+    diretorio = os.path.join(saida, f"backup_{historico_id}")
+    try:
+        escritor = EscritorBackup(diretorio, formato, comprimir, linhas_por_bloco)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            tarefas = [executor.submit(_exportar, conectar, escritor, conjunto, placeholder, desde.get(conjunto))
+                       for conjunto in conjuntos]
+            entradas = [tarefa.result() for tarefa in tarefas]
+
+        manifesto = {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'historico_id': historico_id,
+            'iniciado_em': str(inicio),
+            'agendado': agendado,
+            'modo': 'incremental' if incremental else 'completo',
+            'formato': formato,
+            'desde': {conjunto: str(d) for conjunto, d in desde.items()},
+            'conjuntos': entradas,
+        }
+        caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+        os.replace(caminho + '.tmp', caminho)
+    except Exception as e:
+        registrar_fim(conn, placeholder, historico_id, 'failed', erro=str(e))
+        raise
+
+    registrar_fim(conn, placeholder, historico_id, 'success',
+                  contagens={e['conjunto']: e['linhas'] for e in entradas},
+                  tamanho=sum(e['bytes'] for e in entradas), arquivo=diretorio, agendado=agendado)
+    return manifesto
@@ -0,0 +1,168 @@
+"""
+Testes do backup em streaming usando sqlite3 como banco local
+"""
+
+import functools
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+from tse_backup import EscritorBackup, executar_backup, ler_backup, ler_lotes, ultimos_backups
+
+ESQUEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY, openId TEXT, passwordHash TEXT, name TEXT, email TEXT, createdAt TEXT, updatedAt TEXT
+);
+CREATE TABLE eleitorado_tse (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, nmMunicipio TEXT, qtEleitoresPerfil INTEGER, createdAt TEXT
+);
+CREATE TABLE partidos_tse (id INTEGER PRIMARY KEY, sgPartido TEXT);
+CREATE TABLE scheduled_backups (id INTEGER PRIMARY KEY, name TEXT, lastRunAt TEXT);
+CREATE TABLE backup_history (
+    id INTEGER PRIMARY KEY, scheduledBackupId INTEGER, status TEXT DEFAULT 'running', dataTypes TEXT,
+    recordCounts TEXT, fileSize INTEGER, fileUrl TEXT, errorMessage TEXT, emailSent INTEGER DEFAULT 0,
+    startedAt TEXT DEFAULT CURRENT_TIMESTAMP, completedAt TEXT, createdAt TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+ANTIGO = '2024-01-01 00:00:00'
+NOVO = '2099-01-01 00:00:00'
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = str(tmp_path / 'dte.sqlite')
+    with sqlite3.connect(caminho) as conn:
+        conn.executescript(ESQUEMA)
+        conn.executemany(
+            "INSERT INTO users (openId, passwordHash, name, email, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"open-{i}", f"$2b$10$segredo{i}", f"Usuário {i}", f"u{i}@dte.gov", ANTIGO, ANTIGO) for i in range(25)]
+        )
+        conn.executemany(
+            "INSERT INTO eleitorado_tse (anoEleicao, nmMunicipio, qtEleitoresPerfil, createdAt) VALUES (?, ?, ?, ?)",
+            [(2024, 'PORTO VELHO' if i % 2 else 'ARIQUEMES, "SEDE"\nRO', i, ANTIGO) for i in range(1_000)]
+        )
+        conn.execute("INSERT INTO partidos_tse (sgPartido) VALUES ('PT')")
+        conn.execute("INSERT INTO scheduled_backups (id, name) VALUES (3, 'Diário')")
+    return caminho
+
+
+def _backup(banco, tmp_path, conjuntos, **opcoes):
+    conn = sqlite3.connect(banco)
+    try:
+        return executar_backup(conn, functools.partial(sqlite3.connect, banco), conjuntos, str(tmp_path / 'backups'),
+                               placeholder='?', **opcoes)
+    finally:
+        conn.close()
+
+
+def _historico(banco):
+    with sqlite3.connect(banco) as conn:
+        conn.row_factory = sqlite3.Row
+        return [dict(r) for r in conn.execute("SELECT * FROM backup_history ORDER BY id")]
+
+
+def test_ler_lotes_em_streaming(banco):
+    conn = sqlite3.connect(banco)
+    lotes = list(ler_lotes(conn, 'eleitorado_tse', ['id', 'qtEleitoresPerfil'], '?', lote=300))
+    assert [len(lote) for lote in lotes] == [300, 300, 300, 100]
+    assert sum(q for lote in lotes for _, q in lote) == sum(range(1_000))
+    conn.close()
+
+
+@pytest.mark.parametrize('formato', ['ndjson', 'csv'])
+def test_backup_completo(banco, tmp_path, formato):
+    manifesto = _backup(banco, tmp_path, ['users', 'eleitorado_tse'], formato=formato, workers=2,
+                        linhas_por_bloco=400)
+    diretorio = str(tmp_path / 'backups' / f"backup_{manifesto['historico_id']}")
+    with open(os.path.join(diretorio, 'backup.json'), encoding='utf-8') as f:
+        assert json.load(f) == manifesto
+    assert manifesto['modo'] == 'completo' and manifesto['desde'] == {}
+
+    usuarios, eleitorado = manifesto['conjuntos']
+    assert (usuarios['linhas'], eleitorado['linhas']) == (25, 1_000)
+    assert [b['linhas'] for b in eleitorado['blocos']] == [400, 400, 200]
+    registros = list(ler_backup(diretorio, eleitorado))
+    assert [str(r['qtEleitoresPerfil']) for r in registros] == [str(i) for i in range(1_000)]
+    assert registros[0]['nmMunicipio'] == 'ARIQUEMES, "SEDE"\nRO'
+
+    # Cada bloco comprimido é um membro gzip independente, lido pelo offset do manifesto
+    bloco = eleitorado['blocos'][1]
+    with open(os.path.join(diretorio, eleitorado['arquivo']), 'rb') as f:
+        f.seek(bloco['offset'])
+        texto = gzip.decompress(f.read(bloco['bytes'])).decode('utf-8')
+    assert ('"qtEleitoresPerfil":400' if formato == 'ndjson' else ',400,') in texto
+
+    historico, = _historico(banco)
+    assert historico['status'] == 'success' and historico['completedAt']
+    assert json.loads(historico['recordCounts']) == {'users': 25, 'eleitorado_tse': 1_000}
+    assert historico['fileSize'] == usuarios['bytes'] + eleitorado['bytes']
+    assert historico['fileUrl'] == diretorio
+
+
+@pytest.mark.parametrize('formato', ['ndjson', 'csv'])
+def test_backup_de_usuarios_sem_senha(banco, tmp_path, formato):
+    manifesto = _backup(banco, tmp_path, ['users'], formato=formato, comprimir=False)
+    diretorio = str(tmp_path / 'backups' / f"backup_{manifesto['historico_id']}")
+    usuarios, = manifesto['conjuntos']
+    assert usuarios['colunas'] == ['id', 'name', 'email', 'createdAt']
+    assert set(next(ler_backup(diretorio, usuarios))) == {'id', 'name', 'email', 'createdAt'}
+    with open(os.path.join(diretorio, usuarios['arquivo']), encoding='utf-8') as f:
+        conteudo = f.read()
+    assert 'passwordHash' not in conteudo and 'segredo' not in conteudo and 'open-' not in conteudo
+
+
+def test_backup_incremental(banco, tmp_path):
+    _backup(banco, tmp_path, ['users', 'eleitorado_tse'], agendado=3)
+    with sqlite3.connect(banco) as conn:
+        conn.execute("UPDATE backup_history SET startedAt = '2025-01-01 00:00:00'")
+        conn.execute("UPDATE users SET name = 'Alterado', updatedAt = ? WHERE id IN (1, 2)", [NOVO])
+        conn.execute("INSERT INTO users (name, email, createdAt, updatedAt) VALUES ('Novo', 'n@dte.gov', ?, ?)",
+                     [NOVO, NOVO])
+        conn.execute("INSERT INTO eleitorado_tse (anoEleicao, nmMunicipio, qtEleitoresPerfil, createdAt) "
+                     "VALUES (2024, 'CACOAL', 7, ?)", [NOVO])
+        assert ultimos_backups(conn, '?', ['users', 'partidos_tse'], agendado=3) == {
+            'users': '2025-01-01 00:00:00'
+        }
+        # Backups manuais não servem de base para o agendamento (e vice-versa)
+        assert ultimos_backups(conn, '?', ['users']) == {}
+
+    manifesto = _backup(banco, tmp_path, ['users', 'eleitorado_tse', 'partidos_tse'], incremental=True, agendado=3)
+    diretorio = str(tmp_path / 'backups' / f"backup_{manifesto['historico_id']}")
+    usuarios, eleitorado, partidos = manifesto['conjuntos']
+    assert manifesto['modo'] == 'incremental'
+    assert sorted(r['name'] for r in ler_backup(diretorio, usuarios)) == ['Alterado', 'Alterado', 'Novo']
+    assert [r['nmMunicipio'] for r in ler_backup(diretorio, eleitorado)] == ['CACOAL']
+    # Conjunto sem backup anterior vem inteiro
+    assert partidos['linhas'] == 1 and 'partidos_tse' not in manifesto['desde']
+
+    assert [h['status'] for h in _historico(banco)] == ['success', 'success']
+    with sqlite3.connect(banco) as conn:
+        assert conn.execute("SELECT lastRunAt FROM scheduled_backups WHERE id = 3").fetchone()[0]
+
+
+def test_backup_com_falha_registrado(banco, tmp_path):
+    with sqlite3.connect(banco) as conn:
+        conn.execute("DROP TABLE partidos_tse")
+    with pytest.raises(sqlite3.OperationalError):
+        _backup(banco, tmp_path, ['users', 'partidos_tse'])
+    historico, = _historico(banco)
+    assert historico['status'] == 'failed' and 'partidos_tse' in historico['errorMessage']
+
+    with pytest.raises(ValueError, match='tabela_x'):
+        _backup(banco, tmp_path, ['tabela_x'])
+
+
+def test_escritor_sem_linhas_e_sem_compressao(tmp_path):
+    escritor = EscritorBackup(str(tmp_path), 'csv', comprimir=False)
+    entrada = escritor.escrever('partidos_tse', 'partidos_tse', ['id', 'dados'], iter([]))
+    assert entrada['linhas'] == 0 and entrada['arquivo'] == 'partidos_tse.csv'
+    assert (tmp_path / 'partidos_tse.csv').read_text(encoding='utf-8') == 'id,dados\n'
+
+    entrada = escritor.escrever('importacoes', 'importacoes', ['id', 'dados'], [[(1, {'a': 1}), (2, None)]])
+    assert list(ler_backup(str(tmp_path), entrada)) == [{'id': '1', 'dados': '{"a":1}'}, {'id': '2', 'dados': ''}]
+    with pytest.raises(ValueError):
+        EscritorBackup(str(tmp_path), 'xml')
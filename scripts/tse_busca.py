@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Índice de busca de candidatos (tabelas `candidatos_busca` e `candidatos_busca_termos`)
+Prefixos (a partir do início de cada palavra, atravessando as seguintes) e trigramas sem acento de nome
+de urna, nome, sigla do partido e coligação, com os melhores candidatos de cada termo por partição
+(ano, UF) já ordenados por qualidade do casamento e ano.
+A mesma busca é feita pela API (shared/buscaCandidatos.ts, server/db.ts).
+"""
+
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+
+from tse_manifesto import resumo_registros
+
+TABELA_DOCUMENTOS = 'candidatos_busca'
+TABELA_TERMOS = 'candidatos_busca_termos'
+
+COLUNAS_DOCUMENTOS = (
+    'anoEleicao', 'uf', 'seq', 'nomeUrna', 'nome', 'sigla', 'coligacao', 'cargo', 'municipio', 'numero',
+    'situacao', 'texto'
+)
+COLUNAS_TERMOS = ('termo', 'peso', 'anoEleicao', 'uf', 'seq')
+
+# Campo do registro de candidato (import_tse_data.py) -> peso na qualidade do casamento
+# (nome_urna = NM_URNA_CANDIDATO, nome = NM_CANDIDATO, partido_sigla = SG_PARTIDO, coligacao = NM_COLIGACAO)
+CAMPOS = (('nome_urna', 3), ('nome', 2), ('partido_sigla', 1), ('coligacao', 1))
+
+# Campos com trigramas (erros de digitação e trechos no meio da palavra)
+CAMPOS_TRIGRAMA = ('nome_urna',)
+
+# Tamanhos de prefixo indexados; consultas maiores são conferidas no texto do candidato
+PREFIXO_MIN = 2
+PREFIXO_MAX = 10
+
+# Candidatos guardados por termo em cada partição (ano, UF)
+POR_TERMO = 50
+
+# Marca dos termos de trigrama (não aparece no texto normalizado)
+TRIGRAMA = '#'
+
+# Peso = qualidade * ESCALA_ANO + ano: a ordem do índice é por qualidade e, no empate, pelo ano mais recente
+ESCALA_ANO = 10_000
+
+# Separador dos campos no texto normalizado do candidato (não casa com nenhuma palavra)
+SEPARADOR = ' | '
+
+# Fração mínima dos trigramas da consulta presentes no candidato para entrar como resultado aproximado
+SIMILARIDADE_MINIMA = 0.5
+
+
+def normalizar(texto):
+    """Minúsculas sem acento, só letras e dígitos separados por um espaço"""
+    decomposto = unicodedata.normalize('NFKD', str(texto or ''))
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', sem_acento.lower()).strip()
+
+
+def trigramas(palavra):
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+def termos_documento(registro):
+    """
+    {termo: qualidade} do candidato: prefixos do texto de cada campo a partir do início de cada palavra
+    ('maria silva' gera 'ma', ..., 'maria sil', ..., 'si', 'silva'), para que a consulta inteira,
+    com várias palavras, seja um termo só; e trigramas das palavras do nome de urna
+    """
+    termos = {}
+    for campo, peso in CAMPOS:
+        texto = normalizar(registro.get(campo))
+        inicio = 0
+        for posicao, palavra in enumerate(texto.split()):
+            resto = texto[inicio:]
+            inicio += len(palavra) + 1
+            for tamanho in range(PREFIXO_MIN, min(len(resto), PREFIXO_MAX) + 1):
+                if resto[tamanho - 1] == ' ':
+                    continue
+                # Prefixo que termina em fim de palavra e que começa na primeira palavra casam melhor
+                inteira = tamanho == len(resto) or resto[tamanho] == ' '
+                qualidade = peso * 4 + (2 if inteira else 0) + (1 if posicao == 0 else 0)
+                prefixo = resto[:tamanho]
+                if qualidade > termos.get(prefixo, 0):
+                    termos[prefixo] = qualidade
+            if campo in CAMPOS_TRIGRAMA:
+                for trigrama in trigramas(palavra):
+                    termo = TRIGRAMA + trigrama
+                    termos[termo] = max(termos.get(termo, 0), peso)
+    return termos
+
+
+def documentos_particao(registros):
+    """
+    Um documento por candidato (os dois turnos do arquivo viram um só, com a situação do último),
+    ordenados pelo nome de urna para que `seq` seja estável entre execuções
+    """
+    candidatos = {}
+    for registro in registros:
+        chave = (registro.get('cargo'), registro.get('municipio'), registro.get('numero'),
+                 normalizar(registro.get('nome')))
+        atual = candidatos.get(chave)
+        if atual is None or (registro.get('turno') or 1) >= (atual.get('turno') or 1):
+            candidatos[chave] = registro
+    return sorted(candidatos.values(), key=lambda r: (normalizar(r.get('nome_urna')), normalizar(r.get('nome')),
+                                                      str(r.get('cargo')), str(r.get('municipio'))))
+
+
+def indexar_particao(registros, ano, uf, por_termo=POR_TERMO):
+    """
+    (linhas de candidatos_busca, linhas de candidatos_busca_termos) da partição: cada termo guarda
+    só os `por_termo` candidatos de maior peso, o que limita as linhas dos prefixos curtos e comuns
+    """
+    documentos = []
+    melhores = defaultdict(list)
+    for seq, registro in enumerate(documentos_particao(registros)):
+        texto = SEPARADOR.join(normalizar(registro.get(campo)) for campo, _ in CAMPOS)
+        documentos.append((
+            ano, uf, seq, registro.get('nome_urna'), registro.get('nome'), registro.get('partido_sigla'),
+            registro.get('coligacao'), registro.get('cargo'), registro.get('municipio'), registro.get('numero'),
+            registro.get('resultado') or registro.get('situacao'), texto
+        ))
+        for termo, qualidade in termos_documento(registro).items():
+            # Heap mínimo por (peso, -seq): sai o menor peso e, no empate, o último em ordem alfabética
+            item = (qualidade * ESCALA_ANO + ano, -seq)
+            heap = melhores[termo]
+            if len(heap) < por_termo:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+    termos = [(termo, peso, ano, uf, -negativo) for termo, heap in melhores.items() for peso, negativo in heap]
+    return documentos, termos
+
+
+def gravar_particao(conn, carga, ano, uf, documentos, termos):
+    """Substitui a partição (ano, UF) nas duas tabelas; retorna (documentos, termos) inseridos"""
+    p = carga.placeholder
+    cursor = conn.cursor()
+    for tabela in (TABELA_TERMOS, TABELA_DOCUMENTOS):
+        cursor.execute(f"DELETE FROM {tabela} WHERE anoEleicao = {p} AND uf = {p}", [ano, uf])
+    conn.commit()
+    return (carga.inserir(TABELA_DOCUMENTOS, COLUNAS_DOCUMENTOS, documentos),
+            carga.inserir(TABELA_TERMOS, COLUNAS_TERMOS, termos))
+
+
+def atualizar_busca(conn, carga, filepath, registros, manifesto=None):
+    """
+    Atualiza o índice com os candidatos de um arquivo consulta_cand (uma partição ano/UF).
+    Com `manifesto`, a partição só é regravada quando os registros mudaram desde a última atualização.
+    Retorna {'particao', 'documentos', 'termos', 'atualizada'}.
+    """
+    if not registros:
+        return None
+    ano, uf = registros[0]['ano_eleicao'], registros[0]['uf']
+    resumo = resumo_registros(registros)
+    if manifesto:
+        _, digital = manifesto.situacao(filepath)
+        manifesto.iniciar(filepath, digital)
+        estado = manifesto.estado(filepath, 'busca')
+        if estado.get('resumo') == resumo and manifesto.concluido(filepath, ['busca']):
+            return {'particao': f"{ano}/{uf}", 'documentos': estado['documentos'], 'termos': estado['termos'],
+                    'atualizada': False}
+        manifesto.atualizar_etapa(filepath, 'busca', status='processando')
+
+    documentos, termos = indexar_particao(registros, ano, uf)
+    n_documentos, n_termos = gravar_particao(conn, carga, ano, uf, documentos, termos)
+    if manifesto:
+        manifesto.definir_estado(filepath, 'busca', {'resumo': resumo, 'documentos': n_documentos,
+                                                     'termos': n_termos})
+        manifesto.atualizar_etapa(filepath, 'busca', status='concluido')
+    return {'particao': f"{ano}/{uf}", 'documentos': n_documentos, 'termos': n_termos, 'atualizada': True}
+
+
+def _melhores_do_termo(cursor, p, termo, ano, quantidade):
+    filtro_ano = f" AND anoEleicao = {p}" if ano else ''
+    cursor.execute(
+        f"SELECT peso, anoEleicao, uf, seq FROM {TABELA_TERMOS} WHERE termo = {p}{filtro_ano} "
+        f"ORDER BY peso DESC LIMIT {int(quantidade)}",
+        [termo, ano] if ano else [termo]
+    )
+    return cursor.fetchall()
+
+
+def buscar(conn, placeholder, consulta, limite=10, ano=None, por_termo=200):
+    """
+    Candidatos da consulta (digitação parcial): o texto da consulta é um prefixo, e cada palavra dela
+    também é procurada sozinha (palavras fora de ordem). Só entram candidatos com todas as palavras,
+    ordenados pela consulta inteira em sequência, qualidade do casamento e ano. Sem nenhum,
+    procura por trigramas (erros de digitação). Retorna dicts de candidatos_busca com `pontuacao`
+    e `aproximado`.
+    """
+    texto = normalizar(consulta)
+    if len(texto) < PREFIXO_MIN:
+        return []
+    palavras = texto.split()
+    cursor = conn.cursor()
+    # Casamentos da consulta inteira valem mais que os de uma palavra solta (que só ampliam os candidatos)
+    qualidades = {}
+    for peso, ano_doc, uf, seq in _melhores_do_termo(cursor, placeholder, texto[:PREFIXO_MAX].rstrip(), ano,
+                                                     por_termo):
+        qualidades[(ano_doc, uf, seq)] = 100 + peso // ESCALA_ANO
+    if len(palavras) > 1:
+        for termo in dict.fromkeys(palavra[:PREFIXO_MAX] for palavra in palavras if len(palavra) >= PREFIXO_MIN):
+            for peso, ano_doc, uf, seq in _melhores_do_termo(cursor, placeholder, termo, ano, por_termo):
+                chave = (ano_doc, uf, seq)
+                qualidades[chave] = max(qualidades.get(chave, 0), peso // ESCALA_ANO)
+
+    resultados = []
+    for chave, documento in _documentos(cursor, placeholder, qualidades).items():
+        # Consultas maiores que o prefixo indexado e palavras soltas são conferidas no texto do candidato
+        if not all(_contem_prefixo(documento['texto'], palavra) for palavra in palavras):
+            continue
+        em_sequencia = f" {texto}" in f" {documento['texto']}"
+        resultados.append({**documento, 'pontuacao': (1000 if em_sequencia else 0) + qualidades[chave],
+                           'aproximado': False})
+    resultados.sort(key=lambda r: (-r['pontuacao'], -r['anoEleicao'], r['texto']))
+    resultados = resultados[:limite]
+
+    if not resultados:
+        resultados = _aproximados(cursor, placeholder, palavras, ano, por_termo, limite)
+    cursor.close()
+    return resultados
+
+
+def _contem_prefixo(texto, palavra):
+    return any(p.startswith(palavra) for p in texto.split())
+
+
+def _documentos(cursor, p, chaves):
+    if not chaves:
+        return {}
+    documentos = {}
+    chaves = list(chaves)
+    for inicio in range(0, len(chaves), 500):
+        lote = chaves[inicio:inicio + 500]
+        condicao = ' OR '.join([f"(anoEleicao = {p} AND uf = {p} AND seq = {p})"] * len(lote))
+        cursor.execute(f"SELECT {', '.join(COLUNAS_DOCUMENTOS)} FROM {TABELA_DOCUMENTOS} WHERE {condicao}",
+                       [v for chave in lote for v in chave])
+        for linha in cursor.fetchall():
+            documento = dict(zip(COLUNAS_DOCUMENTOS, linha))
+            documentos[(documento['anoEleicao'], documento['uf'], documento['seq'])] = documento
+    return documentos
+
+
+def _aproximados(cursor, p, palavras, ano, por_termo, limite):
+    """Candidatos com a maior fração dos trigramas da consulta no nome de urna"""
+    consulta = set().union(*(trigramas(palavra) for palavra in palavras))
+    if not consulta:
+        return []
+    contagem = defaultdict(int)
+    ordem = {}
+    for trigrama in consulta:
+        for peso, ano_doc, uf, seq in _melhores_do_termo(cursor, p, TRIGRAMA + trigrama, ano, por_termo):
+            chave = (ano_doc, uf, seq)
+            contagem[chave] += 1
+            ordem[chave] = ano_doc
+    similares = [(n / len(consulta), chave) for chave, n in contagem.items()
+                 if n / len(consulta) >= SIMILARIDADE_MINIMA]
+    similares.sort(key=lambda item: (-item[0], -ordem[item[1]]))
+    similares = similares[:limite]
+    documentos = _documentos(cursor, p, [chave for _, chave in similares])
+    return [{**documentos[chave], 'pontuacao': round(similaridade * 100), 'aproximado': True}
+            for similaridade, chave in similares if chave in documentos]
@@ -0,0 +1,153 @@
+"""
+Testes do índice de busca de candidatos usando sqlite3 como banco local
+"""
+
+import time
+
+import pytest
+
+from tse_busca import (POR_TERMO, PREFIXO_MAX, atualizar_busca, buscar, indexar_particao, normalizar,
+                       termos_documento)
+from tse_carga import CarregadorBulk
+from tse_manifesto import Manifesto
+
+ESQUEMA = """
+CREATE TABLE candidatos_busca (
+    anoEleicao INTEGER, uf TEXT, seq INTEGER, nomeUrna TEXT, nome TEXT, sigla TEXT, coligacao TEXT,
+    cargo TEXT, municipio TEXT, numero INTEGER, situacao TEXT, texto TEXT,
+    PRIMARY KEY (anoEleicao, uf, seq)
+);
+CREATE TABLE candidatos_busca_termos (
+    termo TEXT, peso INTEGER, anoEleicao INTEGER, uf TEXT, seq INTEGER,
+    PRIMARY KEY (termo, peso, anoEleicao, uf, seq)
+);
+CREATE INDEX candidatos_busca_termos_particao ON candidatos_busca_termos (anoEleicao, uf);
+"""
+
+
+def _candidato(nome_urna, nome, sigla='PT', coligacao=None, ano=2024, uf='RO', cargo='VEREADOR',
+               municipio='PORTO VELHO', numero=13000, turno=1, resultado='ELEITO'):
+    return {'ano_eleicao': ano, 'uf': uf, 'turno': turno, 'municipio': municipio, 'cargo': cargo,
+            'numero': numero, 'nome': nome, 'nome_urna': nome_urna, 'partido_sigla': sigla,
+            'coligacao': coligacao, 'resultado': resultado}
+
+
+CANDIDATOS_2024 = [
+    _candidato('JOÃO DA SAÚDE', 'JOÃO BATISTA DE SOUZA', numero=13001),
+    _candidato('JOÃO DA SAÚDE', 'JOÃO BATISTA DE SOUZA', numero=13001, turno=2, resultado='ELEITO'),
+    _candidato('JOSÉ CARLOS', 'JOSÉ CARLOS PEREIRA', sigla='PL', numero=22002),
+    _candidato('MARIA JOANA', 'MARIA JOANA SILVA', sigla='MDB', coligacao='FRENTE POPULAR', numero=15003),
+    _candidato('DR. ÁLVARO', 'ÁLVARO CÉSAR DE ARAÚJO', sigla='PSD', numero=55004),
+]
+CANDIDATOS_2020 = [
+    _candidato('JOÃO DA SAÚDE', 'JOÃO BATISTA DE SOUZA', ano=2020, numero=13001),
+    _candidato('JOAQUIM', 'JOAQUIM NABUCO', ano=2020, sigla='PL', numero=22005),
+]
+
+
+@pytest.fixture
+def conexao(banco):
+    return banco(ESQUEMA)
+
+
+def _carregar(conexao, *particoes):
+    carga = CarregadorBulk(conexao, relatar=False)
+    for registros in particoes:
+        atualizar_busca(conexao, carga, 'consulta_cand.csv', registros)
+    return carga
+
+
+def test_normalizar_sem_acento():
+    assert normalizar('  JOÃO  da Saúde-Filho ') == 'joao da saude filho'
+    assert normalizar('DR. ÁLVARO (45)') == 'dr alvaro 45'
+    assert normalizar(None) == ''
+
+
+def test_termos_do_candidato():
+    termos = termos_documento(_candidato('JOÃO DA SAÚDE', 'JOÃO BATISTA DE SOUZA'))
+    # Prefixos de 2 a PREFIXO_MAX letras; a palavra inteira no nome de urna é o melhor casamento
+    assert 'j' not in termos and termos['joao'] > termos['jo'] > termos['batista']
+    assert 'saude' in termos and '#aud' in termos and '#bat' not in termos
+    longo = termos_documento(_candidato('ANTONIOMARCOS', 'X'))
+    assert max((t for t in longo if not t.startswith('#')), key=len) == 'antoniomarcos'[:PREFIXO_MAX]
+
+
+def test_indexar_particao_limita_candidatos_por_termo():
+    registros = [_candidato(f'ANA {i:03d}', f'ANA PAULA {i:03d}', numero=i) for i in range(POR_TERMO + 30)]
+    documentos, termos = indexar_particao(registros, 2024, 'RO')
+    assert len(documentos) == POR_TERMO + 30
+    assert sum(1 for t in termos if t[0] == 'an') == POR_TERMO
+    # Empate de peso: ficam os primeiros em ordem alfabética
+    assert sorted(t[4] for t in termos if t[0] == 'an') == list(range(POR_TERMO))
+
+
+def test_turnos_viram_um_documento(conexao):
+    _carregar(conexao, CANDIDATOS_2024)
+    assert conexao.execute("SELECT COUNT(*) FROM candidatos_busca").fetchone()[0] == 4
+
+
+def test_busca_por_prefixo_sem_acento(conexao):
+    _carregar(conexao, CANDIDATOS_2024, CANDIDATOS_2020)
+
+    nomes = [(r['nomeUrna'], r['anoEleicao']) for r in buscar(conexao, '?', 'joa')]
+    # Palavra inteira/primeira palavra do nome de urna antes de prefixos de outros campos; empate pelo ano
+    assert nomes[:3] == [('JOÃO DA SAÚDE', 2024), ('JOÃO DA SAÚDE', 2020), ('JOAQUIM', 2020)]
+    assert ('MARIA JOANA', 2024) in nomes
+
+    assert [r['nomeUrna'] for r in buscar(conexao, '?', 'alvaro')] == ['DR. ÁLVARO']
+    assert [r['nome'] for r in buscar(conexao, '?', 'Araújo')] == ['ÁLVARO CÉSAR DE ARAÚJO']
+    assert [r['nomeUrna'] for r in buscar(conexao, '?', 'frente pop')] == ['MARIA JOANA']
+    assert [r['anoEleicao'] for r in buscar(conexao, '?', 'joao da', ano=2020)] == [2020]
+
+
+def test_busca_com_varias_palavras_e_palavra_longa(conexao):
+    _carregar(conexao, CANDIDATOS_2024)
+    resultados = buscar(conexao, '?', 'jose pereira')
+    assert resultados[0]['nomeUrna'] == 'JOSÉ CARLOS' and not resultados[0]['aproximado']
+    # 'batistasouza' cabe no prefixo indexado ('batistasou'), mas não no texto do candidato
+    assert buscar(conexao, '?', 'batistasouza') == []
+    assert buscar(conexao, '?', 'j') == [] and buscar(conexao, '?', '  ') == []
+
+
+def test_busca_aproximada_por_trigramas(conexao):
+    _carregar(conexao, CANDIDATOS_2024)
+    resultados = buscar(conexao, '?', 'saudde')
+    assert resultados and resultados[0]['nomeUrna'] == 'JOÃO DA SAÚDE' and resultados[0]['aproximado']
+
+
+def test_atualizacao_incremental(conexao, tmp_path):
+    arquivo = tmp_path / 'consulta_cand_2024_RO.csv'
+    arquivo.write_text('conteúdo', encoding='utf-8')
+    manifesto = Manifesto(str(tmp_path / 'manifesto.json'))
+    carga = CarregadorBulk(conexao, relatar=False)
+    _carregar(conexao, CANDIDATOS_2020)
+
+    primeira = atualizar_busca(conexao, carga, str(arquivo), CANDIDATOS_2024, manifesto)
+    assert primeira['atualizada'] and primeira['documentos'] == 4
+    assert not atualizar_busca(conexao, carga, str(arquivo), CANDIDATOS_2024, manifesto)['atualizada']
+
+    # Registros mudaram: só a partição 2024/RO é regravada
+    novos = CANDIDATOS_2024[:2]
+    assert atualizar_busca(conexao, carga, str(arquivo), novos, manifesto)['documentos'] == 1
+    assert conexao.execute("SELECT anoEleicao, COUNT(*) FROM candidatos_busca GROUP BY anoEleicao").fetchall() == [
+        (2020, 2), (2024, 1)
+    ]
+    assert [r['nomeUrna'] for r in buscar(conexao, '?', 'maria')] == []
+    assert atualizar_busca(conexao, carga, str(arquivo), [], manifesto) is None
+
+
+def test_busca_rapida_em_muitos_candidatos(conexao):
+    nomes = ('ANA', 'JOÃO', 'JOSÉ', 'MARIA', 'PEDRO', 'PAULO', 'LUCAS', 'MARCOS', 'RAFAEL', 'CARLA')
+    sobrenomes = ('SILVA', 'SOUZA', 'OLIVEIRA', 'PEREIRA', 'COSTA', 'ALMEIDA', 'LIMA', 'ARAÚJO', 'GOMES', 'MELO')
+    for ano in (2020, 2024):
+        registros = [
+            _candidato(f'{nomes[i % 10]} {sobrenomes[i // 10 % 10]} {i}', f'{nomes[i % 10]} {sobrenomes[i // 100 % 10]}',
+                       ano=ano, numero=i)
+            for i in range(5_000)
+        ]
+        _carregar(conexao, registros)
+    inicio = time.perf_counter()
+    for consulta in ('jo', 'maria sil', 'pedro ara', 'lucas 49', 'olivera'):
+        assert buscar(conexao, '?', consulta)
+    assert (time.perf_counter() - inicio) / 5 < 0.05
+    assert buscar(conexao, '?', 'maria sil')[0]['nomeUrna'].startswith('MARIA SILVA')
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Cache colunar binário dos arquivos CSV do TSE
+Cada coluna vira um array .npy (inteiros ou códigos de dicionário) aberto com memory-map,
+evitando decodificar Latin-1 e interpretar o CSV a cada execução
+"""
+
+import json
+import os
+import shutil
+from operator import itemgetter
+
+import numpy as np
+
+from tse_csv import iter_csv_latin1, iter_lotes, ler_cabecalho
+from tse_manifesto import impressao_digital
+
+# Versão do formato em disco (caches de outra versão são reconstruídos)
+FORMATO = 1
+
+# Linhas processadas por vez na leitura do cache
+BLOCO_CACHE = 250_000
+
+# Linhas por vez na construção (lotes menores de tuplas com todas as colunas: menos memória e mais rápido)
+BLOCO_CONSTRUCAO = 20_000
+
+# Inteiros fora deste limite ficam como texto (ex.: códigos longos)
+LIMITE_INTEIRO = 1 << 62
+
+
+class Dicionario(dict):
+    """Codificação de valores em inteiros densos (0, 1, 2, ...) na ordem de aparição"""
+
+    def __init__(self):
+        super().__init__()
+        self.valores = []
+
+    def __missing__(self, valor):
+        cod = self[valor] = len(self.valores)
+        self.valores.append(valor)
+        return cod
+
+    def codificar(self, valores, n):
+        """Codifica `n` valores em um array int64; cada valor novo passa uma única vez por __missing__"""
+        return np.fromiter(map(self.__getitem__, valores), np.int64, n)
+
+
+def _como_inteiros(valores):
+    """Array int64 com os valores se todos forem inteiros na forma canônica ('35', não '035' nem ''), senão None"""
+    try:
+        inteiros = [int(v) for v in valores]
+    except ValueError:
+        return None
+    if any(str(i) != v or abs(i) >= LIMITE_INTEIRO for i, v in zip(inteiros, valores)):
+        return None
+    return np.array(inteiros, dtype=np.int64)
+
+
+def _menor_tipo(minimo, maximo):
+    """Menor tipo inteiro numpy que comporta o intervalo [minimo, maximo]"""
+    for tipo in (np.uint8, np.uint16, np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(tipo)
+        if info.min <= minimo and maximo <= info.max:
+            return tipo
+    return np.int64
+
+
+def diretorio_cache(filepath, cache_dir):
+    return os.path.join(cache_dir, os.path.basename(filepath))
+
+
+def _ler_meta(diretorio):
+    try:
+        with open(os.path.join(diretorio, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_meta(diretorio, meta):
+    temporario = os.path.join(diretorio, 'meta.json.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(temporario, os.path.join(diretorio, 'meta.json'))
+
+
+def construir_cache(filepath, cache_dir):
+    """
+    Converte o CSV em colunas binárias em `cache_dir/<arquivo>/` e retorna o meta.
+    Todas as colunas são codificadas por dicionário durante a leitura; ao final,
+    as que contêm apenas inteiros canônicos são gravadas como inteiros (no menor tipo que os comporta).
+    """
+    destino = diretorio_cache(filepath, cache_dir)
+    temporario = f"{destino}.tmp-{os.getpid()}"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    origem = impressao_digital(filepath)
+    cabecalho = ler_cabecalho(filepath)
+    dicionarios = [Dicionario() for _ in cabecalho]
+    brutos = [open(os.path.join(temporario, f"{i}.raw"), 'wb') for i in range(len(cabecalho))]
+    n = 0
+    try:
+        for lote in iter_lotes(iter_csv_latin1(filepath, colunas=tuple(cabecalho)), BLOCO_CONSTRUCAO):
+            for i, dicionario in enumerate(dicionarios):
+                dicionario.codificar(map(itemgetter(i), lote), len(lote)).astype(np.int32).tofile(brutos[i])
+            n += len(lote)
+    finally:
+        for f in brutos:
+            f.close()
+
+    colunas = []
+    for i, (nome, dicionario) in enumerate(zip(cabecalho, dicionarios)):
+        bruto = os.path.join(temporario, f"{i}.raw")
+        codigos = np.fromfile(bruto, dtype=np.int32) if n else np.zeros(0, dtype=np.int32)
+        inteiros = _como_inteiros(dicionario.valores)
+        if inteiros is not None:
+            tipo = _menor_tipo(inteiros.min(initial=0), inteiros.max(initial=0))
+            np.save(os.path.join(temporario, f"{i}.npy"), inteiros.astype(tipo)[codigos])
+            colunas.append({'nome': nome, 'tipo': 'inteiro'})
+        else:
+            np.save(os.path.join(temporario, f"{i}.npy"), codigos.astype(_menor_tipo(0, len(dicionario.valores))))
+            with open(os.path.join(temporario, f"{i}.json"), 'w', encoding='utf-8') as f:
+                json.dump(dicionario.valores, f, ensure_ascii=False)
+            colunas.append({'nome': nome, 'tipo': 'dicionario'})
+        del codigos
+        os.remove(bruto)
+
+    meta = {'formato': FORMATO, 'origem': origem, 'linhas': n, 'colunas': colunas}
+    _gravar_meta(temporario, meta)
+
+    # Troca atômica do diretório (outro processo pode ter terminado antes)
+    shutil.rmtree(destino, ignore_errors=True)
+    try:
+        os.rename(temporario, destino)
+    except OSError:
+        shutil.rmtree(temporario, ignore_errors=True)
+    return meta
+
+
+def cache_valido(filepath, cache_dir):
+    """Meta do cache se ele corresponde ao conteúdo atual do arquivo, senão None"""
+    diretorio = diretorio_cache(filepath, cache_dir)
+    meta = _ler_meta(diretorio)
+    if not meta or meta.get('formato') != FORMATO:
+        return None
+    origem = impressao_digital(filepath, meta['origem'])
+    if origem['sha256'] != meta['origem']['sha256']:
+        return None
+    if origem != meta['origem']:
+        # Mesmo conteúdo com mtime diferente: atualiza para evitar novo hash
+        meta['origem'] = origem
+        _gravar_meta(diretorio, meta)
+    return meta
+
+
+def abrir_cache(filepath, cache_dir):
+    """Abre o cache colunar do arquivo, (re)construindo-o se não existir ou estiver desatualizado"""
+    meta = cache_valido(filepath, cache_dir)
+    if meta is None:
+        print(f"Construindo cache colunar de {os.path.basename(filepath)}...")
+        os.makedirs(cache_dir, exist_ok=True)
+        meta = construir_cache(filepath, cache_dir)
+    return TabelaColunar(diretorio_cache(filepath, cache_dir), meta)
+
+
+def iter_linhas(filepath, colunas, cache_dir=None):
+    """Tuplas com as colunas pedidas, do cache colunar (se `cache_dir`) ou direto do CSV"""
+    if cache_dir:
+        return abrir_cache(filepath, cache_dir).linhas(colunas)
+    return iter_csv_latin1(filepath, colunas=colunas)
+
+
+class TabelaColunar:
+    """
+    Colunas de um arquivo em cache, abertas com np.load(mmap_mode='r').
+    As páginas são compartilhadas entre processos que abrem o mesmo cache.
+    """
+
+    def __init__(self, diretorio, meta):
+        self.diretorio = diretorio
+        self.n_linhas = meta['linhas']
+        self.tipos = {}
+        self.arrays = {}
+        for i, coluna in enumerate(meta['colunas']):
+            self.tipos[coluna['nome']] = coluna['tipo']
+            self.arrays[coluna['nome']] = np.load(os.path.join(diretorio, f"{i}.npy"), mmap_mode='r')
+        self._indices = {c['nome']: i for i, c in enumerate(meta['colunas'])}
+        self._dicionarios = {}
+
+    def __len__(self):
+        return self.n_linhas
+
+    def dicionario(self, nome):
+        """Lista de valores de uma coluna codificada (None para colunas inteiras)"""
+        if self.tipos.get(nome) != 'dicionario':
+            return None
+        if nome not in self._dicionarios:
+            caminho = os.path.join(self.diretorio, f"{self._indices[nome]}.json")
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self._dicionarios[nome] = json.load(f)
+        return self._dicionarios[nome]
+
+    def codigos(self, nome, inicio=0, fim=None):
+        """(códigos int64, valores) do trecho [inicio, fim) da coluna, com valores como texto"""
+        fim = self.n_linhas if fim is None else fim
+        if nome not in self.arrays:
+            return np.zeros(max(fim - inicio, 0), dtype=np.int64), ['']
+        trecho = self.arrays[nome][inicio:fim]
+        if self.tipos[nome] == 'dicionario':
+            return trecho.astype(np.int64), self.dicionario(nome)
+        distintos, codigos = np.unique(trecho, return_inverse=True)
+        return codigos.astype(np.int64), [str(v) for v in distintos.tolist()]
+
+    def inteiros(self, nome, inicio=0, fim=None):
+        """Trecho da coluna como int64 (texto vazio vira 0)"""
+        fim = self.n_linhas if fim is None else fim
+        if self.tipos.get(nome) == 'inteiro':
+            return self.arrays[nome][inicio:fim].astype(np.int64)
+        codigos, valores = self.codigos(nome, inicio, fim)
+        return np.array([int(v or 0) for v in valores], dtype=np.int64)[codigos]
+
+    def convertidos(self, nome, converter=None, inicio=0, fim=None):
+        """Trecho da coluna como lista, com `converter` aplicado uma vez a cada valor distinto (texto)"""
+        codigos, valores = self.codigos(nome, inicio, fim)
+        if converter:
+            valores = list(map(converter, valores))
+        return list(map(valores.__getitem__, codigos.tolist()))
+
+    def valor(self, nome, indice):
+        """Valor de uma célula como texto"""
+        if nome not in self.arrays:
+            return ''
+        v = self.arrays[nome][indice]
+        return self.dicionario(nome)[v] if self.tipos[nome] == 'dicionario' else str(v)
+
+    def linhas(self, colunas, tamanho=BLOCO_CACHE):
+        """Gera tuplas de texto como iter_csv_latin1(..., colunas=colunas)"""
+        for inicio in range(0, self.n_linhas, tamanho):
+            fim = min(inicio + tamanho, self.n_linhas)
+            valores = []
+            for nome in colunas:
+                if nome not in self.arrays:
+                    valores.append([''] * (fim - inicio))
+                elif self.tipos[nome] == 'dicionario':
+                    valores.append(list(map(self.dicionario(nome).__getitem__, self.arrays[nome][inicio:fim].tolist())))
+                else:
+                    valores.append(list(map(str, self.arrays[nome][inicio:fim].tolist())))
+            yield from zip(*valores)
@@ -0,0 +1,77 @@
+"""
+Testes do cache colunar binário
+"""
+
+import numpy as np
+import pytest
+
+from tse_agregacao import agregar_eleitorado
+from tse_cache import abrir_cache, cache_valido
+from tse_csv import iter_csv_latin1
+
+CABECALHO = ('SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA', 'DS_GENERO', 'DS_FAIXA_ETARIA',
+             'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_PERFIL', 'QT_ELEITORES_BIOMETRIA', 'QT_ELEITORES_DEFICIENCIA')
+
+LINHAS = [
+    ('RO', '00035', 'ALTA FLORESTA D OESTE', '6', 'MASCULINO', '21 A 24 ANOS', 'ENSINO MÉDIO COMPLETO', '10', '8', '1'),
+    ('RO', '00035', 'ALTA FLORESTA D OESTE', '6', 'FEMININO', '70 A 74 ANOS', 'ANALFABETO', '4', '4', '0'),
+    ('RO', '00043', 'ARIQUEMES', '7', 'FEMININO', '16 ANOS', 'NÃO INFORMADO', '300', '0', '2'),
+    ('RO', '00043', 'ARIQUEMES', '23', 'NÃO INFORMADO', 'INVÁLIDO', 'SUPERIOR COMPLETO', '1', '1', '0'),
+]
+
+
+def _gravar(caminho, linhas):
+    with open(caminho, 'w', encoding='latin-1', newline='') as f:
+        for linha in (CABECALHO,) + tuple(linhas):
+            f.write(';'.join(f'"{v}"' for v in linha) + '\r\n')
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = str(tmp_path / "perfil_eleitorado_2024_RO.csv")
+    _gravar(caminho, LINHAS)
+    return caminho
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_linhas_iguais_as_do_csv(arquivo, cache_dir):
+    colunas = ('NM_MUNICIPIO', 'CD_MUNICIPIO', 'NR_ZONA', 'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_PERFIL', 'AUSENTE')
+    tabela = abrir_cache(arquivo, cache_dir)
+    assert len(tabela) == len(LINHAS)
+    assert list(tabela.linhas(colunas, tamanho=3)) == list(iter_csv_latin1(arquivo, colunas=colunas))
+
+
+def test_tipos_das_colunas(arquivo, cache_dir):
+    tabela = abrir_cache(arquivo, cache_dir)
+    # Zeros à esquerda são preservados como texto
+    assert tabela.tipos['CD_MUNICIPIO'] == 'dicionario'
+    assert tabela.dicionario('CD_MUNICIPIO') == ['00035', '00043']
+    assert tabela.tipos['QT_ELEITORES_PERFIL'] == 'inteiro'
+    assert tabela.arrays['QT_ELEITORES_PERFIL'].dtype == np.uint16
+    assert isinstance(tabela.arrays['QT_ELEITORES_PERFIL'], np.memmap)
+    assert tabela.inteiros('QT_ELEITORES_PERFIL', 1, 3).tolist() == [4, 300]
+
+
+def test_agregacao_pelo_cache_igual_a_do_csv(arquivo, cache_dir):
+    assert agregar_eleitorado(arquivo, tamanho_lote=3, cache_dir=cache_dir) == agregar_eleitorado(arquivo, tamanho_lote=3)
+
+
+def test_cache_invalidado_quando_o_arquivo_muda(arquivo, cache_dir):
+    abrir_cache(arquivo, cache_dir)
+    assert cache_valido(arquivo, cache_dir) is not None
+
+    _gravar(arquivo, LINHAS[:2])
+    assert cache_valido(arquivo, cache_dir) is None
+    assert len(abrir_cache(arquivo, cache_dir)) == 2
+
+
+def test_arquivo_sem_linhas(tmp_path, cache_dir):
+    caminho = str(tmp_path / "vazio.csv")
+    _gravar(caminho, [])
+    tabela = abrir_cache(caminho, cache_dir)
+    assert len(tabela) == 0
+    assert list(tabela.linhas(CABECALHO)) == []
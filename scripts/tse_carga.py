@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Carga em lote no banco de dados DTE
+Modos: INSERT multi-linhas limitado por tamanho, executemany e LOAD DATA LOCAL INFILE
+Funciona com mysql.connector (TiDB/MySQL) e com sqlite3 como banco local de testes
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+from tse_metricas import avancar
+
+MODOS_CARGA = ('multi', 'executemany', 'load_data')
+
+# Limite padrão de bytes por comando (abaixo do max_allowed_packet padrão de 16 MiB do TiDB/MySQL)
+MAX_BYTES_PADRAO = 4 * 1024 * 1024
+
+
+def eh_sqlite(conn):
+    """Indica se a conexão é sqlite3 (placeholders '?' e INSERT OR IGNORE)"""
+    return isinstance(conn, sqlite3.Connection)
+
+
+def tamanho_estimado(linha):
+    """Bytes aproximados que a linha ocupa em um comando INSERT"""
+    return sum(4 if v is None else len(str(v)) + 3 for v in linha) + 4
+
+
+def escapar_load_data(valor):
+    """Formata um valor para arquivo de LOAD DATA (campos separados por tab, NULL como \\N)"""
+    if valor is None:
+        return '\\N'
+    texto = str(valor)
+    if '\\' in texto or '\t' in texto or '\n' in texto or '\r' in texto:
+        texto = (texto.replace('\\', '\\\\').replace('\t', '\\t')
+                 .replace('\n', '\\n').replace('\r', '\\r'))
+    return texto
+
+
+class CarregadorBulk:
+    """
+    Insere linhas (tuplas) em lotes, com commit a cada `linhas_por_transacao` linhas.
+
+    No modo 'multi' cada comando INSERT agrupa até `tamanho_lote` linhas e nunca
+    passa de `max_bytes`. No modo 'load_data' cada transação é gravada em um
+    arquivo temporário e enviada com LOAD DATA LOCAL INFILE (apenas MySQL/TiDB,
+    com allow_local_infile=True na conexão). Com `relatar=False` as estatísticas
+    por tabela não são impressas (ex.: uma carga por partição).
+    """
+
+    def __init__(self, conn, modo='multi', tamanho_lote=1000, linhas_por_transacao=50_000,
+                 max_bytes=MAX_BYTES_PADRAO, relatar=True):
+        if modo not in MODOS_CARGA:
+            raise ValueError(f"Modo de carga inválido: {modo} (use {', '.join(MODOS_CARGA)})")
+        if modo == 'load_data' and eh_sqlite(conn):
+            raise ValueError("LOAD DATA LOCAL INFILE não é suportado pelo sqlite3")
+        self.conn = conn
+        self.modo = modo
+        self.tamanho_lote = tamanho_lote
+        self.linhas_por_transacao = linhas_por_transacao
+        self.max_bytes = max_bytes
+        self.placeholder = '?' if eh_sqlite(conn) else '%s'
+        self.relatar = relatar
+        self.estatisticas = {}
+
+    def _prefixo_insert(self, tabela, colunas, ignorar):
+        if not ignorar:
+            verbo = 'INSERT'
+        elif eh_sqlite(self.conn):
+            verbo = 'INSERT OR IGNORE'
+        else:
+            verbo = 'INSERT IGNORE'
+        return f"{verbo} INTO {tabela} ({', '.join(colunas)}) VALUES "
+
+    def inserir(self, tabela, colunas, linhas, ignorar=False, ao_confirmar=None):
+        """
+        Insere as linhas na tabela e retorna a quantidade enviada.
+        `ao_confirmar(total)` é chamado após cada commit com o total de linhas já confirmadas.
+        """
+        inicio = time.perf_counter()
+        cursor = self.conn.cursor()
+        enviar = {
+            'multi': self._enviar_multi,
+            'executemany': self._enviar_executemany,
+            'load_data': self._enviar_load_data,
+        }[self.modo]
+
+        total = 0
+        transacao = []
+        for linha in linhas:
+            transacao.append(linha)
+            if len(transacao) >= self.linhas_por_transacao:
+                enviar(cursor, tabela, colunas, transacao, ignorar)
+                self.conn.commit()
+                total += len(transacao)
+                avancar(0, len(transacao))
+                transacao = []
+                if ao_confirmar:
+                    ao_confirmar(total)
+        if transacao:
+            enviar(cursor, tabela, colunas, transacao, ignorar)
+            total += len(transacao)
+        self.conn.commit()
+        avancar(0, len(transacao))
+        if transacao and ao_confirmar:
+            ao_confirmar(total)
+
+        self._registrar(tabela, total, time.perf_counter() - inicio)
+        return total
+
+    def _enviar_multi(self, cursor, tabela, colunas, linhas, ignorar):
+        prefixo = self._prefixo_insert(tabela, colunas, ignorar)
+        tupla = f"({', '.join([self.placeholder] * len(colunas))})"
+        lote, parametros, tamanho = 0, [], len(prefixo)
+        for linha in linhas:
+            tam_linha = tamanho_estimado(linha)
+            if lote and (lote >= self.tamanho_lote or tamanho + tam_linha > self.max_bytes):
+                cursor.execute(prefixo + ', '.join([tupla] * lote), parametros)
+                lote, parametros, tamanho = 0, [], len(prefixo)
+            parametros.extend(linha)
+            lote += 1
+            tamanho += tam_linha
+        if lote:
+            cursor.execute(prefixo + ', '.join([tupla] * lote), parametros)
+
+    def _enviar_executemany(self, cursor, tabela, colunas, linhas, ignorar):
+        sql = self._prefixo_insert(tabela, colunas, ignorar) + f"({', '.join([self.placeholder] * len(colunas))})"
+        for i in range(0, len(linhas), self.tamanho_lote):
+            cursor.executemany(sql, linhas[i:i + self.tamanho_lote])
+
+    def _enviar_load_data(self, cursor, tabela, colunas, linhas, ignorar):
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False) as f:
+            for linha in linhas:
+                f.write('\t'.join(map(escapar_load_data, linha)))
+                f.write('\n')
+            caminho = f.name
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{caminho}' {'IGNORE' if ignorar else ''} INTO TABLE {tabela} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                f"({', '.join(colunas)})"
+            )
+        finally:
+            os.unlink(caminho)
+
+    def _registrar(self, tabela, linhas, segundos):
+        anterior = self.estatisticas.get(tabela, {'linhas': 0, 'segundos': 0.0})
+        linhas += anterior['linhas']
+        segundos += anterior['segundos']
+        taxa = linhas / segundos if segundos > 0 else 0.0
+        self.estatisticas[tabela] = {'linhas': linhas, 'segundos': segundos, 'linhas_por_segundo': taxa}
+        if self.relatar:
+            print(f"  {tabela}: {linhas} linhas em {segundos:.2f}s ({taxa:,.0f} linhas/s, modo {self.modo})")
@@ -0,0 +1,79 @@
+"""
+Testes da carga em lote usando sqlite3 como banco local
+"""
+
+import pytest
+
+from tse_carga import CarregadorBulk, escapar_load_data
+
+ESQUEMA = "CREATE TABLE zonas (numero INTEGER, nome TEXT, UNIQUE (numero));"
+
+
+@pytest.fixture
+def conexao(banco):
+    return banco(ESQUEMA)
+
+
+def _contar_inserts(conexao):
+    """Lista que recebe cada comando INSERT executado na conexão"""
+    comandos = []
+    conexao.set_trace_callback(lambda sql: sql.startswith('INSERT') and comandos.append(sql))
+    return comandos
+
+
+def _linhas(n):
+    return [(i, f"Zona {i}") for i in range(1, n + 1)]
+
+
+@pytest.mark.parametrize("modo", ['multi', 'executemany'])
+def test_insere_todas_as_linhas(conexao, modo):
+    carga = CarregadorBulk(conexao, modo=modo, tamanho_lote=7, linhas_por_transacao=20)
+    assert carga.inserir('zonas', ('numero', 'nome'), iter(_linhas(50))) == 50
+    assert conexao.execute("SELECT COUNT(*), SUM(numero) FROM zonas").fetchone() == (50, 1275)
+    assert carga.estatisticas['zonas']['linhas'] == 50
+
+
+def test_multi_agrupa_por_lote_dentro_da_transacao(conexao):
+    comandos = _contar_inserts(conexao)
+    CarregadorBulk(conexao, tamanho_lote=7, linhas_por_transacao=20).inserir('zonas', ('numero', 'nome'), _linhas(50))
+    # Transações de 20, 20 e 10 linhas, em comandos de até 7 linhas
+    assert len(comandos) == 8
+
+
+def test_ao_confirmar_recebe_total_apos_cada_commit(conexao):
+    confirmados = []
+    CarregadorBulk(conexao, linhas_por_transacao=20).inserir(
+        'zonas', ('numero', 'nome'), _linhas(50), ao_confirmar=confirmados.append
+    )
+    assert confirmados == [20, 40, 50]
+
+
+def test_multi_respeita_limite_de_bytes(conexao):
+    comandos = _contar_inserts(conexao)
+    CarregadorBulk(conexao, tamanho_lote=1000, max_bytes=80).inserir('zonas', ('numero', 'nome'), _linhas(10))
+    assert conexao.execute("SELECT COUNT(*) FROM zonas").fetchone() == (10,)
+    assert len(comandos) == 5  # duas linhas por comando
+
+
+def test_ignorar_duplicadas(conexao):
+    carga = CarregadorBulk(conexao)
+    carga.inserir('zonas', ('numero', 'nome'), _linhas(5), ignorar=True)
+    carga.inserir('zonas', ('numero', 'nome'), _linhas(8), ignorar=True)
+    assert conexao.execute("SELECT COUNT(*) FROM zonas").fetchone() == (8,)
+    assert carga.estatisticas['zonas']['linhas'] == 13
+
+
+def test_valores_nulos(conexao):
+    CarregadorBulk(conexao).inserir('zonas', ('numero', 'nome'), [(1, None)])
+    assert conexao.execute("SELECT nome FROM zonas").fetchone() == (None,)
+
+
+def test_load_data_indisponivel_no_sqlite(conexao):
+    with pytest.raises(ValueError):
+        CarregadorBulk(conexao, modo='load_data')
+
+
+def test_escapar_load_data():
+    assert escapar_load_data(None) == '\\N'
+    assert escapar_load_data(12) == '12'
+    assert escapar_load_data('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
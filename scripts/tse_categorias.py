@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tabelas de classificação do perfil do eleitorado do TSE
+Mapeiam cada rótulo de gênero, faixa etária e grau de escolaridade
+para o contador correspondente da tabela `eleitorado`
+"""
+
+import re
+import unicodedata
+
+# ==================== GÊNERO ====================
+
+# DS_GENERO normalizado -> contador
+GENERO_POR_ROTULO = {
+    'MASCULINO': 'eleitoresMasculino',
+    'FEMININO': 'eleitoresFeminino',
+    'NAO INFORMADO': 'eleitoresOutros',
+}
+
+# ==================== FAIXA ETÁRIA ====================
+
+# Faixas da tabela `eleitorado`: (contador, idade mínima, idade máxima)
+FAIXAS = (
+    ('faixa16a17', 16, 17),
+    ('faixa18a24', 18, 24),
+    ('faixa25a34', 25, 34),
+    ('faixa35a44', 35, 44),
+    ('faixa45a59', 45, 59),
+    ('faixa60a69', 60, 69),
+    ('faixa70mais', 70, None),
+)
+
+# DS_FAIXA_ETARIA normalizado -> contador (None = rótulo conhecido que não entra em nenhuma faixa)
+FAIXA_POR_ROTULO = {
+    # Dicionário atual (2020 em diante)
+    '16 ANOS': 'faixa16a17',
+    '17 ANOS': 'faixa16a17',
+    '18 ANOS': 'faixa18a24',
+    '19 ANOS': 'faixa18a24',
+    '20 ANOS': 'faixa18a24',
+    '21 A 24 ANOS': 'faixa18a24',
+    '25 A 29 ANOS': 'faixa25a34',
+    '30 A 34 ANOS': 'faixa25a34',
+    '35 A 39 ANOS': 'faixa35a44',
+    '40 A 44 ANOS': 'faixa35a44',
+    '45 A 49 ANOS': 'faixa45a59',
+    '50 A 54 ANOS': 'faixa45a59',
+    '55 A 59 ANOS': 'faixa45a59',
+    '60 A 64 ANOS': 'faixa60a69',
+    '65 A 69 ANOS': 'faixa60a69',
+    '70 A 74 ANOS': 'faixa70mais',
+    '75 A 79 ANOS': 'faixa70mais',
+    '80 A 84 ANOS': 'faixa70mais',
+    '85 A 89 ANOS': 'faixa70mais',
+    '90 A 94 ANOS': 'faixa70mais',
+    '95 A 99 ANOS': 'faixa70mais',
+    '100 ANOS OU MAIS': 'faixa70mais',
+    'INVALIDO': None,
+    # Dicionário anterior (até 2018)
+    '18 A 20 ANOS': 'faixa18a24',
+    '25 A 34 ANOS': 'faixa25a34',
+    '35 A 44 ANOS': 'faixa35a44',
+    '45 A 59 ANOS': 'faixa45a59',
+    '60 A 69 ANOS': 'faixa60a69',
+    '70 A 79 ANOS': 'faixa70mais',
+    'SUPERIOR A 79 ANOS': 'faixa70mais',
+    'INVALIDA': None,
+}
+
+# ==================== ESCOLARIDADE ====================
+
+# DS_GRAU_ESCOLARIDADE normalizado -> contador
+ESCOLARIDADE_POR_ROTULO = {
+    'ANALFABETO': 'escolaridadeAnalfabeto',
+    'LE E ESCREVE': 'escolaridadeAnalfabeto',
+    'ENSINO FUNDAMENTAL INCOMPLETO': 'escolaridadeFundamental',
+    'ENSINO FUNDAMENTAL COMPLETO': 'escolaridadeFundamental',
+    'ENSINO MEDIO INCOMPLETO': 'escolaridadeMedio',
+    'ENSINO MEDIO COMPLETO': 'escolaridadeMedio',
+    'SUPERIOR INCOMPLETO': 'escolaridadeSuperior',
+    'SUPERIOR COMPLETO': 'escolaridadeSuperior',
+    'NAO INFORMADO': None,
+    # Dicionário anterior (até 2018)
+    'PRIMEIRO GRAU INCOMPLETO': 'escolaridadeFundamental',
+    'PRIMEIRO GRAU COMPLETO': 'escolaridadeFundamental',
+    'SEGUNDO GRAU INCOMPLETO': 'escolaridadeMedio',
+    'SEGUNDO GRAU COMPLETO': 'escolaridadeMedio',
+}
+
+# Rótulos vistos que não constam nas tabelas, por dimensão
+DESCONHECIDOS = {'genero': set(), 'faixa': set(), 'escolaridade': set()}
+
+_cache = {'genero': {}, 'faixa': {}, 'escolaridade': {}}
+
+_RE_INTERVALO = re.compile(r'^(\d+) A (\d+) ANOS$')
+_RE_IDADE = re.compile(r'^(\d+) ANOS( OU MAIS)?$')
+_RE_SUPERIOR_A = re.compile(r'^SUPERIOR A (\d+) ANOS$')
+
+
+def normalizar(rotulo):
+    """Maiúsculas, sem acentos e com espaços simples"""
+    sem_acentos = unicodedata.normalize('NFKD', rotulo).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.upper().split())
+
+
+def faixa_por_idades(minima, maxima):
+    """Contador cuja faixa contém o intervalo [minima, maxima] (maxima None = sem limite)"""
+    for contador, inicio, fim in FAIXAS:
+        if minima >= inicio and (fim is None or (maxima is not None and maxima <= fim)):
+            return contador
+    return None
+
+
+def _faixa_por_padrao(rotulo):
+    """Interpreta rótulos fora da tabela no formato do TSE ('NN A MM ANOS', 'NN ANOS OU MAIS', ...)"""
+    m = _RE_INTERVALO.match(rotulo)
+    if m:
+        return faixa_por_idades(int(m.group(1)), int(m.group(2)))
+    m = _RE_IDADE.match(rotulo)
+    if m:
+        idade = int(m.group(1))
+        return faixa_por_idades(idade, None if m.group(2) else idade)
+    m = _RE_SUPERIOR_A.match(rotulo)
+    if m:
+        return faixa_por_idades(int(m.group(1)) + 1, None)
+    return None
+
+
+def _classificar(dimensao, rotulo, tabela, padrao=None):
+    cache = _cache[dimensao]
+    if rotulo in cache:
+        return cache[rotulo]
+    chave = normalizar(rotulo)
+    if chave in tabela:
+        contador = tabela[chave]
+    else:
+        contador = padrao(chave) if padrao else None
+        if contador is None:
+            DESCONHECIDOS[dimensao].add(rotulo)
+    cache[rotulo] = contador
+    return contador
+
+
+def classificar_genero(ds_genero):
+    """Contador de gênero para um rótulo DS_GENERO (desconhecidos contam como outros)"""
+    return _classificar('genero', ds_genero, GENERO_POR_ROTULO) or 'eleitoresOutros'
+
+
+def classificar_faixa(ds_faixa):
+    """Contador de faixa etária para um rótulo DS_FAIXA_ETARIA (None se não classificado)"""
+    return _classificar('faixa', ds_faixa, FAIXA_POR_ROTULO, _faixa_por_padrao)
+
+
+def classificar_escolaridade(ds_escolaridade):
+    """Contador de escolaridade para um rótulo DS_GRAU_ESCOLARIDADE (None se não classificado)"""
+    return _classificar('escolaridade', ds_escolaridade, ESCOLARIDADE_POR_ROTULO)
+
+
+def relatar_desconhecidos():
+    """Imprime os rótulos que não puderam ser classificados"""
+    for dimensao, rotulos in DESCONHECIDOS.items():
+        if rotulos:
+            print(f"Aviso: rótulos de {dimensao} não classificados: {', '.join(sorted(rotulos))}")
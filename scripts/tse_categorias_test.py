@@ -0,0 +1,114 @@
+"""
+Testes das tabelas de classificação do perfil do eleitorado
+Fixam o contador de cada rótulo do dicionário de dados do TSE
+"""
+
+import pytest
+
+import tse_categorias
+from tse_categorias import (
+    classificar_escolaridade, classificar_faixa, classificar_genero, normalizar
+)
+
+
+@pytest.fixture(autouse=True)
+def limpar_desconhecidos():
+    for rotulos in tse_categorias.DESCONHECIDOS.values():
+        rotulos.clear()
+    for cache in tse_categorias._cache.values():
+        cache.clear()
+
+
+@pytest.mark.parametrize("rotulo,contador", [
+    ("MASCULINO", "eleitoresMasculino"),
+    ("FEMININO", "eleitoresFeminino"),
+    ("NÃO INFORMADO", "eleitoresOutros"),
+])
+def test_genero(rotulo, contador):
+    assert classificar_genero(rotulo) == contador
+
+
+@pytest.mark.parametrize("rotulo,contador", [
+    ("16 anos", "faixa16a17"),
+    ("17 anos", "faixa16a17"),
+    ("18 anos", "faixa18a24"),
+    ("19 anos", "faixa18a24"),
+    ("20 anos", "faixa18a24"),
+    ("21 a 24 anos", "faixa18a24"),
+    ("25 a 29 anos", "faixa25a34"),
+    ("30 a 34 anos", "faixa25a34"),
+    ("35 a 39 anos", "faixa35a44"),
+    ("40 a 44 anos", "faixa35a44"),
+    ("45 a 49 anos", "faixa45a59"),
+    ("50 a 54 anos", "faixa45a59"),
+    ("55 a 59 anos", "faixa45a59"),
+    ("60 a 64 anos", "faixa60a69"),
+    ("65 a 69 anos", "faixa60a69"),
+    ("70 a 74 anos", "faixa70mais"),
+    ("75 a 79 anos", "faixa70mais"),
+    ("80 a 84 anos", "faixa70mais"),
+    ("85 a 89 anos", "faixa70mais"),
+    ("90 a 94 anos", "faixa70mais"),
+    ("95 a 99 anos", "faixa70mais"),
+    ("100 anos ou mais", "faixa70mais"),
+    ("Inválido", None),
+    # Dicionário anterior (até 2018)
+    ("16 ANOS", "faixa16a17"),
+    ("17 ANOS", "faixa16a17"),
+    ("18 A 20 ANOS", "faixa18a24"),
+    ("21 A 24 ANOS", "faixa18a24"),
+    ("25 A 34 ANOS", "faixa25a34"),
+    ("35 A 44 ANOS", "faixa35a44"),
+    ("45 A 59 ANOS", "faixa45a59"),
+    ("60 A 69 ANOS", "faixa60a69"),
+    ("70 A 79 ANOS", "faixa70mais"),
+    ("SUPERIOR A 79 ANOS", "faixa70mais"),
+    ("INVÁLIDA", None),
+])
+def test_faixa_etaria(rotulo, contador):
+    assert classificar_faixa(rotulo) == contador
+    assert not tse_categorias.DESCONHECIDOS['faixa']
+
+
+@pytest.mark.parametrize("rotulo,contador", [
+    ("ANALFABETO", "escolaridadeAnalfabeto"),
+    ("LÊ E ESCREVE", "escolaridadeAnalfabeto"),
+    ("ENSINO FUNDAMENTAL INCOMPLETO", "escolaridadeFundamental"),
+    ("ENSINO FUNDAMENTAL COMPLETO", "escolaridadeFundamental"),
+    ("ENSINO MÉDIO INCOMPLETO", "escolaridadeMedio"),
+    ("ENSINO MÉDIO COMPLETO", "escolaridadeMedio"),
+    ("SUPERIOR INCOMPLETO", "escolaridadeSuperior"),
+    ("SUPERIOR COMPLETO", "escolaridadeSuperior"),
+    ("NÃO INFORMADO", None),
+    # Dicionário anterior (até 2018)
+    ("PRIMEIRO GRAU INCOMPLETO", "escolaridadeFundamental"),
+    ("PRIMEIRO GRAU COMPLETO", "escolaridadeFundamental"),
+    ("SEGUNDO GRAU INCOMPLETO", "escolaridadeMedio"),
+    ("SEGUNDO GRAU COMPLETO", "escolaridadeMedio"),
+])
+def test_escolaridade(rotulo, contador):
+    assert classificar_escolaridade(rotulo) == contador
+    assert not tse_categorias.DESCONHECIDOS['escolaridade']
+
+
+def test_normalizar_ignora_acentos_caixa_e_espacos():
+    assert normalizar("  Lê  e escreve ") == "LE E ESCREVE"
+
+
+def test_faixa_fora_da_tabela_usa_intervalo():
+    assert classificar_faixa("18 a 19 anos") == "faixa18a24"
+    assert classificar_faixa("75 anos ou mais") == "faixa70mais"
+    assert not tse_categorias.DESCONHECIDOS['faixa']
+
+
+def test_faixa_que_cruza_limites_e_relatada():
+    assert classificar_faixa("20 a 29 anos") is None
+    assert tse_categorias.DESCONHECIDOS['faixa'] == {"20 a 29 anos"}
+
+
+def test_rotulos_desconhecidos_sao_relatados_uma_vez():
+    assert classificar_genero("OUTRO") == "eleitoresOutros"
+    assert classificar_escolaridade("DOUTORADO") is None
+    assert classificar_escolaridade("DOUTORADO") is None
+    assert tse_categorias.DESCONHECIDOS['genero'] == {"OUTRO"}
+    assert tse_categorias.DESCONHECIDOS['escolaridade'] == {"DOUTORADO"}
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Leitura em streaming dos arquivos CSV do TSE
+Os arquivos usam encoding Latin-1, separador ';' e todos os campos entre aspas
+"""
+
+import csv
+import io
+from itertools import islice
+from operator import itemgetter
+
+from tse_zip import abrir_binario, separar, tamanho
+
+# Tamanho do buffer de leitura (1 MiB) - reduz chamadas de sistema em arquivos grandes
+BUFFER_LEITURA = 1 << 20
+
+
+class DialetoTSE(csv.Dialect):
+    """Dialeto CSV dos arquivos do TSE: aspas são tratadas pelo parser, não por campo"""
+    delimiter = ';'
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = '\n'
+    quoting = csv.QUOTE_MINIMAL
+    strict = False
+
+
+csv.register_dialect('tse', DialetoTSE)
+
+
+def abrir_csv_latin1(filepath):
+    """Abre o arquivo CSV (ou membro de .zip, descomprimido em streaming) em modo texto Latin-1 com buffer grande"""
+    if separar(filepath) is None:
+        return open(filepath, 'r', encoding='latin-1', newline='', buffering=BUFFER_LEITURA)
+    return io.TextIOWrapper(io.BufferedReader(abrir_binario(filepath), BUFFER_LEITURA),
+                            encoding='latin-1', newline='')
+
+
+def ler_cabecalho(filepath, delimiter=';'):
+    """Retorna a lista de colunas do arquivo sem ler o restante"""
+    with abrir_csv_latin1(filepath) as f:
+        return next(csv.reader(f, 'tse', delimiter=delimiter), [])
+
+
+def estimar_linhas(filepath, amostra=BUFFER_LEITURA):
+    """Linhas de dados do arquivo: exato se couber na amostra, senão pelo tamanho médio das linhas iniciais"""
+    total = tamanho(filepath)
+    with abrir_binario(filepath) as f:
+        bloco = f.read(amostra)
+    quebras = bloco.count(b'\n')
+    if len(bloco) >= total:
+        return max(quebras - 1 + (not bloco.endswith(b'\n') and bool(bloco)), 0)
+    if quebras < 2:
+        return None
+    cabecalho = bloco.index(b'\n') + 1
+    media = (bloco.rindex(b'\n') + 1 - cabecalho) / (quebras - 1)
+    return round((total - cabecalho) / media)
+
+
+def iter_csv_latin1(filepath, delimiter=';', colunas=None):
+    """
+    Lê o CSV de forma preguiçosa, uma linha por vez (memória constante).
+
+    Sem `colunas`, gera dicts {coluna: valor}. Com `colunas`, gera tuplas apenas
+    com os valores dessas colunas, na ordem pedida (modo por índice de coluna).
+    Colunas ausentes no arquivo geram string vazia.
+    """
+    with abrir_csv_latin1(filepath) as f:
+        reader = csv.reader(f, 'tse', delimiter=delimiter)
+        cabecalho = next(reader, None)
+        if cabecalho is None:
+            return
+
+        if colunas is None:
+            for row in reader:
+                if row:
+                    yield dict(zip(cabecalho, row))
+            return
+
+        indices = {nome: i for i, nome in enumerate(cabecalho)}
+        largura = len(cabecalho)
+        # Colunas ausentes apontam para um campo vazio além do fim da linha
+        posicoes = [indices.get(nome, largura) for nome in colunas]
+        if len(posicoes) == 1:
+            pos = posicoes[0]
+            extrair = lambda row: (row[pos],)
+        else:
+            extrair = itemgetter(*posicoes)
+
+        # Linhas curtas (truncadas ou irregulares, como uma última linha gravada pela metade)
+        # são completadas com campos vazios, como fazia o DictReader
+        minimo = max(posicoes) + 1
+        for row in reader:
+            if row:
+                if len(row) < minimo:
+                    row += [''] * (minimo - len(row))
+                yield extrair(row)
+
+
+def iter_lotes(linhas, tamanho=250_000):
+    """Agrupa um iterável de linhas em listas de até `tamanho` elementos"""
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
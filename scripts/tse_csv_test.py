@@ -0,0 +1,27 @@
+"""
+Testes da leitura em streaming dos CSV do TSE
+"""
+
+from tse_csv import iter_csv_latin1
+
+
+def _csv(tmp_path, texto):
+    caminho = tmp_path / 'consulta.csv'
+    caminho.write_bytes(texto.encode('latin-1'))
+    return str(caminho)
+
+
+def test_projecao_por_coluna(tmp_path):
+    arquivo = _csv(tmp_path, '"A";"B";"C"\n"1";"São";"3"\n\n"4";"5";"6"\n')
+    assert list(iter_csv_latin1(arquivo, colunas=('C', 'B'))) == [('3', 'São'), ('6', '5')]
+    assert list(iter_csv_latin1(arquivo, colunas=('A',))) == [('1',), ('4',)]
+    assert list(iter_csv_latin1(arquivo, colunas=('B', 'X'))) == [('São', ''), ('5', '')]
+    assert next(iter_csv_latin1(arquivo)) == {'A': '1', 'B': 'São', 'C': '3'}
+
+
+def test_linhas_curtas_completadas_com_vazio(tmp_path):
+    # Linha irregular no meio e última linha gravada pela metade
+    arquivo = _csv(tmp_path, '"A";"B";"C"\n"1";"2"\n"4";"5";"6"\n"7"')
+    assert list(iter_csv_latin1(arquivo, colunas=('A', 'B', 'C'))) == [('1', '2', ''), ('4', '5', '6'), ('7', '', '')]
+    assert list(iter_csv_latin1(arquivo, colunas=('C',))) == [('',), ('6',), ('',)]
+    assert list(iter_csv_latin1(arquivo, colunas=('C', 'X'))) == [('', ''), ('6', ''), ('', '')]
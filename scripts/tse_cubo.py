@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Cubo de agregados do eleitorado (tabela `eleitorado_cubo`)
+Totais pré-somados por ano x município x zona x gênero x faixa etária x escolaridade,
+incluindo todas as combinações de "todos", para que cada filtro da API leia poucas linhas pela chave
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+TABELA_CUBO = 'eleitorado_cubo'
+
+COLUNAS_CUBO = (
+    'anoEleicao', 'municipioId', 'zonaId', 'genero', 'faixaEtaria', 'escolaridade', 'totalEleitores'
+)
+
+# "Todos" em cada dimensão (as colunas fazem parte da chave primária e não aceitam NULL)
+TODOS = 0
+TODAS = ''
+
+# Faixa etária ou escolaridade sem classificação (contam apenas nos totais)
+NAO_INFORMADO = 'naoInformado'
+
+
+def celulas_cubo(agregador):
+    """
+    Células de um AgregadorEleitorado, por município:
+    {codigo_municipio: [(zona, genero, faixa, escolaridade, eleitores), ...]}.
+    As categorias são os nomes dos contadores da tabela `eleitorado` (ex.: 'faixa18a24').
+    """
+    categorias = [
+        (genero, faixa or NAO_INFORMADO, escolaridade or NAO_INFORMADO)
+        for genero, faixa, escolaridade in agregador.categorias()
+    ]
+    distintas = sorted(set(categorias))
+    indice = {c: i for i, c in enumerate(distintas)}
+
+    # Combinações originais que caem na mesma categoria classificada são somadas
+    m = np.zeros((len(categorias), len(distintas)), dtype=np.int64)
+    for i, c in enumerate(categorias):
+        m[i, indice[c]] = 1
+    qt = agregador.qt @ m
+
+    celulas = defaultdict(list)
+    grupos, colunas = np.nonzero(qt)
+    for g, c, total in zip(grupos.tolist(), colunas.tolist(), qt[grupos, colunas].tolist()):
+        chave = agregador.grupos.valores[g]
+        municipio = agregador.municipios.valores[chave >> 20]
+        zona = agregador.zonas.valores[chave & 0xFFFFF]
+        celulas[municipio].append((zona, *distintas[c], total))
+    for lista in celulas.values():
+        lista.sort()
+    return dict(celulas)
+
+
+def expandir(ano, municipio_id, celulas):
+    """
+    Linhas do cubo de um município no ano: cada célula (zonaId, genero, faixa, escolaridade, eleitores)
+    soma em todas as combinações dela com "todos". Zonas sem id entram apenas no total do município.
+    """
+    totais = defaultdict(int)
+    for zona_id, genero, faixa, escolaridade, qt in celulas:
+        for z in ((zona_id, TODOS) if zona_id else (TODOS,)):
+            for g in (genero, TODAS):
+                for f in (faixa, TODAS):
+                    for e in (escolaridade, TODAS):
+                        totais[(z, g, f, e)] += qt
+    return [(ano, municipio_id, *chave, qt) for chave, qt in sorted(totais.items())]
+
+
+def _rollup(cursor, fixos, filtro, parametros):
+    """INSERT ... SELECT que soma as linhas do filtro, com `fixos` (coluna -> expressão) no lugar das dimensões somadas"""
+    selecao = [fixos.get(c, c) for c in COLUNAS_CUBO[:-1]] + ['SUM(totalEleitores)']
+    cursor.execute(
+        f"INSERT INTO {TABELA_CUBO} ({', '.join(COLUNAS_CUBO)}) "
+        f"SELECT {', '.join(selecao)} FROM {TABELA_CUBO} WHERE {filtro} "
+        f"GROUP BY {', '.join(c for c in COLUNAS_CUBO[:-1] if c not in fixos)}",
+        parametros
+    )
+
+
+def atualizar_cubo(conn, carga, ano, linhas_por_municipio, removidos=(), escritor=None, total_nacional=True):
+    """
+    Atualiza o cubo para um ano: substitui as linhas dos municípios em `linhas_por_municipio`
+    ({municipioId: linhas de expandir()}) e remove as de `removidos`. Depois recalcula no banco
+    só o que depende deles: o município "todos" do ano e o ano "todos" desses municípios.
+    Com `escritor` (EscritorParalelo), cada município é gravado em uma transação própria, em paralelo.
+    Sem `total_nacional` (cargas por UF em paralelo), o município "todos" fica para
+    recalcular_total_nacional, chamado uma vez ao final.
+    Retorna a quantidade de linhas de municípios inseridas.
+    """
+    municipios = sorted(set(linhas_por_municipio) | set(removidos))
+    if not municipios:
+        return 0
+    p = carga.placeholder
+    cursor = conn.cursor()
+
+    if escritor:
+        def limpar(cursor_particao, placeholder, municipio_id):
+            cursor_particao.execute(
+                f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao = {placeholder} AND municipioId = {placeholder}",
+                [ano, municipio_id])
+        inseridas = escritor.gravar(TABELA_CUBO, COLUNAS_CUBO,
+                                    {m: linhas_por_municipio.get(m, []) for m in municipios}, limpar)
+    else:
+        lista = ', '.join([p] * len(municipios))
+        cursor.execute(f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao = {p} AND municipioId IN ({lista})",
+                       [ano, *municipios])
+        conn.commit()
+        inseridas = carga.inserir(TABELA_CUBO, COLUNAS_CUBO,
+                                  (linha for linhas in linhas_por_municipio.values() for linha in linhas))
+
+    if total_nacional:
+        _municipio_todos(cursor, p, ano)
+        municipios.append(TODOS)
+        _ano_todos_ou_completo(conn, cursor, p, municipios)
+    else:
+        _ano_todos(cursor, p, municipios)
+    conn.commit()
+    return inseridas
+
+
+def recalcular_total_nacional(conn, carga, ano):
+    """Município "todos" do ano e do ano "todos", depois das cargas por UF feitas com total_nacional=False"""
+    cursor = conn.cursor()
+    _municipio_todos(cursor, carga.placeholder, ano)
+    _ano_todos_ou_completo(conn, cursor, carga.placeholder, [TODOS])
+    conn.commit()
+
+
+def cubo_cobre_ano(conn, placeholder, ano):
+    """
+    Se o cubo tem o total geral do ano (`ano` = TODOS para o ano "todos"). A API apaga as linhas do ano
+    e do ano "todos" quando recebe eleitorado por upload (importacoes.processData), e a leitura volta ao SUM.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT COUNT(*) FROM {TABELA_CUBO} WHERE anoEleicao = {placeholder} AND municipioId = {TODOS} "
+        f"AND zonaId = {TODOS} AND genero = '{TODAS}' AND faixaEtaria = '{TODAS}' AND escolaridade = '{TODAS}'",
+        [ano]
+    )
+    (existe,) = cursor.fetchone()
+    cursor.close()
+    return bool(existe)
+
+
+def invalidar_ano(conn, placeholder, ano):
+    """Apaga as linhas do ano e do ano "todos" (o mesmo que a API faz no upload de eleitorado)"""
+    cursor = conn.cursor()
+    cursor.execute(f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao IN ({placeholder}, {TODOS})", [ano])
+    conn.commit()
+    cursor.close()
+
+
+def _municipio_todos(cursor, p, ano):
+    """Município "todos" no ano (uma zona pode abranger mais de um município)"""
+    cursor.execute(f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao = {p} AND municipioId = {TODOS}", [ano])
+    _rollup(cursor, {'municipioId': str(TODOS)},
+            f"anoEleicao = {p} AND municipioId <> {TODOS}", [ano])
+
+
+def _ano_todos_ou_completo(conn, cursor, p, municipios):
+    """Ano "todos" dos municípios informados, ou de todos os municípios se ele foi invalidado"""
+    if cubo_cobre_ano(conn, p, TODOS):
+        _ano_todos(cursor, p, municipios)
+    else:
+        cursor.execute(f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao = {TODOS}")
+        _rollup(cursor, {'anoEleicao': str(TODOS)}, f"anoEleicao <> {TODOS}", [])
+
+
+def _ano_todos(cursor, p, municipios):
+    """Ano "todos" dos municípios informados"""
+    lista = ', '.join([p] * len(municipios))
+    cursor.execute(f"DELETE FROM {TABELA_CUBO} WHERE anoEleicao = {TODOS} AND municipioId IN ({lista})", municipios)
+    _rollup(cursor, {'anoEleicao': str(TODOS)},
+            f"anoEleicao <> {TODOS} AND municipioId IN ({lista})", municipios)
@@ -0,0 +1,157 @@
+"""
+Testes do cubo de agregados do eleitorado usando sqlite3 como banco local
+"""
+
+import sqlite3
+
+import pytest
+
+from tse_agregacao import AgregadorEleitorado
+from tse_carga import CarregadorBulk
+from tse_cubo import (
+    NAO_INFORMADO, TABELA_CUBO, atualizar_cubo, celulas_cubo, cubo_cobre_ano, expandir, invalidar_ano,
+)
+from tse_escritores import EscritorParalelo, PoolConexoes
+
+ESQUEMA = f"""
+CREATE TABLE {TABELA_CUBO} (
+    anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    genero TEXT, faixaEtaria TEXT, escolaridade TEXT, totalEleitores INTEGER,
+    PRIMARY KEY (anoEleicao, municipioId, zonaId, genero, faixaEtaria, escolaridade)
+);
+"""
+
+
+@pytest.fixture
+def conexao(banco):
+    return banco(ESQUEMA)
+
+
+def _total(conexao, ano=0, municipio=0, zona=0, genero='', faixa='', escolaridade=''):
+    linha = conexao.execute(
+        f"SELECT totalEleitores FROM {TABELA_CUBO} WHERE anoEleicao = ? AND municipioId = ? AND zonaId = ? "
+        "AND genero = ? AND faixaEtaria = ? AND escolaridade = ?",
+        (ano, municipio, zona, genero, faixa, escolaridade)
+    ).fetchone()
+    return linha[0] if linha else None
+
+
+def _perfil(*linhas):
+    """Tuplas tipadas na ordem de COLUNAS_PERFIL a partir de (município, zona, gênero, faixa, escolaridade, qt)"""
+    return [('RO', mun, f"Município {mun}", zona, genero, faixa, escol, qt, 0, 0)
+            for mun, zona, genero, faixa, escol, qt in linhas]
+
+
+def test_celulas_somam_rotulos_da_mesma_categoria():
+    agregador = AgregadorEleitorado()
+    agregador.adicionar(_perfil(
+        ('100', '1', 'FEMININO', '18 ANOS', 'ENSINO MEDIO COMPLETO', 3),
+        ('100', '1', 'FEMININO', '19 ANOS', 'ENSINO MEDIO INCOMPLETO', 4),
+        ('100', '2', 'MASCULINO', '16 ANOS', 'NAO INFORMADO', 5),
+        ('200', '1', 'MASCULINO', '16 ANOS', 'ANALFABETO', 0),
+    ))
+    assert celulas_cubo(agregador) == {'100': [
+        ('1', 'eleitoresFeminino', 'faixa18a24', 'escolaridadeMedio', 7),
+        ('2', 'eleitoresMasculino', 'faixa16a17', NAO_INFORMADO, 5),
+    ]}
+
+
+def test_expandir_gera_todas_as_combinacoes_com_todos():
+    linhas = expandir(2024, 7, [
+        (11, 'eleitoresFeminino', 'faixa18a24', 'escolaridadeMedio', 7),
+        (12, 'eleitoresMasculino', 'faixa18a24', 'escolaridadeMedio', 5),
+        (None, 'eleitoresMasculino', 'faixa16a17', 'escolaridadeSuperior', 2),
+    ])
+    totais = {linha[:6]: linha[6] for linha in linhas}
+    assert len(linhas) == len(totais)
+    assert totais[(2024, 7, 0, '', '', '')] == 14
+    assert totais[(2024, 7, 11, '', '', '')] == 7
+    assert totais[(2024, 7, 0, '', 'faixa18a24', 'escolaridadeMedio')] == 12
+    assert totais[(2024, 7, 0, 'eleitoresMasculino', '', '')] == 7
+    # Zona sem id entra apenas nas linhas de "todas as zonas"
+    assert all(zona in (0, 11, 12) for _, _, zona, *_ in linhas)
+
+
+def test_atualizacao_incremental_recalcula_apenas_dependentes(conexao):
+    carga = CarregadorBulk(conexao, tamanho_lote=50)
+    f, m = 'eleitoresFeminino', 'eleitoresMasculino'
+
+    def celulas(qt):
+        return [(10, f, 'faixa18a24', 'escolaridadeMedio', qt), (10, m, 'faixa25a34', 'escolaridadeMedio', 1)]
+
+    for ano in (2022, 2024):
+        atualizar_cubo(conexao, carga, ano, {1: expandir(ano, 1, celulas(10)), 2: expandir(ano, 2, celulas(20))})
+    assert _total(conexao) == 2 * (11 + 21)
+    assert _total(conexao, ano=2024, genero=f) == 30
+    assert _total(conexao, municipio=2, faixa='faixa18a24') == 40
+
+    # Reimportação de um município em um ano
+    atualizar_cubo(conexao, carga, 2024, {1: expandir(2024, 1, celulas(100))})
+    assert _total(conexao, ano=2024, municipio=1) == 101
+    assert _total(conexao, ano=2024) == 101 + 21
+    assert _total(conexao, ano=2024, zona=10, genero=f) == 120
+    assert _total(conexao, municipio=1, genero=f) == 110
+    assert _total(conexao, municipio=2, genero=f) == 40
+    assert _total(conexao) == 11 + 21 + 101 + 21
+
+    # Município removido do arquivo do ano
+    atualizar_cubo(conexao, carga, 2024, {}, removidos=[2])
+    assert _total(conexao, ano=2024, municipio=2) is None
+    assert _total(conexao, ano=2024) == 101
+    assert _total(conexao, municipio=2) == 21
+
+    # Nenhuma linha duplicada na chave e todas as combinações consistentes com a base
+    base = conexao.execute(
+        f"SELECT SUM(totalEleitores) FROM {TABELA_CUBO} WHERE anoEleicao <> 0 AND municipioId <> 0 "
+        "AND zonaId = 0 AND genero = '' AND faixaEtaria = '' AND escolaridade = ''"
+    ).fetchone()[0]
+    assert base == _total(conexao)
+
+
+def test_ano_invalidado_e_refeito_por_completo(conexao):
+    carga = CarregadorBulk(conexao)
+    celulas = [(10, 'eleitoresFeminino', 'faixa18a24', 'escolaridadeMedio', 5)]
+    for ano in (2022, 2024):
+        atualizar_cubo(conexao, carga, ano, {1: expandir(ano, 1, celulas), 2: expandir(ano, 2, celulas)})
+    assert cubo_cobre_ano(conexao, '?', 2024) and cubo_cobre_ano(conexao, '?', 0)
+
+    # Upload fora da importação: o ano e o ano "todos" saem do cubo, o resto fica
+    invalidar_ano(conexao, '?', 2024)
+    assert not cubo_cobre_ano(conexao, '?', 2024) and not cubo_cobre_ano(conexao, '?', 0)
+    assert _total(conexao, ano=2022) == 10
+
+    # Sem o total do ano "todos", a atualização de um município refaz o ano 0 com todos os anos
+    atualizar_cubo(conexao, carga, 2024, {1: expandir(2024, 1, celulas)})
+    assert _total(conexao, ano=2024) == 5
+    assert _total(conexao) == 15
+    assert _total(conexao, municipio=2) == 5
+
+
+def test_sem_municipios_nao_altera_o_cubo(conexao):
+    assert atualizar_cubo(conexao, CarregadorBulk(conexao), 2024, {}) == 0
+    assert conexao.execute(f"SELECT COUNT(*) FROM {TABELA_CUBO}").fetchone() == (0,)
+
+
+def test_escritores_paralelos_geram_o_mesmo_cubo(banco, tmp_path):
+    linhas = {
+        mun: expandir(2024, mun, [(10 + mun % 2, 'eleitoresFeminino', 'faixa18a24', 'escolaridadeMedio', mun),
+                                  (10, 'eleitoresMasculino', 'faixa60a69', 'escolaridadeSuperior', 2 * mun)])
+        for mun in range(1, 9)
+    }
+    cubos = []
+    for escritores in (None, 4):
+        caminho = str(tmp_path / f"cubo_{escritores}.sqlite")
+        conexao = banco(ESQUEMA, caminho)
+        escritor = None
+        if escritores:
+            pool = PoolConexoes(lambda: sqlite3.connect(caminho, timeout=30, check_same_thread=False), escritores)
+            escritor = EscritorParalelo(pool, escritores)
+        carga = CarregadorBulk(conexao)
+        atualizar_cubo(conexao, carga, 2024, linhas, escritor=escritor)
+        atualizar_cubo(conexao, carga, 2024, {1: linhas[1]}, removidos=[8], escritor=escritor)
+        cubos.append(sorted(conexao.execute(f"SELECT * FROM {TABELA_CUBO}").fetchall()))
+        assert _total(conexao) == sum(3 * mun for mun in range(1, 8))
+        if escritor:
+            pool.fechar()
+        conexao.close()
+    assert cubos[0] == cubos[1]
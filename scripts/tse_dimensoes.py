@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Resolução de chaves das tabelas de dimensão do banco de dados DTE
+Os ids existentes são lidos uma vez por carga; membros ausentes são inseridos em lote e só eles são relidos
+"""
+
+from functools import cached_property
+
+from tse_categorias import normalizar
+
+# Valores por cláusula IN ao reler os membros inseridos
+LOTE_CONSULTA = 1000
+
+
+def normalizar_cargo(ds_cargo):
+    """'DEPUTADO ESTADUAL' -> 'deputado_estadual' (valor de `cargo` usado pela aplicação)"""
+    return normalizar(ds_cargo).lower().replace('-', '_').replace(' ', '_')
+
+
+class Dimensao:
+    """
+    Ids de uma tabela de dimensão por chave natural (`colunas_chave`, convertidas por `chave`).
+    A consulta por chave é um acesso a dicionário; a tabela não precisa de índice único.
+    """
+
+    def __init__(self, conn, carga, tabela, colunas_chave, filtro='', parametros=(), chave=None):
+        self.conn = conn
+        self.carga = carga
+        self.tabela = tabela
+        self.colunas_chave = tuple(colunas_chave)
+        self.filtro = filtro
+        self.parametros = list(parametros)
+        self.chave = chave or ((lambda row: row[0]) if len(self.colunas_chave) == 1 else tuple)
+        self.inseridos = 0
+        self.ids = {}
+        self._carregar()
+
+    def _carregar(self, valores=None):
+        """Lê os ids da tabela (com `valores`, só as linhas cuja primeira coluna da chave está entre eles)"""
+        p = self.carga.placeholder
+        cursor = self.conn.cursor()
+        lotes = [None] if valores is None else [valores[i:i + LOTE_CONSULTA]
+                                                 for i in range(0, len(valores), LOTE_CONSULTA)]
+        for lote in lotes:
+            condicoes = [self.filtro] if self.filtro else []
+            parametros = list(self.parametros)
+            if lote is not None:
+                condicoes.append(f"{self.colunas_chave[0]} IN ({', '.join([p] * len(lote))})")
+                parametros.extend(lote)
+            onde = f" WHERE {' AND '.join(condicoes)}" if condicoes else ''
+            cursor.execute(f"SELECT id, {', '.join(self.colunas_chave)} FROM {self.tabela}{onde}", parametros)
+            for row in cursor.fetchall():
+                self.ids.setdefault(self.chave(row[1:]), row[0])
+
+    def get(self, chave, padrao=None):
+        return self.ids.get(chave, padrao)
+
+    def __getitem__(self, chave):
+        return self.ids[chave]
+
+    def __contains__(self, chave):
+        return chave in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def inserir_faltantes(self, colunas, novos):
+        """
+        Insere `novos` ({chave: linha com `colunas`}) que ainda não têm id e lê só os ids deles.
+        Retorna a quantidade inserida; `colunas` precisa incluir a primeira coluna da chave.
+        """
+        faltantes = [linha for chave, linha in novos.items() if chave not in self.ids]
+        if not faltantes:
+            return 0
+        inseridos = self.carga.inserir(self.tabela, colunas, faltantes)
+        self.inseridos += inseridos
+        posicao = list(colunas).index(self.colunas_chave[0])
+        self._carregar(sorted({linha[posicao] for linha in faltantes}, key=str))
+        return inseridos
+
+
+class Dimensoes:
+    """
+    Regiões, municípios, zonas, seções, partidos e candidatos (por ano) de uma conexão,
+    cada dimensão carregada na primeira vez que é usada e compartilhada pelas etapas da carga.
+    Com `uf`, só os municípios da UF são carregados.
+    """
+
+    def __init__(self, conn, carga, uf=None):
+        self.conn = conn
+        self.carga = carga
+        self.uf = uf
+        self.candidatos_por_ano = {}
+
+    def _dimensao(self, tabela, colunas_chave, filtro='', parametros=(), chave=None):
+        return Dimensao(self.conn, self.carga, tabela, colunas_chave, filtro, parametros, chave)
+
+    @cached_property
+    def regioes(self):
+        """Por UF"""
+        return self._dimensao('regioes', ('uf',))
+
+    @cached_property
+    def municipios(self):
+        """Por código do município"""
+        if self.uf:
+            return self._dimensao('municipios', ('codigo',), f"uf = {self.carga.placeholder}", [self.uf])
+        return self._dimensao('municipios', ('codigo',))
+
+    @cached_property
+    def zonas(self):
+        """Por (número, municipioId)"""
+        return self._dimensao('zonas_eleitorais', ('numero', 'municipioId'))
+
+    @cached_property
+    def secoes(self):
+        """Por (número, zonaId)"""
+        return self._dimensao('secoes_eleitorais', ('numero', 'zonaId'))
+
+    @cached_property
+    def partidos(self):
+        """Por número do partido (texto, como no arquivo do TSE)"""
+        return self._dimensao('partidos', ('numero',), chave=lambda row: str(row[0]))
+
+    def candidatos(self, ano):
+        """Candidatos do ano por (cargo normalizado, número em texto, municipioId)"""
+        if ano not in self.candidatos_por_ano:
+            self.candidatos_por_ano[ano] = self._dimensao(
+                'candidatos', ('cargo', 'numero', 'municipioId'), f"anoEleicao = {self.carga.placeholder}", [ano],
+                chave=lambda row: (normalizar_cargo(row[0]), str(row[1]), row[2])
+            )
+        return self.candidatos_por_ano[ano]
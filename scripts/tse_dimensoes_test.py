@@ -0,0 +1,122 @@
+"""
+Testes da resolução de chaves das dimensões usando sqlite3 como banco local
+"""
+
+import pytest
+
+import seed_database
+from tse_carga import CarregadorBulk
+from tse_dimensoes import Dimensao, Dimensoes
+
+ESQUEMA = """
+CREATE TABLE regioes (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, uf TEXT);
+CREATE TABLE municipios (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT, codigoTse TEXT, regiaoId INTEGER, uf TEXT);
+CREATE TABLE zonas_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, municipioId INTEGER);
+CREATE TABLE partidos (id INTEGER PRIMARY KEY, sigla TEXT, nome TEXT, numero INTEGER, cor TEXT);
+CREATE TABLE candidatos (
+    id INTEGER PRIMARY KEY, nome TEXT, nomeUrna TEXT, numero INTEGER, partidoId INTEGER,
+    cargo TEXT, anoEleicao INTEGER, municipioId INTEGER
+);
+"""
+
+
+@pytest.fixture
+def conexao(banco):
+    return banco(ESQUEMA)
+
+
+def _comandos(conexao):
+    """Lista que recebe cada comando SQL executado na conexão"""
+    comandos = []
+    conexao.set_trace_callback(comandos.append)
+    return comandos
+
+
+def test_insere_so_faltantes_e_rele_so_os_novos(conexao):
+    conexao.executemany("INSERT INTO zonas_eleitorais (numero, municipioId) VALUES (?, ?)", [(1, 10), (2, 10)])
+    zonas = Dimensao(conexao, CarregadorBulk(conexao, tamanho_lote=2), 'zonas_eleitorais', ('numero', 'municipioId'))
+    assert len(zonas) == 2 and zonas[(1, 10)] == 1 and (2, 20) not in zonas
+
+    comandos = _comandos(conexao)
+    novas = {(numero, mun): (numero, mun) for numero, mun in [(1, 10), (2, 20), (3, 20), (7, 30)]}
+    assert zonas.inserir_faltantes(('numero', 'municipioId'), novas) == 3
+    # Sem releitura da tabela inteira: apenas os números inseridos
+    consultas = [c for c in comandos if c.startswith('SELECT')]
+    assert consultas == ['SELECT id, numero, municipioId FROM zonas_eleitorais WHERE numero IN (2, 3, 7)']
+    assert zonas.inseridos == 3 and len(zonas) == 5
+    assert zonas.get((7, 30)) == conexao.execute(
+        "SELECT id FROM zonas_eleitorais WHERE numero = 7 AND municipioId = 30").fetchone()[0]
+
+    # Segunda chamada com os mesmos membros não vai ao banco
+    comandos.clear()
+    assert zonas.inserir_faltantes(('numero', 'municipioId'), novas) == 0
+    assert comandos == []
+
+
+def test_dimensoes_compartilhadas(conexao):
+    carga = CarregadorBulk(conexao)
+    conexao.execute("INSERT INTO municipios (nome, codigo, uf) VALUES ('Fora', '999', 'AM')")
+    conexao.execute("INSERT INTO partidos (sigla, numero) VALUES ('PT', 13)")
+    conexao.execute("INSERT INTO candidatos (nome, numero, cargo, anoEleicao, municipioId) "
+                    "VALUES ('Ana', 13, 'Prefeito', 2024, 1)")
+    dimensoes = Dimensoes(conexao, carga, uf='RO')
+
+    comandos = _comandos(conexao)
+    assert '999' not in dimensoes.municipios and dimensoes.partidos['13'] == 1
+    # Cargo normalizado e número em texto, como chegam do arquivo
+    assert dimensoes.candidatos(2024).get(('prefeito', '13', 1)) == 1
+    assert len(dimensoes.candidatos(2022)) == 0
+    assert dimensoes.municipios is dimensoes.municipios
+    assert len(comandos) == 4
+
+
+def test_seed_sem_idas_ao_banco_repetidas(conexao, tmp_path):
+    perfil = tmp_path / 'perfil_eleitorado_2024_RO.csv'
+    linhas = [('100', 'CIDADE A', '1'), ('100', 'CIDADE A', '2'), ('200', 'CIDADE B', '3'), ('200', 'CIDADE B', '3')]
+    perfil.write_text('"CD_MUNICIPIO";"NM_MUNICIPIO";"NR_ZONA"\n'
+                      + ''.join(f'"{m}";"{n}";"{z}"\n' for m, n, z in linhas), encoding='latin-1')
+    carga = CarregadorBulk(conexao)
+
+    def executar():
+        dimensoes = Dimensoes(conexao, carga, seed_database.UF)
+        comandos = _comandos(conexao)
+        seed_database.insert_municipios(conexao, str(perfil), carga, dimensoes=dimensoes)
+        seed_database.insert_zonas(conexao, str(perfil), carga, dimensoes=dimensoes)
+        seed_database.insert_partidos(conexao, carga, dimensoes=dimensoes)
+        return dimensoes, comandos
+
+    dimensoes, _ = executar()
+    assert conexao.execute("SELECT COUNT(*) FROM municipios").fetchone()[0] == 2
+    assert conexao.execute("SELECT COUNT(*) FROM zonas_eleitorais").fetchone()[0] == 3
+    assert dimensoes.zonas[(3, dimensoes.municipios['200'])] == 3
+
+    # Reexecução: uma leitura por dimensão e nenhum INSERT
+    dimensoes, comandos = executar()
+    assert [c for c in comandos if c.startswith('INSERT')] == []
+    assert len([c for c in comandos if c.startswith('SELECT')]) == 4
+    assert len(dimensoes.partidos) == conexao.execute("SELECT COUNT(*) FROM partidos").fetchone()[0]
+
+
+def test_seed_em_pipeline_igual_ao_sequencial(banco, tmp_path):
+    from tse_sintetico import gerar_conjunto
+    perfil = gerar_conjunto(str(tmp_path), 3_000)['perfil']
+
+    def tabelas(conexao):
+        # Os ids seguem a ordem de chegada dos lotes; a comparação é pelas chaves naturais
+        return (
+            conexao.execute("SELECT nome, codigo, codigoTse, uf FROM municipios ORDER BY codigo").fetchall(),
+            conexao.execute("SELECT z.numero, m.codigo FROM zonas_eleitorais z "
+                            "JOIN municipios m ON m.id = z.municipioId ORDER BY m.codigo, z.numero").fetchall(),
+        )
+
+    sequencial = banco(ESQUEMA)
+    carga = CarregadorBulk(sequencial)
+    seed_database.insert_municipios(sequencial, perfil, carga)
+    seed_database.insert_zonas(sequencial, perfil, carga)
+
+    em_pipeline = banco(ESQUEMA)
+    agregador = seed_database.ler_perfil_em_pipeline(em_pipeline, perfil, CarregadorBulk(em_pipeline), capacidade=1)
+
+    assert tabelas(em_pipeline) == tabelas(sequencial)
+    assert agregador.total_registros == 3_000
+    assert agregador.resultado() == seed_database.agregar_perfil(perfil).resultado()
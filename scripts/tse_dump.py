@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Geração de scripts SQL (dump) em streaming
+Comandos INSERT multi-linhas limitados por bytes, gravados direto em arquivo (opcionalmente .gz)
+"""
+
+import gzip
+from datetime import datetime
+
+from tse_carga import MAX_BYTES_PADRAO
+
+# Tipo de coluna do esquema -> tipo SQL usado no CREATE TABLE
+TIPOS_SQL = {
+    'inteiro': 'BIGINT',
+    'texto': 'VARCHAR(255)',
+    'texto_longo': 'TEXT',
+}
+
+_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    "'": "''",
+    '\0': '\\0',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\x1a': '\\Z',
+})
+
+
+def formatar_inteiro(valor):
+    """Literal SQL de um inteiro (vazio ou não numérico vira NULL)"""
+    if valor is None or valor == '':
+        return 'NULL'
+    try:
+        return str(int(valor))
+    except ValueError:
+        return 'NULL'
+
+
+def formatar_texto(valor):
+    """Literal SQL de um texto, com escapes do MySQL (vazio vira NULL)"""
+    if valor is None or valor == '':
+        return 'NULL'
+    return f"'{str(valor).translate(_ESCAPES)}'"
+
+
+FORMATADORES = {
+    'inteiro': formatar_inteiro,
+    'texto': formatar_texto,
+    'texto_longo': formatar_texto,
+}
+
+
+def criar_tabela(tabela, esquema):
+    """Comando CREATE TABLE IF NOT EXISTS a partir do esquema ((coluna, tipo), ...)"""
+    colunas = ',\n'.join(f"  {coluna} {TIPOS_SQL[tipo]}" for coluna, tipo in esquema)
+    return f"CREATE TABLE IF NOT EXISTS {tabela} (\n{colunas}\n) DEFAULT CHARSET=utf8mb4;\n"
+
+
+def _gerar_lotes(tabela, registros, esquema, max_bytes):
+    """Gera (comando INSERT, quantidade de linhas) com cada comando abaixo de `max_bytes`"""
+    colunas = [coluna for coluna, _ in esquema]
+    formatadores = [(coluna, FORMATADORES[tipo]) for coluna, tipo in esquema]
+    prefixo = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES\n"
+
+    base = len(prefixo.encode('utf-8'))
+    tuplas, tamanho = [], base
+    for registro in registros:
+        tupla = f"({', '.join([formatar(registro.get(coluna)) for coluna, formatar in formatadores])})"
+        # Bytes em UTF-8 + 2 de separador (",\n" ou ";\n")
+        tam_tupla = len(tupla.encode('utf-8')) + 2
+        if tuplas and tamanho + tam_tupla > max_bytes:
+            yield prefixo + ',\n'.join(tuplas) + ';\n', len(tuplas)
+            tuplas, tamanho = [], base
+        tuplas.append(tupla)
+        tamanho += tam_tupla
+    if tuplas:
+        yield prefixo + ',\n'.join(tuplas) + ';\n', len(tuplas)
+
+
+def gerar_inserts(tabela, registros, esquema, max_bytes=MAX_BYTES_PADRAO):
+    """
+    Gera comandos INSERT multi-linhas para `registros` (dicts), um por vez.
+    Cada comando fica abaixo de `max_bytes` (ex.: max_allowed_packet do servidor).
+    """
+    for comando, _ in _gerar_lotes(tabela, registros, esquema, max_bytes):
+        yield comando
+
+
+def abrir_dump(caminho, comprimir=None):
+    """Abre o arquivo de saída em texto UTF-8; comprime com gzip se `comprimir` ou se termina em .gz"""
+    if comprimir is None:
+        comprimir = caminho.endswith('.gz')
+    if comprimir:
+        return gzip.open(caminho, 'wt', encoding='utf-8', compresslevel=6)
+    return open(caminho, 'w', encoding='utf-8')
+
+
+class EscritorDump:
+    """
+    Grava um script SQL em streaming: cabeçalho, CREATE TABLE e INSERTs por tabela.
+    A memória usada é a de um comando, independente do tamanho das tabelas.
+    """
+
+    def __init__(self, caminho, max_bytes=MAX_BYTES_PADRAO, comprimir=None):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.arquivo = abrir_dump(caminho, comprimir)
+        self.estatisticas = {}
+        self.arquivo.write(f"-- Dump gerado em {datetime.now().isoformat(timespec='seconds')}\n")
+        self.arquivo.write("SET NAMES utf8mb4;\n\n")
+
+    def escrever_comando(self, sql):
+        """Grava um comando avulso (ex.: DELETE antes dos INSERTs de uma tabela)"""
+        self.arquivo.write(sql.rstrip().rstrip(';') + ';\n')
+
+    def escrever_tabela(self, tabela, registros, esquema, criar=True):
+        """Grava os registros da tabela e retorna (linhas, comandos)"""
+        if criar:
+            self.arquivo.write(criar_tabela(tabela, esquema) + '\n')
+        linhas = comandos = 0
+        for comando, n in _gerar_lotes(tabela, registros, esquema, self.max_bytes):
+            self.arquivo.write(comando)
+            linhas += n
+            comandos += 1
+        self.arquivo.write('\n')
+        self.estatisticas[tabela] = {'linhas': linhas, 'comandos': comandos}
+        return linhas, comandos
+
+    def fechar(self):
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
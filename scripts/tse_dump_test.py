@@ -0,0 +1,65 @@
+"""
+Testes da geração de dump SQL em streaming
+"""
+
+import gzip
+
+import pytest
+
+from tse_dump import EscritorDump, formatar_inteiro, formatar_texto, gerar_inserts
+
+ESQUEMA = (('numero', 'inteiro'), ('nome', 'texto'))
+
+
+def _registros(n):
+    return ({'numero': i, 'nome': f"Candidata {i} d'Oeste"} for i in range(n))
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (None, 'NULL'),
+    ('', 'NULL'),
+    ('42', '42'),
+    (7, '7'),
+    ('#NULO#', 'NULL'),
+])
+def test_formatar_inteiro(valor, esperado):
+    assert formatar_inteiro(valor) == esperado
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (None, 'NULL'),
+    ('', 'NULL'),
+    ("D'OESTE", "'D''OESTE'"),
+    ('C:\\dados', "'C:\\\\dados'"),
+    ('linha\nnova', "'linha\\nnova'"),
+    (13, "'13'"),
+])
+def test_formatar_texto(valor, esperado):
+    assert formatar_texto(valor) == esperado
+
+
+def test_comandos_respeitam_limite_de_bytes():
+    comandos = list(gerar_inserts('candidatos', _registros(200), ESQUEMA, max_bytes=500))
+    assert len(comandos) > 1
+    assert all(len(c.encode('utf-8')) <= 500 for c in comandos)
+    assert sum(c.count("d''Oeste") for c in comandos) == 200
+    assert comandos[0].startswith("INSERT INTO candidatos (numero, nome) VALUES\n(0, 'Candidata 0 d''Oeste'),\n")
+
+
+def test_limite_conta_bytes_utf8():
+    registros = [{'numero': 1, 'nome': 'ç' * 100}, {'numero': 2, 'nome': 'ç' * 100}]
+    # Cada tupla tem ~110 caracteres mas ~210 bytes
+    assert len(list(gerar_inserts('t', registros, ESQUEMA, max_bytes=400))) == 2
+
+
+@pytest.mark.parametrize("nome", ['dump.sql', 'dump.sql.gz'])
+def test_escritor_grava_tabelas(tmp_path, nome):
+    caminho = str(tmp_path / nome)
+    with EscritorDump(caminho, max_bytes=1000) as dump:
+        assert dump.escrever_tabela('candidatos', _registros(50), ESQUEMA) == (50, dump.estatisticas['candidatos']['comandos'])
+
+    abrir = gzip.open if nome.endswith('.gz') else open
+    with abrir(caminho, 'rt', encoding='utf-8') as f:
+        conteudo = f.read()
+    assert 'CREATE TABLE IF NOT EXISTS candidatos (\n  numero BIGINT,\n  nome VARCHAR(255)\n)' in conteudo
+    assert conteudo.count('INSERT INTO candidatos') == dump.estatisticas['candidatos']['comandos'] > 1
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Carga das linhas completas do perfil do eleitorado na tabela particionada `eleitorado_tse`
+Cada arquivo (ano, UF) é carregado em uma tabela de carga sem índices secundários, que recebe os
+índices depois da carga e entra no lugar da partição com EXCHANGE PARTITION: a tabela em uso
+não fica bloqueada durante a carga, e as consultas veem a partição antiga até a troca.
+"""
+
+import contextlib
+import itertools
+import statistics
+import time
+
+from tse_carga import eh_sqlite
+from tse_esquemas import PERFIL_ELEITORADO, TAMANHO_LOTE
+from tse_metricas import avancar
+
+TABELA = 'eleitorado_tse'
+
+# Colunas gravadas: id, as da projeção 'detalhe' do perfil (na mesma ordem) e importacaoId
+COLUNAS = (
+    'id', 'dtGeracao', 'anoEleicao', 'sgUf', 'cdMunicipio', 'nmMunicipio', 'nrZona',
+    'cdGenero', 'dsGenero', 'cdEstadoCivil', 'dsEstadoCivil', 'cdFaixaEtaria', 'dsFaixaEtaria',
+    'cdGrauEscolaridade', 'dsGrauEscolaridade', 'qtEleitoresPerfilBiometrico', 'qtEleitoresPerfilDeficiencia',
+    'qtEleitoresPerfilNomeSocial', 'qtEleitoresPerfil', 'importacaoId'
+)
+
+# Índices secundários (os mesmos da migração drizzle/0011), criados só depois da carga
+INDICES = {
+    'eleitorado_tse_local_idx': ('anoEleicao', 'cdMunicipio', 'nrZona'),
+}
+
+# Consultas medidas depois da troca (latência da partição recém-carregada)
+CONSULTAS = {
+    'total_particao': (
+        f"SELECT SUM(qtEleitoresPerfil) FROM {TABELA} WHERE anoEleicao = {{p}} AND sgUf = {{p}}",
+        ('ano', 'uf'),
+    ),
+    'zonas_municipio': (
+        f"SELECT nrZona, SUM(qtEleitoresPerfil) FROM {TABELA} "
+        f"WHERE anoEleicao = {{p}} AND sgUf = {{p}} AND cdMunicipio = {{p}} GROUP BY nrZona",
+        ('ano', 'uf', 'municipio'),
+    ),
+    'faixas_zona': (
+        f"SELECT dsFaixaEtaria, SUM(qtEleitoresPerfil) FROM {TABELA} "
+        f"WHERE anoEleicao = {{p}} AND sgUf = {{p}} AND cdMunicipio = {{p}} AND nrZona = {{p}} "
+        f"GROUP BY dsFaixaEtaria",
+        ('ano', 'uf', 'municipio', 'zona'),
+    ),
+}
+
+
+def nome_particao(ano, uf):
+    return f"p{ano}_{uf.lower()}"
+
+
+def nome_tabela_carga(ano, uf):
+    return f"{TABELA}_carga_{ano}_{uf.lower()}"
+
+
+def proximo_id(conn):
+    """
+    Primeiro id das linhas novas. As linhas são gravadas com id explícito: a tabela de carga
+    não compartilha o contador de auto incremento da tabela em uso.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {TABELA}")
+    (valor,) = cursor.fetchone()
+    cursor.close()
+    return int(valor)
+
+
+def linhas_detalhe(lotes, ano, uf, primeiro_id, importacao_id=None):
+    """Linhas de eleitorado_tse a partir dos lotes da projeção 'detalhe'; todas da partição (ano, UF)"""
+    ids = itertools.count(primeiro_id)
+    for lote in lotes:
+        for tupla in lote:
+            if tupla[1] != ano or tupla[2] != uf:
+                raise ValueError(f"Linha de {tupla[1]}/{tupla[2]} no arquivo da partição {ano}/{uf}")
+            yield (next(ids), *tupla, importacao_id)
+        avancar(len(lote))
+
+
+def criar_tabela_carga(conn, tabela_carga):
+    """Tabela vazia com a estrutura de eleitorado_tse, sem partições e sem índices secundários"""
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {tabela_carga}")
+    if eh_sqlite(conn):
+        cursor.execute(f"CREATE TABLE {tabela_carga} AS SELECT * FROM {TABELA} WHERE 0")
+    else:
+        cursor.execute(f"CREATE TABLE {tabela_carga} LIKE {TABELA}")
+        cursor.execute(f"ALTER TABLE {tabela_carga} REMOVE PARTITIONING")
+        for indice in INDICES:
+            cursor.execute(f"ALTER TABLE {tabela_carga} DROP INDEX {indice}")
+    conn.commit()
+    cursor.close()
+
+
+def criar_indices(conn, tabela_carga):
+    """Índices secundários da tabela de carga, construídos de uma vez sobre as linhas já gravadas"""
+    cursor = conn.cursor()
+    for indice, colunas in INDICES.items():
+        if eh_sqlite(conn):
+            # No sqlite os nomes de índice são do banco inteiro
+            cursor.execute(f"CREATE INDEX {tabela_carga}_{indice} ON {tabela_carga} ({', '.join(colunas)})")
+        else:
+            cursor.execute(f"ALTER TABLE {tabela_carga} ADD INDEX {indice} ({', '.join(colunas)})")
+    conn.commit()
+    cursor.close()
+
+
+def garantir_particao(conn, ano, uf):
+    """Cria a partição (ano, UF) se ela ainda não existe; retorna True se criou"""
+    if eh_sqlite(conn):
+        return False
+    particao = nome_particao(ano, uf)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME = %s",
+        [TABELA, particao]
+    )
+    (existe,) = cursor.fetchone()
+    if not existe:
+        cursor.execute(f"ALTER TABLE {TABELA} ADD PARTITION (PARTITION {particao} VALUES IN (({int(ano)}, %s)))",
+                       [uf])
+    cursor.close()
+    return not existe
+
+
+def trocar_particao(conn, ano, uf, tabela_carga):
+    """
+    Põe as linhas da tabela de carga no lugar da partição (ano, UF). No TiDB/MySQL é uma troca de
+    metadados (EXCHANGE PARTITION) e a tabela de carga fica com as linhas antigas; no sqlite, sem
+    partições, é uma transação que apaga a partição e copia a tabela de carga.
+    """
+    cursor = conn.cursor()
+    if eh_sqlite(conn):
+        colunas = ', '.join(COLUNAS)
+        cursor.execute(f"DELETE FROM {TABELA} WHERE anoEleicao = ? AND sgUf = ?", [ano, uf])
+        cursor.execute(f"INSERT INTO {TABELA} ({colunas}) SELECT {colunas} FROM {tabela_carga}")
+    else:
+        cursor.execute(f"ALTER TABLE {TABELA} EXCHANGE PARTITION {nome_particao(ano, uf)} WITH TABLE {tabela_carga}")
+    conn.commit()
+    cursor.close()
+
+
+def medir_consultas(conn, placeholder, parametros, repeticoes=5):
+    """Mediana em ms de cada consulta de CONSULTAS com os `parametros` (ano, uf, municipio, zona)"""
+    cursor = conn.cursor()
+    latencias = {}
+    for nome, (sql, chaves) in CONSULTAS.items():
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            cursor.execute(sql.format(p=placeholder), [parametros[chave] for chave in chaves])
+            cursor.fetchall()
+            tempos.append(time.perf_counter() - inicio)
+        latencias[nome] = round(statistics.median(tempos) * 1000, 3)
+    cursor.close()
+    return latencias
+
+
+def carregar_eleitorado_tse(conn, carga, filepath, importacao_id=None, cache_dir=None,
+                            tamanho_lote=TAMANHO_LOTE, metricas=None):
+    """
+    Carrega o arquivo perfil_eleitorado (uma partição ano/UF) em eleitorado_tse, substituindo a partição.
+    Com `metricas`, cada fase (carga, índices, troca, consultas) é uma etapa com o nome da partição.
+    Retorna as estatísticas da carga, ou None para arquivo vazio.
+    """
+    lotes = PERFIL_ELEITORADO.ler_lotes(filepath, 'detalhe', tamanho_lote, cache_dir)
+    primeiro = next(lotes, None)
+    if not primeiro:
+        return None
+    _, ano, uf, municipio, _, zona = primeiro[0][:6]
+    tabela_carga = nome_tabela_carga(ano, uf)
+    stats = {'particao': nome_particao(ano, uf), 'ano': ano, 'uf': uf, 'tabela_carga': tabela_carga}
+
+    def etapa(nome, **opcoes):
+        return metricas.etapa(f"{nome}_{stats['particao']}", **opcoes) if metricas else contextlib.nullcontext()
+
+    criar_tabela_carga(conn, tabela_carga)
+    try:
+        inicio = time.perf_counter()
+        with etapa('carga', arquivo=filepath):
+            linhas = linhas_detalhe(itertools.chain([primeiro], lotes), ano, uf, proximo_id(conn), importacao_id)
+            stats['linhas'] = carga.inserir(tabela_carga, COLUNAS, linhas)
+        stats['segundos_carga'] = time.perf_counter() - inicio
+        stats['linhas_por_segundo'] = stats['linhas'] / stats['segundos_carga'] if stats['segundos_carga'] else 0.0
+
+        inicio = time.perf_counter()
+        with etapa('indices'):
+            criar_indices(conn, tabela_carga)
+        stats['segundos_indices'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with etapa('troca'):
+            stats['particao_criada'] = garantir_particao(conn, ano, uf)
+            trocar_particao(conn, ano, uf, tabela_carga)
+        stats['segundos_troca'] = time.perf_counter() - inicio
+    finally:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {tabela_carga}")
+        conn.commit()
+        cursor.close()
+
+    with etapa('consultas'):
+        stats['latencias_ms'] = medir_consultas(
+            conn, carga.placeholder, {'ano': ano, 'uf': uf, 'municipio': municipio, 'zona': zona}
+        )
+    return stats
+
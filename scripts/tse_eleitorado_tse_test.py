@@ -0,0 +1,116 @@
+"""
+Testes da carga particionada de eleitorado_tse usando sqlite3 como banco local
+"""
+
+import pytest
+
+from tse_carga import CarregadorBulk
+from tse_csv import iter_csv_latin1
+from tse_eleitorado_tse import (
+    COLUNAS, CONSULTAS, carregar_eleitorado_tse, linhas_detalhe, nome_particao, nome_tabela_carga
+)
+from tse_esquemas import PERFIL_ELEITORADO
+from tse_sintetico import gerar_perfil
+
+ESQUEMA = """
+CREATE TABLE eleitorado_tse (
+    id INTEGER NOT NULL, dtGeracao TEXT, anoEleicao INTEGER NOT NULL, sgUf TEXT NOT NULL, cdMunicipio TEXT,
+    nmMunicipio TEXT, cdMrc TEXT, nmMrc TEXT, nrZona INTEGER, cdGenero TEXT, dsGenero TEXT, cdEstadoCivil TEXT,
+    dsEstadoCivil TEXT, cdFaixaEtaria TEXT, dsFaixaEtaria TEXT, cdGrauEscolaridade TEXT, dsGrauEscolaridade TEXT,
+    qtEleitoresPerfilBiometrico INTEGER DEFAULT 0, qtEleitoresPerfilDeficiencia INTEGER DEFAULT 0,
+    qtEleitoresPerfilNomeSocial INTEGER DEFAULT 0, qtEleitoresPerfil INTEGER DEFAULT 0, importacaoId INTEGER,
+    createdAt TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, anoEleicao, sgUf)
+);
+CREATE INDEX eleitorado_tse_local_idx ON eleitorado_tse (anoEleicao, cdMunicipio, nrZona);
+"""
+
+
+@pytest.fixture
+def conexao(banco):
+    return banco(ESQUEMA)
+
+
+def _perfil(tmp_path, n_linhas, ano=2024, uf='RO', semente=1):
+    return gerar_perfil(str(tmp_path / f"perfil_eleitorado_{ano}_{uf}_{semente}.csv"), n_linhas, ano, uf, semente=semente)
+
+
+def _total(arquivo):
+    return sum(int(qt) for (qt,) in iter_csv_latin1(arquivo, colunas=('QT_ELEITORES_PERFIL',)))
+
+
+def _por_particao(conexao):
+    return conexao.execute(
+        "SELECT anoEleicao, sgUf, COUNT(*), SUM(qtEleitoresPerfil), MIN(importacaoId) FROM eleitorado_tse "
+        "GROUP BY anoEleicao, sgUf ORDER BY anoEleicao, sgUf"
+    ).fetchall()
+
+
+def test_colunas_seguem_a_projecao():
+    assert len(COLUNAS) == len(PERFIL_ELEITORADO.projecao('detalhe')) + 2
+    assert nome_particao(2024, 'RO') == 'p2024_ro' and nome_tabela_carga(2024, 'RO') == 'eleitorado_tse_carga_2024_ro'
+
+
+def test_linhas_de_outra_particao_sao_erro():
+    tupla = ('01/01/2024', 2024, 'RO', '00035', 'CIDADE', 1, *([''] * 8), 0, 0, 0, 10)
+    assert list(linhas_detalhe([[tupla, tupla]], 2024, 'RO', 7, 3)) == [(7, *tupla, 3), (8, *tupla, 3)]
+    with pytest.raises(ValueError, match='2024/AC'):
+        list(linhas_detalhe([[tupla[:2] + ('AC',) + tupla[3:]]], 2024, 'RO', 1))
+
+
+def test_carga_em_tabela_de_carga_e_troca(conexao, tmp_path):
+    arquivo = _perfil(tmp_path, 3_000)
+    carga = CarregadorBulk(conexao, linhas_por_transacao=1_000, relatar=False)
+
+    stats = carregar_eleitorado_tse(conexao, carga, arquivo, importacao_id=5, tamanho_lote=700)
+    assert stats['linhas'] == 3_000 and stats['particao'] == 'p2024_ro'
+    assert _por_particao(conexao) == [(2024, 'RO', 3_000, _total(arquivo), 5)]
+    assert set(stats['latencias_ms']) == set(CONSULTAS) and stats['linhas_por_segundo'] > 0
+
+    # A tabela de carga some depois da troca
+    tabelas = {nome for (nome,) in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tabelas == {'eleitorado_tse'}
+    ids = [i for (i,) in conexao.execute("SELECT id FROM eleitorado_tse ORDER BY id")]
+    assert ids == list(range(1, 3_001))
+
+
+def test_reimportacao_substitui_so_a_particao(conexao, tmp_path):
+    carga = CarregadorBulk(conexao, relatar=False)
+    ro_2024 = _perfil(tmp_path, 1_000)
+    ac_2024 = _perfil(tmp_path, 400, uf='AC')
+    ro_2022 = _perfil(tmp_path, 600, ano=2022)
+    for importacao_id, arquivo in enumerate((ro_2024, ac_2024, ro_2022), 1):
+        carregar_eleitorado_tse(conexao, carga, arquivo, importacao_id)
+
+    novo = _perfil(tmp_path, 800, semente=9)
+    stats = carregar_eleitorado_tse(conexao, carga, novo, importacao_id=4)
+    assert stats['linhas'] == 800
+    assert _por_particao(conexao) == [
+        (2022, 'RO', 600, _total(ro_2022), 3),
+        (2024, 'AC', 400, _total(ac_2024), 2),
+        (2024, 'RO', 800, _total(novo), 4),
+    ]
+    # Ids das linhas novas continuam depois dos já usados
+    assert conexao.execute("SELECT MIN(id) FROM eleitorado_tse WHERE importacaoId = 4").fetchone()[0] == 2_001
+
+
+def test_falha_na_carga_preserva_a_particao(conexao, tmp_path):
+    carga = CarregadorBulk(conexao, relatar=False)
+    carregar_eleitorado_tse(conexao, carga, _perfil(tmp_path, 500), importacao_id=1)
+    antes = _por_particao(conexao)
+
+    # Arquivo com linhas de outra UF: erro durante a carga, a partição em uso não muda
+    misturado = tmp_path / 'perfil_misturado.csv'
+    with open(_perfil(tmp_path, 300), encoding='latin-1') as f, \
+            open(_perfil(tmp_path, 200, uf='AC'), encoding='latin-1') as g:
+        misturado.write_text(f.read() + ''.join(g.readlines()[1:]), encoding='latin-1')
+    with pytest.raises(ValueError):
+        carregar_eleitorado_tse(conexao, carga, str(misturado), importacao_id=2)
+    assert _por_particao(conexao) == antes
+    assert conexao.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE '%_carga_%'").fetchone()[0] == 0
+
+
+def test_arquivo_vazio(conexao, tmp_path):
+    vazio = tmp_path / 'perfil_eleitorado_2024_RO.csv'
+    vazio.write_text(';'.join(f'"{c}"' for c in PERFIL_ELEITORADO.nomes) + '\n', encoding='latin-1')
+    assert carregar_eleitorado_tse(conexao, CarregadorBulk(conexao, relatar=False), str(vazio)) is None
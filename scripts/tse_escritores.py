@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Escrita concorrente no banco de dados DTE
+A carga é dividida em partições (ex.: um município) gravadas por N escritores, cada um com uma
+conexão do pool; cada partição é uma transação (DELETE + INSERT) repetida com backoff em erros transitórios
+"""
+
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tse_carga import MAX_BYTES_PADRAO, CarregadorBulk
+
+# Códigos de erro do MySQL/TiDB em que a transação pode ser repetida
+ERROS_TRANSITORIOS = {
+    1205,  # lock wait timeout
+    1213,  # deadlock
+    2006,  # server has gone away
+    2013,  # lost connection during query
+    2055,  # lost connection (SSL)
+    8002,  # TiDB: SELECT FOR UPDATE em conflito de escrita
+    8022,  # TiDB: falha no commit, transação pode ser repetida
+    8028,  # TiDB: schema alterado durante a transação
+    9001,  # TiDB: timeout do PD
+    9002,  # TiDB: timeout do TiKV
+    9005,  # TiDB: região indisponível
+    9007,  # TiDB: conflito de escrita
+}
+
+# Erros em que a conexão não pode mais ser usada (é descartada e recriada pelo pool)
+ERROS_CONEXAO = {2006, 2013, 2055}
+
+
+def eh_transitorio(erro):
+    """Indica se o erro é transitório (vale repetir a transação)"""
+    if getattr(erro, 'errno', None) in ERROS_TRANSITORIOS:
+        return True
+    # sqlite3 (banco local): escritor concorrente segurando o lock
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in str(erro) or 'busy' in str(erro))
+
+
+class PoolConexoes:
+    """
+    Até `tamanho` conexões criadas sob demanda por `fabrica()` e reaproveitadas entre partições.
+    Conexões com erro de conexão são descartadas e recriadas no próximo uso.
+    """
+
+    def __init__(self, fabrica, tamanho):
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.livres = queue.LifoQueue()
+        self.criadas = 0
+        self._trava = threading.Lock()
+
+    def obter(self):
+        try:
+            return self.livres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._trava:
+            criar = self.criadas < self.tamanho
+            if criar:
+                self.criadas += 1
+        if not criar:
+            return self.livres.get()
+        try:
+            conn = self.fabrica()
+            if conn is None:
+                raise ConnectionError("Falha ao abrir conexão do pool")
+            return conn
+        except BaseException:
+            with self._trava:
+                self.criadas -= 1
+            raise
+
+    def devolver(self, conn, descartar=False):
+        if not descartar:
+            self.livres.put(conn)
+            return
+        with self._trava:
+            self.criadas -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def fechar(self):
+        while True:
+            try:
+                conn = self.livres.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._trava:
+                self.criadas -= 1
+
+
+class EscritorParalelo:
+    """
+    Grava partições de uma tabela com `escritores` threads, cada partição em uma transação própria.
+    A partição apaga as próprias linhas antes de inserir (`limpar`), então repetir uma partição após
+    falha, ou reexecutar a carga, não duplica linhas: o total final não depende da ordem nem dos escritores.
+    """
+
+    def __init__(self, pool, escritores=4, modo='multi', tamanho_lote=1000, max_bytes=MAX_BYTES_PADRAO,
+                 tentativas=5, espera_inicial=0.1, espera_maxima=5.0):
+        self.pool = pool
+        self.escritores = escritores
+        self.modo = modo
+        self.tamanho_lote = tamanho_lote
+        self.max_bytes = max_bytes
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.retentativas = 0
+        self.estatisticas = {}
+        self._trava = threading.Lock()
+
+    def gravar(self, tabela, colunas, particoes, limpar=None):
+        """
+        Grava `particoes` ({chave: linhas}) e retorna o total de linhas inseridas.
+        `limpar(cursor, placeholder, chave)` apaga as linhas da partição na mesma transação.
+        """
+        inicio = time.perf_counter()
+        # Maiores primeiro: as partições pequenas preenchem o fim e equilibram os escritores
+        ordem = sorted(particoes.items(), key=lambda item: len(item[1]), reverse=True)
+        with ThreadPoolExecutor(max_workers=self.escritores) as executor:
+            futuros = [executor.submit(self._gravar_particao, tabela, colunas, chave, linhas, limpar)
+                       for chave, linhas in ordem]
+            total = sum(futuro.result() for futuro in futuros)
+        self._registrar(tabela, total, len(particoes), time.perf_counter() - inicio)
+        return total
+
+    def _gravar_particao(self, tabela, colunas, chave, linhas, limpar):
+        for tentativa in range(1, self.tentativas + 1):
+            conn = self.pool.obter()
+            try:
+                carga = CarregadorBulk(conn, self.modo, self.tamanho_lote, linhas_por_transacao=max(len(linhas), 1),
+                                       max_bytes=self.max_bytes, relatar=False)
+                if limpar:
+                    limpar(conn.cursor(), carga.placeholder, chave)
+                inseridas = carga.inserir(tabela, colunas, linhas)
+            except Exception as erro:
+                descartar = getattr(erro, 'errno', None) in ERROS_CONEXAO
+                try:
+                    conn.rollback()
+                except Exception:
+                    descartar = True
+                self.pool.devolver(conn, descartar)
+                if not eh_transitorio(erro) or tentativa == self.tentativas:
+                    raise
+                with self._trava:
+                    self.retentativas += 1
+                # Backoff exponencial com jitter para que os escritores não colidam de novo juntos
+                espera = min(self.espera_maxima, self.espera_inicial * 2 ** (tentativa - 1))
+                time.sleep(espera * random.uniform(0.5, 1.0))
+            else:
+                self.pool.devolver(conn)
+                return inseridas
+
+    def _registrar(self, tabela, linhas, particoes, segundos):
+        taxa = linhas / segundos if segundos > 0 else 0.0
+        self.estatisticas[tabela] = {
+            'linhas': linhas, 'particoes': particoes, 'segundos': segundos, 'linhas_por_segundo': taxa,
+        }
+        print(f"  {tabela}: {linhas} linhas em {particoes} partições, {segundos:.2f}s "
+              f"({taxa:,.0f} linhas/s, {self.escritores} escritores, {self.retentativas} retentativas)")
@@ -0,0 +1,121 @@
+"""
+Testes da escrita concorrente por partições usando sqlite3 como banco local
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from tse_escritores import EscritorParalelo, PoolConexoes, eh_transitorio
+
+
+class ErroBanco(Exception):
+    """Erro com código como os de mysql.connector"""
+
+    def __init__(self, errno):
+        super().__init__(f"erro {errno}")
+        self.errno = errno
+
+
+def _particoes(municipios=12, linhas=50):
+    return {m: [(m, i, m * 1000 + i) for i in range(linhas * (1 + m % 3))] for m in range(1, municipios + 1)}
+
+
+def _limpar(cursor, placeholder, municipio):
+    cursor.execute(f"DELETE FROM valores WHERE municipioId = {placeholder}", [municipio])
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = str(tmp_path / 'banco.sqlite')
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute("CREATE TABLE valores (municipioId INTEGER, ordem INTEGER, valor INTEGER)")
+    return caminho
+
+
+def _pool(banco, tamanho, falhas=None):
+    """Pool sobre o mesmo arquivo; `falhas` é uma lista de códigos lançados no commit, um por vez"""
+    trava = threading.Lock()
+
+    class Conexao(sqlite3.Connection):
+        def commit(self):
+            with trava:
+                erro = falhas.pop(0) if falhas else None
+            if erro:
+                raise ErroBanco(erro)
+            super().commit()
+
+    return PoolConexoes(lambda: sqlite3.connect(banco, timeout=30, factory=Conexao, check_same_thread=False),
+                        tamanho)
+
+
+def _conteudo(banco):
+    with sqlite3.connect(banco) as conexao:
+        return sorted(conexao.execute("SELECT municipioId, ordem, valor FROM valores").fetchall())
+
+
+def test_eh_transitorio():
+    assert eh_transitorio(ErroBanco(1213)) and eh_transitorio(ErroBanco(9007))
+    assert eh_transitorio(sqlite3.OperationalError('database is locked'))
+    assert not eh_transitorio(ErroBanco(1062))
+    assert not eh_transitorio(sqlite3.OperationalError('no such table: valores'))
+
+
+def test_contagem_final_independe_dos_escritores(banco):
+    particoes = _particoes()
+    esperadas = sum(len(linhas) for linhas in particoes.values())
+    conteudos = []
+    for escritores in (1, 8):
+        escritor = EscritorParalelo(_pool(banco, escritores), escritores, tamanho_lote=7)
+        assert escritor.gravar('valores', ('municipioId', 'ordem', 'valor'), particoes, _limpar) == esperadas
+        assert escritor.estatisticas['valores']['particoes'] == len(particoes)
+        conteudos.append(_conteudo(banco))
+        escritor.pool.fechar()
+    # A segunda carga substituiu a primeira partição a partição, sem duplicar
+    assert len(conteudos[0]) == esperadas and conteudos[0] == conteudos[1]
+
+
+def test_retenta_erros_transitorios(banco):
+    particoes = _particoes(municipios=6)
+    # Perda de conexão (descartada e recriada) e conflito de escrita do TiDB
+    falhas = [2013, 9007, 1213, 2006]
+    pool = _pool(banco, 3, falhas)
+    escritor = EscritorParalelo(pool, 3, espera_inicial=0.001)
+    total = escritor.gravar('valores', ('municipioId', 'ordem', 'valor'), particoes, _limpar)
+
+    assert falhas == [] and escritor.retentativas == 4
+    assert total == len(_conteudo(banco)) == sum(len(linhas) for linhas in particoes.values())
+    assert pool.criadas <= 3
+
+
+def test_erro_permanente_e_tentativas_esgotadas(banco):
+    escritor = EscritorParalelo(_pool(banco, 2, [1062]), 2, espera_inicial=0.001)
+    with pytest.raises(ErroBanco):
+        escritor.gravar('valores', ('municipioId', 'ordem', 'valor'), _particoes(municipios=1), _limpar)
+    assert escritor.retentativas == 0
+
+    escritor = EscritorParalelo(_pool(banco, 1, [1205] * 3), 1, tentativas=3, espera_inicial=0.001)
+    with pytest.raises(ErroBanco):
+        escritor.gravar('valores', ('municipioId', 'ordem', 'valor'), _particoes(municipios=1), _limpar)
+    assert escritor.retentativas == 2
+    # A partição que falhou não deixou linhas pela metade
+    assert _conteudo(banco) == []
+
+
+def test_pool_limita_e_reaproveita_conexoes():
+    criadas = []
+
+    def fabrica():
+        criadas.append(sqlite3.connect(':memory:', check_same_thread=False))
+        return criadas[-1]
+
+    pool = PoolConexoes(fabrica, 2)
+    a, b = pool.obter(), pool.obter()
+    pool.devolver(a)
+    assert pool.obter() is a
+    pool.devolver(b, descartar=True)
+    assert pool.obter() is not b and len(criadas) == 3 and pool.criadas == 2
+
+    with pytest.raises(ConnectionError):
+        PoolConexoes(lambda: None, 1).obter()
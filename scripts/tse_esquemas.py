@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Esquemas declarados dos arquivos do TSE: colunas, tipos, nulidade e a projeção usada por cada etapa
+A leitura converte só as colunas projetadas, uma vez por valor distinto, e confere o cabeçalho antes da primeira linha
+"""
+
+import csv
+import os
+from operator import itemgetter
+from typing import NamedTuple
+
+from tse_cache import abrir_cache
+from tse_csv import abrir_csv_latin1, iter_lotes, ler_cabecalho
+
+TEXTO, INTEIRO = 'texto', 'inteiro'
+
+# Marcadores de valor ausente usados pelo TSE (além do campo vazio)
+NULOS = frozenset(('', '#NULO#', '#NULO', '#NE#', '#NE'))
+
+TAMANHO_LOTE = 250_000
+
+
+class ErroEsquema(ValueError):
+    """Arquivo incompatível com o esquema declarado (coluna obrigatória ausente ou valor inválido)"""
+
+
+class Coluna(NamedTuple):
+    """
+    Coluna de um arquivo do TSE. Colunas anuláveis podem faltar no cabeçalho (layouts de outros anos);
+    nas obrigatórias, ausência ou valor nulo é erro. Valores nulos de colunas inteiras viram `padrao`;
+    colunas de texto são repassadas como lidas (vazias quando ausentes).
+    """
+    nome: str
+    tipo: str = TEXTO
+    anulavel: bool = True
+    padrao: object = None
+
+
+class _Conversor(dict):
+    """Memo valor lido -> valor convertido de uma coluna inteira (colunas do TSE repetem poucos valores)"""
+
+    def __init__(self, coluna):
+        super().__init__()
+        self.coluna = coluna
+
+    def __missing__(self, valor):
+        if valor in NULOS:
+            if not self.coluna.anulavel:
+                raise ErroEsquema(f"{self.coluna.nome}: valor nulo em coluna obrigatória")
+            convertido = self.coluna.padrao
+        else:
+            try:
+                convertido = int(valor)
+            except ValueError:
+                raise ErroEsquema(f"{self.coluna.nome}: valor não inteiro {valor!r}") from None
+        self[valor] = convertido
+        return convertido
+
+
+class Esquema:
+    """Layout de um tipo de arquivo (`<prefixo>_<ano>_<UF>.csv`) e as projeções nomeadas por etapa"""
+
+    def __init__(self, prefixo, colunas, projecoes):
+        self.prefixo = prefixo
+        self.colunas = {coluna.nome: coluna for coluna in colunas}
+        self.projecoes = {etapa: tuple(nomes) for etapa, nomes in projecoes.items()}
+        for etapa, nomes in self.projecoes.items():
+            nao_declaradas = [nome for nome in nomes if nome not in self.colunas]
+            if nao_declaradas:
+                raise ValueError(f"{prefixo}/{etapa}: colunas não declaradas: {', '.join(nao_declaradas)}")
+
+    @property
+    def nomes(self):
+        """Colunas do layout, na ordem do arquivo"""
+        return tuple(self.colunas)
+
+    def projecao(self, etapa):
+        """Nomes das colunas lidas pela etapa, na ordem em que chegam às tuplas"""
+        return self.projecoes[etapa]
+
+    def conversor(self, nome):
+        """Função valor lido -> valor tipado da coluna (None para texto, que não é convertido)"""
+        coluna = self.colunas[nome]
+        return _Conversor(coluna).__getitem__ if coluna.tipo == INTEIRO else None
+
+    def verificar(self, cabecalho, etapa=None, arquivo=None):
+        """
+        Confere o cabeçalho contra o layout antes da leitura. Falta de coluna obrigatória
+        (da etapa, ou de todo o layout sem `etapa`) é ErroEsquema; colunas anuláveis ausentes
+        e colunas não declaradas são avisadas. Retorna (ausentes, não declaradas).
+        """
+        nomes = self.projecao(etapa) if etapa else self.nomes
+        presentes = set(cabecalho)
+        ausentes = [nome for nome in nomes if nome not in presentes]
+        obrigatorias = [nome for nome in ausentes if not self.colunas[nome].anulavel]
+        origem = os.path.basename(arquivo) if arquivo else self.prefixo
+        if obrigatorias:
+            raise ErroEsquema(f"{origem}: colunas obrigatórias ausentes: {', '.join(obrigatorias)}")
+        extras = [nome for nome in cabecalho if nome not in self.colunas]
+        if ausentes:
+            print(f"Aviso: {origem}: colunas ausentes, lidas como vazias: {', '.join(ausentes)}")
+        if extras:
+            print(f"Aviso: {origem}: colunas não declaradas no esquema: {', '.join(extras)}")
+        return ausentes, extras
+
+    def extrator(self, cabecalho, etapa):
+        """
+        Função linha do CSV -> tupla tipada com as colunas da etapa, montada para o cabeçalho do arquivo:
+        itemgetter com as posições projetadas e o conversor de cada coluna inteira. Colunas ausentes
+        apontam para um campo vazio além do fim da linha; linhas curtas são completadas com vazios.
+        """
+        posicoes = {nome: i for i, nome in enumerate(cabecalho)}
+        largura = len(cabecalho)
+        nomes = self.projecao(etapa)
+        indices = [posicoes.get(nome, largura) for nome in nomes]
+        minimo = max(indices) + 1
+        pegar = itemgetter(*indices) if len(indices) > 1 else lambda row: (row[indices[0]],)
+        conversores = tuple((i, converter) for i, converter in enumerate(map(self.conversor, nomes)) if converter)
+
+        def extrair(row):
+            if len(row) < minimo:
+                row += [''] * (minimo - len(row))
+            if not conversores:
+                return pegar(row)
+            valores = list(pegar(row))
+            for i, converter in conversores:
+                valores[i] = converter(valores[i])
+            return tuple(valores)
+
+        return extrair
+
+    def ler_lotes(self, filepath, etapa, tamanho_lote=TAMANHO_LOTE, cache_dir=None):
+        """
+        Lotes de tuplas tipadas com as colunas da etapa, do CSV ou do cache colunar (se `cache_dir`).
+        O cabeçalho é conferido antes do primeiro lote.
+        """
+        if cache_dir:
+            self.verificar(ler_cabecalho(filepath), etapa, filepath)
+            tabela = abrir_cache(filepath, cache_dir)
+            nomes = self.projecao(etapa)
+            conversores = [self.conversor(nome) for nome in nomes]
+            for inicio in range(0, len(tabela), tamanho_lote):
+                fim = min(inicio + tamanho_lote, len(tabela))
+                # No cache cada valor distinto do trecho é convertido uma vez
+                yield list(zip(*(tabela.convertidos(nome, converter, inicio, fim)
+                                 for nome, converter in zip(nomes, conversores))))
+            return
+
+        with abrir_csv_latin1(filepath) as f:
+            reader = csv.reader(f, 'tse')
+            cabecalho = next(reader, None)
+            if cabecalho is None:
+                return
+            self.verificar(cabecalho, etapa, filepath)
+            yield from iter_lotes(map(self.extrator(cabecalho, etapa), filter(None, reader)), tamanho_lote)
+
+    def ler(self, filepath, etapa, cache_dir=None):
+        """Tuplas tipadas com as colunas da etapa, uma por linha"""
+        for lote in self.ler_lotes(filepath, etapa, cache_dir=cache_dir):
+            yield from lote
+
+
+def _layout(nomes, inteiros=(), obrigatorias=(), padroes=None):
+    """Colunas na ordem do arquivo: texto anulável, salvo as listadas como inteiras e/ou obrigatórias"""
+    padroes = padroes or {}
+    return [
+        Coluna(nome, INTEIRO if nome in inteiros else TEXTO, nome not in obrigatorias, padroes.get(nome))
+        for nome in nomes
+    ]
+
+
+PERFIL_ELEITORADO = Esquema('perfil_eleitorado', _layout(
+    (
+        'DT_GERACAO', 'HH_GERACAO', 'ANO_ELEICAO', 'SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO',
+        'CD_MUN_SIT_BIOMETRIA', 'DS_MUN_SIT_BIOMETRIA', 'NR_ZONA', 'CD_GENERO', 'DS_GENERO',
+        'CD_ESTADO_CIVIL', 'DS_ESTADO_CIVIL', 'CD_FAIXA_ETARIA', 'DS_FAIXA_ETARIA',
+        'CD_GRAU_ESCOLARIDADE', 'DS_GRAU_ESCOLARIDADE', 'CD_RACA_COR', 'DS_RACA_COR',
+        'CD_IDENTIDADE_GENERO', 'DS_IDENTIDADE_GENERO', 'CD_QUILOMBOLA', 'DS_QUILOMBOLA',
+        'CD_INTERPRETE_LIBRAS', 'DS_INTERPRETE_LIBRAS', 'QT_ELEITORES_PERFIL', 'QT_ELEITORES_BIOMETRIA',
+        'QT_ELEITORES_DEFICIENCIA', 'QT_ELEITORES_INC_NM_SOCIAL',
+    ),
+    inteiros=('ANO_ELEICAO', 'NR_ZONA', 'QT_ELEITORES_PERFIL', 'QT_ELEITORES_BIOMETRIA',
+              'QT_ELEITORES_DEFICIENCIA', 'QT_ELEITORES_INC_NM_SOCIAL'),
+    obrigatorias=('SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA', 'DS_GENERO', 'DS_FAIXA_ETARIA',
+                  'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_PERFIL'),
+    # Contagens que não existem nos layouts mais antigos
+    padroes={'QT_ELEITORES_BIOMETRIA': 0, 'QT_ELEITORES_DEFICIENCIA': 0, 'QT_ELEITORES_INC_NM_SOCIAL': 0},
+), {
+    'agregacao': (
+        'SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA',
+        'DS_GENERO', 'DS_FAIXA_ETARIA', 'DS_GRAU_ESCOLARIDADE',
+        'QT_ELEITORES_PERFIL', 'QT_ELEITORES_BIOMETRIA', 'QT_ELEITORES_DEFICIENCIA',
+    ),
+    'municipios': ('CD_MUNICIPIO', 'NM_MUNICIPIO'),
+    'zonas': ('NR_ZONA', 'CD_MUNICIPIO'),
+    # Linhas completas da tabela eleitorado_tse (tse_eleitorado_tse.py)
+    'detalhe': (
+        'DT_GERACAO', 'ANO_ELEICAO', 'SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA',
+        'CD_GENERO', 'DS_GENERO', 'CD_ESTADO_CIVIL', 'DS_ESTADO_CIVIL', 'CD_FAIXA_ETARIA', 'DS_FAIXA_ETARIA',
+        'CD_GRAU_ESCOLARIDADE', 'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_BIOMETRIA', 'QT_ELEITORES_DEFICIENCIA',
+        'QT_ELEITORES_INC_NM_SOCIAL', 'QT_ELEITORES_PERFIL',
+    ),
+})
+
+CONSULTA_CAND = Esquema('consulta_cand', _layout(
+    (
+        'DT_GERACAO', 'HH_GERACAO', 'ANO_ELEICAO', 'CD_TIPO_ELEICAO', 'NM_TIPO_ELEICAO', 'NR_TURNO',
+        'CD_ELEICAO', 'DS_ELEICAO', 'DT_ELEICAO', 'TP_ABRANGENCIA', 'SG_UF', 'SG_UE', 'NM_UE',
+        'CD_CARGO', 'DS_CARGO', 'SQ_CANDIDATO', 'NR_CANDIDATO', 'NM_CANDIDATO', 'NM_URNA_CANDIDATO',
+        'NM_SOCIAL_CANDIDATO', 'NR_CPF_CANDIDATO', 'DS_EMAIL', 'CD_SITUACAO_CANDIDATURA',
+        'DS_SITUACAO_CANDIDATURA', 'TP_AGREMIACAO', 'NR_PARTIDO', 'SG_PARTIDO', 'NM_PARTIDO',
+        'SQ_COLIGACAO', 'NM_COLIGACAO', 'DS_COMPOSICAO_COLIGACAO', 'SG_UF_NASCIMENTO', 'DT_NASCIMENTO',
+        'CD_GENERO', 'DS_GENERO', 'CD_GRAU_INSTRUCAO', 'DS_GRAU_INSTRUCAO', 'CD_ESTADO_CIVIL',
+        'DS_ESTADO_CIVIL', 'CD_COR_RACA', 'DS_COR_RACA', 'CD_OCUPACAO', 'DS_OCUPACAO',
+        'CD_SIT_TOT_TURNO', 'DS_SIT_TOT_TURNO',
+    ),
+    inteiros=('ANO_ELEICAO', 'NR_TURNO', 'NR_CANDIDATO', 'NR_PARTIDO'),
+    obrigatorias=('NM_UE', 'DS_CARGO', 'NR_CANDIDATO', 'NM_CANDIDATO'),
+    padroes={'NR_TURNO': 1},
+), {
+    'candidatos': (
+        'NM_TIPO_ELEICAO', 'NR_TURNO', 'NM_UE', 'DS_CARGO', 'NR_CANDIDATO', 'NM_CANDIDATO',
+        'NM_URNA_CANDIDATO', 'SG_PARTIDO', 'NM_PARTIDO', 'NM_COLIGACAO', 'DS_SITUACAO_CANDIDATURA',
+        'DS_SIT_TOT_TURNO', 'DS_GENERO', 'DS_GRAU_INSTRUCAO', 'DS_COR_RACA', 'DS_OCUPACAO',
+    ),
+})
+
+CONSULTA_COLIGACAO = Esquema('consulta_coligacao', _layout(
+    (
+        'DT_GERACAO', 'HH_GERACAO', 'ANO_ELEICAO', 'CD_TIPO_ELEICAO', 'NM_TIPO_ELEICAO', 'NR_TURNO',
+        'CD_ELEICAO', 'DS_ELEICAO', 'SG_UF', 'SG_UE', 'NM_UE', 'CD_CARGO', 'DS_CARGO', 'TP_AGREMIACAO',
+        'SQ_COLIGACAO', 'NM_COLIGACAO', 'DS_COMPOSICAO_COLIGACAO', 'ST_COLIGACAO',
+    ),
+    inteiros=('ANO_ELEICAO', 'NR_TURNO'),
+    obrigatorias=('NM_UE', 'DS_CARGO'),
+    padroes={'NR_TURNO': 1},
+), {
+    'coligacoes': (
+        'NM_TIPO_ELEICAO', 'NR_TURNO', 'NM_UE', 'DS_CARGO', 'TP_AGREMIACAO', 'SQ_COLIGACAO',
+        'NM_COLIGACAO', 'DS_COMPOSICAO_COLIGACAO', 'ST_COLIGACAO',
+    ),
+})
+
+VOTACAO_SECAO = Esquema('votacao_secao', _layout(
+    (
+        'DT_GERACAO', 'HH_GERACAO', 'ANO_ELEICAO', 'CD_TIPO_ELEICAO', 'NM_TIPO_ELEICAO', 'NR_TURNO',
+        'CD_ELEICAO', 'DS_ELEICAO', 'DT_ELEICAO', 'TP_ABRANGENCIA', 'SG_UF', 'SG_UE', 'NM_UE',
+        'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA', 'NR_SECAO', 'CD_CARGO', 'DS_CARGO', 'NR_VOTAVEL',
+        'NM_VOTAVEL', 'QT_VOTOS', 'NR_LOCAL_VOTACAO', 'SQ_CANDIDATO', 'NM_LOCAL_VOTACAO',
+        'DS_LOCAL_VOTACAO_ENDERECO',
+    ),
+    # NR_VOTAVEL fica em texto: o número de dígitos distingue voto de legenda, branco e nulo
+    inteiros=('ANO_ELEICAO', 'NR_TURNO', 'NR_ZONA', 'NR_SECAO', 'QT_VOTOS', 'NR_LOCAL_VOTACAO'),
+    obrigatorias=('ANO_ELEICAO', 'NR_TURNO', 'CD_MUNICIPIO', 'NR_ZONA', 'NR_SECAO', 'DS_CARGO',
+                  'NR_VOTAVEL', 'QT_VOTOS'),
+), {
+    'votacao': (
+        'ANO_ELEICAO', 'NR_TURNO', 'CD_MUNICIPIO', 'NR_ZONA', 'NR_SECAO',
+        'DS_CARGO', 'NR_VOTAVEL', 'NM_VOTAVEL', 'QT_VOTOS',
+    ),
+})
+
+# Esquemas por prefixo do nome do arquivo
+ESQUEMAS = {esquema.prefixo: esquema for esquema in (PERFIL_ELEITORADO, CONSULTA_CAND, CONSULTA_COLIGACAO, VOTACAO_SECAO)}
+
+
+def esquema_do_arquivo(filepath):
+    """Esquema pelo nome do arquivo (ou membro de .zip): perfil_eleitorado_2024_RO.csv -> PERFIL_ELEITORADO"""
+    nome = os.path.basename(filepath).lower()
+    for prefixo in sorted(ESQUEMAS, key=len, reverse=True):
+        if nome.startswith(f"{prefixo}_"):
+            return ESQUEMAS[prefixo]
+    raise ErroEsquema(f"{os.path.basename(filepath)}: tipo de arquivo do TSE desconhecido")
@@ -0,0 +1,106 @@
+"""
+Testes dos esquemas declarados e da leitura tipada dos arquivos do TSE
+"""
+
+import pytest
+
+from tse_csv import iter_csv_latin1, ler_cabecalho
+from tse_esquemas import (
+    CONSULTA_CAND, ESQUEMAS, PERFIL_ELEITORADO, VOTACAO_SECAO, ErroEsquema, esquema_do_arquivo
+)
+from tse_sintetico import gerar_conjunto
+
+
+def _gravar(caminho, colunas, linhas):
+    caminho.write_text(';'.join(f'"{c}"' for c in colunas) + '\n'
+                       + ''.join(';'.join(f'"{v}"' for v in linha) + '\n' for linha in linhas),
+                       encoding='latin-1')
+    return str(caminho)
+
+
+def test_layouts_sinteticos_conferem_com_os_esquemas(tmp_path):
+    arquivos = gerar_conjunto(str(tmp_path), 500)
+    for caminho in arquivos.values():
+        esquema = esquema_do_arquivo(caminho)
+        assert tuple(ler_cabecalho(caminho)) == esquema.nomes
+        assert esquema.verificar(ler_cabecalho(caminho)) == ([], [])
+    assert esquema_do_arquivo('/dados/votacao_secao_2024_RO.zip/votacao_secao_2024_RO.csv') is VOTACAO_SECAO
+    assert set(ESQUEMAS) == {'perfil_eleitorado', 'consulta_cand', 'consulta_coligacao', 'votacao_secao'}
+    with pytest.raises(ErroEsquema):
+        esquema_do_arquivo('bem_candidato_2024_RO.csv')
+
+
+def test_projecao_tipada_igual_no_csv_e_no_cache(tmp_path):
+    arquivos = gerar_conjunto(str(tmp_path / 'csv'), 2_000)
+    perfil, candidatos = arquivos['perfil'], arquivos['candidatos']
+    nomes = PERFIL_ELEITORADO.projecao('agregacao')
+
+    lidas = list(PERFIL_ELEITORADO.ler(perfil, 'agregacao'))
+    texto = list(iter_csv_latin1(perfil, colunas=nomes))
+    assert len(lidas) == 2_000
+    # Só as colunas inteiras são convertidas; o texto chega como lido
+    assert lidas == [(*t[:3], int(t[3]), *t[4:7], *map(int, t[7:])) for t in texto]
+    assert [len(lote) for lote in PERFIL_ELEITORADO.ler_lotes(perfil, 'agregacao', 700)] == [700, 700, 600]
+
+    cache = str(tmp_path / 'cache')
+    assert list(PERFIL_ELEITORADO.ler(perfil, 'agregacao', cache)) == lidas
+    assert list(CONSULTA_CAND.ler(candidatos, 'candidatos', cache)) == list(CONSULTA_CAND.ler(candidatos, 'candidatos'))
+    _, turno, _, _, numero, *_ = next(CONSULTA_CAND.ler(candidatos, 'candidatos'))
+    assert isinstance(turno, int) and isinstance(numero, int)
+
+
+def test_mudanca_de_layout_detectada_no_cabecalho(tmp_path, capsys):
+    # Layout antigo: sem as contagens de biometria e deficiência, com uma coluna que o esquema não conhece
+    antigo = _gravar(tmp_path / 'perfil_eleitorado_2016_RO.csv', (
+        'SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'NR_ZONA', 'DS_GENERO', 'DS_FAIXA_ETARIA',
+        'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_PERFIL', 'CD_NOVA_CLASSIFICACAO',
+    ), [('RO', '00035', 'CIDADE', '7', 'FEMININO', '18 anos', 'ANALFABETO', '12', 'X')])
+    assert list(PERFIL_ELEITORADO.ler(antigo, 'agregacao')) == [
+        ('RO', '00035', 'CIDADE', 7, 'FEMININO', '18 anos', 'ANALFABETO', 12, 0, 0)
+    ]
+    avisos = capsys.readouterr().out
+    assert 'QT_ELEITORES_BIOMETRIA, QT_ELEITORES_DEFICIENCIA' in avisos and 'CD_NOVA_CLASSIFICACAO' in avisos
+
+    # Coluna obrigatória renomeada: erro antes de ler qualquer linha
+    renomeado = _gravar(tmp_path / 'perfil_eleitorado_2030_RO.csv', ('CD_MUNICIPIO', 'NM_MUNICIPIO', 'NUM_ZONA'),
+                        [('00035', 'CIDADE', '7')])
+    with pytest.raises(ErroEsquema, match='NR_ZONA'):
+        next(PERFIL_ELEITORADO.ler(renomeado, 'zonas'))
+    # A etapa que não usa a coluna continua lendo o arquivo
+    assert list(PERFIL_ELEITORADO.ler(renomeado, 'municipios')) == [('00035', 'CIDADE')]
+
+
+def test_valores_nulos_e_invalidos(tmp_path):
+    colunas = ('NM_TIPO_ELEICAO', 'NR_TURNO', 'NM_UE', 'DS_CARGO', 'NR_CANDIDATO', 'NM_CANDIDATO')
+    caminho = _gravar(tmp_path / 'consulta_cand_2024_RO.csv', colunas, [
+        ('ORDINÁRIA', '#NULO#', 'CIDADE', 'PREFEITO', '13', 'ANA'),
+        ('ORDINÁRIA', '', 'CIDADE', 'VEREADOR', '13123', '#NULO#'),
+    ])
+    linhas = list(CONSULTA_CAND.ler(caminho, 'candidatos'))
+    # Turno ausente vira o padrão declarado; texto ausente fica como no arquivo
+    assert [linha[:6] for linha in linhas] == [
+        ('ORDINÁRIA', 1, 'CIDADE', 'PREFEITO', 13, 'ANA'), ('ORDINÁRIA', 1, 'CIDADE', 'VEREADOR', 13123, '#NULO#')
+    ]
+    assert linhas[0][6:] == ('',) * 10
+
+    sem_numero = _gravar(tmp_path / 'consulta_cand_2022_RO.csv', colunas,
+                         [('ORDINÁRIA', '1', 'CIDADE', 'PREFEITO', '#NULO#', 'ANA')])
+    with pytest.raises(ErroEsquema, match='NR_CANDIDATO'):
+        list(CONSULTA_CAND.ler(sem_numero, 'candidatos'))
+    invalido = _gravar(tmp_path / 'consulta_cand_2020_RO.csv', colunas,
+                       [('ORDINÁRIA', '1º', 'CIDADE', 'PREFEITO', '13', 'ANA')])
+    with pytest.raises(ErroEsquema, match="'1º'"):
+        list(CONSULTA_CAND.ler(invalido, 'candidatos'))
+
+
+def test_extrator_com_colunas_ausentes_e_linhas_curtas():
+    cabecalho = ['NR_ZONA', 'SG_UF', 'CD_MUNICIPIO', 'NM_MUNICIPIO', 'DS_GENERO', 'DS_FAIXA_ETARIA',
+                 'DS_GRAU_ESCOLARIDADE', 'QT_ELEITORES_PERFIL']
+    extrair = PERFIL_ELEITORADO.extrator(cabecalho, 'agregacao')
+    linha = ['7', 'RO', '00035', 'CIDADE', 'FEMININO', '25 anos', 'MÉDIO', '12']
+    # Biometria e deficiência ausentes no cabeçalho: valor padrão das colunas
+    assert extrair(list(linha)) == ('RO', '00035', 'CIDADE', 7, 'FEMININO', '25 anos', 'MÉDIO', 12, 0, 0)
+    with pytest.raises(ErroEsquema, match='QT_ELEITORES_PERFIL'):
+        extrair(linha[:7])
+    assert PERFIL_ELEITORADO.extrator(cabecalho, 'municipios')(linha[:2]) == ('', '')
+    assert PERFIL_ELEITORADO.extrator(cabecalho, 'zonas')(linha[:1]) == (7, '')
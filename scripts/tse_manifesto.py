@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Manifesto de importação: impressão digital de cada CSV de origem e checkpoint por etapa
+Permite pular arquivos inalterados, retomar cargas interrompidas e carregar apenas o delta
+"""
+
+import hashlib
+import json
+import os
+
+from tse_zip import abrir_binario, estado
+
+BLOCO_HASH = 1 << 20
+
+
+def impressao_digital(filepath, anterior=None):
+    """
+    Tamanho, mtime e SHA-256 do arquivo (de um membro de .zip, do conteúdo descomprimido,
+    igual ao do CSV extraído). Se tamanho e mtime coincidem com a impressão `anterior`, o hash é reaproveitado.
+    """
+    tamanho, mtime_ns = estado(filepath)
+    digital = {'tamanho': tamanho, 'mtime_ns': mtime_ns}
+    if anterior and anterior.get('tamanho') == tamanho and anterior.get('mtime_ns') == mtime_ns:
+        digital['sha256'] = anterior['sha256']
+        return digital
+    h = hashlib.sha256()
+    with abrir_binario(filepath) as f:
+        for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+            h.update(bloco)
+    digital['sha256'] = h.hexdigest()
+    return digital
+
+
+def resumo_registros(registros):
+    """Hash estável de uma lista de registros (para detectar mudanças por grupo)"""
+    return hashlib.sha1(json.dumps(registros, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Manifesto:
+    """
+    Estado das importações gravado em JSON, por arquivo de origem:
+
+        {"arquivos": {"perfil_eleitorado_2024_RO.csv": {
+            "digital": {"tamanho": ..., "mtime_ns": ..., "sha256": ...},
+            "importacaoId": 12,
+            "etapas": {"eleitorado": {"status": "processando", "linhas_confirmadas": 5000}},
+            "estado": {"eleitorado": {"00035": "<hash dos registros do município>"}}
+        }}}
+
+    `etapas` vale para a impressão digital atual; `estado` descreve o que já está
+    no banco e sobrevive a mudanças no arquivo, servindo de base para o delta.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.dados = {'arquivos': {}}
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self.dados = json.load(f)
+
+    def salvar(self):
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def arquivo(self, filepath):
+        return self.dados['arquivos'].get(os.path.basename(filepath))
+
+    def situacao(self, filepath):
+        """Retorna ('novo' | 'alterado' | 'inalterado', impressão digital atual)"""
+        registro = self.arquivo(filepath)
+        anterior = registro['digital'] if registro else None
+        digital = impressao_digital(filepath, anterior)
+        if registro is None:
+            return 'novo', digital
+        if digital['sha256'] != anterior['sha256']:
+            return 'alterado', digital
+        return 'inalterado', digital
+
+    def iniciar(self, filepath, digital):
+        """Registra a impressão digital; etapas só são mantidas se o conteúdo não mudou"""
+        chave = os.path.basename(filepath)
+        registro = self.dados['arquivos'].get(chave)
+        if registro is None or registro['digital']['sha256'] != digital['sha256']:
+            registro = {
+                'digital': digital,
+                'importacaoId': None,
+                'etapas': {},
+                'estado': registro['estado'] if registro else {},
+            }
+        else:
+            registro['digital'] = digital
+        self.dados['arquivos'][chave] = registro
+        self.salvar()
+        return registro
+
+    def reiniciar(self, filepath):
+        """Descarta checkpoints e estado do arquivo, forçando uma recarga completa"""
+        registro = self.arquivo(filepath)
+        registro['etapas'] = {}
+        registro['estado'] = {}
+        self.salvar()
+
+    def concluido(self, filepath, etapas):
+        registro = self.arquivo(filepath)
+        return bool(registro) and all(
+            registro['etapas'].get(e, {}).get('status') == 'concluido' for e in etapas
+        )
+
+    def etapa(self, filepath, nome):
+        return self.arquivo(filepath)['etapas'].setdefault(nome, {'status': 'pendente'})
+
+    def atualizar_etapa(self, filepath, nome, **campos):
+        self.etapa(filepath, nome).update(campos)
+        self.salvar()
+
+    def estado(self, filepath, nome):
+        return self.arquivo(filepath)['estado'].get(nome, {})
+
+    def definir_estado(self, filepath, nome, estado):
+        self.arquivo(filepath)['estado'][nome] = estado
+        self.salvar()
@@ -0,0 +1,76 @@
+"""
+Testes do manifesto de importação (impressão digital e checkpoints)
+"""
+
+import os
+
+import pytest
+
+from tse_manifesto import Manifesto, impressao_digital, resumo_registros
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = tmp_path / "perfil_eleitorado_2024_RO.csv"
+    caminho.write_text("SG_UF;CD_MUNICIPIO\nRO;00035\n", encoding='latin-1')
+    return str(caminho)
+
+
+@pytest.fixture
+def manifesto(tmp_path):
+    return Manifesto(str(tmp_path / "manifesto.json"))
+
+
+def test_impressao_digital_reaproveita_hash_se_tamanho_e_mtime_iguais(arquivo):
+    digital = impressao_digital(arquivo)
+    assert impressao_digital(arquivo, {**digital, 'sha256': 'anterior'})['sha256'] == 'anterior'
+    assert impressao_digital(arquivo, {**digital, 'mtime_ns': 0, 'sha256': 'anterior'}) == digital
+
+
+def test_situacao_novo_inalterado_alterado(arquivo, manifesto):
+    situacao, digital = manifesto.situacao(arquivo)
+    assert situacao == 'novo'
+    manifesto.iniciar(arquivo, digital)
+    assert manifesto.situacao(arquivo)[0] == 'inalterado'
+
+    with open(arquivo, 'a', encoding='latin-1') as f:
+        f.write("RO;00043\n")
+    assert manifesto.situacao(arquivo)[0] == 'alterado'
+
+
+def test_mtime_diferente_com_mesmo_conteudo_continua_inalterado(arquivo, manifesto):
+    manifesto.iniciar(arquivo, manifesto.situacao(arquivo)[1])
+    os.utime(arquivo, ns=(0, 0))
+    assert manifesto.situacao(arquivo)[0] == 'inalterado'
+
+
+def test_checkpoints_persistem_e_sobrevivem_a_reabertura(arquivo, manifesto):
+    manifesto.iniciar(arquivo, manifesto.situacao(arquivo)[1])
+    manifesto.atualizar_etapa(arquivo, 'municipios', status='concluido')
+    manifesto.atualizar_etapa(arquivo, 'eleitorado', status='processando', linhas_confirmadas=500)
+
+    reaberto = Manifesto(manifesto.caminho)
+    assert reaberto.etapa(arquivo, 'eleitorado') == {'status': 'processando', 'linhas_confirmadas': 500}
+    assert reaberto.concluido(arquivo, ('municipios',))
+    assert not reaberto.concluido(arquivo, ('municipios', 'eleitorado'))
+    assert not os.path.exists(manifesto.caminho + '.tmp')
+
+
+def test_arquivo_alterado_descarta_etapas_mas_mantem_estado(arquivo, manifesto):
+    manifesto.iniciar(arquivo, manifesto.situacao(arquivo)[1])
+    manifesto.atualizar_etapa(arquivo, 'eleitorado', status='concluido')
+    manifesto.definir_estado(arquivo, 'eleitorado', {'00035': 'abc'})
+
+    with open(arquivo, 'a', encoding='latin-1') as f:
+        f.write("RO;00043\n")
+    manifesto.iniciar(arquivo, manifesto.situacao(arquivo)[1])
+    assert manifesto.etapa(arquivo, 'eleitorado')['status'] == 'pendente'
+    assert manifesto.estado(arquivo, 'eleitorado') == {'00035': 'abc'}
+
+    manifesto.reiniciar(arquivo)
+    assert manifesto.estado(arquivo, 'eleitorado') == {}
+
+
+def test_resumo_registros_independe_da_ordem_das_chaves():
+    assert resumo_registros([{'a': 1, 'b': 2}]) == resumo_registros([{'b': 2, 'a': 1}])
+    assert resumo_registros([{'a': 1}]) != resumo_registros([{'a': 2}])
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Células do mapa de calor (tabela `mapa_calor`)
+Eleitores, nulos, brancos e votos por partido somados em uma grade Web Mercator alinhada aos tiles
+do mapa, em vários níveis de zoom. A célula (celulaX, celulaY) de cada nível faz parte da chave
+primária, então a janela visível do mapa é lida como um intervalo da chave (shared/mapaCalor.ts).
+"""
+
+import json
+import math
+from collections import defaultdict
+
+import numpy as np
+
+TABELA_MAPA = 'mapa_calor'
+
+COLUNAS_MAPA = (
+    'anoEleicao', 'cargo', 'zoom', 'celulaX', 'celulaY', 'latitude', 'longitude',
+    'eleitores', 'nulos', 'brancos', 'votosValidos', 'partidos'
+)
+
+# Níveis de zoom pré-calculados; o mapa usa o maior nível que não passa do zoom atual
+NIVEIS_ZOOM = (4, 6, 8, 10, 12, 14, 16)
+
+# Células por tile (256 px) em cada eixo: células de 32 px na tela. Um nível é a soma exata do seguinte
+CELULAS_POR_TILE = 8
+
+# Latitude máxima da projeção Web Mercator
+LATITUDE_MAXIMA = 85.05112878
+
+
+def celula(latitude, longitude, zoom):
+    """(celulaX, celulaY) do ponto no nível `zoom` (mesmo cálculo de shared/mapaCalor.ts)"""
+    x, y = celulas(np.array([latitude], dtype=np.float64), np.array([longitude], dtype=np.float64), zoom)
+    return int(x[0]), int(y[0])
+
+
+def celulas(latitudes, longitudes, zoom):
+    """Vetores (celulaX, celulaY) dos pontos no nível `zoom`"""
+    n = CELULAS_POR_TILE << zoom
+    lat = np.radians(np.clip(latitudes, -LATITUDE_MAXIMA, LATITUDE_MAXIMA))
+    x = (longitudes + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+    limite = n - 1
+    return (np.clip(np.floor(x * n), 0, limite).astype(np.int64),
+            np.clip(np.floor(y * n), 0, limite).astype(np.int64))
+
+
+class Pontos:
+    """
+    Medidas somadas por coordenada (bairro, zona ou município de cada linha das tabelas de fatos).
+    Partidos são colunas de uma matriz ponto x partido, na ordem de `partidos`.
+    """
+
+    def __init__(self):
+        self.indice = {}
+        self.coordenadas = []
+        self.medidas = []      # [eleitores, nulos, brancos] por ponto
+        self.votos = []        # {coluna do partido: votos} por ponto
+        self.partidos = {}     # sigla -> coluna
+        self.ignorados = 0     # linhas sem coordenada
+
+    def _ponto(self, latitude, longitude):
+        try:
+            chave = (float(latitude), float(longitude))
+        except (TypeError, ValueError):
+            return None
+        if not all(map(math.isfinite, chave)):
+            return None
+        i = self.indice.get(chave)
+        if i is None:
+            i = self.indice[chave] = len(self.coordenadas)
+            self.coordenadas.append(chave)
+            self.medidas.append([0, 0, 0])
+            self.votos.append(defaultdict(int))
+        return i
+
+    def somar(self, latitude, longitude, eleitores=0, nulos=0, brancos=0, partido=None, votos=0):
+        """Soma medidas na coordenada; linhas sem coordenada válida só são contadas em `ignorados`"""
+        i = self._ponto(latitude, longitude)
+        if i is None:
+            self.ignorados += 1
+            return
+        medidas = self.medidas[i]
+        medidas[0] += eleitores or 0
+        medidas[1] += nulos or 0
+        medidas[2] += brancos or 0
+        if votos:
+            coluna = self.partidos.setdefault(partido or 'outros', len(self.partidos))
+            self.votos[i][coluna] += votos
+
+    def __len__(self):
+        return len(self.coordenadas)
+
+    def matrizes(self):
+        """(latitudes, longitudes, medidas n x 3, votos n x partidos)"""
+        coordenadas = np.array(self.coordenadas, dtype=np.float64).reshape(-1, 2)
+        votos = np.zeros((len(self), len(self.partidos)), dtype=np.int64)
+        for i, por_partido in enumerate(self.votos):
+            for coluna, qt in por_partido.items():
+                votos[i, coluna] = qt
+        return (coordenadas[:, 0], coordenadas[:, 1],
+                np.array(self.medidas, dtype=np.int64).reshape(-1, 3), votos)
+
+
+def construir_celulas(pontos, ano, cargo, niveis=NIVEIS_ZOOM):
+    """
+    Linhas de `mapa_calor` (na ordem de COLUNAS_MAPA) de todos os níveis: medidas somadas por célula
+    com uma redução agrupada por nível. A coordenada da célula é o centro ponderado pelos eleitores
+    (ou pelos votos, onde não há eleitores), para o ponto de calor cair onde o eleitorado está.
+    """
+    if not len(pontos):
+        return []
+    latitudes, longitudes, medidas, votos = pontos.matrizes()
+    siglas = sorted(pontos.partidos, key=pontos.partidos.get)
+    peso = np.where(medidas[:, 0] > 0, medidas[:, 0], medidas[:, 1:].sum(axis=1) + votos.sum(axis=1))
+    peso = np.maximum(peso, 1).astype(np.float64)
+
+    linhas = []
+    for zoom in niveis:
+        x, y = celulas(latitudes, longitudes, zoom)
+        chaves, grupo = np.unique(np.stack([x, y], axis=1), axis=0, return_inverse=True)
+        grupo = grupo.reshape(-1)
+        n = len(chaves)
+        soma_peso = np.bincount(grupo, weights=peso, minlength=n)
+        lat = np.bincount(grupo, weights=latitudes * peso, minlength=n) / soma_peso
+        lng = np.bincount(grupo, weights=longitudes * peso, minlength=n) / soma_peso
+        somas = np.zeros((n, 3 + votos.shape[1]), dtype=np.int64)
+        np.add.at(somas, grupo, np.hstack([medidas, votos]))
+        for (cx, cy), la, lo, s in zip(chaves.tolist(), lat.tolist(), lng.tolist(), somas.tolist()):
+            por_partido = {sigla: qt for sigla, qt in zip(siglas, s[3:]) if qt}
+            linhas.append((ano, cargo, zoom, cx, cy, round(la, 6), round(lo, 6), s[0], s[1], s[2],
+                           sum(s[3:]), json.dumps(por_partido, ensure_ascii=False, sort_keys=True)))
+    return linhas
+
+
+def _mais_finas(linhas):
+    """
+    Linhas (municipioId, zonaId, bairroId, secaoId, ...) sem as de escopo mais amplo que já têm
+    detalhamento na mesma tabela (ex.: o total da zona quando a zona também tem linhas por seção),
+    para que o mesmo eleitor não seja somado duas vezes
+    """
+    zonas = {z for m, z, b, s, *_ in linhas if z and (b or s)}
+    bairros = {b for m, z, b, s, *_ in linhas if b and s}
+    municipios = {m for m, z, b, s, *_ in linhas if z or b or s}
+    for linha in linhas:
+        m, z, b, s = linha[:4]
+        if s or (b and b not in bairros) or (not b and z and z not in zonas) or (not (b or z) and m not in municipios):
+            yield linha
+
+
+def _consulta(tabela, medidas, filtro, extras=''):
+    """Soma as medidas por escopo da linha, com a coordenada do bairro, da zona ou do município"""
+    return f"""
+        SELECT f.municipioId, f.zonaId, f.bairroId, f.secaoId,
+               MAX(COALESCE(b.latitude, z.latitude, m.latitude)),
+               MAX(COALESCE(b.longitude, z.longitude, m.longitude)),
+               {medidas}
+        FROM {tabela} f
+        LEFT JOIN secoes_eleitorais s ON s.id = f.secaoId
+        LEFT JOIN bairros b ON b.id = COALESCE(f.bairroId, s.bairroId)
+        LEFT JOIN zonas_eleitorais z ON z.id = COALESCE(f.zonaId, s.zonaId)
+        LEFT JOIN municipios m ON m.id = COALESCE(f.municipioId, z.municipioId, b.municipioId)
+        {extras}
+        WHERE {filtro}
+        GROUP BY f.municipioId, f.zonaId, f.bairroId, f.secaoId{', f.partidoId' if 'partidoId' in medidas else ''}
+    """
+
+
+def carregar_pontos(conn, placeholder, ano, cargo, turno=1):
+    """Pontos do ano a partir de eleitorado, votos_nulos_brancos e resultados_eleitorais (cargo e turno)"""
+    p = placeholder
+    cursor = conn.cursor()
+    pontos = Pontos()
+
+    cursor.execute(_consulta('eleitorado', 'SUM(f.totalEleitores)', f"f.anoEleicao = {p}"), [ano])
+    for *_, lat, lng, eleitores in _mais_finas(cursor.fetchall()):
+        pontos.somar(lat, lng, eleitores=int(eleitores or 0))
+
+    filtro_votos = f"f.anoEleicao = {p} AND f.cargo = {p} AND f.turno = {p}"
+    cursor.execute(_consulta('votos_nulos_brancos', 'SUM(f.votosNulos), SUM(f.votosBrancos)', filtro_votos),
+                   [ano, cargo, turno])
+    for *_, lat, lng, nulos, brancos in _mais_finas(cursor.fetchall()):
+        pontos.somar(lat, lng, nulos=int(nulos or 0), brancos=int(brancos or 0))
+
+    cursor.execute(_consulta('resultados_eleitorais', 'f.partidoId, MAX(pa.sigla), SUM(f.votosValidos)',
+                             filtro_votos, 'LEFT JOIN partidos pa ON pa.id = f.partidoId'),
+                   [ano, cargo, turno])
+    for *_, lat, lng, _, sigla, votos in _mais_finas(cursor.fetchall()):
+        pontos.somar(lat, lng, partido=sigla, votos=int(votos or 0))
+    return pontos
+
+
+def gravar_mapa(conn, carga, ano, cargo, linhas):
+    """Substitui as células do ano e cargo; retorna as linhas inseridas"""
+    p = carga.placeholder
+    cursor = conn.cursor()
+    cursor.execute(f"DELETE FROM {TABELA_MAPA} WHERE anoEleicao = {p} AND cargo = {p}", [ano, cargo])
+    conn.commit()
+    return carga.inserir(TABELA_MAPA, COLUNAS_MAPA, linhas)
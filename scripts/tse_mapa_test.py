@@ -0,0 +1,184 @@
+"""
+Testes das células do mapa de calor usando sqlite3 como banco local
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from tse_carga import CarregadorBulk
+from tse_mapa import (COLUNAS_MAPA, NIVEIS_ZOOM, Pontos, carregar_pontos, celula, celulas,
+                      construir_celulas, gravar_mapa)
+
+ESQUEMA = """
+CREATE TABLE municipios (id INTEGER PRIMARY KEY, nome TEXT, latitude TEXT, longitude TEXT);
+CREATE TABLE bairros (id INTEGER PRIMARY KEY, nome TEXT, municipioId INTEGER, latitude TEXT, longitude TEXT);
+CREATE TABLE zonas_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, municipioId INTEGER,
+                               latitude TEXT, longitude TEXT);
+CREATE TABLE secoes_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, zonaId INTEGER, bairroId INTEGER);
+CREATE TABLE partidos (id INTEGER PRIMARY KEY, sigla TEXT);
+CREATE TABLE eleitorado (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, municipioId INTEGER, zonaId INTEGER,
+    bairroId INTEGER, secaoId INTEGER, totalEleitores INTEGER
+);
+CREATE TABLE resultados_eleitorais (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, partidoId INTEGER, votosValidos INTEGER
+);
+CREATE TABLE votos_nulos_brancos (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, votosNulos INTEGER, votosBrancos INTEGER
+);
+CREATE TABLE mapa_calor (
+    anoEleicao INTEGER, cargo TEXT, zoom INTEGER, celulaX INTEGER, celulaY INTEGER,
+    latitude REAL, longitude REAL, eleitores INTEGER, nulos INTEGER, brancos INTEGER,
+    votosValidos INTEGER, partidos TEXT,
+    PRIMARY KEY (anoEleicao, cargo, zoom, celulaX, celulaY)
+);
+"""
+
+# Porto Velho (bairros Centro e Nova Porto Velho, zona 2 sem bairro) e Ariquemes (só o município)
+CENTRO = ('-8.7612', '-63.9004')
+NOVA_PV = ('-8.7523', '-63.8820')
+ZONA_2 = ('-8.7800', '-63.8500')
+ARIQUEMES = ('-9.9133', '-63.0408')
+
+
+def _ponto(coordenada):
+    return tuple(map(float, coordenada))
+
+
+@pytest.fixture
+def conexao(banco):
+    conexao = banco(ESQUEMA)
+    conexao.executemany("INSERT INTO municipios VALUES (?, ?, ?, ?)",
+                        [(1, 'Porto Velho', '-8.76', '-63.90'), (2, 'Ariquemes', *ARIQUEMES), (3, 'Sem mapa', None, None)])
+    conexao.executemany("INSERT INTO bairros VALUES (?, ?, ?, ?, ?)",
+                        [(10, 'Centro', 1, *CENTRO), (11, 'Nova Porto Velho', 1, *NOVA_PV)])
+    conexao.executemany("INSERT INTO zonas_eleitorais VALUES (?, ?, ?, ?, ?)",
+                        [(20, 1, 1, None, None), (21, 2, 1, *ZONA_2)])
+    conexao.executemany("INSERT INTO secoes_eleitorais VALUES (?, ?, ?, ?)",
+                        [(100, 1, 20, 10), (101, 2, 20, 11), (102, 3, 21, None)])
+    conexao.executemany("INSERT INTO partidos VALUES (?, ?)", [(7, 'PT'), (8, 'PL')])
+    # Eleitorado por seção, com o total da zona 20 repetido (não deve ser somado de novo)
+    conexao.executemany(
+        "INSERT INTO eleitorado (anoEleicao, municipioId, zonaId, bairroId, secaoId, totalEleitores) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [(2024, 1, 20, 10, 100, 300), (2024, 1, 20, 11, 101, 200), (2024, 1, 21, None, 102, 100),
+         (2024, 1, 20, None, None, 500), (2024, 2, None, None, None, 400), (2024, 3, None, None, None, 50),
+         (2022, 1, 20, 10, 100, 999)]
+    )
+    conexao.executemany(
+        "INSERT INTO resultados_eleitorais (anoEleicao, turno, cargo, municipioId, zonaId, bairroId, secaoId, "
+        "partidoId, votosValidos) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(2024, 1, 'prefeito', 1, 20, 10, 100, 7, 150), (2024, 1, 'prefeito', 1, 20, 10, 100, 8, 100),
+         (2024, 1, 'prefeito', 1, 20, 11, 101, 8, 120), (2024, 1, 'prefeito', 2, None, None, None, 7, 300),
+         (2024, 2, 'prefeito', 1, 20, 10, 100, 7, 777), (2024, 1, 'vereador', 1, 20, 10, 100, 7, 888)]
+    )
+    conexao.executemany(
+        "INSERT INTO votos_nulos_brancos (anoEleicao, turno, cargo, municipioId, zonaId, bairroId, secaoId, "
+        "votosNulos, votosBrancos) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(2024, 1, 'prefeito', 1, 20, None, 100, 10, 5), (2024, 1, 'prefeito', 1, 21, None, 102, 3, 2)]
+    )
+    return conexao
+
+
+def test_celula_web_mercator():
+    # Zoom 0: o mundo inteiro em um tile de 8 x 8 células; Greenwich/Equador no canto da célula central
+    assert celula(0.0, 0.0, 0) == (4, 4)
+    assert celula(85.0, -180.0, 0) == (0, 0)
+    assert celula(-90.0, 180.0, 0) == (7, 7)
+    # Cada nível divide a célula em quatro: o pai é a célula do filho dividida por 2^(diferença de zoom)
+    x, y = celula(-8.7612, -63.9004, 16)
+    assert celula(-8.7612, -63.9004, 12) == (x >> 4, y >> 4)
+
+
+def test_pontos_somados_por_coordenada():
+    pontos = Pontos()
+    pontos.somar('-8.76', '-63.9', eleitores=10)
+    pontos.somar(-8.76, -63.9, nulos=2, partido='PT', votos=5)
+    pontos.somar(None, '-63.9', eleitores=99)
+    pontos.somar('nan', '1', eleitores=99)
+    latitudes, longitudes, medidas, votos = pontos.matrizes()
+    assert len(pontos) == 1 and pontos.ignorados == 2
+    assert medidas.tolist() == [[10, 2, 0]] and votos.tolist() == [[5]]
+
+
+def test_carregar_pontos_sem_contagem_dupla(conexao):
+    pontos = carregar_pontos(conexao, '?', 2024, 'prefeito')
+    por_coordenada = {coordenada: (m, v) for coordenada, m, v in zip(
+        pontos.coordenadas, pontos.medidas, pontos.votos)}
+    siglas = {coluna: sigla for sigla, coluna in pontos.partidos.items()}
+
+    # Seção 102 sem bairro cai na coordenada da zona 21; o total da zona 20 é descartado
+    assert por_coordenada[_ponto(CENTRO)][0] == [300, 10, 5]
+    assert por_coordenada[_ponto(NOVA_PV)][0] == [200, 0, 0]
+    assert por_coordenada[_ponto(ZONA_2)][0] == [100, 3, 2]
+    assert por_coordenada[_ponto(ARIQUEMES)][0] == [400, 0, 0]
+    assert {siglas[c]: v for c, v in por_coordenada[_ponto(CENTRO)][1].items()} == {'PT': 150, 'PL': 100}
+    # Município sem coordenada fica fora do mapa; 2º turno, outro cargo e outro ano não entram
+    assert pontos.ignorados == 1
+    assert sum(m[0] for m in pontos.medidas) == 1000
+    assert sum(sum(v.values()) for v in pontos.votos) == 670
+
+
+def test_niveis_somam_o_mesmo_total(conexao):
+    pontos = carregar_pontos(conexao, '?', 2024, 'prefeito')
+    linhas = construir_celulas(pontos, 2024, 'prefeito')
+    por_nivel = {}
+    for linha in linhas:
+        registro = dict(zip(COLUNAS_MAPA, linha))
+        total = por_nivel.setdefault(registro['zoom'], [0, 0, 0, 0, 0])
+        for i, coluna in enumerate(('eleitores', 'nulos', 'brancos', 'votosValidos')):
+            total[i] += registro[coluna]
+        total[4] += json.loads(registro['partidos']).get('PT', 0)
+    assert sorted(por_nivel) == list(NIVEIS_ZOOM)
+    assert all(total == [1000, 13, 7, 670, 450] for total in por_nivel.values())
+
+    # Zoom 4: Porto Velho e Ariquemes na mesma célula, com o centro puxado para Porto Velho (mais eleitores)
+    zoom4 = [dict(zip(COLUNAS_MAPA, linha)) for linha in linhas if linha[2] == 4]
+    assert len(zoom4) == 1
+    assert -9.9133 < zoom4[0]['latitude'] < -8.76 and zoom4[0]['longitude'] < -63.5
+    # Zoom 16: um ponto por célula; a célula tem a coordenada exata do ponto
+    zoom16 = [dict(zip(COLUNAS_MAPA, linha)) for linha in linhas if linha[2] == 16]
+    assert len(zoom16) == 4
+    centro = next(r for r in zoom16 if r['eleitores'] == 300)
+    assert (centro['celulaX'], centro['celulaY']) == celula(-8.7612, -63.9004, 16)
+    assert (centro['latitude'], centro['longitude']) == (-8.7612, -63.9004)
+
+
+def test_celulas_filhas_somam_a_celula_pai(conexao):
+    linhas = construir_celulas(carregar_pontos(conexao, '?', 2024, 'prefeito'), 2024, 'prefeito', (8, 10))
+    pais = {(linha[3], linha[4]): linha[7] for linha in linhas if linha[2] == 8}
+    filhos = {}
+    for linha in linhas:
+        if linha[2] == 10:
+            chave = (linha[3] >> 2, linha[4] >> 2)
+            filhos[chave] = filhos.get(chave, 0) + linha[7]
+    assert pais == filhos
+
+
+def test_gravar_mapa_substitui_ano_e_cargo(conexao):
+    carga = CarregadorBulk(conexao, tamanho_lote=3, relatar=False)
+    linhas = construir_celulas(carregar_pontos(conexao, '?', 2024, 'prefeito'), 2024, 'prefeito')
+    conexao.execute("INSERT INTO mapa_calor (anoEleicao, cargo, zoom, celulaX, celulaY) VALUES (2024, 'vereador', 4, 0, 0)")
+    assert gravar_mapa(conexao, carga, 2024, 'prefeito', linhas) == len(linhas)
+    assert gravar_mapa(conexao, carga, 2024, 'prefeito', linhas) == len(linhas)
+    assert conexao.execute("SELECT COUNT(*) FROM mapa_calor WHERE cargo = 'prefeito'").fetchone()[0] == len(linhas)
+    assert conexao.execute("SELECT COUNT(*) FROM mapa_calor WHERE cargo = 'vereador'").fetchone()[0] == 1
+
+    # Janela visível no zoom 16: intervalo de células em torno do Centro
+    x, y = celula(-8.7612, -63.9004, 16)
+    janela = conexao.execute(
+        "SELECT eleitores FROM mapa_calor WHERE anoEleicao = 2024 AND cargo = 'prefeito' AND zoom = 16 "
+        "AND celulaX BETWEEN ? AND ? AND celulaY BETWEEN ? AND ?", [x - 1, x + 1, y - 1, y + 1]
+    ).fetchall()
+    assert janela == [(300,)]
+
+
+def test_celulas_vetorizado_igual_ao_escalar():
+    latitudes = np.array([-8.7612, -9.9133, 10.0])
+    longitudes = np.array([-63.9004, -63.0408, 20.0])
+    x, y = celulas(latitudes, longitudes, 10)
+    assert list(zip(x.tolist(), y.tolist())) == [celula(la, lo, 10) for la, lo in zip(latitudes, longitudes)]
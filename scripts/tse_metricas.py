@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Instrumentação da importação: tempo, linhas/s, bytes lidos e pico de memória por etapa
+O progresso (etapa atual, linhas, ETA) é publicado periodicamente em `importacoes` e em um arquivo JSON
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from tse_csv import estimar_linhas
+from tse_zip import tamanho
+
+# Intervalo mínimo entre duas publicações do progresso (segundos)
+INTERVALO_PADRAO = 5.0
+
+# Instrumentação ativa no processo; sem ela, avancar() não faz nada
+_ativa = None
+
+
+def pico_rss_mb():
+    """Pico de memória residente do processo atual em MiB"""
+    # No Linux, VmHWM é zerado no exec; ru_maxrss herda o pico do processo pai
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def avancar(linhas, gravadas=0):
+    """Soma linhas lidas e gravadas à etapa atual da instrumentação ativa (chamar por lote, não por linha)"""
+    if _ativa is not None:
+        _ativa.avancar(linhas, gravadas)
+
+
+class Etapa:
+    """Contadores de uma etapa; `total` é a estimativa de linhas a ler, usada no progresso e no ETA"""
+
+    def __init__(self, nome, total=None, bytes_total=0):
+        self.nome = nome
+        self.total = total
+        self.bytes_total = bytes_total
+        self.linhas = 0
+        self.gravadas = 0
+        self.status = 'processando'
+        self.inicio = time.perf_counter()
+        self.segundos = 0.0
+        self.pico_rss_mb = None
+
+    def decorrido(self):
+        return time.perf_counter() - self.inicio if self.status == 'processando' else self.segundos
+
+    def linhas_por_segundo(self):
+        segundos = self.decorrido()
+        return (self.linhas or self.gravadas) / segundos if segundos > 0 else 0.0
+
+    def progresso(self):
+        if self.status == 'concluido':
+            return 1.0
+        return min(self.linhas / self.total, 1.0) if self.total else None
+
+    def eta_segundos(self):
+        if self.status != 'processando' or not self.total or not self.linhas:
+            return None
+        return max(self.total - self.linhas, 0) / self.linhas_por_segundo()
+
+    def bytes_lidos(self):
+        if not self.linhas:
+            return 0
+        if self.status != 'processando':
+            return self.bytes_total
+        return int(self.bytes_total * self.progresso()) if self.total else 0
+
+    def como_dict(self):
+        segundos = self.decorrido()
+        bytes_lidos = self.bytes_lidos()
+        return {
+            'nome': self.nome,
+            'status': self.status,
+            'segundos': round(segundos, 3),
+            'linhas': self.linhas,
+            'linhas_gravadas': self.gravadas,
+            'linhas_estimadas': self.total,
+            'linhas_por_segundo': round(self.linhas_por_segundo(), 1),
+            'bytes_lidos': bytes_lidos,
+            'mb_por_segundo': round(bytes_lidos / 1e6 / segundos, 2) if segundos > 0 else 0.0,
+            'progresso': self.progresso(),
+            'eta_segundos': self.eta_segundos(),
+            'pico_rss_mb': self.pico_rss_mb,
+        }
+
+
+class Metricas:
+    """
+    Instrumentação de uma execução, ativa dentro de `with`. Cada etapa é medida com `etapa()`;
+    os laços de leitura e carga chamam avancar() por lote. A cada `intervalo` segundos (e no
+    início e fim de cada etapa) o resumo é gravado em `arquivo` e enviado para `publicar(resumo)`.
+    O custo por lote é uma soma e uma leitura de relógio.
+    """
+
+    def __init__(self, arquivo=None, publicar=None, intervalo=INTERVALO_PADRAO):
+        self.arquivo = arquivo
+        self.publicar = publicar
+        self.intervalo = intervalo
+        self.etapas = []
+        self.atual = None
+        self.status = 'processando'
+        self.mensagem_erro = None
+        self.iniciado_em = datetime.now().isoformat(timespec='seconds')
+        self.inicio = time.perf_counter()
+        self._pid = os.getpid()
+        self._proxima = 0.0
+        self._trava = threading.Lock()
+
+    def __enter__(self):
+        global _ativa
+        self._anterior, _ativa = _ativa, self
+        self._publicar()
+        return self
+
+    def __exit__(self, tipo, erro, rastreio):
+        global _ativa
+        _ativa = self._anterior
+        self.status = 'concluido' if tipo is None else 'erro'
+        self.mensagem_erro = str(erro) if erro is not None else None
+        self._publicar()
+        return False
+
+    @contextmanager
+    def etapa(self, nome, total=None, arquivo=None):
+        """Mede o bloco como uma etapa; com `arquivo`, o tamanho dá os bytes lidos e a estimativa de linhas dá o ETA"""
+        bytes_total = 0
+        if arquivo:
+            bytes_total = tamanho(arquivo)
+            if total is None:
+                total = estimar_linhas(arquivo)
+        etapa = Etapa(nome, total, bytes_total)
+        self.etapas.append(etapa)
+        anterior, self.atual = self.atual, etapa
+        self._publicar()
+        try:
+            yield etapa
+            etapa.status = 'concluido'
+        except BaseException:
+            etapa.status = 'erro'
+            raise
+        finally:
+            etapa.segundos = time.perf_counter() - etapa.inicio
+            etapa.pico_rss_mb = round(pico_rss_mb(), 1)
+            self.atual = anterior
+            self._publicar()
+
+    def registrar(self, nome, segundos, linhas=0, gravadas=0, arquivo=None, pico_mb=None):
+        """Registra uma etapa já medida em outro processo (ex.: tarefa de um pool); linhas estimadas pelo arquivo"""
+        etapa = Etapa(nome, estimar_linhas(arquivo) if arquivo else None,
+                      tamanho(arquivo) if arquivo else 0)
+        etapa.linhas = linhas or etapa.total or 0
+        etapa.gravadas = gravadas
+        etapa.status = 'concluido'
+        etapa.segundos = segundos
+        etapa.pico_rss_mb = pico_mb
+        self.etapas.append(etapa)
+
+    def avancar(self, linhas, gravadas=0):
+        etapa = self.atual
+        # Processos filhos de um pool (fork) herdam a instrumentação ativa, mas não publicam
+        if etapa is None or os.getpid() != self._pid:
+            return
+        # Escritores concorrentes (threads) avançam a mesma etapa
+        with self._trava:
+            etapa.linhas += linhas
+            etapa.gravadas += gravadas
+            if time.perf_counter() >= self._proxima:
+                self._publicar()
+
+    def resumo(self):
+        segundos = time.perf_counter() - self.inicio
+        return {
+            'status': self.status,
+            'mensagem_erro': self.mensagem_erro,
+            'iniciado_em': self.iniciado_em,
+            'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+            'segundos': round(segundos, 3),
+            'pico_rss_mb': round(pico_rss_mb(), 1),
+            'etapa_atual': self.atual.nome if self.atual else None,
+            'etapas': [etapa.como_dict() for etapa in self.etapas],
+        }
+
+    def _publicar(self):
+        self._proxima = time.perf_counter() + self.intervalo
+        resumo = self.resumo()
+        if self.arquivo:
+            gravar_metricas(self.arquivo, resumo)
+        if self.publicar:
+            # O progresso nunca interrompe a importação
+            try:
+                self.publicar(resumo)
+            except Exception as e:
+                print(f"Aviso: não foi possível publicar o progresso: {e}")
+
+
+def gravar_metricas(caminho, resumo):
+    """Grava o resumo em JSON de forma atômica (arquivo temporário + rename)"""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def publicar_importacao(conn, importacao_id, placeholder='%s'):
+    """
+    Função de publicação que atualiza o registro `importacao_id` de `importacoes`.
+    Use uma conexão só para o progresso: cada publicação faz commit.
+    """
+    def publicar(resumo):
+        etapa = resumo['etapas'][-1] if resumo['etapas'] else None
+        campos = {'status': resumo['status']}
+        if etapa:
+            progresso = etapa['progresso']
+            eta = etapa['eta_segundos']
+            campos.update(
+                etapaAtual=etapa['nome'],
+                progresso=round(100 * progresso) if progresso is not None else None,
+                linhasProcessadas=etapa['linhas'] or etapa['linhas_gravadas'],
+                linhasPorSegundo=round(etapa['linhas_por_segundo']),
+                etaSegundos=round(eta) if eta is not None else None,
+            )
+        if resumo['mensagem_erro']:
+            campos['mensagemErro'] = resumo['mensagem_erro']
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE importacoes SET {', '.join(f'{c} = {placeholder}' for c in campos)} WHERE id = {placeholder}",
+            [*campos.values(), importacao_id]
+        )
+        conn.commit()
+    return publicar
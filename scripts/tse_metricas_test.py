@@ -0,0 +1,110 @@
+"""
+Testes da instrumentação da importação (métricas por etapa e progresso em `importacoes`)
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import tse_metricas
+from tse_csv import estimar_linhas
+from tse_metricas import Metricas, avancar, publicar_importacao
+
+
+@pytest.fixture
+def arquivo_csv(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('"A";"B"\n' + ''.join(f'"{i}";"x"\n' for i in range(1000)), encoding='latin-1')
+    return str(caminho)
+
+
+def test_estimar_linhas(arquivo_csv):
+    assert estimar_linhas(arquivo_csv) == 1000
+    # Pela média das linhas iniciais quando o arquivo não cabe na amostra
+    assert estimar_linhas(arquivo_csv, amostra=2000) == pytest.approx(1000, rel=0.05)
+
+
+def test_etapas_e_arquivo_de_metricas(tmp_path, arquivo_csv):
+    saida = tmp_path / 'metricas' / 'execucao.json'
+    publicados = []
+    with Metricas(str(saida), publicados.append, intervalo=3600) as metricas:
+        with metricas.etapa('leitura', arquivo=arquivo_csv):
+            avancar(400)
+            # Entre publicações, o resumo é montado sob demanda
+            etapa = metricas.resumo()['etapas'][0]
+            assert etapa['progresso'] == 0.4 and etapa['eta_segundos'] is not None
+            assert etapa['bytes_lidos'] > 0
+            avancar(600)
+        with metricas.etapa('carga'):
+            avancar(0, gravadas=250)
+
+    # Início, início e fim de cada etapa e fim da execução; nenhuma publicação por lote
+    assert len(publicados) == 6
+    resumo = json.loads(saida.read_text(encoding='utf-8'))
+    assert resumo == publicados[-1]
+    assert resumo['status'] == 'concluido' and resumo['etapa_atual'] is None
+    leitura, carga = resumo['etapas']
+    assert leitura['linhas'] == 1000 and leitura['linhas_estimadas'] == 1000
+    assert leitura['bytes_lidos'] == len(open(arquivo_csv, 'rb').read())
+    assert leitura['progresso'] == 1.0 and leitura['pico_rss_mb'] > 0
+    assert carga['linhas_gravadas'] == 250 and carga['linhas_por_segundo'] > 0
+    assert tse_metricas._ativa is None
+
+
+def test_publica_por_intervalo():
+    publicados = []
+    with Metricas(publicar=publicados.append, intervalo=0) as metricas:
+        with metricas.etapa('leitura'):
+            for _ in range(5):
+                avancar(10)
+    assert len(publicados) == 4 + 5
+
+
+def test_avancar_sem_instrumentacao_ativa():
+    avancar(10)
+    metricas = Metricas()
+    with metricas.etapa('fora'):
+        avancar(10)
+    assert metricas.etapas[0].linhas == 0
+
+
+def test_erro_e_falha_na_publicacao(capsys):
+    def publicar(resumo):
+        raise RuntimeError('banco fora do ar')
+
+    with pytest.raises(ValueError):
+        with Metricas(publicar=publicar) as metricas:
+            with metricas.etapa('carga'):
+                raise ValueError('falhou')
+    assert metricas.status == 'erro' and metricas.mensagem_erro == 'falhou'
+    assert metricas.etapas[0].status == 'erro'
+    assert 'banco fora do ar' in capsys.readouterr().out
+
+
+def test_publicar_importacao(arquivo_csv):
+    conexao = sqlite3.connect(':memory:')
+    conexao.execute("""
+        CREATE TABLE importacoes (
+            id INTEGER PRIMARY KEY, status TEXT, mensagemErro TEXT, etapaAtual TEXT, progresso INTEGER,
+            linhasProcessadas INTEGER, linhasPorSegundo INTEGER, etaSegundos INTEGER
+        )
+    """)
+    conexao.execute("INSERT INTO importacoes (id, status) VALUES (7, 'pendente')")
+    publicar = publicar_importacao(conexao, 7, placeholder='?')
+
+    def registro():
+        return conexao.execute(
+            "SELECT status, etapaAtual, progresso, linhasProcessadas, etaSegundos, mensagemErro "
+            "FROM importacoes WHERE id = 7"
+        ).fetchone()
+
+    with pytest.raises(RuntimeError):
+        with Metricas(publicar=publicar, intervalo=0) as metricas:
+            with metricas.etapa('eleitorado', arquivo=arquivo_csv):
+                avancar(250)
+                status, etapa, progresso, linhas, eta, _ = registro()
+                assert (status, etapa, progresso, linhas) == ('processando', 'eleitorado', 25, 250)
+                assert eta is not None
+            raise RuntimeError('conexão perdida')
+    assert registro() == ('erro', 'eleitorado', 100, 250, None, 'conexão perdida')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Saída particionada em NDJSON (um objeto JSON por linha)
+Uma partição por conjunto e ano, com índice de linhas e offsets para leitura em blocos
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+# Linhas por bloco; cada bloco tem offset próprio no índice
+LINHAS_POR_BLOCO = 10_000
+
+ARQUIVO_INDICE = 'indice.json'
+
+
+def caminho_particao(dataset, ano, comprimir=False, uf=None):
+    """Caminho relativo da partição (dataset/ano=AAAA.ndjson[.gz], ou dataset/uf=XX/ano=AAAA.ndjson[.gz])"""
+    nome = f"ano={ano}.ndjson" + ('.gz' if comprimir else '')
+    return os.path.join(dataset, f"uf={uf}", nome) if uf else os.path.join(dataset, nome)
+
+
+class EscritorParticionado:
+    """
+    Grava conjuntos completos em `diretorio/<dataset>/ano=<ano>.ndjson[.gz]` e um
+    `indice.json` com linhas, bytes e blocos de cada partição.
+
+    Cada bloco de `linhas_por_bloco` linhas começa em um offset conhecido. Nas
+    partições comprimidas cada bloco é um membro gzip independente, de modo que o
+    trecho [offset, offset + bytes) pode ser lido e descomprimido sozinho.
+    """
+
+    def __init__(self, diretorio, comprimir=False, linhas_por_bloco=LINHAS_POR_BLOCO):
+        self.diretorio = diretorio
+        self.comprimir = comprimir
+        self.linhas_por_bloco = linhas_por_bloco
+        self.particoes = []
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, dataset, ano, registros, uf=None):
+        """Grava uma partição em streaming e retorna sua entrada no índice; com `uf`, uma partição por UF"""
+        relativo = caminho_particao(dataset, ano, self.comprimir, uf)
+        caminho = os.path.join(self.diretorio, relativo)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        blocos = []
+        linhas = 0
+        bloco = []
+        with open(caminho + '.tmp', 'wb') as f:
+            for registro in registros:
+                bloco.append(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+                if len(bloco) >= self.linhas_por_bloco:
+                    blocos.append(self._gravar_bloco(f, bloco, linhas))
+                    linhas += len(bloco)
+                    bloco = []
+            if bloco:
+                blocos.append(self._gravar_bloco(f, bloco, linhas))
+                linhas += len(bloco)
+            tamanho = f.tell()
+        os.replace(caminho + '.tmp', caminho)
+
+        entrada = {
+            'dataset': dataset,
+            'ano': ano,
+            **({'uf': uf} if uf else {}),
+            'arquivo': relativo,
+            'comprimido': self.comprimir,
+            'linhas': linhas,
+            'bytes': tamanho,
+            'blocos': blocos,
+        }
+        self.particoes.append(entrada)
+        return entrada
+
+    def _gravar_bloco(self, f, bloco, linha_inicial):
+        dados = ('\n'.join(bloco) + '\n').encode('utf-8')
+        if self.comprimir:
+            dados = gzip.compress(dados, compresslevel=6)
+        offset = f.tell()
+        f.write(dados)
+        return {'linha_inicial': linha_inicial, 'linhas': len(bloco), 'offset': offset, 'bytes': len(dados)}
+
+    def gravar_indice(self, **metadados):
+        """Grava o índice das partições escritas (com metadados extras) e retorna seu caminho"""
+        indice = {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'formato': 'ndjson',
+            **metadados,
+            'particoes': self.particoes,
+        }
+        caminho = os.path.join(self.diretorio, ARQUIVO_INDICE)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2)
+        os.replace(caminho + '.tmp', caminho)
+        return caminho
+
+
+def ler_bloco(diretorio, particao, bloco):
+    """Lê um bloco de uma partição pelo offset do índice e retorna a lista de registros"""
+    with open(os.path.join(diretorio, particao['arquivo']), 'rb') as f:
+        f.seek(bloco['offset'])
+        dados = f.read(bloco['bytes'])
+    if particao['comprimido']:
+        dados = gzip.decompress(dados)
+    return [json.loads(linha) for linha in dados.decode('utf-8').splitlines()]
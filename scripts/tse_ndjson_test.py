@@ -0,0 +1,43 @@
+"""
+Testes da saída NDJSON particionada
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from tse_ndjson import ARQUIVO_INDICE, EscritorParticionado, ler_bloco
+
+
+def _registros(n):
+    return ({'numero': i, 'nome': f"Candidata {i} São Francisco"} for i in range(n))
+
+
+@pytest.mark.parametrize("comprimir", [False, True])
+def test_particoes_blocos_e_indice(tmp_path, comprimir):
+    diretorio = str(tmp_path)
+    saida = EscritorParticionado(diretorio, comprimir=comprimir, linhas_por_bloco=4)
+    saida.escrever('candidatos', 2024, _registros(10))
+    saida.escrever('candidatos', 2022, iter([]))
+    saida.gravar_indice(totais={'candidatos_2024': 10})
+
+    with open(os.path.join(diretorio, ARQUIVO_INDICE), encoding='utf-8') as f:
+        indice = json.load(f)
+    assert indice['totais'] == {'candidatos_2024': 10}
+    particao, vazia = indice['particoes']
+    assert particao['arquivo'] == os.path.join('candidatos', 'ano=2024.ndjson' + ('.gz' if comprimir else ''))
+    assert particao['linhas'] == 10
+    assert [(b['linha_inicial'], b['linhas']) for b in particao['blocos']] == [(0, 4), (4, 4), (8, 2)]
+    assert vazia['linhas'] == 0 and vazia['blocos'] == []
+
+    # Cada bloco é lido sozinho pelo offset
+    assert ler_bloco(diretorio, particao, particao['blocos'][1]) == list(_registros(10))[4:8]
+
+    # O arquivo inteiro também é NDJSON válido (membros gzip concatenados)
+    caminho = os.path.join(diretorio, particao['arquivo'])
+    assert os.path.getsize(caminho) == particao['bytes']
+    abrir = gzip.open if comprimir else open
+    with abrir(caminho, 'rt', encoding='utf-8') as f:
+        assert [json.loads(linha) for linha in f] == list(_registros(10))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Execução em pipeline: leitura, transformação e carga ligadas por filas limitadas
+Cada etapa roda em sua thread e a última (a do banco) na thread que chamou; enquanto um lote é gravado,
+os seguintes são lidos e transformados. Filas cheias bloqueiam quem produz (contrapressão),
+então a memória fica limitada a `capacidade` lotes por fila.
+"""
+
+import queue
+import threading
+import time
+
+# Espera máxima em cada tentativa de get/put antes de conferir se o pipeline foi interrompido
+INTERVALO_VERIFICACAO = 0.1
+
+_FIM = object()
+
+
+class _Interrompido(Exception):
+    """Outra etapa falhou; esta thread só precisa encerrar"""
+
+
+class Pipeline:
+    """
+    Fonte iterável seguida de etapas `(nome, funcao)`: cada etapa recebe um item da anterior
+    e retorna o item da seguinte (None não é repassado). A fonte e as etapas intermediárias
+    rodam em threads; a última etapa roda na thread de `executar`, que pode usar a conexão dela.
+    O primeiro erro de qualquer etapa interrompe as demais e é relançado por `executar`.
+    """
+
+    def __init__(self, capacidade=2):
+        self.capacidade = capacidade
+        self.estatisticas = {}
+        self.segundos = 0.0
+        self._parar = threading.Event()
+        self._erro = None
+
+    def _colocar(self, fila, item, estatistica):
+        inicio = time.perf_counter()
+        while True:
+            if self._parar.is_set():
+                raise _Interrompido()
+            try:
+                fila.put(item, timeout=INTERVALO_VERIFICACAO)
+                break
+            except queue.Full:
+                continue
+        estatistica['espera_saida'] += time.perf_counter() - inicio
+
+    def _retirar(self, fila, estatistica):
+        inicio = time.perf_counter()
+        while True:
+            if self._parar.is_set():
+                raise _Interrompido()
+            try:
+                item = fila.get(timeout=INTERVALO_VERIFICACAO)
+                break
+            except queue.Empty:
+                continue
+        estatistica['espera_entrada'] += time.perf_counter() - inicio
+        return item
+
+    def _falhar(self, erro):
+        if self._erro is None:
+            self._erro = erro
+        self._parar.set()
+
+    def _produzir(self, estatistica, fonte, saida):
+        iterador = iter(fonte)
+        try:
+            while True:
+                inicio = time.perf_counter()
+                item = next(iterador, _FIM)
+                estatistica['ocupado'] += time.perf_counter() - inicio
+                if item is _FIM:
+                    break
+                estatistica['itens'] += 1
+                self._colocar(saida, item, estatistica)
+            self._colocar(saida, _FIM, estatistica)
+        except _Interrompido:
+            pass
+        except BaseException as e:
+            self._falhar(e)
+        finally:
+            # Fecha a fonte (e o arquivo dela) também quando o pipeline é interrompido
+            if hasattr(iterador, 'close'):
+                iterador.close()
+
+    def _consumir(self, estatistica, funcao, entrada, saida):
+        """Laço de uma etapa; retorna quando a entrada termina (repassando o fim) ou o pipeline é interrompido"""
+        while True:
+            item = self._retirar(entrada, estatistica)
+            if item is _FIM:
+                if saida is not None:
+                    self._colocar(saida, _FIM, estatistica)
+                return
+            inicio = time.perf_counter()
+            resultado = funcao(item)
+            estatistica['ocupado'] += time.perf_counter() - inicio
+            estatistica['itens'] += 1
+            if resultado is not None and saida is not None:
+                self._colocar(saida, resultado, estatistica)
+
+    def _etapa_em_thread(self, estatistica, funcao, entrada, saida):
+        try:
+            self._consumir(estatistica, funcao, entrada, saida)
+        except _Interrompido:
+            pass
+        except BaseException as e:
+            self._falhar(e)
+
+    def executar(self, fonte, *etapas, nome_fonte='leitura'):
+        """Executa o pipeline até a fonte se esgotar e retorna as estatísticas por etapa"""
+        inicio = time.perf_counter()
+        for nome in (nome_fonte, *(nome for nome, _ in etapas)):
+            self.estatisticas[nome] = {'itens': 0, 'ocupado': 0.0, 'espera_entrada': 0.0, 'espera_saida': 0.0}
+        estatisticas = list(self.estatisticas.values())
+        filas = [queue.Queue(self.capacidade) for _ in etapas]
+        threads = [threading.Thread(target=self._produzir, args=(estatisticas[0], fonte, filas[0]), daemon=True)]
+        for i, (_, funcao) in enumerate(etapas[:-1]):
+            threads.append(threading.Thread(target=self._etapa_em_thread,
+                                            args=(estatisticas[i + 1], funcao, filas[i], filas[i + 1]), daemon=True))
+        for thread in threads:
+            thread.start()
+        try:
+            self._consumir(estatisticas[-1], etapas[-1][1], filas[-1], None)
+        except _Interrompido:
+            pass
+        except BaseException as e:
+            self._falhar(e)
+        finally:
+            for thread in threads:
+                thread.join()
+            self.segundos = time.perf_counter() - inicio
+        if self._erro is not None:
+            raise self._erro
+        return self.estatisticas
+
+    def resumo(self):
+        """Texto com o tempo ocupado de cada etapa e o tempo de relógio do pipeline"""
+        etapas = ', '.join(f"{nome} {e['ocupado']:.2f}s" for nome, e in self.estatisticas.items())
+        soma = sum(e['ocupado'] for e in self.estatisticas.values())
+        return f"{etapas}; {self.segundos:.2f}s de relógio para {soma:.2f}s somando as etapas"
@@ -0,0 +1,88 @@
+"""
+Testes da execução em pipeline com filas limitadas
+"""
+
+import threading
+import time
+
+import pytest
+
+from tse_pipeline import Pipeline
+
+
+def test_ordem_e_descarte_de_none():
+    gravados = []
+    pipeline = Pipeline()
+    estatisticas = pipeline.executar(range(10), ('dobro', lambda x: x * 2 if x % 3 else None),
+                                     ('gravacao', gravados.append))
+    assert gravados == [2, 4, 8, 10, 14, 16]
+    assert [e['itens'] for e in estatisticas.values()] == [10, 10, 6]
+    assert list(estatisticas) == ['leitura', 'dobro', 'gravacao']
+    assert 'de relógio' in pipeline.resumo()
+
+
+def test_contrapressao_limita_itens_em_transito():
+    lidos = []
+    liberar = threading.Event()
+
+    def fonte():
+        for i in range(20):
+            lidos.append(i)
+            yield i
+
+    def gravar(item):
+        # Segura a primeira gravação: a leitura só avança até encher as filas
+        if item == 0:
+            assert liberar.wait(5)
+
+    def soltar():
+        time.sleep(0.3)
+        # 1 em gravação + 1 na fila da gravação + 1 na transformação + 1 na fila dela + 1 lido esperando vaga
+        assert len(lidos) <= 5
+        liberar.set()
+
+    thread = threading.Thread(target=soltar)
+    thread.start()
+    Pipeline(capacidade=1).executar(fonte(), ('identidade', lambda x: x), ('gravacao', gravar))
+    thread.join()
+    assert lidos == list(range(20))
+
+
+def test_erro_interrompe_as_etapas_e_fecha_a_fonte():
+    fechada = threading.Event()
+
+    def fonte():
+        try:
+            for i in range(1_000_000):
+                yield i
+        finally:
+            fechada.set()
+
+    def transformar(item):
+        if item == 5:
+            raise ValueError('linha inválida')
+        return item
+
+    with pytest.raises(ValueError, match='linha inválida'):
+        Pipeline().executar(fonte(), ('transformacao', transformar), ('gravacao', lambda x: None))
+    assert fechada.is_set()
+
+    def gravar(item):
+        raise RuntimeError('banco indisponível')
+
+    with pytest.raises(RuntimeError, match='banco indisponível'):
+        Pipeline().executar(fonte(), ('gravacao', gravar))
+
+
+def test_etapas_se_sobrepoem():
+    # Leitura e gravação esperando E/S (sleep libera o GIL): o relógio fica perto da etapa mais lenta
+    def fonte():
+        for i in range(8):
+            time.sleep(0.02)
+            yield i
+
+    pipeline = Pipeline()
+    pipeline.executar(fonte(), ('gravacao', lambda x: time.sleep(0.02)))
+    soma = sum(e['ocupado'] for e in pipeline.estatisticas.values())
+    assert soma >= 0.3
+    assert pipeline.segundos < soma * 0.8
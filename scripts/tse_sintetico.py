@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Gerador de arquivos sintéticos no layout do TSE (Latin-1, ';', campos entre aspas)
+perfil_eleitorado, consulta_cand, consulta_coligacao e votacao_secao em qualquer escala, para benchmarks
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from tse_esquemas import CONSULTA_CAND, CONSULTA_COLIGACAO, PERFIL_ELEITORADO, VOTACAO_SECAO
+
+# Linhas geradas por vez (memória constante em qualquer escala)
+BLOCO_GERACAO = 100_000
+
+# Layouts completos, como declarados nos esquemas de leitura
+COLUNAS_PERFIL_TSE = PERFIL_ELEITORADO.nomes
+COLUNAS_CANDIDATOS_TSE = CONSULTA_CAND.nomes
+COLUNAS_COLIGACOES_TSE = CONSULTA_COLIGACAO.nomes
+COLUNAS_VOTACAO_TSE = VOTACAO_SECAO.nomes
+
+# Domínios (código, descrição) como aparecem nos arquivos do TSE
+GENEROS = (('2', 'MASCULINO'), ('4', 'FEMININO'), ('0', 'NÃO INFORMADO'))
+ESTADOS_CIVIS = (('1', 'SOLTEIRO'), ('3', 'CASADO'), ('5', 'VIÚVO'), ('9', 'DIVORCIADO'))
+FAIXAS_ETARIAS = (
+    ('1600', '16 anos'), ('1700', '17 anos'), ('1800', '18 anos'), ('1900', '19 anos'),
+    ('2000', '20 anos'), ('2124', '21 a 24 anos'), ('2529', '25 a 29 anos'), ('3034', '30 a 34 anos'),
+    ('3539', '35 a 39 anos'), ('4044', '40 a 44 anos'), ('4549', '45 a 49 anos'), ('5054', '50 a 54 anos'),
+    ('5559', '55 a 59 anos'), ('6064', '60 a 64 anos'), ('6569', '65 a 69 anos'), ('7074', '70 a 74 anos'),
+    ('7579', '75 a 79 anos'), ('8084', '80 a 84 anos'), ('8589', '85 a 89 anos'), ('9094', '90 a 94 anos'),
+    ('9599', '95 a 99 anos'), ('9999', '100 anos ou mais'), ('-3', 'Inválido'),
+)
+ESCOLARIDADES = (
+    ('1', 'ANALFABETO'), ('2', 'LÊ E ESCREVE'), ('3', 'ENSINO FUNDAMENTAL INCOMPLETO'),
+    ('4', 'ENSINO FUNDAMENTAL COMPLETO'), ('5', 'ENSINO MÉDIO INCOMPLETO'), ('6', 'ENSINO MÉDIO COMPLETO'),
+    ('7', 'SUPERIOR INCOMPLETO'), ('8', 'SUPERIOR COMPLETO'), ('0', 'NÃO INFORMADO'),
+)
+CARGOS = (('11', 'PREFEITO'), ('12', 'VICE-PREFEITO'), ('13', 'VEREADOR'))
+PARTIDOS = (
+    ('13', 'PT', 'Partido dos Trabalhadores'), ('22', 'PL', 'Partido Liberal'),
+    ('15', 'MDB', 'Movimento Democrático Brasileiro'), ('55', 'PSD', 'Partido Social Democrático'),
+    ('44', 'UNIÃO', 'União Brasil'), ('10', 'REPUBLICANOS', 'Republicanos'),
+    ('11', 'PP', 'Progressistas'), ('12', 'PDT', 'Partido Democrático Trabalhista'),
+)
+SITUACOES_TURNO = (('1', 'ELEITO'), ('4', 'NÃO ELEITO'), ('5', 'SUPLENTE'), ('2', 'ELEITO POR QP'))
+
+
+def _q(*valores):
+    """Campos entre aspas separados por ';' (trecho de linha pré-formatado)"""
+    return ';'.join(f'"{v}"' for v in valores)
+
+
+def municipios_sinteticos(n=52):
+    """Códigos e nomes de municípios (`n` = 52 como em RO)"""
+    return [(f"{i * 8 + 11:05d}", f"MUNICÍPIO {i:03d} D'OESTE") for i in range(1, n + 1)]
+
+
+def _gravar(caminho, colunas, linhas_por_bloco):
+    """Grava o cabeçalho e os blocos de linhas em Latin-1 com CRLF"""
+    with open(caminho, 'w', encoding='latin-1', newline='') as f:
+        f.write(_q(*colunas) + '\r\n')
+        for linhas in linhas_por_bloco:
+            f.write('\r\n'.join(linhas))
+            f.write('\r\n')
+    return caminho
+
+
+def _blocos(n):
+    for inicio in range(0, n, BLOCO_GERACAO):
+        yield min(BLOCO_GERACAO, n - inicio)
+
+
+def gerar_perfil(caminho, n_linhas, ano=2024, uf='RO', n_municipios=52, semente=1):
+    """Gera perfil_eleitorado com `n_linhas` linhas"""
+    rng = np.random.default_rng(semente)
+    municipios = municipios_sinteticos(n_municipios)
+    inicio = _q('15/08/2024', '10:00:00', ano, uf)
+    seg_mun = [_q(cod, nome, '1', 'Sim') for cod, nome in municipios]
+    zonas = [(i % 35 + 1, (i * 7 + 3) % 35 + 1) for i in range(n_municipios)]
+    seg_zona = [[_q(z) for z in par] for par in zonas]
+    seg_gen = [_q(c, d) for c, d in GENEROS]
+    seg_civil = [_q(c, d) for c, d in ESTADOS_CIVIS]
+    seg_faixa = [_q(c, d) for c, d in FAIXAS_ETARIAS]
+    seg_escol = [_q(c, d) for c, d in ESCOLARIDADES]
+    meio = _q('3', 'PARDA', '0', 'NÃO INFORMADO', '0', 'NÃO', '0', 'NÃO')
+
+    def linhas():
+        for n in _blocos(n_linhas):
+            mun = rng.integers(0, len(municipios), n).tolist()
+            zona = rng.integers(0, 2, n).tolist()
+            gen = rng.integers(0, len(GENEROS), n).tolist()
+            civil = rng.integers(0, len(ESTADOS_CIVIS), n).tolist()
+            faixa = rng.integers(0, len(FAIXAS_ETARIAS), n).tolist()
+            escol = rng.integers(0, len(ESCOLARIDADES), n).tolist()
+            qt = rng.integers(1, 60, n)
+            bio = (qt * rng.random(n)).astype(np.int64).tolist()
+            defi = np.minimum(rng.integers(0, 3, n), qt).tolist()
+            yield [
+                f'{inicio};{seg_mun[m]};{seg_zona[m][z]};{seg_gen[g]};{seg_civil[c]};{seg_faixa[f]};'
+                f'{seg_escol[e]};{meio};"{q}";"{b}";"{d}";"0"'
+                for m, z, g, c, f, e, q, b, d in zip(mun, zona, gen, civil, faixa, escol, qt.tolist(), bio, defi)
+            ]
+
+    return _gravar(caminho, COLUNAS_PERFIL_TSE, linhas())
+
+
+def gerar_candidatos(caminho, n_linhas, ano=2024, uf='RO', n_municipios=52, semente=2):
+    """Gera consulta_cand com `n_linhas` linhas"""
+    rng = np.random.default_rng(semente)
+    municipios = municipios_sinteticos(n_municipios)
+    inicio = _q('15/08/2024', '10:00:00', ano, '2', 'ELEIÇÃO ORDINÁRIA', '1', '619', f'Eleições Municipais {ano}',
+                f'06/10/{ano}', 'MUNICIPAL', uf)
+    seg_ue = [_q(cod, nome) for cod, nome in municipios]
+    seg_cargo = [_q(c, d) for c, d in CARGOS]
+    seg_partido = [_q('PARTIDO ISOLADO', nr, sg, nm) for nr, sg, nm in PARTIDOS]
+    seg_gen = [_q(c, d) for c, d in GENEROS[:2]]
+    seg_escol = [_q(c, d) for c, d in ESCOLARIDADES[2:]]
+    seg_sit = [_q(c, d) for c, d in SITUACOES_TURNO]
+
+    def linhas():
+        sequencial = 220_000_000_000
+        for n in _blocos(n_linhas):
+            mun = rng.integers(0, len(municipios), n).tolist()
+            cargo = rng.integers(0, len(CARGOS), n).tolist()
+            partido = rng.integers(0, len(PARTIDOS), n).tolist()
+            gen = rng.integers(0, 2, n).tolist()
+            escol = rng.integers(0, len(ESCOLARIDADES) - 2, n).tolist()
+            sit = rng.integers(0, len(SITUACOES_TURNO), n).tolist()
+            numero = rng.integers(10_000, 99_999, n).tolist()
+            bloco = []
+            for m, c, p, g, e, s, nr in zip(mun, cargo, partido, gen, escol, sit, numero):
+                sequencial += 1
+                nome = f"CANDIDATO SINTÉTICO {sequencial % 1_000_000:06d}"
+                bloco.append(
+                    f'{inicio};{seg_ue[m]};{seg_cargo[c]};"{sequencial}";"{nr}";"{nome}";"SINTÉTICO {nr}";'
+                    f'"#NULO#";"-4";"#NULO#";"2";"APTO";{seg_partido[p]};"-1";"#NULO#";"#NULO#";"{uf}";'
+                    f'"01/01/1980";{seg_gen[g]};{seg_escol[e]};"3";"CASADO(A)";"03";"PARDA";'
+                    f'"999";"OUTROS";{seg_sit[s]}'
+                )
+            yield bloco
+
+    return _gravar(caminho, COLUNAS_CANDIDATOS_TSE, linhas())
+
+
+def gerar_coligacoes(caminho, n_linhas, ano=2024, uf='RO', n_municipios=52, semente=3):
+    """Gera consulta_coligacao com `n_linhas` linhas"""
+    rng = np.random.default_rng(semente)
+    municipios = municipios_sinteticos(n_municipios)
+    inicio = _q('15/08/2024', '10:00:00', ano, '2', 'ELEIÇÃO ORDINÁRIA', '1', '619', f'Eleições Municipais {ano}', uf)
+    seg_ue = [_q(cod, nome) for cod, nome in municipios]
+    seg_cargo = [_q(c, d) for c, d in CARGOS]
+    siglas = [sg for _, sg, _ in PARTIDOS]
+
+    def linhas():
+        sequencial = 220_000_000_000
+        for n in _blocos(n_linhas):
+            mun = rng.integers(0, len(municipios), n).tolist()
+            cargo = rng.integers(0, len(CARGOS), n).tolist()
+            tamanho = rng.integers(1, 4, n).tolist()
+            primeiro = rng.integers(0, len(siglas), n).tolist()
+            bloco = []
+            for m, c, t, p in zip(mun, cargo, tamanho, primeiro):
+                sequencial += 1
+                composicao = ' / '.join(siglas[(p + k) % len(siglas)] for k in range(t))
+                tipo = 'COLIGAÇÃO' if t > 1 else 'PARTIDO ISOLADO'
+                nome = f"COLIGAÇÃO {sequencial % 100_000:05d}" if t > 1 else siglas[p]
+                bloco.append(f'{inicio};{seg_ue[m]};{seg_cargo[c]};"{tipo}";"{sequencial}";"{nome}";"{composicao}";"DEFERIDO"')
+            yield bloco
+
+    return _gravar(caminho, COLUNAS_COLIGACOES_TSE, linhas())
+
+
+def gerar_votacao(caminho, n_linhas, ano=2024, uf='RO', n_municipios=52, semente=4):
+    """
+    Gera votacao_secao com `n_linhas` linhas: votos por seção em prefeito (número do partido)
+    e vereador (5 dígitos ou legenda), além de brancos (95) e nulos (96)
+    """
+    rng = np.random.default_rng(semente)
+    municipios = municipios_sinteticos(n_municipios)
+    inicio = _q('15/10/2024', '10:00:00', ano, '2', 'ELEIÇÃO ORDINÁRIA', '1', '619',
+                f'Eleições Municipais {ano}', '06/10/2024', 'M', uf)
+    seg_mun = [_q(cod, nome, cod, nome) for cod, nome in municipios]
+    zonas = [(i % 35 + 1, (i * 7 + 3) % 35 + 1) for i in range(n_municipios)]
+    prefeito, vereador = CARGOS[0], CARGOS[2]
+    numeros = [numero for numero, _, _ in PARTIDOS]
+    nomes_partido = {numero: nome for numero, _, nome in PARTIDOS}
+    especiais = (('95', 'Branco'), ('96', 'Nulo'))
+
+    def votavel(cargo, sorteio, sufixo):
+        if sorteio < 2:
+            return especiais[sorteio]
+        partido = numeros[sorteio % len(numeros)]
+        if cargo is prefeito:
+            return partido, f"CANDIDATO {partido}"
+        if sorteio < 5:
+            return partido, nomes_partido[partido]
+        return f"{partido}{sufixo:03d}", f"CANDIDATO {partido}{sufixo:03d}"
+
+    def linhas():
+        for n in _blocos(n_linhas):
+            mun = rng.integers(0, len(municipios), n).tolist()
+            zona = rng.integers(0, 2, n).tolist()
+            secao = rng.integers(1, 300, n).tolist()
+            cargo = rng.random(n).tolist()
+            sorteio = rng.integers(0, 40, n).tolist()
+            sufixo = rng.integers(1, 60, n).tolist()
+            qt = rng.integers(1, 120, n).tolist()
+            bloco = []
+            for m, z, sc, c, st, sf, q in zip(mun, zona, secao, cargo, sorteio, sufixo, qt):
+                cod_cargo, ds_cargo = prefeito if c < 0.2 else vereador
+                numero, nome = votavel(prefeito if c < 0.2 else vereador, st, sf)
+                bloco.append(
+                    f'{inicio};{seg_mun[m]};"{zonas[m][z]}";"{sc}";"{cod_cargo}";"{ds_cargo}";'
+                    f'"{numero}";"{nome}";"{q}";"{1000 + sc % 20}";"-1";"ESCOLA {sc % 20}";"RUA {sc % 20}"'
+                )
+            yield bloco
+
+    return _gravar(caminho, COLUNAS_VOTACAO_TSE, linhas())
+
+
+def gerar_conjunto(diretorio, linhas_perfil, ano=2024, uf='RO', proporcao_candidatos=0.05,
+                   proporcao_coligacoes=0.01, proporcao_votacao=1.0):
+    """
+    Gera os quatro arquivos em `diretorio` com os nomes usados pelos scripts de importação.
+    Candidatos, coligações e votação são proporcionais ao perfil (mínimo de 100, 10 e 100 linhas).
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    return {
+        'perfil': gerar_perfil(os.path.join(diretorio, f"perfil_eleitorado_{ano}_{uf}.csv"), linhas_perfil, ano, uf),
+        'candidatos': gerar_candidatos(
+            os.path.join(diretorio, f"consulta_cand_{ano}_{uf}.csv"),
+            max(int(linhas_perfil * proporcao_candidatos), 100), ano, uf
+        ),
+        'coligacoes': gerar_coligacoes(
+            os.path.join(diretorio, f"consulta_coligacao_{ano}_{uf}.csv"),
+            max(int(linhas_perfil * proporcao_coligacoes), 10), ano, uf
+        ),
+        'votacao': gerar_votacao(
+            os.path.join(diretorio, f"votacao_secao_{ano}_{uf}.csv"),
+            max(int(linhas_perfil * proporcao_votacao), 100), ano, uf
+        ),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera arquivos sintéticos no layout do TSE")
+    parser.add_argument('diretorio', help="Diretório de saída")
+    parser.add_argument('--linhas', type=int, default=100_000, help="Linhas do perfil do eleitorado")
+    parser.add_argument('--ano', type=int, default=2024)
+    parser.add_argument('--uf', default='RO')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    for nome, caminho in gerar_conjunto(args.diretorio, args.linhas, args.ano, args.uf).items():
+        print(f"{nome}: {caminho} ({os.path.getsize(caminho):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
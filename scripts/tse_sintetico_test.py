@@ -0,0 +1,34 @@
+"""
+Testes do gerador de arquivos sintéticos do TSE
+"""
+
+from tse_agregacao import agregar_eleitorado
+from tse_csv import iter_csv_latin1, ler_cabecalho
+from tse_sintetico import (
+    COLUNAS_CANDIDATOS_TSE,
+    COLUNAS_COLIGACOES_TSE,
+    COLUNAS_PERFIL_TSE,
+    gerar_conjunto,
+)
+
+
+def test_conjunto_no_layout_do_tse(tmp_path):
+    arquivos = gerar_conjunto(str(tmp_path), 3_000, ano=2024, uf='RO')
+
+    for nome, colunas in (('perfil', COLUNAS_PERFIL_TSE), ('candidatos', COLUNAS_CANDIDATOS_TSE),
+                          ('coligacoes', COLUNAS_COLIGACOES_TSE)):
+        assert tuple(ler_cabecalho(arquivos[nome])) == colunas
+        linhas = list(iter_csv_latin1(arquivos[nome], colunas=colunas))
+        assert all(len(linha) == len(colunas) for linha in linhas)
+
+    assert sum(1 for _ in iter_csv_latin1(arquivos['perfil'], colunas=('ANO_ELEICAO',))) == 3_000
+    assert sum(1 for _ in iter_csv_latin1(arquivos['candidatos'], colunas=('ANO_ELEICAO',))) == 150
+
+
+def test_perfil_e_agregavel(tmp_path):
+    arquivos = gerar_conjunto(str(tmp_path), 2_000)
+    total = sum(int(qt) for (qt,) in iter_csv_latin1(arquivos['perfil'], colunas=('QT_ELEITORES_PERFIL',)))
+
+    registros, linhas = agregar_eleitorado(arquivos['perfil'])
+    assert linhas == 2_000
+    assert sum(r['totalEleitores'] for r in registros) == total
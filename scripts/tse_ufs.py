@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Unidades da federação dos arquivos do TSE (sufixo _<UF> dos nomes)
+"""
+
+# Sigla -> nome, na ordem das regiões do IBGE
+UFS = {
+    'AC': 'Acre', 'AM': 'Amazonas', 'AP': 'Amapá', 'PA': 'Pará', 'RO': 'Rondônia', 'RR': 'Roraima',
+    'TO': 'Tocantins',
+    'AL': 'Alagoas', 'BA': 'Bahia', 'CE': 'Ceará', 'MA': 'Maranhão', 'PB': 'Paraíba', 'PE': 'Pernambuco',
+    'PI': 'Piauí', 'RN': 'Rio Grande do Norte', 'SE': 'Sergipe',
+    'DF': 'Distrito Federal', 'GO': 'Goiás', 'MS': 'Mato Grosso do Sul', 'MT': 'Mato Grosso',
+    'ES': 'Espírito Santo', 'MG': 'Minas Gerais', 'RJ': 'Rio de Janeiro', 'SP': 'São Paulo',
+    'PR': 'Paraná', 'RS': 'Rio Grande do Sul', 'SC': 'Santa Catarina',
+}
+
+# Valor de --ufs que seleciona as 27 UFs
+TODAS = 'todas'
+
+
+def selecionar_ufs(siglas):
+    """Siglas validadas, sem repetição e na ordem informada; `todas` expande para as 27 UFs"""
+    selecionadas = []
+    for sigla in siglas:
+        if sigla.lower() == TODAS:
+            novas = list(UFS)
+        elif sigla.upper() in UFS:
+            novas = [sigla.upper()]
+        else:
+            raise ValueError(f"UF desconhecida: {sigla}")
+        selecionadas.extend(uf for uf in novas if uf not in selecionadas)
+    return selecionadas
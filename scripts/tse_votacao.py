@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Importação da votação por seção (votacao_secao_*.csv)
+Leitura em uma única passada com memória limitada: votos no nível escolhido (seção, zona ou município),
+ids resolvidos em lote e carga em `resultados_eleitorais` e `votos_nulos_brancos`
+"""
+
+import time
+from operator import itemgetter
+
+import numpy as np
+
+from tse_cache import Dicionario
+from tse_dimensoes import Dimensoes, normalizar_cargo
+from tse_esquemas import VOTACAO_SECAO
+from tse_metricas import avancar
+from tse_pipeline import Pipeline
+
+# Colunas lidas do arquivo, na ordem em que chegam a AgregadorVotacao.adicionar
+COLUNAS_VOTACAO = VOTACAO_SECAO.projecao('votacao')
+
+# Níveis de agregação gravados (um por carga, para que as somas da API não contem votos duas vezes)
+NIVEIS = ('secao', 'zona', 'municipio')
+
+VOTO_BRANCO = '95'
+VOTOS_NULOS = ('96', '97')  # 97: anulado e apurado em separado
+
+# Tipo de cada número votado
+VALIDO, NULO, BRANCO = 0, 1, 2
+
+# Colunas (índices em COLUNAS_VOTACAO) que formam o local em cada nível: ano, turno, cargo, município, zona, seção
+PROJECOES = {
+    'secao': (0, 1, 5, 2, 3, 4),
+    'zona': (0, 1, 5, 2, 3),
+    'municipio': (0, 1, 5, 2),
+}
+
+# Nos cargos proporcionais, um número de 2 dígitos é voto de legenda (no partido)
+CARGOS_PROPORCIONAIS = {'vereador', 'deputado_estadual', 'deputado_federal', 'deputado_distrital'}
+
+# Candidatos desses cargos são identificados também pelo município
+CARGOS_MUNICIPAIS = {'prefeito', 'vice_prefeito', 'vereador'}
+
+COLUNAS_RESULTADOS = (
+    'anoEleicao', 'turno', 'cargo', 'municipioId', 'bairroId', 'zonaId', 'secaoId',
+    'candidatoId', 'partidoId', 'votosValidos', 'votosNominais', 'votosLegenda'
+)
+COLUNAS_NULOS_BRANCOS = (
+    'anoEleicao', 'turno', 'cargo', 'municipioId', 'bairroId', 'zonaId', 'secaoId', 'votosNulos', 'votosBrancos'
+)
+
+TAMANHO_LOTE = 100_000
+
+
+def eh_legenda(cargo, nr_votavel):
+    return len(nr_votavel) == 2 and cargo in CARGOS_PROPORCIONAIS
+
+
+class AgregadorVotacao:
+    """
+    Soma os votos do arquivo no nível escolhido, com a redução agrupada em NumPy.
+
+    Um local é (ano, turno, cargo, cd_municipio, nr_zona, nr_secao), com seção (e zona) None
+    nos níveis mais agregados. Locais e números votados viram códigos densos (Dicionario) e cada
+    lote é reduzido com um bincount por chave local x votável. No nível de seção cada linha do
+    arquivo já é única: os votos do lote são devolvidos por `adicionar` em vez de acumulados,
+    e a memória não cresce com o arquivo. Brancos e nulos são sempre acumulados por local.
+    """
+
+    def __init__(self, nivel='zona'):
+        if nivel not in NIVEIS:
+            raise ValueError(f"Nível inválido: {nivel} (use {', '.join(NIVEIS)})")
+        self.nivel = nivel
+        self._projetar = itemgetter(*PROJECOES[nivel])
+        self.locais = Dicionario()     # local no nível, com DS_CARGO original
+        self.votaveis = Dicionario()   # NR_VOTAVEL
+        self.chaves = Dicionario()     # local << 24 | votável (níveis zona e município)
+        self.qt = np.zeros(0, dtype=np.int64)
+        self.nulos_brancos = np.zeros((0, 2), dtype=np.int64)
+        self.nomes = {}                # (ano, cargo, cd_municipio ou '', nr_votavel) -> NM_VOTAVEL
+        self.candidaturas = Dicionario()  # grupo << 24 | votável com nome registrado
+        self._grupos = Dicionario()       # (ano, cargo, cd_municipio ou '') dos candidatos
+        self._grupo_do_local = np.zeros(0, dtype=np.int64)
+        self.cargos = {}               # DS_CARGO -> cargo normalizado
+        self._tipos = np.zeros(0, dtype=np.int8)
+        self._decodificados = []       # local(código), estendido sob demanda
+        self.total_linhas = 0
+        self.total_votos = 0
+
+    def local(self, codigo):
+        """Local (ano, turno, cargo, cd_municipio, nr_zona, nr_secao) de um código"""
+        decodificados = self._decodificados
+        for ano, turno, ds_cargo, *resto in self.locais.valores[len(decodificados):codigo + 1]:
+            cargo = self.cargos.get(ds_cargo)
+            if cargo is None:
+                cargo = self.cargos[ds_cargo] = normalizar_cargo(ds_cargo)
+            decodificados.append((ano, turno, cargo, *resto) + (None,) * (3 - len(resto)))
+        return decodificados[codigo]
+
+    def _agrupar(self, chaves, qt):
+        """[(local, [nr_votavel, ...], [votos, ...])] de chaves local << 24 | votável em ordem crescente"""
+        locais = chaves >> 24
+        inicios = np.flatnonzero(np.r_[True, locais[1:] != locais[:-1]])
+        fins = np.r_[inicios[1:], len(chaves)].tolist()
+        votaveis = [self.votaveis.valores[v] for v in (chaves & 0xFFFFFF).tolist()]
+        qt = qt.tolist()
+        return [
+            (self.local(codigo), votaveis[i:j], qt[i:j])
+            for codigo, i, j in zip(locais[inicios].tolist(), inicios.tolist(), fins)
+        ]
+
+    def _tipos_votaveis(self):
+        """Tipo de cada votável (VALIDO, NULO ou BRANCO), estendido quando surgem números novos"""
+        if len(self._tipos) < len(self.votaveis):
+            novos = [
+                BRANCO if v == VOTO_BRANCO else NULO if v in VOTOS_NULOS else VALIDO
+                for v in self.votaveis.valores[len(self._tipos):]
+            ]
+            self._tipos = np.concatenate([self._tipos, np.array(novos, dtype=np.int8)])
+        return self._tipos
+
+    def adicionar(self, lote):
+        """
+        Soma um lote de tuplas tipadas (VOTACAO_SECAO.ler_lotes) na ordem de COLUNAS_VOTACAO;
+        no nível de seção retorna os votos do lote (ver votos)
+        """
+        if not lote:
+            return []
+        n = len(lote)
+        local = self.locais.codificar(map(self._projetar, lote), n)
+        votavel = self.votaveis.codificar(map(itemgetter(6), lote), n)
+        qt = np.fromiter(map(itemgetter(8), lote), np.int64, n)
+        self.total_linhas += n
+        self.total_votos += int(qt.sum())
+
+        tipo = self._tipos_votaveis()[votavel]
+        n_locais = len(self.locais)
+        if len(self.nulos_brancos) < n_locais:
+            nulos_brancos = np.zeros((n_locais, 2), dtype=np.int64)
+            nulos_brancos[:len(self.nulos_brancos)] = self.nulos_brancos
+            self.nulos_brancos = nulos_brancos
+        for coluna, t in enumerate((NULO, BRANCO)):
+            marcados = tipo == t
+            if marcados.any():
+                self.nulos_brancos[:, coluna] += np.bincount(
+                    local[marcados], weights=qt[marcados], minlength=n_locais
+                ).astype(np.int64)
+
+        # Redução agrupada dos votos válidos por local x votável
+        validas = np.flatnonzero(tipo == VALIDO)
+        distintas, primeiras, inverso = np.unique(
+            (local[validas] << 24) | votavel[validas], return_index=True, return_inverse=True
+        )
+        soma = np.bincount(inverso, weights=qt[validas], minlength=len(distintas)).astype(np.int64)
+
+        if self.nivel == 'secao':
+            self._registrar_nomes(lote, distintas, validas[primeiras])
+            return self._agrupar(distintas, soma)
+
+        antes = len(self.chaves)
+        codigos = self.chaves.codificar(distintas.tolist(), len(distintas))
+        if len(self.qt) < len(self.chaves):
+            qt_total = np.zeros(len(self.chaves), dtype=np.int64)
+            qt_total[:len(self.qt)] = self.qt
+            self.qt = qt_total
+        self.qt[codigos] += soma
+        novas = codigos >= antes
+        if novas.any():
+            self._registrar_nomes(lote, distintas[novas], validas[primeiras[novas]])
+        return []
+
+    def _registrar_nomes(self, lote, chaves, linhas):
+        """Guarda NM_VOTAVEL da primeira linha de cada candidatura nova (candidatos ausentes do banco são cadastrados com ele)"""
+        if len(self._grupo_do_local) < len(self.locais):
+            novos = []
+            for i in range(len(self._grupo_do_local), len(self.locais)):
+                ano, _, cargo, municipio, *_ = self.local(i)
+                novos.append(self._grupos[(ano, cargo, municipio if cargo in CARGOS_MUNICIPAIS else '')])
+            self._grupo_do_local = np.concatenate([self._grupo_do_local, np.array(novos, dtype=np.int64)])
+
+        candidatura = (self._grupo_do_local[chaves >> 24] << 24) | (chaves & 0xFFFFFF)
+        unicas, primeiras = np.unique(candidatura, return_index=True)
+        antes = len(self.candidaturas)
+        novas = self.candidaturas.codificar(unicas.tolist(), len(unicas)) >= antes
+        for codigo, i in zip(unicas[novas].tolist(), linhas[primeiras[novas]].tolist()):
+            ano, cargo, municipio = self._grupos.valores[codigo >> 24]
+            self.nomes[(ano, cargo, municipio, self.votaveis.valores[codigo & 0xFFFFFF])] = lote[i][7]
+
+    def votos(self):
+        """[(local, [nr_votavel, ...], [votos, ...])] acumulados (níveis zona e município)"""
+        chaves = np.array(self.chaves.valores, dtype=np.int64)
+        ordem = np.argsort(chaves, kind='stable')
+        return self._agrupar(chaves[ordem], self.qt[ordem])
+
+    def votos_nulos_brancos(self):
+        """[(local, [nulos, brancos])] dos locais com algum voto nulo ou branco"""
+        return [
+            (self.local(i), contagem)
+            for i, contagem in enumerate(self.nulos_brancos.tolist()) if contagem[0] or contagem[1]
+        ]
+
+
+class CargaVotacao:
+    """
+    Resolve municípios, zonas, seções, candidatos e partidos para os ids do banco e grava os votos.
+    Zonas, seções e candidatos ausentes são cadastrados em lote; municípios desconhecidos são ignorados.
+    Na primeira vez que um (ano, turno, município) aparece, seus votos anteriores são removidos.
+    """
+
+    def __init__(self, conn, carga, dimensoes=None):
+        self.conn = conn
+        self.carga = carga
+        self.dimensoes = dimensoes or Dimensoes(conn, carga)
+        self.municipios = self.dimensoes.municipios
+        self.partidos = self.dimensoes.partidos
+        self.zonas = self.dimensoes.zonas
+        self.secoes = self.dimensoes.secoes
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, bairroId FROM secoes_eleitorais WHERE bairroId IS NOT NULL")
+        self.bairros = dict(cursor.fetchall())
+        self.limpos = set()
+        self.ignorados = set()
+        self.votos_ignorados = 0
+
+    def _limpar(self, chaves):
+        """Remove os votos já gravados dos (ano, turno, municipioId) ainda não vistos nesta carga"""
+        novos = sorted(set(chaves) - self.limpos)
+        if not novos:
+            return
+        p = self.carga.placeholder
+        cursor = self.conn.cursor()
+        for ano, turno in sorted({(ano, turno) for ano, turno, _ in novos}):
+            ids = [mun for a, t, mun in novos if (a, t) == (ano, turno)]
+            for tabela in ('resultados_eleitorais', 'votos_nulos_brancos'):
+                cursor.execute(
+                    f"DELETE FROM {tabela} WHERE anoEleicao = {p} AND turno = {p} "
+                    f"AND municipioId IN ({', '.join([p] * len(ids))})",
+                    [ano, turno, *ids]
+                )
+        self.conn.commit()
+        self.limpos.update(novos)
+
+    def _resolver_locais(self, locais):
+        """{local: (ano, turno, cargo, municipioId, bairroId, zonaId, secaoId)} (None se o município é desconhecido)"""
+        municipios = {}
+        for local in locais:
+            mun_id = self.municipios.get(local[3])
+            municipios[local] = mun_id
+            if mun_id is None:
+                self.ignorados.add(local[3])
+
+        zonas = {(local[4], mun_id): (local[4], mun_id)
+                 for local, mun_id in municipios.items() if mun_id and local[4] is not None}
+        self.zonas.inserir_faltantes(('numero', 'municipioId'), zonas)
+
+        secoes = {}
+        for local, mun_id in municipios.items():
+            if mun_id and local[5] is not None:
+                zona_id = self.zonas.get((local[4], mun_id))
+                secoes[(local[5], zona_id)] = (local[5], zona_id)
+        self.secoes.inserir_faltantes(('numero', 'zonaId'), secoes)
+
+        resolvidos = {}
+        for local, mun_id in municipios.items():
+            if mun_id is None:
+                resolvidos[local] = None
+                continue
+            ano, turno, cargo, _, zona, secao = local
+            zona_id = self.zonas.get((zona, mun_id)) if zona is not None else None
+            secao_id = self.secoes.get((secao, zona_id)) if secao is not None else None
+            resolvidos[local] = (ano, turno, cargo, mun_id, self.bairros.get(secao_id), zona_id, secao_id)
+        self._limpar({(r[0], r[1], r[3]) for r in resolvidos.values() if r})
+        return resolvidos
+
+    def _resolver_candidatos(self, chaves, nomes):
+        """Cadastra em lote os candidatos votados que ainda não existem (nome de urna do arquivo)"""
+        por_ano = {}
+        for ano, cargo, municipio, votavel in chaves:
+            mun_id = self.municipios.get(municipio) if municipio else None
+            if municipio and mun_id is None:
+                continue
+            nome = nomes.get((ano, cargo, municipio, votavel), '')
+            por_ano.setdefault(ano, {})[(cargo, votavel, mun_id)] = (
+                nome, nome, int(votavel), self.partidos.get(votavel[:2]), cargo, ano, mun_id
+            )
+        for ano, linhas in por_ano.items():
+            self.dimensoes.candidatos(ano).inserir_faltantes(
+                ('nome', 'nomeUrna', 'numero', 'partidoId', 'cargo', 'anoEleicao', 'municipioId'), linhas
+            )
+
+    def gravar_votos(self, votos, nomes):
+        """Grava [(local, [nr_votavel, ...], [votos, ...])] em resultados_eleitorais e retorna as linhas gravadas"""
+        votos = list(votos)
+        locais = self._resolver_locais({local for local, _, _ in votos})
+        chaves_candidatos = set()
+        for local, votaveis, _ in votos:
+            if locais[local]:
+                ano, _, cargo, municipio = local[:4]
+                municipio = municipio if cargo in CARGOS_MUNICIPAIS else ''
+                chaves_candidatos.update((ano, cargo, municipio, v) for v in votaveis if not eh_legenda(cargo, v))
+        self._resolver_candidatos(chaves_candidatos, nomes)
+
+        partidos = self.partidos
+        linhas = []
+        for local, votaveis, qts in votos:
+            resolvido = locais[local]
+            if resolvido is None:
+                self.votos_ignorados += sum(qts)
+                continue
+            ano, _, cargo, mun_id = resolvido[:4]
+            candidatos = self.dimensoes.candidatos(ano).ids
+            mun_candidato = mun_id if cargo in CARGOS_MUNICIPAIS else None
+            proporcional = cargo in CARGOS_PROPORCIONAIS
+            for votavel, qt in zip(votaveis, qts):
+                if proporcional and len(votavel) == 2:
+                    linhas.append(resolvido + (None, partidos.get(votavel), qt, 0, qt))
+                else:
+                    linhas.append(resolvido + (
+                        candidatos.get((cargo, votavel, mun_candidato)), partidos.get(votavel[:2]), qt, qt, 0
+                    ))
+        return self.carga.inserir('resultados_eleitorais', COLUNAS_RESULTADOS, linhas)
+
+    def gravar_nulos_brancos(self, nulos_brancos):
+        """Grava [(local, [nulos, brancos])] em votos_nulos_brancos e retorna as linhas gravadas"""
+        nulos_brancos = list(nulos_brancos)
+        locais = self._resolver_locais({local for local, _ in nulos_brancos})
+        linhas = []
+        for local, (nulos, brancos) in nulos_brancos:
+            if locais[local] is None:
+                self.votos_ignorados += nulos + brancos
+                continue
+            linhas.append(locais[local] + (nulos, brancos))
+        return self.carga.inserir('votos_nulos_brancos', COLUNAS_NULOS_BRANCOS, linhas)
+
+
+def importar_votacao(conn, carga, filepath, nivel='zona', tamanho_lote=TAMANHO_LOTE, cache_dir=None,
+                     dimensoes=None, pipeline=False):
+    """
+    Importa um arquivo votacao_secao em uma passada e retorna as estatísticas da carga.
+    No nível de seção os votos são gravados a cada lote; nos demais, ao final da leitura.
+    Com `pipeline`, leitura, agregação e gravação rodam em etapas ligadas por filas limitadas:
+    os votos de um lote são gravados enquanto os lotes seguintes são lidos e agregados.
+    """
+    inicio = time.perf_counter()
+    agregador = AgregadorVotacao(nivel)
+    destino = CargaVotacao(conn, carga, dimensoes)
+    resultados = 0
+    
+    def agregar(lote):
+        votos = agregador.adicionar(lote)
+        avancar(len(lote))
+        segundos = time.perf_counter() - inicio
+        print(f"  {agregador.total_linhas:,} linhas ({agregador.total_linhas / segundos:,.0f} linhas/s)")
+        return votos or None
+    
+    def gravar(votos):
+        nonlocal resultados
+        resultados += destino.gravar_votos(votos, agregador.nomes)
+    
+    lotes = VOTACAO_SECAO.ler_lotes(filepath, 'votacao', tamanho_lote, cache_dir)
+    etapas = None
+    if pipeline:
+        etapas = Pipeline()
+        etapas.executar(lotes, ('agregacao', agregar), ('gravacao', gravar))
+    else:
+        for lote in lotes:
+            votos = agregar(lote)
+            if votos:
+                gravar(votos)
+
+    if nivel != 'secao':
+        resultados += destino.gravar_votos(agregador.votos(), agregador.nomes)
+    nulos_brancos = destino.gravar_nulos_brancos(agregador.votos_nulos_brancos())
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'nivel': nivel,
+        'linhas': agregador.total_linhas,
+        'votos': agregador.total_votos,
+        'resultados': resultados,
+        'nulos_brancos': nulos_brancos,
+        'candidatos_cadastrados': sum(d.inseridos for d in destino.dimensoes.candidatos_por_ano.values()),
+        'zonas_cadastradas': destino.zonas.inseridos,
+        'secoes_cadastradas': destino.secoes.inseridos,
+        'municipios_ignorados': sorted(destino.ignorados),
+        'votos_ignorados': destino.votos_ignorados,
+        'segundos': segundos,
+        'linhas_por_segundo': agregador.total_linhas / segundos if segundos else 0.0,
+        'pipeline': etapas.estatisticas if etapas else None,
+    }
@@ -0,0 +1,155 @@
+"""
+Testes da importação da votação por seção usando sqlite3 como banco local
+"""
+
+import pytest
+
+from tse_carga import CarregadorBulk
+from tse_votacao import COLUNAS_VOTACAO, AgregadorVotacao, importar_votacao, normalizar_cargo
+
+ESQUEMA = """
+CREATE TABLE municipios (id INTEGER PRIMARY KEY, nome TEXT, codigo TEXT);
+CREATE TABLE zonas_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, municipioId INTEGER);
+CREATE TABLE secoes_eleitorais (id INTEGER PRIMARY KEY, numero INTEGER, zonaId INTEGER, bairroId INTEGER);
+CREATE TABLE partidos (id INTEGER PRIMARY KEY, sigla TEXT, numero INTEGER);
+CREATE TABLE candidatos (
+    id INTEGER PRIMARY KEY, nome TEXT, nomeUrna TEXT, numero INTEGER, partidoId INTEGER,
+    cargo TEXT, anoEleicao INTEGER, municipioId INTEGER
+);
+CREATE TABLE resultados_eleitorais (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, candidatoId INTEGER, partidoId INTEGER,
+    votosValidos INTEGER, votosNominais INTEGER, votosLegenda INTEGER
+);
+CREATE TABLE votos_nulos_brancos (
+    id INTEGER PRIMARY KEY, anoEleicao INTEGER, turno INTEGER, cargo TEXT, municipioId INTEGER,
+    bairroId INTEGER, zonaId INTEGER, secaoId INTEGER, votosNulos INTEGER, votosBrancos INTEGER
+);
+"""
+
+# (município, zona, seção, cargo, número, nome, votos)
+VOTOS = [
+    ('100', '1', '10', 'PREFEITO', '13', 'ANA', 50),
+    ('100', '1', '10', 'PREFEITO', '22', 'BRUNO', 30),
+    ('100', '1', '10', 'PREFEITO', '95', 'Branco', 4),
+    ('100', '1', '10', 'PREFEITO', '96', 'Nulo', 6),
+    ('100', '1', '11', 'PREFEITO', '13', 'ANA', 20),
+    ('100', '1', '10', 'VEREADOR', '13123', 'CARLA', 25),
+    ('100', '1', '10', 'VEREADOR', '13', 'PARTIDO 13', 5),
+    ('100', '2', '20', 'VEREADOR', '13123', 'CARLA', 15),
+    ('100', '2', '20', 'VEREADOR', '97', 'Anulado', 1),
+    ('200', '3', '30', 'PREFEITO', '13', 'DIEGO', 40),
+    ('999', '9', '90', 'PREFEITO', '13', 'FORA', 7),
+]
+
+
+def _lote(votos=VOTOS, turno=1):
+    """Tuplas tipadas na ordem de COLUNAS_VOTACAO"""
+    return [(2024, turno, mun, int(zona), int(secao), cargo, numero, nome, qt)
+            for mun, zona, secao, cargo, numero, nome, qt in votos]
+
+
+def _gravar_csv(caminho, votos=VOTOS):
+    with open(caminho, 'w', encoding='latin-1') as f:
+        f.write(';'.join(f'"{c}"' for c in COLUNAS_VOTACAO) + '\n')
+        for linha in _lote(votos):
+            f.write(';'.join(f'"{v}"' for v in linha) + '\n')
+    return str(caminho)
+
+
+@pytest.fixture
+def conexao(banco):
+    conexao = banco(ESQUEMA)
+    conexao.executemany("INSERT INTO municipios (id, nome, codigo) VALUES (?, ?, ?)",
+                        [(1, 'Cidade A', '100'), (2, 'Cidade B', '200')])
+    conexao.executemany("INSERT INTO partidos (id, sigla, numero) VALUES (?, ?, ?)", [(7, 'PT', 13), (8, 'PL', 22)])
+    conexao.execute("INSERT INTO zonas_eleitorais (id, numero, municipioId) VALUES (5, 1, 1)")
+    conexao.execute("INSERT INTO secoes_eleitorais (id, numero, zonaId, bairroId) VALUES (50, 10, 5, 400)")
+    conexao.execute("INSERT INTO candidatos (id, nome, nomeUrna, numero, partidoId, cargo, anoEleicao, municipioId) "
+                    "VALUES (70, 'Ana Silva', 'ANA', 13, 7, 'prefeito', 2024, 1)")
+    return conexao
+
+
+def test_normalizar_cargo():
+    assert normalizar_cargo('DEPUTADO ESTADUAL') == 'deputado_estadual'
+    assert normalizar_cargo('VICE-PREFEITO') == 'vice_prefeito'
+
+
+def test_niveis_somam_os_mesmos_votos():
+    totais = {}
+    for nivel in ('secao', 'zona', 'municipio'):
+        agregador = AgregadorVotacao(nivel)
+        votos = agregador.adicionar(_lote(VOTOS[:6])) + agregador.adicionar(_lote(VOTOS[6:]))
+        if nivel != 'secao':
+            assert votos == []
+            votos = agregador.votos()
+        totais[nivel] = {}
+        for local, votaveis, qts in votos:
+            for votavel, qt in zip(votaveis, qts):
+                chave = (local[2], local[3], votavel)
+                totais[nivel][chave] = totais[nivel].get(chave, 0) + qt
+        assert sum(nb[0] for _, nb in agregador.votos_nulos_brancos()) == 7
+        assert sum(nb[1] for _, nb in agregador.votos_nulos_brancos()) == 4
+        assert agregador.total_votos == sum(v[-1] for v in VOTOS)
+    assert totais['secao'] == totais['zona'] == totais['municipio']
+    assert totais['zona'][('prefeito', '100', '13')] == 70
+
+    zona = AgregadorVotacao('zona')
+    zona.adicionar(_lote())
+    assert [(local, votaveis, qts) for local, votaveis, qts in zona.votos() if local[3] == '100'][:1] == [
+        ((2024, 1, 'prefeito', '100', 1, None), ['13', '22'], [70, 30])
+    ]
+    assert zona.nomes[(2024, 'vereador', '100', '13123')] == 'CARLA'
+
+
+def test_nivel_invalido():
+    with pytest.raises(ValueError):
+        AgregadorVotacao('bairro')
+
+
+@pytest.mark.parametrize('pipeline', [False, True])
+@pytest.mark.parametrize('nivel', ['secao', 'zona', 'municipio'])
+def test_importar_votacao(conexao, tmp_path, nivel, pipeline):
+    arquivo = _gravar_csv(tmp_path / 'votacao_secao_2024_XX.csv')
+    carga = CarregadorBulk(conexao, tamanho_lote=3)
+    stats = importar_votacao(conexao, carga, arquivo, nivel, tamanho_lote=4, pipeline=pipeline)
+    if pipeline:
+        assert stats['pipeline']['leitura']['itens'] == 3
+
+    assert stats['municipios_ignorados'] == ['999']
+    assert stats['votos_ignorados'] == 7
+    validos, nominais, legenda = conexao.execute(
+        "SELECT SUM(votosValidos), SUM(votosNominais), SUM(votosLegenda) FROM resultados_eleitorais"
+    ).fetchone()
+    assert (validos, nominais, legenda) == (185, 180, 5)
+    assert conexao.execute("SELECT SUM(votosNulos), SUM(votosBrancos) FROM votos_nulos_brancos").fetchone() == (7, 4)
+
+    # Candidato existente é reaproveitado; os ausentes são cadastrados com o nome do arquivo
+    ana = conexao.execute(
+        "SELECT SUM(votosValidos) FROM resultados_eleitorais WHERE candidatoId = 70"
+    ).fetchone()[0]
+    assert ana == 70
+    assert conexao.execute(
+        "SELECT nomeUrna, partidoId, municipioId FROM candidatos WHERE numero = 13 AND municipioId = 2"
+    ).fetchone() == ('DIEGO', 7, 2)
+    assert stats['candidatos_cadastrados'] == 3
+    assert conexao.execute(
+        "SELECT partidoId, candidatoId FROM resultados_eleitorais WHERE votosLegenda > 0"
+    ).fetchall() == [(7, None)]
+
+    linhas = conexao.execute("SELECT COUNT(*) FROM resultados_eleitorais").fetchone()[0]
+    if nivel == 'secao':
+        # Seções e zonas ausentes são cadastradas; o bairro vem da seção
+        assert stats['zonas_cadastradas'] == 2 and stats['secoes_cadastradas'] == 3
+        assert conexao.execute(
+            "SELECT SUM(votosValidos) FROM resultados_eleitorais WHERE bairroId = 400"
+        ).fetchone()[0] == 110
+    elif nivel == 'municipio':
+        assert conexao.execute(
+            "SELECT COUNT(*) FROM resultados_eleitorais WHERE zonaId IS NOT NULL OR secaoId IS NOT NULL"
+        ).fetchone()[0] == 0
+
+    # Reimportar substitui os votos dos municípios do arquivo
+    importar_votacao(conexao, carga, arquivo, nivel, tamanho_lote=4, pipeline=pipeline)
+    assert conexao.execute("SELECT COUNT(*) FROM resultados_eleitorais").fetchone()[0] == linhas
+    assert conexao.execute("SELECT SUM(votosValidos) FROM resultados_eleitorais").fetchone()[0] == 185
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Leitura direta dos arquivos .zip do TSE, sem extrair para o disco
+Um membro é endereçado como um arquivo dentro de um diretório: /dados/consulta_cand_2024.zip/consulta_cand_2024_RO.csv
+"""
+
+import os
+import re
+import zipfile
+
+# Buffer de leitura dos arquivos comuns (1 MiB)
+BUFFER_BINARIO = 1 << 20
+
+
+def separar(caminho):
+    """(arquivo .zip, membro) se o caminho aponta para dentro de um .zip existente, senão None"""
+    minusculo = caminho.lower()
+    inicio = 0
+    while (i := minusculo.find('.zip/', inicio)) >= 0:
+        arquivo = caminho[:i + 4]
+        if os.path.isfile(arquivo):
+            return arquivo, caminho[i + 5:]
+        inicio = i + 1
+    return None
+
+
+def existe(caminho):
+    """os.path.exists que também reconhece membros de .zip"""
+    membro = separar(caminho)
+    if membro is None:
+        return os.path.exists(caminho)
+    with zipfile.ZipFile(membro[0]) as arquivo:
+        try:
+            arquivo.getinfo(membro[1])
+            return True
+        except KeyError:
+            return False
+
+
+def tamanho(caminho):
+    """Tamanho em bytes (de um membro de .zip, o tamanho descomprimido)"""
+    membro = separar(caminho)
+    if membro is None:
+        return os.path.getsize(caminho)
+    with zipfile.ZipFile(membro[0]) as arquivo:
+        return arquivo.getinfo(membro[1]).file_size
+
+
+def estado(caminho):
+    """(tamanho, mtime em ns); o mtime de um membro é o do .zip, que muda quando o arquivo é substituído"""
+    membro = separar(caminho)
+    if membro is None:
+        st = os.stat(caminho)
+        return st.st_size, st.st_mtime_ns
+    return tamanho(caminho), os.stat(membro[0]).st_mtime_ns
+
+
+def abrir_binario(caminho):
+    """Abre para leitura binária; um membro de .zip é descomprimido em streaming"""
+    membro = separar(caminho)
+    if membro is None:
+        return open(caminho, 'rb', buffering=BUFFER_BINARIO)
+    # O .zip fica aberto enquanto o membro estiver aberto
+    return zipfile.ZipFile(membro[0]).open(membro[1])
+
+
+def membros(arquivo, uf=None, ano=None):
+    """Caminhos dos CSVs do .zip, opcionalmente só os de uma UF e/ou ano (<nome>_<ano>_<UF>.csv)"""
+    ano = str(ano) if ano else r'\d{4}'
+    uf = re.escape(uf) if uf else '[A-Z]{2}'
+    padrao = re.compile(f"_{ano}_{uf}\\.csv$", re.IGNORECASE)
+    with zipfile.ZipFile(arquivo) as z:
+        nomes = [nome for nome in z.namelist() if not nome.endswith('/') and padrao.search(nome)]
+    return [f"{arquivo}/{nome}" for nome in sorted(nomes)]
+
+
+def localizar(nome, arquivos):
+    """Caminho do primeiro membro chamado `nome` (em qualquer pasta) nos .zip de `arquivos`, ou None"""
+    for arquivo in arquivos:
+        with zipfile.ZipFile(arquivo) as z:
+            for membro in z.namelist():
+                if os.path.basename(membro).lower() == nome.lower():
+                    return f"{arquivo}/{membro}"
+    return None
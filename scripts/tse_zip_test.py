@@ -0,0 +1,89 @@
+"""
+Testes da leitura direta dos arquivos .zip do TSE
+"""
+
+import os
+import zipfile
+
+import pytest
+
+import import_tse_data
+from tse_cache import iter_linhas
+from tse_csv import estimar_linhas, iter_csv_latin1, ler_cabecalho
+from tse_manifesto import impressao_digital
+from tse_metricas import Metricas
+from tse_sintetico import gerar_conjunto
+from tse_zip import existe, localizar, membros, separar, tamanho
+
+
+@pytest.fixture
+def conjunto(tmp_path):
+    """CSVs extraídos em `csv/` e os mesmos arquivos em .zip por conjunto, como distribuídos pelo TSE"""
+    extraidos = tmp_path / 'csv'
+    gerar_conjunto(str(extraidos), 3_000)
+    gerar_conjunto(str(extraidos), 200, ano=2022)
+    zips = tmp_path / 'zips'
+    zips.mkdir()
+    for prefixo in ('perfil_eleitorado', 'consulta_cand', 'consulta_coligacao', 'votacao_secao'):
+        with zipfile.ZipFile(zips / f"{prefixo}.zip", 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('leiame.pdf', b'%PDF')
+            for nome in sorted(os.listdir(extraidos)):
+                if nome.startswith(prefixo):
+                    z.write(extraidos / nome, nome)
+            # Membro de outra UF, que não deve ser selecionado
+            z.writestr(f"{prefixo}_2024_AC.csv", '"ANO_ELEICAO"\n"2024"\n')
+    return str(extraidos), sorted(str(zips / nome) for nome in os.listdir(zips))
+
+
+def test_membros_por_uf_e_ano(conjunto):
+    _, zips = conjunto
+    arquivo = next(z for z in zips if z.endswith('consulta_cand.zip'))
+    assert [os.path.basename(m) for m in membros(arquivo, uf='RO')] == [
+        'consulta_cand_2022_RO.csv', 'consulta_cand_2024_RO.csv'
+    ]
+    assert [os.path.basename(m) for m in membros(arquivo, ano=2024)] == [
+        'consulta_cand_2024_AC.csv', 'consulta_cand_2024_RO.csv'
+    ]
+    caminho = localizar('consulta_cand_2024_RO.csv', zips)
+    assert separar(caminho) == (arquivo, 'consulta_cand_2024_RO.csv')
+    assert existe(caminho) and not existe(f"{arquivo}/consulta_cand_2018_RO.csv")
+    assert localizar('consulta_cand_2018_RO.csv', zips) is None
+    assert separar('/dados/arquivo.zip/nao_existe.csv') is None
+
+
+def test_membro_le_o_mesmo_que_o_csv_extraido(conjunto, tmp_path):
+    extraidos, zips = conjunto
+    csv = os.path.join(extraidos, 'perfil_eleitorado_2024_RO.csv')
+    membro = localizar('perfil_eleitorado_2024_RO.csv', zips)
+
+    assert tamanho(membro) == os.path.getsize(csv)
+    assert ler_cabecalho(membro) == ler_cabecalho(csv)
+    assert list(iter_csv_latin1(membro)) == list(iter_csv_latin1(csv))
+    assert estimar_linhas(membro) == estimar_linhas(csv) == 3_000
+    assert estimar_linhas(membro, amostra=4096) == estimar_linhas(csv, amostra=4096)
+    # Mesmo conteúdo, mesma impressão digital: manifesto e cache não distinguem a origem
+    assert impressao_digital(membro)['sha256'] == impressao_digital(csv)['sha256']
+
+    colunas = ('CD_MUNICIPIO', 'NR_ZONA', 'QT_ELEITORES_PERFIL')
+    cache = str(tmp_path / 'cache')
+    assert list(iter_linhas(membro, colunas, cache)) == list(iter_csv_latin1(csv, colunas=colunas))
+    assert list(iter_linhas(csv, colunas, cache)) == list(iter_csv_latin1(csv, colunas=colunas))
+
+    metricas = Metricas()
+    with metricas.etapa('leitura', arquivo=membro) as etapa:
+        pass
+    assert etapa.bytes_total == os.path.getsize(csv) and etapa.total == 3_000
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_importacao_do_zip_igual_a_dos_csvs(conjunto, tmp_path, monkeypatch, workers):
+    extraidos, zips = conjunto
+    tarefas = [('eleitorado', 2024), ('candidatos', 2024), ('candidatos', 2022), ('coligacoes', 2024)]
+
+    monkeypatch.setattr(import_tse_data, 'DATA_DIR', extraidos)
+    esperado = import_tse_data.executar_tarefas(tarefas)
+
+    monkeypatch.setattr(import_tse_data, 'DATA_DIR', str(tmp_path / 'vazio'))
+    assert separar(import_tse_data.arquivo_tarefa(('candidatos', 2022), zips))
+    assert import_tse_data.executar_tarefas(tarefas, workers=workers, zips=zips) == esperado
+    assert all(esperado[tarefa] for tarefa in tarefas)
@@ -58,6 +58,12 @@ export function serveStatic(app: Express) {
     );
   }
 
+  // Favicons com ?v=hash (vite.config.ts) nunca mudam de conteúdo na mesma URL
+  app.use(/^\/(favicon|apple-touch-icon)[^/]*$/, (req, res, next) => {
+    if (req.query.v) res.setHeader("Cache-Control", "public, max-age=31536000, immutable");
+    next();
+  });
+
   app.use(express.static(distPath));
 
   // fall through to index.html if the file doesn't exist
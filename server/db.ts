@@ -1,4 +1,4 @@
-import { eq, and, desc, sql, gte, lte, sum, count, or, isNull } from "drizzle-orm";
+import { eq, and, desc, sql, gte, lte, sum, count, or, isNull, inArray } from "drizzle-orm";
 import { drizzle } from "drizzle-orm/mysql2";
 import {
   InsertUser,
@@ -11,6 +11,10 @@ import {
   zonasEleitorais,
   secoesEleitorais,
   eleitorado,
+  eleitoradoCubo,
+  mapaCalor,
+  candidatosBusca,
+  candidatosBuscaTermos,
   partidos,
   candidatos,
   resultadosEleitorais,
@@ -21,6 +25,18 @@ import {
   systemSettings,
 } from "../drizzle/schema";
 import { ENV } from "./_core/env";
+import type { IntervaloCelulas } from "@shared/mapaCalor";
+import {
+  ESCALA_ANO,
+  POR_TERMO,
+  PREFIXO_MIN,
+  SIMILARIDADE_MINIMA,
+  TRIGRAMA,
+  contemPrefixo,
+  normalizar,
+  termosDaConsulta,
+  trigramas,
+} from "@shared/buscaCandidatos";
 
 let _db: ReturnType<typeof drizzle> | null = null;
 
@@ -167,10 +183,97 @@ export async function getZonasEleitorais(municipioId?: number) {
 
 // ==================== ELEITORADO ====================
 
+// Categoria do cubo (nome do contador na importação) -> campo retornado por getEleitoradoStats
+const CAMPOS_CUBO: Record<string, string> = {
+  eleitoresMasculino: "masculino",
+  eleitoresFeminino: "feminino",
+  eleitoresOutros: "outros",
+  faixa16a17: "faixa16a17",
+  faixa18a24: "faixa18a24",
+  faixa25a34: "faixa25a34",
+  faixa35a44: "faixa35a44",
+  faixa45a59: "faixa45a59",
+  faixa60a69: "faixa60a69",
+  faixa70mais: "faixa70mais",
+  escolaridadeAnalfabeto: "analfabeto",
+  escolaridadeFundamental: "fundamental",
+  escolaridadeMedio: "medio",
+  escolaridadeSuperior: "superior",
+};
+
+// Lê os totais pré-somados do cubo (0 = todos); null se o cubo não tiver a combinação
+async function getEleitoradoStatsCubo(
+  db: ReturnType<typeof drizzle>,
+  filters?: { anoEleicao?: number; municipioId?: number; zonaId?: number }
+) {
+  const rows = await db
+    .select({
+      genero: eleitoradoCubo.genero,
+      faixaEtaria: eleitoradoCubo.faixaEtaria,
+      escolaridade: eleitoradoCubo.escolaridade,
+      totalEleitores: eleitoradoCubo.totalEleitores,
+    })
+    .from(eleitoradoCubo)
+    .where(
+      and(
+        eq(eleitoradoCubo.anoEleicao, filters?.anoEleicao || 0),
+        eq(eleitoradoCubo.municipioId, filters?.municipioId || 0),
+        eq(eleitoradoCubo.zonaId, filters?.zonaId || 0),
+        // Total geral e totais de uma única dimensão
+        or(
+          and(eq(eleitoradoCubo.faixaEtaria, ""), eq(eleitoradoCubo.escolaridade, "")),
+          and(eq(eleitoradoCubo.genero, ""), eq(eleitoradoCubo.escolaridade, "")),
+          and(eq(eleitoradoCubo.genero, ""), eq(eleitoradoCubo.faixaEtaria, ""))
+        )
+      )
+    );
+
+  if (!rows.some(row => row.genero === "" && row.faixaEtaria === "" && row.escolaridade === "")) {
+    return null;
+  }
+
+  // Mesmo formato do SUM (strings); categorias sem linha no cubo valem "0"
+  const stats = {
+    totalEleitores: null as string | null,
+    masculino: "0",
+    feminino: "0",
+    outros: "0",
+    faixa16a17: "0",
+    faixa18a24: "0",
+    faixa25a34: "0",
+    faixa35a44: "0",
+    faixa45a59: "0",
+    faixa60a69: "0",
+    faixa70mais: "0",
+    analfabeto: "0",
+    fundamental: "0",
+    medio: "0",
+    superior: "0",
+  };
+  const campos: Record<string, string | null> = stats;
+  for (const row of rows) {
+    const categoria = row.genero || row.faixaEtaria || row.escolaridade;
+    const campo = categoria ? CAMPOS_CUBO[categoria] : "totalEleitores";
+    if (campo) campos[campo] = String(row.totalEleitores);
+  }
+  return stats;
+}
+
 export async function getEleitoradoStats(filters?: { anoEleicao?: number; municipioId?: number; bairroId?: number; zonaId?: number }) {
   const db = await getDb();
   if (!db) return null;
 
+  // O cubo não tem bairro (o perfil do TSE é por zona); sem filtro de bairro, lê os totais pré-somados.
+  // Ano sem total no cubo (nunca gerado, ou invalidado por upload em processData) volta ao SUM
+  if (!filters?.bairroId) {
+    try {
+      const stats = await getEleitoradoStatsCubo(db, filters);
+      if (stats) return stats;
+    } catch (error) {
+      console.warn("[Database] Cubo de eleitorado indisponível, usando agregação:", error);
+    }
+  }
+
   const conditions = [];
   if (filters?.anoEleicao) conditions.push(eq(eleitorado.anoEleicao, filters.anoEleicao));
   if (filters?.municipioId) conditions.push(eq(eleitorado.municipioId, filters.municipioId));
@@ -222,6 +325,37 @@ export async function getEleitoradoPorBairro(anoEleicao: number, municipioId?: n
     .groupBy(eleitorado.bairroId, bairros.nome, bairros.latitude, bairros.longitude);
 }
 
+// Células do mapa de calor na janela visível: intervalo da chave primária (ano, cargo, zoom, x, y)
+export async function getMapaCalor(anoEleicao: number, cargo: string, intervalo: IntervaloCelulas) {
+  const db = await getDb();
+  if (!db) return [];
+
+  return db
+    .select({
+      celulaX: mapaCalor.celulaX,
+      celulaY: mapaCalor.celulaY,
+      latitude: mapaCalor.latitude,
+      longitude: mapaCalor.longitude,
+      eleitores: mapaCalor.eleitores,
+      nulos: mapaCalor.nulos,
+      brancos: mapaCalor.brancos,
+      votosValidos: mapaCalor.votosValidos,
+      partidos: mapaCalor.partidos,
+    })
+    .from(mapaCalor)
+    .where(
+      and(
+        eq(mapaCalor.anoEleicao, anoEleicao),
+        eq(mapaCalor.cargo, cargo),
+        eq(mapaCalor.zoom, intervalo.zoom),
+        gte(mapaCalor.celulaX, intervalo.xMin),
+        lte(mapaCalor.celulaX, intervalo.xMax),
+        gte(mapaCalor.celulaY, intervalo.yMin),
+        lte(mapaCalor.celulaY, intervalo.yMax)
+      )
+    );
+}
+
 // ==================== PARTIDOS E CANDIDATOS ====================
 
 export async function getPartidos() {
@@ -250,6 +384,98 @@ export async function getCandidatos(filters?: { anoEleicao?: number; cargo?: str
     .orderBy(candidatos.nome);
 }
 
+// Busca de candidatos pelo índice de scripts/tse_busca.py (mesma ordem de resultados)
+export async function buscarCandidatos(consulta: string, limite = 10, anoEleicao?: number) {
+  const db = await getDb();
+  if (!db) return [];
+
+  const texto = normalizar(consulta);
+  if (texto.length < PREFIXO_MIN) return [];
+  const { palavras, frase, soltas } = termosDaConsulta(texto);
+
+  const melhores = (termo: string) =>
+    db
+      .select({
+        peso: candidatosBuscaTermos.peso,
+        anoEleicao: candidatosBuscaTermos.anoEleicao,
+        uf: candidatosBuscaTermos.uf,
+        seq: candidatosBuscaTermos.seq,
+      })
+      .from(candidatosBuscaTermos)
+      .where(
+        anoEleicao
+          ? and(eq(candidatosBuscaTermos.termo, termo), eq(candidatosBuscaTermos.anoEleicao, anoEleicao))
+          : eq(candidatosBuscaTermos.termo, termo)
+      )
+      .orderBy(desc(candidatosBuscaTermos.peso))
+      .limit(POR_TERMO);
+  const chave = (c: { anoEleicao: number; uf: string; seq: number }) => `${c.anoEleicao}/${c.uf}/${c.seq}`;
+
+  const documentos = async (chaves: { anoEleicao: number; uf: string; seq: number }[]) => {
+    if (chaves.length === 0) return new Map<string, typeof candidatosBusca.$inferSelect>();
+    const linhas = await db
+      .select()
+      .from(candidatosBusca)
+      .where(
+        or(
+          ...chaves.map((c) =>
+            and(eq(candidatosBusca.anoEleicao, c.anoEleicao), eq(candidatosBusca.uf, c.uf), eq(candidatosBusca.seq, c.seq))
+          )
+        )
+      );
+    return new Map(linhas.map((linha) => [chave(linha), linha]));
+  };
+
+  // Casamentos da consulta inteira valem mais que os de uma palavra solta (que só ampliam os candidatos)
+  const qualidades = new Map<string, number>();
+  const candidatosDaBusca = new Map<string, { anoEleicao: number; uf: string; seq: number }>();
+  for (const linha of await melhores(frase)) {
+    qualidades.set(chave(linha), 100 + Math.floor(linha.peso / ESCALA_ANO));
+    candidatosDaBusca.set(chave(linha), linha);
+  }
+  for (const termo of soltas) {
+    for (const linha of await melhores(termo)) {
+      const k = chave(linha);
+      qualidades.set(k, Math.max(qualidades.get(k) ?? 0, Math.floor(linha.peso / ESCALA_ANO)));
+      candidatosDaBusca.set(k, linha);
+    }
+  }
+
+  const resultados = [];
+  for (const [k, documento] of Array.from(await documentos(Array.from(candidatosDaBusca.values())))) {
+    if (!palavras.every((palavra) => contemPrefixo(documento.texto, palavra))) continue;
+    const emSequencia = ` ${documento.texto}`.includes(` ${texto}`);
+    resultados.push({ ...documento, pontuacao: (emSequencia ? 1000 : 0) + (qualidades.get(k) ?? 0), aproximado: false });
+  }
+  resultados.sort(
+    (a, b) => b.pontuacao - a.pontuacao || b.anoEleicao - a.anoEleicao || (a.texto < b.texto ? -1 : a.texto > b.texto ? 1 : 0)
+  );
+  if (resultados.length > 0) return resultados.slice(0, limite);
+
+  // Sem nenhum candidato com todas as palavras: trigramas do nome de urna (erros de digitação)
+  const consultaTrigramas = new Set(palavras.flatMap((palavra) => Array.from(trigramas(palavra))));
+  if (consultaTrigramas.size === 0) return [];
+  const contagem = new Map<string, { anoEleicao: number; uf: string; seq: number; n: number }>();
+  for (const trigrama of Array.from(consultaTrigramas)) {
+    for (const linha of await melhores(TRIGRAMA + trigrama)) {
+      const k = chave(linha);
+      const atual = contagem.get(k) ?? { anoEleicao: linha.anoEleicao, uf: linha.uf, seq: linha.seq, n: 0 };
+      atual.n += 1;
+      contagem.set(k, atual);
+    }
+  }
+  const similares = Array.from(contagem.values())
+    .map((c) => ({ ...c, similaridade: c.n / consultaTrigramas.size }))
+    .filter((c) => c.similaridade >= SIMILARIDADE_MINIMA)
+    .sort((a, b) => b.similaridade - a.similaridade || b.anoEleicao - a.anoEleicao)
+    .slice(0, limite);
+  const encontrados = await documentos(similares);
+  return similares.flatMap((c) => {
+    const documento = encontrados.get(chave(c));
+    return documento ? [{ ...documento, pontuacao: Math.round(c.similaridade * 100), aproximado: true }] : [];
+  });
+}
+
 // ==================== RESULTADOS ELEITORAIS ====================
 
 export async function getResultadosPorPartido(filters: { anoEleicao: number; cargo: string; municipioId?: number }) {
@@ -495,6 +721,14 @@ export async function bulkInsertEleitorado(data: (typeof eleitorado.$inferInsert
   await db.insert(eleitorado).values(data);
 }
 
+// O cubo é gerado só pela importação do TSE (scripts/tse_cubo.py): linhas novas em `eleitorado`
+// invalidam o ano e o ano "todos" (0), e getEleitoradoStats volta ao SUM até o cubo ser refeito
+export async function invalidarCuboEleitorado(anoEleicao: number) {
+  const db = await getDb();
+  if (!db) return;
+  await db.delete(eleitoradoCubo).where(inArray(eleitoradoCubo.anoEleicao, [anoEleicao, 0]));
+}
+
 export async function bulkInsertResultados(data: (typeof resultadosEleitorais.$inferInsert)[]) {
   const db = await getDb();
   if (!db) return;
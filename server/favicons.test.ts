@@ -0,0 +1,33 @@
+import { describe, expect, it } from "vitest";
+import crypto from "node:crypto";
+import fs from "node:fs";
+import path from "node:path";
+
+// O plugin faviconsVersionados (vite.config.ts) só versiona as URLs que conferem com
+// client/public/favicons.json: manifesto desatualizado deixa os favicons sem versão no build
+const publico = path.resolve(import.meta.dirname, "..", "client", "public");
+
+type Manifesto = {
+  logo: { arquivo: string; sha256: string };
+  arquivos: Record<string, { sha256: string; bytes: number }>;
+};
+
+function sha256(nome: string) {
+  return crypto.createHash("sha256").update(fs.readFileSync(path.join(publico, nome))).digest("hex");
+}
+
+describe("favicons.json", () => {
+  const manifesto = JSON.parse(fs.readFileSync(path.join(publico, "favicons.json"), "utf-8")) as Manifesto;
+
+  it("confere com a logo de origem", () => {
+    expect(sha256(manifesto.logo.arquivo), "Logo mudou: rode scripts/generate-favicon.py").toBe(
+      manifesto.logo.sha256
+    );
+  });
+
+  it.each(Object.keys(manifesto.arquivos))("confere com %s", (nome) => {
+    const { sha256: esperado, bytes } = manifesto.arquivos[nome];
+    expect(fs.statSync(path.join(publico, nome)).size).toBe(bytes);
+    expect(sha256(nome), `${nome} difere de favicons.json: rode scripts/generate-favicon.py`).toBe(esperado);
+  });
+});
@@ -1,4 +1,5 @@
 import { COOKIE_NAME } from "@shared/const";
+import { MAX_CELULAS_JANELA, NIVEIS_ZOOM, totalCelulas } from "@shared/mapaCalor";
 import { TRPCError } from "@trpc/server";
 import { z } from "zod";
 import { getSessionCookieOptions } from "./_core/cookies";
@@ -240,6 +241,32 @@ const eleitoradoRouter = router({
     }),
 });
 
+const mapaCalorRouter = router({
+  celulas: publicProcedure
+    .input(
+      z.object({
+        anoEleicao: z.number(),
+        cargo: z.string().default("prefeito"),
+        zoom: z.number().int(),
+        xMin: z.number().int().min(0),
+        xMax: z.number().int().min(0),
+        yMin: z.number().int().min(0),
+        yMax: z.number().int().min(0),
+      })
+    )
+    .query(async ({ input }) => {
+      const { anoEleicao, cargo, ...intervalo } = input;
+      if (!(NIVEIS_ZOOM as readonly number[]).includes(intervalo.zoom)) {
+        throw new TRPCError({ code: "BAD_REQUEST", message: `Nível de zoom não pré-calculado: ${intervalo.zoom}` });
+      }
+      const total = totalCelulas(intervalo);
+      if (total <= 0 || total > MAX_CELULAS_JANELA) {
+        throw new TRPCError({ code: "BAD_REQUEST", message: `Janela com ${total} células (máximo ${MAX_CELULAS_JANELA})` });
+      }
+      return db.getMapaCalor(anoEleicao, cargo, intervalo);
+    }),
+});
+
 const partidosRouter = router({
   list: publicProcedure.query(async () => {
     return db.getPartidos();
@@ -260,6 +287,18 @@ const candidatosRouter = router({
     .query(async ({ input }) => {
       return db.getCandidatos(input);
     }),
+  // Busca por digitação parcial (nome de urna, nome, partido, coligação), sem acento e tolerante a erros
+  buscar: publicProcedure
+    .input(
+      z.object({
+        q: z.string().max(100),
+        anoEleicao: z.number().optional(),
+        limite: z.number().int().min(1).max(50).default(10),
+      })
+    )
+    .query(async ({ input }) => {
+      return db.buscarCandidatos(input.q, input.limite, input.anoEleicao);
+    }),
 });
 
 const resultadosRouter = router({
@@ -417,6 +456,8 @@ const importacoesRouter = router({
             escolaridadeSuperior: parseInt(row.superior || row.escolaridade_superior || "0"),
           }));
           await db.bulkInsertEleitorado(records);
+          // O cubo (tse_cubo.py) não cobre as linhas novas: o ano volta ao SUM em getEleitoradoStats
+          await db.invalidarCuboEleitorado(anoReferencia || new Date().getFullYear());
           registrosImportados = records.length;
         } else if (tipoDataset === "votos_nulos_brancos") {
           const records = data.map((row: any) => ({
@@ -976,6 +1017,7 @@ export const appRouter = router({
   users: usersRouter,
   geografia: geografiaRouter,
   eleitorado: eleitoradoRouter,
+  mapaCalor: mapaCalorRouter,
   partidos: partidosRouter,
   candidatos: candidatosRouter,
   resultados: resultadosRouter,
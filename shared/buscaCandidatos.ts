@@ -0,0 +1,55 @@
+/**
+ * Busca de candidatos (tabelas candidatos_busca e candidatos_busca_termos)
+ * Mesma normalização e mesmos termos de scripts/tse_busca.py, que gera o índice
+ */
+
+// Tamanhos de prefixo indexados; consultas maiores são conferidas no texto do candidato
+export const PREFIXO_MIN = 2;
+export const PREFIXO_MAX = 10;
+
+// Marca dos termos de trigrama
+export const TRIGRAMA = "#";
+
+// Peso = qualidade * ESCALA_ANO + ano
+export const ESCALA_ANO = 10_000;
+
+// Fração mínima dos trigramas da consulta presentes no candidato para entrar como resultado aproximado
+export const SIMILARIDADE_MINIMA = 0.5;
+
+// Candidatos lidos por termo da consulta
+export const POR_TERMO = 200;
+
+/** Minúsculas sem acento, só letras e dígitos separados por um espaço */
+export function normalizar(texto: string | null | undefined): string {
+  return (texto ?? "")
+    .normalize("NFKD")
+    .replace(/\p{M}/gu, "")
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim();
+}
+
+export function trigramas(palavra: string): Set<string> {
+  const resultado = new Set<string>();
+  for (let i = 0; i + 3 <= palavra.length; i++) resultado.add(palavra.slice(i, i + 3));
+  return resultado;
+}
+
+/**
+ * Termos procurados no índice: a consulta inteira como prefixo e, com várias palavras,
+ * cada palavra sozinha (palavras fora de ordem)
+ */
+export function termosDaConsulta(texto: string) {
+  const palavras = texto.split(" ").filter(Boolean);
+  const frase = texto.slice(0, PREFIXO_MAX).trimEnd();
+  const soltas =
+    palavras.length > 1
+      ? Array.from(new Set(palavras.filter((p) => p.length >= PREFIXO_MIN).map((p) => p.slice(0, PREFIXO_MAX))))
+      : [];
+  return { palavras, frase, soltas };
+}
+
+/** Alguma palavra do texto normalizado do candidato começa com `palavra` */
+export function contemPrefixo(texto: string, palavra: string): boolean {
+  return texto.split(" ").some((p) => p.startsWith(palavra));
+}
@@ -0,0 +1,59 @@
+/**
+ * Grade do mapa de calor (tabela mapa_calor)
+ * Mesmo cálculo de scripts/tse_mapa.py: células Web Mercator alinhadas aos tiles do mapa
+ */
+
+// Níveis de zoom pré-calculados pelo script gerar_mapa_calor.py
+export const NIVEIS_ZOOM = [4, 6, 8, 10, 12, 14, 16] as const;
+
+// Células por tile (256 px) em cada eixo
+export const CELULAS_POR_TILE = 8;
+
+// Máximo de células pedidas por janela (a janela de uma tela cheia tem cerca de mil)
+export const MAX_CELULAS_JANELA = 5000;
+
+const LATITUDE_MAXIMA = 85.05112878;
+
+export type Janela = { norte: number; sul: number; leste: number; oeste: number };
+
+export type IntervaloCelulas = { zoom: number; xMin: number; xMax: number; yMin: number; yMax: number };
+
+/** Maior nível pré-calculado que não passa do zoom do mapa (o menor nível abaixo dele) */
+export function nivelDoZoom(zoom: number): number {
+  let nivel: number = NIVEIS_ZOOM[0];
+  for (const n of NIVEIS_ZOOM) {
+    if (n <= zoom) nivel = n;
+  }
+  return nivel;
+}
+
+/** Célula (x, y) do ponto no nível */
+export function celulaDe(latitude: number, longitude: number, nivel: number) {
+  const n = CELULAS_POR_TILE * 2 ** nivel;
+  const lat = (Math.max(-LATITUDE_MAXIMA, Math.min(LATITUDE_MAXIMA, latitude)) * Math.PI) / 180;
+  const x = (longitude + 180) / 360;
+  const y = (1 - Math.log(Math.tan(lat) + 1 / Math.cos(lat)) / Math.PI) / 2;
+  const limitar = (v: number) => Math.max(0, Math.min(n - 1, Math.floor(v * n)));
+  return { x: limitar(x), y: limitar(y) };
+}
+
+/** Intervalo de células da janela visível no nível do zoom (y cresce para o sul) */
+export function celulasDaJanela(janela: Janela, zoom: number): IntervaloCelulas {
+  const nivel = nivelDoZoom(zoom);
+  const noroeste = celulaDe(janela.norte, janela.oeste, nivel);
+  const sudeste = celulaDe(janela.sul, janela.leste, nivel);
+  // Janela que cruza o antimeridiano: todas as colunas
+  const cruza = janela.oeste > janela.leste;
+  return {
+    zoom: nivel,
+    xMin: cruza ? 0 : noroeste.x,
+    xMax: cruza ? CELULAS_POR_TILE * 2 ** nivel - 1 : sudeste.x,
+    yMin: noroeste.y,
+    yMax: sudeste.y,
+  };
+}
+
+/** Quantidade de células do intervalo */
+export function totalCelulas(intervalo: IntervaloCelulas): number {
+  return (intervalo.xMax - intervalo.xMin + 1) * (intervalo.yMax - intervalo.yMin + 1);
+}
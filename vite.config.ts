@@ -1,13 +1,42 @@
 import { jsxLocPlugin } from "@builder.io/vite-plugin-jsx-loc";
 import tailwindcss from "@tailwindcss/vite";
 import react from "@vitejs/plugin-react";
+import crypto from "node:crypto";
 import fs from "node:fs";
 import path from "path";
-import { defineConfig } from "vite";
+import { defineConfig, type Plugin } from "vite";
 import { vitePluginManusRuntime } from "vite-plugin-manus-runtime";
 
+// Versiona os favicons do index.html pelo hash do manifesto de scripts/generate-favicon.py
+// (client/public/favicons.json, versionado no git): a URL muda só quando o arquivo muda, e o cache
+// pode ser longo (vercel.json, serveStatic). Arquivo que não confere com o manifesto fica sem versão.
+function faviconsVersionados(): Plugin {
+  const publico = path.resolve(import.meta.dirname, "client", "public");
+  const manifesto = path.join(publico, "favicons.json");
+  return {
+    name: "favicons-versionados",
+    transformIndexHtml(html) {
+      if (!fs.existsSync(manifesto)) return html;
+      const { arquivos } = JSON.parse(fs.readFileSync(manifesto, "utf-8")) as {
+        arquivos: Record<string, { sha256: string }>;
+      };
+      const confere = (nome: string) => {
+        const caminho = path.join(publico, nome);
+        if (!fs.existsSync(caminho)) return false;
+        const hash = crypto.createHash("sha256").update(fs.readFileSync(caminho)).digest("hex");
+        if (hash !== arquivos[nome].sha256) {
+          console.warn(`[favicons-versionados] ${nome} difere de favicons.json; rode scripts/generate-favicon.py`);
+        }
+        return hash === arquivos[nome].sha256;
+      };
+      return html.replace(/href="\/([^"?]+)"/g, (trecho, nome: string) =>
+        arquivos[nome] && confere(nome) ? `href="/${nome}?v=${arquivos[nome].sha256.slice(0, 12)}"` : trecho
+      );
+    },
+  };
+}
 
-const plugins = [react(), tailwindcss(), jsxLocPlugin(), vitePluginManusRuntime()];
+const plugins = [react(), tailwindcss(), jsxLocPlugin(), vitePluginManusRuntime(), faviconsVersionados()];
 
 export default defineConfig({
   plugins,